@@ -0,0 +1,65 @@
+"""Benchmark AttributionIndex build, lookup, save and reload.
+
+Run from packages/python::
+
+    PYTHONPATH=src python benchmarks/bench_attribution.py
+"""
+
+from __future__ import annotations
+
+import io
+import random
+import time
+
+from openhook import EventType, OpenHookEvent
+from openhook.attribution import AttributionIndex
+
+
+def main(n: int = 200_000, files: int = 500) -> None:
+    rng = random.Random(0)
+    events = []
+    for i in range(n):
+        start = rng.randint(1, 5_000)
+        events.append(OpenHookEvent.create(
+            source="claude-code",
+            type=EventType.FILE_WRITE,
+            session_id=f"sess_{i // 200}",
+            data={
+                "path": f"src/file_{rng.randrange(files)}.ts",
+                "start_line": start,
+                "end_line": start + rng.randint(0, 40),
+                "model": rng.choice(["anthropic/claude-sonnet-4-6", "openai/gpt-5"]),
+            },
+            event_id=str(i),
+            time="2026-02-23T10:00:00Z",
+        ))
+
+    index = AttributionIndex()
+    start = time.perf_counter()
+    for event in events:
+        index.add(event)
+    build = time.perf_counter() - start
+
+    queries = [(f"src/file_{rng.randrange(files)}.ts", rng.randint(1, 5_000)) for _ in range(100_000)]
+    start = time.perf_counter()
+    for path, line in queries:
+        index.who_wrote(path, line)
+    lookup = time.perf_counter() - start
+
+    buf = io.BytesIO()
+    start = time.perf_counter()
+    index.save(buf)
+    save = time.perf_counter() - start
+    buf.seek(0)
+    start = time.perf_counter()
+    AttributionIndex.load(buf)
+    load = time.perf_counter() - start
+
+    print(f"build:  {n / build:>12,.0f} events/s")
+    print(f"lookup: {lookup / len(queries) * 1e9:>12,.0f} ns/query")
+    print(f"save:   {save * 1e3:>12,.1f} ms ({len(buf.getvalue()):,} bytes)")
+    print(f"load:   {load * 1e3:>12,.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
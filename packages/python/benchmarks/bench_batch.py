@@ -0,0 +1,74 @@
+"""Benchmark EventBatch against a list of OpenHookEvent objects.
+
+Run from packages/python::
+
+    PYTHONPATH=src python benchmarks/bench_batch.py
+"""
+
+from __future__ import annotations
+
+import io
+import time
+import tracemalloc
+from collections import defaultdict
+
+from openhook import EventType, OpenHookEvent, iter_events
+from openhook.batch import EventBatch
+
+
+def _ndjson(n: int) -> bytes:
+    tools = ("Bash", "Read", "Edit", "Grep")
+    return b"".join(
+        OpenHookEvent.create(
+            source="claude-code", type=EventType.TOOL_END, session_id=f"sess_{i // 100}",
+            data={"tool_name": tools[i % 4], "tool_call_id": f"call_{i}", "status": "success", "duration_ms": i % 500},
+            time="2026-02-23T10:00:00Z",
+        ).to_json_bytes() + b"\n"
+        for i in range(n)
+    )
+
+
+def _held(build) -> int:
+    tracemalloc.start()
+    result = build()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return held
+
+
+def main(n: int = 100_000) -> None:
+    raw = _ndjson(n)
+
+    start = time.perf_counter()
+    events = list(iter_events(io.BytesIO(raw)))
+    load_list = time.perf_counter() - start
+    start = time.perf_counter()
+    batch = EventBatch.from_stream(io.BytesIO(raw))
+    load_batch = time.perf_counter() - start
+
+    start = time.perf_counter()
+    totals: dict[str, int] = defaultdict(int)
+    for event in events:
+        if event.type == EventType.TOOL_END:
+            totals[event.data["tool_name"]] += event.data["duration_ms"]
+    query_list = time.perf_counter() - start
+    start = time.perf_counter()
+    batch.filter(type="tool.end").group_by("tool_name", "duration_ms", "sum")
+    query_batch = time.perf_counter() - start
+
+    list_bytes = _held(lambda: list(iter_events(io.BytesIO(raw))))
+    batch_bytes = _held(lambda: EventBatch.from_stream(io.BytesIO(raw)))
+
+    for label, load, query, held in (
+        ("list[OpenHookEvent]", load_list, query_list, list_bytes),
+        ("EventBatch", load_batch, query_batch, batch_bytes),
+    ):
+        print(
+            f"{label:<20} load {load / n * 1e6:>6,.2f} us/event  "
+            f"filter+group {query * 1e3:>8,.1f} ms  {held / n:>7,.0f} bytes/event"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Benchmark `openhook convert` / `openhook trace` throughput by worker count.
+
+Run from packages/python::
+
+    PYTHONPATH=src python benchmarks/bench_cli.py
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import time
+
+from openhook.cli import run
+
+
+def _write_corpus(path: str, n: int) -> None:
+    with open(path, "w") as f:
+        for i in range(n):
+            f.write(json.dumps({
+                "openhook": "0.1", "id": f"e{i}", "source": "claude-code", "type": "file.write",
+                "time": "2026-02-23T10:15:45.678Z", "session_id": f"sess_{i % 500}",
+                "data": {"path": f"src/module_{i % 97}.ts", "start_line": 1, "end_line": 30, "model": "anthropic/x"},
+            }) + "\n")
+
+
+def main(n: int = 400_000) -> None:
+    cpus = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "events.ndjson")
+        _write_corpus(path, n)
+        size = os.path.getsize(path)
+        print(f"{n:,} events, {size / 1e6:,.0f} MB, {cpus} CPUs")
+        for command, aggregate in (("convert", False), ("trace", False), ("trace", True)):
+            label = command + (" --aggregate" if aggregate else "")
+            for jobs in sorted({1, 2, cpus}):
+                start = time.perf_counter()
+                out = os.path.join(tmp, f"out-{len(label)}-{jobs}")
+                run(command, [path], out, jobs=jobs, chunk_size=4 << 20,
+                    partitions=jobs if aggregate else 1, aggregate=aggregate)
+                elapsed = time.perf_counter() - start
+                print(f"  {label:<18} jobs={jobs:<3} {size / elapsed / 1e6:>8,.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Compare JSON backends for from_json and the direct to_json encoder.
+
+Run from packages/python::
+
+    PYTHONPATH=src python benchmarks/bench_codec.py
+"""
+
+from __future__ import annotations
+
+import json
+import timeit
+from pathlib import Path
+
+from openhook import OpenHookEvent, codec
+
+EXAMPLE = Path(__file__).resolve().parents[3] / "spec" / "examples" / "claude-session-end.json"
+
+
+def _per_call_ns(stmt, number: int) -> float:
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number * 1e9
+
+
+def main(number: int = 50_000) -> None:
+    raw = json.dumps(json.loads(EXAMPLE.read_text())).encode()
+    event = OpenHookEvent.from_json_bytes(raw)
+
+    previous = codec.get_backend()
+    for name in codec.BACKENDS:
+        try:
+            codec.set_backend(name)
+        except ImportError:
+            print(f"from_json_bytes [{name}]: not installed")
+            continue
+        ns = _per_call_ns(lambda: OpenHookEvent.from_json_bytes(raw), number)
+        print(f"from_json_bytes [{name}]: {ns:,.0f} ns")
+    codec.set_backend(previous)
+
+    baseline = _per_call_ns(lambda: json.dumps(event.to_dict()), number)
+    direct = _per_call_ns(event.to_json, number)
+    print(f"json.dumps(to_dict()): {baseline:,.0f} ns")
+    print(f"to_json():             {direct:,.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
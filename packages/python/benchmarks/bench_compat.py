@@ -0,0 +1,74 @@
+"""Benchmark legacy conversion: batch throughput and per-event retained memory.
+
+Run from packages/python::
+
+    PYTHONPATH=src python benchmarks/bench_compat.py
+"""
+
+from __future__ import annotations
+
+import json
+import time
+import tracemalloc
+
+from openhook import from_legacy, from_legacy_many
+
+
+def _corpus(n: int) -> list[dict]:
+    payloads = []
+    for i in range(n):
+        if i % 3 == 0:
+            payloads.append({
+                "hook_event_name": "postToolUse", "session_id": f"s{i % 50}",
+                "tool_name": "Bash", "cwd": "/home/user/project", "tool_output": "x" * 64,
+            })
+        elif i % 3 == 1:
+            payloads.append({"sessionId": f"s{i % 50}", "transcriptPath": "/t.jsonl", "cwd": "/home"})
+        else:
+            payloads.append({"conversation_id": f"c{i % 50}", "hook_event_name": "stop"})
+    return payloads
+
+
+def _retention(n: int = 20, output_bytes: int = 1 << 20) -> None:
+    """Memory kept per converted postToolUse event carrying a large tool output."""
+    print(f"\nretained per event ({output_bytes:,} B tool output):")
+    for retain in ("full", "keys-only", "truncated", "digest", "raw"):
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        events = []
+        for i in range(n):
+            raw = json.dumps({
+                "hook_event_name": "postToolUse", "session_id": f"s{i}",
+                "tool_name": "Bash", "tool_output": "x" * output_bytes,
+            }).encode()
+            payload = json.loads(raw)
+            events.append(from_legacy(payload, retain=retain, raw=raw))
+            del payload, raw
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        retained = sum(s.size_diff for s in after.compare_to(before, "filename"))
+        print(f"  {retain:<10}{retained / len(events):>14,.0f} B/event")
+        del events
+
+
+def main(n: int = 200_000) -> None:
+    payloads = _corpus(n)
+
+    start = time.perf_counter()
+    for p in payloads:
+        from_legacy(p)
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in from_legacy_many(payloads):
+        pass
+    many = time.perf_counter() - start
+
+    print(f"from_legacy loop:   {n / single:>12,.0f} payloads/s")
+    print(f"from_legacy_many:   {n / many:>12,.0f} payloads/s ({single / many:.1f}x)")
+
+    _retention()
+
+
+if __name__ == "__main__":
+    main()
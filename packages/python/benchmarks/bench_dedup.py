@@ -0,0 +1,53 @@
+"""Benchmark DedupFilter lookup cost and memory per id.
+
+Run from packages/python::
+
+    PYTHONPATH=src python benchmarks/bench_dedup.py
+"""
+
+from __future__ import annotations
+
+import time
+import tracemalloc
+import uuid
+
+from openhook.dedup import DedupFilter
+
+
+def _measure(label: str, ids: list[str], **options: object) -> None:
+    dedup = DedupFilter(**options)  # type: ignore[arg-type]
+    start = time.perf_counter()
+    for event_id in ids:
+        dedup.seen(event_id)
+    insert = time.perf_counter() - start
+    start = time.perf_counter()
+    for event_id in ids:
+        dedup.seen(event_id)
+    repeat = time.perf_counter() - start
+
+    # Memory is measured on a separate run: tracemalloc slows allocation.
+    # The id strings themselves are excluded (the caller holds them anyway).
+    tracemalloc.start()
+    dedup = DedupFilter(**options)  # type: ignore[arg-type]
+    for event_id in ids:
+        dedup.seen(event_id)
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(
+        f"{label:<18} new {insert / len(ids) * 1e9:>7,.0f} ns/id  "
+        f"duplicate {repeat / len(ids) * 1e9:>7,.0f} ns/id  "
+        f"{held / len(ids):>7,.1f} bytes/id"
+    )
+
+
+def main(n: int = 200_000) -> None:
+    ids = [str(uuid.uuid4()) for _ in range(n)]
+    _measure("exact LRU", ids, max_ids=n)
+    _measure("bloom (p=0.001)", ids, max_ids=1, bloom_capacity=n)
+    _measure("bloom (p=0.01)", ids, max_ids=1, bloom_capacity=n, false_positive_rate=0.01)
+    _measure("LRU 10k + bloom", ids, max_ids=10_000, bloom_capacity=n)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""Benchmark event id generation against uuid.uuid4().
+
+Run from packages/python::
+
+    PYTHONPATH=src python benchmarks/bench_ids.py
+"""
+
+from __future__ import annotations
+
+import time
+import uuid
+
+from openhook.ids import UUID4Generator, UUID7Generator
+
+
+def main(n: int = 200_000) -> None:
+    for label, generate in (
+        ("str(uuid.uuid4())", lambda: str(uuid.uuid4())),
+        ("UUID4Generator (batched)", UUID4Generator()),
+        ("UUID7Generator (batched)", UUID7Generator()),
+    ):
+        start = time.perf_counter()
+        for _ in range(n):
+            generate()
+        elapsed = time.perf_counter() - start
+        print(f"{label:<26} {elapsed / n * 1e9:>7,.0f} ns/id")
+
+
+if __name__ == "__main__":
+    main()
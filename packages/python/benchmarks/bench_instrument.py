@@ -0,0 +1,48 @@
+"""Benchmark the cost of instrumentation, disabled and enabled.
+
+Run from packages/python::
+
+    PYTHONPATH=src python benchmarks/bench_instrument.py
+"""
+
+from __future__ import annotations
+
+import json
+import time
+
+from openhook import OpenHookEvent, envelope, instrument
+
+_LINE = json.dumps({
+    "openhook": "0.1", "id": "e1", "source": "copilot", "type": "tool.end",
+    "time": "2026-02-23T10:16:05.456Z", "session_id": "gh_sess_xyz789",
+    "data": {"tool_name": "Bash", "tool_call_id": "call_abc123", "status": "success", "duration_ms": 3200},
+})
+
+
+def _ns_per_op(fn, arg, n: int) -> float:
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter_ns()
+        for _ in range(n):
+            fn(arg)
+        best = min(best, (time.perf_counter_ns() - start) / n)
+    return best
+
+
+def main(n: int = 50_000) -> None:
+    payload = json.loads(_LINE)
+    for label, enable in (("disabled", None), ("enabled", {}), ("enabled + callback", {"callback": lambda *a: None})):
+        if enable is not None:
+            instrument.enable(**enable)
+        # Look the functions up after enable(), as instrumented code would.
+        from_json = OpenHookEvent.from_json
+        validate = envelope.validate
+        print(
+            f"{label:<20} from_json {_ns_per_op(from_json, _LINE, n):>8,.0f} ns/op"
+            f"   validate {_ns_per_op(validate, payload, n):>8,.0f} ns/op"
+        )
+        instrument.disable()
+
+
+if __name__ == "__main__":
+    main()
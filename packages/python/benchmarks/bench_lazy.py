@@ -0,0 +1,66 @@
+"""Compare OpenHookEvent and LazyEvent: parse throughput and retained memory.
+
+Run from packages/python::
+
+    PYTHONPATH=src python benchmarks/bench_lazy.py
+"""
+
+from __future__ import annotations
+
+import json
+import time
+import tracemalloc
+
+from openhook import LazyEvent, OpenHookEvent
+
+
+def _line(i: int) -> bytes:
+    return json.dumps({
+        "openhook": "0.1",
+        "id": f"7c9e6679-7425-40de-944b-{i:012d}",
+        "source": "copilot",
+        "type": "tool.end",
+        "time": "2026-02-23T10:16:05.456Z",
+        "session_id": f"sess_{i % 100}",
+        "data": {
+            "tool_name": "Bash",
+            "tool_call_id": f"call_{i}",
+            "status": "success",
+            "duration_ms": 3200,
+            "output": "x" * 200,
+        },
+        "context": "file:///home/user/my-project",
+        "extensions": {"vendor": {"trace": [1, 2, 3]}},
+    }).encode()
+
+
+def _measure(parse, lines: list[bytes]) -> tuple[float, float]:
+    start = time.perf_counter()
+    for line in lines:
+        parse(line)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    # Parse fresh copies so raw text retained by an event is counted.
+    kept = [parse(bytes(memoryview(line))) for line in lines]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    retained = sum(s.size_diff for s in after.compare_to(before, "filename"))
+    del kept
+    return len(lines) / elapsed, retained / len(lines)
+
+
+def main(n: int = 50_000) -> None:
+    lines = [_line(i) for i in range(n)]
+    # Routing only touches the envelope, so the lazy path never decodes data.
+    for name, parse in (
+        ("OpenHookEvent", OpenHookEvent.from_json),
+        ("LazyEvent", LazyEvent.from_json),
+    ):
+        ops, per_event = _measure(parse, lines)
+        print(f"{name:<14}{ops:>12,.0f} events/s{per_event:>10,.0f} B/event retained")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Benchmark OTLPExporter throughput against a local stand-in collector.
+
+Run from packages/python::
+
+    PYTHONPATH=src python benchmarks/bench_otlp.py
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from openhook import EventType, OpenHookEvent
+from openhook.export.otlp import OTLPExporter
+
+
+class _Sink(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    received = 0
+
+    def do_POST(self) -> None:
+        _Sink.received += len(self.rfile.read(int(self.headers["Content-Length"])))
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+def _events(n: int) -> list[OpenHookEvent]:
+    events = []
+    for i in range(n // 3):
+        session_id = f"sess_{i // 20}"
+        events.append(OpenHookEvent.create(
+            source="claude-code", type=EventType.TOOL_START, session_id=session_id,
+            data={"tool_name": "Bash", "tool_call_id": f"call_{i}"},
+            event_id=f"{i}s", time="2026-02-23T10:00:00Z",
+        ))
+        events.append(OpenHookEvent.create(
+            source="claude-code", type=EventType.TOOL_END, session_id=session_id,
+            data={"tool_call_id": f"call_{i}", "status": "success", "duration_ms": 1200},
+            event_id=f"{i}e", time="2026-02-23T10:00:01.200Z",
+        ))
+        events.append(OpenHookEvent.create(
+            source="claude-code", type=EventType.SESSION_END, session_id=session_id,
+            data={"duration_ms": 120000, "input_tokens": 5000, "output_tokens": 1200,
+                  "model": "anthropic/claude-sonnet-4-6"},
+            event_id=f"{i}x", time="2026-02-23T10:02:00Z",
+        ))
+    return events
+
+
+def main(n: int = 60_000, batch_sizes: tuple[int, ...] = (1, 64, 512, 2048)) -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Sink)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    endpoint = f"http://127.0.0.1:{server.server_port}"
+    events = _events(n)
+    try:
+        for batch_size in batch_sizes:
+            count = len(events) if batch_size > 1 else len(events) // 20
+            _Sink.received = 0
+            exporter = OTLPExporter(endpoint, max_batch_size=batch_size)
+            start = time.perf_counter()
+            for event in events[:count]:
+                exporter.add(event)
+            exporter.close()
+            elapsed = time.perf_counter() - start
+            print(
+                f"batch {batch_size:>5}: {count / elapsed:>10,.0f} events/s "
+                f"{exporter.counters['requests']:>6,} requests "
+                f"{_Sink.received / count:>7.1f} wire bytes/event"
+            )
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Benchmark Router.match against checking every subscription, up to 10k subscriptions.
+
+Run from packages/python::
+
+    PYTHONPATH=src python benchmarks/bench_router.py
+"""
+
+from __future__ import annotations
+
+import random
+import time
+
+from openhook import EventType, OpenHookEvent
+from openhook.router import Router, Subscription
+
+_TYPES = [t.value for t in EventType]
+_SOURCES = ["claude-code", "copilot", "cursor", "codex", "gemini"]
+_TOOLS = ["Bash", "Read", "Edit", "Write", "Grep"]
+
+
+def _subscriptions(n: int, rng: random.Random) -> list[Subscription]:
+    # A gateway's mix: a few global subscriptions, the rest watching one of
+    # n/10 teams' repositories; some also narrow by type, source or tool.
+    # An event therefore matches about the same number at every size.
+    teams = max(n // 10, 1)
+    subs = []
+    for i in range(n):
+        roll = rng.random()
+        subs.append(Subscription(
+            i,
+            events=frozenset(rng.sample(_TYPES, 2)) if roll < 0.6 else frozenset({"*"}),
+            sources=frozenset({rng.choice(_SOURCES)}) if roll < 0.3 else frozenset({"*"}),
+            context=f"file:///srv/repos/team-{rng.randrange(teams)}/" if i >= 10 else None,
+            data=(("tool_name", rng.choice(_TOOLS)),) if rng.random() < 0.2 else (),
+        ))
+    return subs
+
+
+def _events(n: int, teams: int, rng: random.Random) -> list[OpenHookEvent]:
+    return [
+        OpenHookEvent.create(
+            source=rng.choice(_SOURCES),
+            type=rng.choice(_TYPES),
+            session_id="s1",
+            data={"tool_name": rng.choice(_TOOLS), "status": "success"},
+            context=f"file:///srv/repos/team-{rng.randrange(teams)}/src/app.py",
+            event_id=str(i),
+            time="2026-02-23T10:00:00Z",
+        )
+        for i in range(n)
+    ]
+
+
+def _per_event(fn, events: list[OpenHookEvent]) -> float:
+    start = time.perf_counter()
+    for event in events:
+        fn(event)
+    return (time.perf_counter() - start) / len(events) * 1e6
+
+
+def main(sizes: tuple[int, ...] = (10, 100, 1_000, 10_000), n_events: int = 20_000) -> None:
+    print(f"{'subscriptions':>13}  {'router us/event':>15}  {'linear us/event':>15}  {'matches/event':>13}")
+    for n in sizes:
+        rng = random.Random(n)
+        subs = _subscriptions(n, rng)
+        events = _events(n_events, max(n // 10, 1), rng)
+        router = Router(subs)
+        router.compile()
+        matched = sum(len(router.match(e)) for e in events[:1000]) / 1000
+        routed = _per_event(router.match, events)
+        # The one-by-one scan is slow at 10k; time fewer events.
+        linear = _per_event(lambda e: [s for s in subs if s.matches(e)], events[: max(200, n_events * 10 // n)])
+        print(f"{n:>13,}  {routed:>15.2f}  {linear:>15.2f}  {matched:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Benchmark SessionStore throughput, snapshot cost and memory per open session.
+
+Run from packages/python::
+
+    PYTHONPATH=src python benchmarks/bench_sessions.py
+"""
+
+from __future__ import annotations
+
+import time
+import tracemalloc
+
+from openhook import EventType, OpenHookEvent
+from openhook.sessions import SessionStore
+
+_TOOLS = ("Bash", "Read", "Edit", "Write", "Grep", "Glob")
+
+
+def _events(sessions: int, per_session: int) -> list[OpenHookEvent]:
+    events = []
+    for i in range(per_session):
+        for s in range(sessions):
+            session_id = f"sess_{s:08d}"
+            kind = i % 4
+            if kind == 0:
+                type, data = EventType.PROMPT_SUBMIT, {"prompt_length": 120}
+            elif kind == 1:
+                type, data = EventType.TOOL_START, {"tool_name": _TOOLS[(s + i) % 6], "tool_call_id": f"c{i}"}
+            elif kind == 2:
+                type, data = EventType.TOOL_END, {"tool_call_id": f"c{i}", "status": "error" if i % 9 == 2 else "success"}
+            else:
+                type, data = EventType.FILE_WRITE, {"path": f"src/module_{(s + i) % 40}.py", "model": "anthropic/claude"}
+            events.append(OpenHookEvent.create(
+                source="claude-code", type=type, session_id=session_id, data=data,
+                event_id=f"{s}-{i}", time="2026-02-23T10:00:00Z",
+            ))
+    return events
+
+
+def _memory(sessions: int, per_session: int) -> float:
+    """Bytes retained by the store per open session, ids and paths included."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    store = SessionStore(max_sessions=sessions)
+    events = _events(sessions, per_session)
+    for event in events:
+        store.add(event)
+    del events
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(store) == sessions
+    return (after - before) / sessions
+
+
+def main(sessions: int = 20_000, per_session: int = 8) -> None:
+    events = _events(sessions, per_session)
+    store = SessionStore(max_sessions=sessions)
+    start = time.perf_counter()
+    for event in events:
+        store.add(event)
+    elapsed = time.perf_counter() - start
+
+    ids = [f"sess_{s:08d}" for s in range(sessions)]
+    start = time.perf_counter()
+    for session_id in ids:
+        store.snapshot(session_id)
+    snap_elapsed = time.perf_counter() - start
+
+    print(f"events:    {len(events):>12,} across {sessions:,} sessions")
+    print(f"rate:      {len(events) / elapsed:>12,.0f} events/s")
+    print(f"snapshot:  {snap_elapsed / sessions * 1e6:>12.2f} us")
+    print(f"memory:    {_memory(sessions, 1):>12,.0f} bytes/session (one prompt)")
+    print(f"memory:    {_memory(sessions, per_session):>12,.0f} bytes/session "
+          f"({per_session} events, 2 files)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Benchmark ToolSpanCorrelator throughput and open-table size.
+
+Run from packages/python::
+
+    PYTHONPATH=src python benchmarks/bench_spans.py
+"""
+
+from __future__ import annotations
+
+import random
+import time
+
+from openhook import EventType, OpenHookEvent
+from openhook.spans import ToolSpanCorrelator
+
+
+def main(n: int = 100_000, orphan_rate: float = 0.05, max_open: int = 10_000) -> None:
+    rng = random.Random(0)
+    events = []
+    for i in range(n // 2):
+        session_id = f"sess_{i // 50}"
+        events.append(OpenHookEvent.create(
+            source="claude-code",
+            type=EventType.TOOL_START,
+            session_id=session_id,
+            data={"tool_name": "Bash", "tool_call_id": f"call_{i}"},
+            event_id=f"{i}s",
+            time="2026-02-23T10:00:00Z",
+        ))
+        if rng.random() >= orphan_rate:
+            events.append(OpenHookEvent.create(
+                source="claude-code",
+                type=EventType.TOOL_END,
+                session_id=session_id,
+                data={"tool_call_id": f"call_{i}", "status": "success", "duration_ms": 1200},
+                event_id=f"{i}e",
+                time="2026-02-23T10:00:01.200Z",
+            ))
+
+    correlator = ToolSpanCorrelator(max_open=max_open)
+    peak = 0
+    start = time.perf_counter()
+    for event in events:
+        correlator.add(event)
+        if len(correlator) > peak:
+            peak = len(correlator)
+    elapsed = time.perf_counter() - start
+
+    print(f"events:    {len(events):>12,}")
+    print(f"rate:      {len(events) / elapsed:>12,.0f} events/s")
+    print(f"peak open: {peak:>12,} (max_open={max_open:,})")
+    print(f"counters:  {correlator.counters}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark spool appends against emit() + fsync per event.
+
+Run from packages/python::
+
+    PYTHONPATH=src python benchmarks/bench_spool.py
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+import time
+
+from openhook import EventType, OpenHookEvent
+from openhook.spool import SpoolReader, SpoolWriter
+
+
+def _report(label: str, n: int, elapsed: float) -> None:
+    print(f"{label:<30} {elapsed / n * 1e6:>9,.1f} us/event {n / elapsed:>10,.0f} events/s")
+
+
+def main(n: int = 20_000, threads: int = 8) -> None:
+    events = [
+        OpenHookEvent.create(
+            source="claude-code", type=EventType.TOOL_END, session_id=f"sess_{i // 100}",
+            data={"tool_name": "Bash", "tool_call_id": f"call_{i}", "status": "success", "duration_ms": 120},
+            event_id=str(i), time="2026-02-23T10:00:00Z",
+        )
+        for i in range(n)
+    ]
+    few = events[: n // 10]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, "events.ndjson"), "w") as f:
+            start = time.perf_counter()
+            for event in few:
+                event.emit(f)
+                os.fsync(f.fileno())
+            _report("emit + fsync per event", len(few), time.perf_counter() - start)
+
+        with SpoolWriter(os.path.join(tmp, "a"), fsync=False) as spool:
+            start = time.perf_counter()
+            for event in events:
+                spool.append(event)
+            _report("spool append (no fsync)", n, time.perf_counter() - start)
+
+        with SpoolWriter(os.path.join(tmp, "b")) as spool:
+            start = time.perf_counter()
+            for event in few:
+                spool.append(event)
+            _report("spool append (fsync, 1 thread)", len(few), time.perf_counter() - start)
+
+        spool = SpoolWriter(os.path.join(tmp, "c"))
+        per_thread = len(few) // threads
+
+        def work(k: int) -> None:
+            for event in few[k * per_thread:(k + 1) * per_thread]:
+                spool.append(event)
+
+        workers = [threading.Thread(target=work, args=(k,)) for k in range(threads)]
+        start = time.perf_counter()
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        elapsed = time.perf_counter() - start
+        spool.close()
+        _report(f"spool append (fsync, {threads} threads)", per_thread * threads, elapsed)
+        print(f"{'':<30} {spool.counters['fsyncs']:,} fsyncs for {spool.counters['records']:,} records")
+
+        reader = SpoolReader(os.path.join(tmp, "a"))
+        start = time.perf_counter()
+        count = sum(1 for _ in reader.replay(lazy=True))
+        _report("replay (lazy)", count, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Benchmark timestamp parsing and time-range filtering of NDJSON streams.
+
+Run from packages/python::
+
+    PYTHONPATH=src python benchmarks/bench_timestamps.py
+"""
+
+from __future__ import annotations
+
+import io
+import time
+from datetime import datetime, timedelta, timezone
+
+from openhook import EventType, OpenHookEvent, iter_events
+from openhook.timestamps import parse_time
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _fromisoformat_ns(timestamp: str) -> int:
+    delta = datetime.fromisoformat(timestamp) - _EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000_000 + delta.microseconds * 1_000
+
+
+def _report(label: str, n: int, elapsed: float) -> None:
+    print(f"{label:<36} {elapsed / n * 1e9:>9,.0f} ns/event")
+
+
+def main(n: int = 100_000) -> None:
+    start = datetime(2026, 2, 23, tzinfo=timezone.utc)
+    stamps = [(start + timedelta(microseconds=i * 7_919)).isoformat() for i in range(n)]
+    zulu = [s.replace("+00:00", "Z") for s in stamps]
+
+    for label, parse, corpus in (
+        ("datetime.fromisoformat (+00:00)", _fromisoformat_ns, stamps),
+        ("parse_time (+00:00)", parse_time, stamps),
+        ("parse_time (Z)", parse_time, zulu),
+    ):
+        t0 = time.perf_counter()
+        for s in corpus:
+            parse(s)
+        _report(label, n, time.perf_counter() - t0)
+
+    events = [
+        OpenHookEvent.create(source="claude-code", type=EventType.PROMPT_SUBMIT, session_id="s", time=s)
+        for s in zulu
+    ]
+    t0 = time.perf_counter()
+    for _ in range(10):
+        for event in events:
+            event.epoch_ns
+    _report("event.epoch_ns (x10, cached)", n * 10, time.perf_counter() - t0)
+
+    raw = b"".join(e.to_json_bytes() + b"\n" for e in events)
+    since = parse_time(zulu[n * 9 // 10])
+    t0 = time.perf_counter()
+    decoded = [e for e in iter_events(io.BytesIO(raw)) if e.epoch_ns >= since]  # type: ignore[operator]
+    _report("decode all, then filter (last 10%)", n, time.perf_counter() - t0)
+    t0 = time.perf_counter()
+    skipped = list(iter_events(io.BytesIO(raw), since=since))
+    _report("iter_events(since=) (last 10%)", n, time.perf_counter() - t0)
+    assert len(decoded) == len(skipped)
+
+
+if __name__ == "__main__":
+    main()
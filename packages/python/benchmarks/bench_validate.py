@@ -0,0 +1,64 @@
+"""Compare validate() with and without strict schema checks.
+
+Run from packages/python::
+
+    PYTHONPATH=src python benchmarks/bench_validate.py
+"""
+
+from __future__ import annotations
+
+import timeit
+
+from openhook import validate
+
+PAYLOADS = {
+    "session.end": {
+        "openhook": "0.1",
+        "id": "550e8400-e29b-41d4-a716-446655440000",
+        "source": "claude-code",
+        "type": "session.end",
+        "time": "2026-02-23T10:15:30.123Z",
+        "session_id": "sess_abc123def456",
+        "data": {
+            "transcript_path": "/home/user/.claude/sessions/sess_abc123def456.jsonl",
+            "reason": "user_exit",
+            "model": "claude-sonnet-4-20250514",
+            "duration_ms": 120000,
+            "input_tokens": 50000,
+            "output_tokens": 12000,
+        },
+        "context": "file:///home/user/my-project",
+    },
+    "file.write": {
+        "openhook": "0.1",
+        "id": "a1b2c3d4-e5f6-7890-abcd-ef1234567890",
+        "source": "claude-code",
+        "type": "file.write",
+        "time": "2026-02-23T10:15:45.678Z",
+        "session_id": "sess_abc123def456",
+        "data": {
+            "path": "src/utils.ts",
+            "operation": "create",
+            "start_line": 1,
+            "end_line": 30,
+            "model": "anthropic/claude-sonnet-4-6",
+            "tool_call_id": "call_xyz789",
+        },
+    },
+}
+
+
+def _per_call_ns(stmt, number: int) -> float:
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number * 1e9
+
+
+def main(number: int = 100_000) -> None:
+    print(f"{'event':<14}{'validate':>12}{'strict':>12}{'ratio':>8}")
+    for name, payload in PAYLOADS.items():
+        loose = _per_call_ns(lambda: validate(payload), number)
+        strict = _per_call_ns(lambda: validate(payload, strict=True), number)
+        print(f"{name:<14}{loose:>10.0f}ns{strict:>10.0f}ns{strict / loose:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Benchmark EventWriter against emit() per event.
+
+Run from packages/python::
+
+    PYTHONPATH=src python benchmarks/bench_writer.py
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import tempfile
+import time
+
+from openhook import EventType, OpenHookEvent
+from openhook.writer import EventWriter
+
+
+def _report(label: str, n: int, elapsed: float) -> None:
+    print(f"{label:<34} {elapsed / n * 1e6:>7,.2f} us/event {n / elapsed:>11,.0f} events/s")
+
+
+def main(n: int = 50_000) -> None:
+    events = [
+        OpenHookEvent.create(
+            source="claude-code", type=EventType.TOOL_START, session_id=f"sess_{i // 100}",
+            data={"tool_name": "Bash", "tool_call_id": f"call_{i}"},
+            event_id=str(i), time="2026-02-23T10:00:00Z",
+        )
+        for i in range(n)
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "events.ndjson")
+        with open(path, "w") as f:
+            start = time.perf_counter()
+            for event in events:
+                event.emit(f)
+            _report("emit() per event (text file)", n, time.perf_counter() - start)
+        expected = os.path.getsize(path)
+
+        for label, options in (
+            ("EventWriter(max_events=100)", {"max_events": 100, "max_bytes": None}),
+            ("EventWriter(max_bytes=64 KiB)", {}),
+            ("EventWriter(max_age=0.05)", {"max_bytes": None, "max_age": 0.05}),
+        ):
+            with open(path, "wb") as f:
+                start = time.perf_counter()
+                with EventWriter(f, **options) as writer:  # type: ignore[arg-type]
+                    for event in events:
+                        writer.write(event)
+                _report(label, n, time.perf_counter() - start)
+            assert os.path.getsize(path) == expected
+
+    # A pipe to another process, as a hook's stdout usually is: every flush
+    # is a write(2) the reader has to wake up for.
+    for label, make in (
+        ("emit() per event (pipe)", None),
+        ("EventWriter(max_events=100) (pipe)", lambda out: EventWriter(out, max_events=100, max_bytes=None)),
+    ):
+        sink = subprocess.Popen(["cat"], stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, text=True)
+        start = time.perf_counter()
+        if make is None:
+            for event in events:
+                event.emit(sink.stdin)
+        else:
+            with make(sink.stdin) as writer:
+                for event in events:
+                    writer.write(event)
+        sink.stdin.close()  # type: ignore[union-attr]
+        sink.wait()
+        _report(label, n, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+"""Benchmark suite for the parse / validate / convert / serialize hot paths.
+
+Each case runs one operation over a synthetic corpus shaped like the
+envelopes in spec/examples, at the sizes hooks see in practice: small metric
+events, session and file.write events, file.write events carrying large data,
+and legacy payloads up to megabytes of tool output. Per case it reports:
+
+- ops/s, from the fastest of several passes over the corpus,
+- p50 / p99 latency of individual calls,
+- the peak bytes allocated per call (tracemalloc),
+- the change against a saved baseline.
+
+Timings are also scored relative to a fixed pure-Python calibration loop, so
+a baseline saved on one machine can be compared on another. With
+``--baseline`` the run exits with status 1 if any case is slower than its
+baseline by more than ``--threshold``, after measuring such cases a second
+time. Save a new baseline when a change is meant to trade speed for
+something else, or when CI moves to a different Python. The JSON decoder is pinned to the
+stdlib backend (``--backend`` to change it), so results do not depend on
+whether orjson or msgspec happens to be installed.
+
+Run from packages/python::
+
+    PYTHONPATH=src python benchmarks/suite.py
+    PYTHONPATH=src python benchmarks/suite.py --quick --baseline benchmarks/baseline.json
+    PYTHONPATH=src python benchmarks/suite.py --save benchmarks/baseline.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+from openhook import OpenHookEvent, codec, from_legacy, validate
+from openhook.integrations.agent_trace import to_trace_record
+
+EXAMPLES = Path(__file__).resolve().parents[3] / "spec" / "examples"
+
+DEFAULT_THRESHOLD = 0.25
+
+_MIN_PASS_NS = 5_000_000
+
+_TOOLS = ("Bash", "Read", "Edit", "Grep", "Write", "WebFetch")
+_REASONS = ("user_exit", "clear", "logout", "prompt_input_exit")
+
+
+def _example(name: str) -> dict[str, Any]:
+    return json.loads((EXAMPLES / name).read_text())
+
+
+def _envelope(example: dict[str, Any], i: int, data: dict[str, Any]) -> dict[str, Any]:
+    return {
+        **example,
+        "id": f"{i:08x}-0000-4000-8000-{i:012x}",
+        "time": f"2026-02-23T10:{i // 60 % 60:02d}:{i % 60:02d}.{i % 1000:03d}Z",
+        "session_id": f"sess_{i % 50:04d}",
+        "data": data,
+    }
+
+
+def _text(rng: random.Random, lo: int, hi: int) -> str:
+    # Sizes spread log-uniformly between lo and hi bytes.
+    size = int(lo * (hi / lo) ** rng.random())
+    return ("const value = compute(input);\n" * (size // 29 + 1))[:size]
+
+
+def corpora(seed: int = 0) -> dict[str, list[dict[str, Any]]]:
+    """Synthetic envelopes and legacy payloads, by size class."""
+    rng = random.Random(seed)
+    tool_end = _example("copilot-tool-end.json")
+    session_end = _example("claude-session-end.json")
+    file_write = _example("agent-trace-integration.json")
+    return {
+        # ~300 B: tool.end metrics, the bulk of a session's events.
+        "metric": [
+            _envelope(tool_end, i, {
+                "tool_name": rng.choice(_TOOLS), "tool_call_id": f"call_{i}",
+                "status": "success" if rng.random() < 0.95 else "error",
+                "duration_ms": rng.randrange(1, 30_000),
+            })
+            for i in range(1000)
+        ],
+        # ~500 B: one per session.
+        "session": [
+            _envelope(session_end, i, {
+                **session_end["data"], "reason": rng.choice(_REASONS),
+                "duration_ms": rng.randrange(1_000, 3_600_000),
+                "input_tokens": rng.randrange(1_000, 200_000), "output_tokens": rng.randrange(100, 50_000),
+            })
+            for i in range(500)
+        ],
+        # ~400 B: file.write as in the Agent Trace example.
+        "file_write": [
+            _envelope(file_write, i, {
+                **file_write["data"], "path": f"src/module_{i % 97}.ts",
+                "start_line": (start := rng.randrange(1, 500)), "end_line": start + rng.randrange(0, 200),
+            })
+            for i in range(500)
+        ],
+        # 4 KiB - 256 KiB: file.write carrying the written content.
+        "file_write_large": [
+            _envelope(file_write, i, {**file_write["data"], "content": _text(rng, 4 << 10, 256 << 10)})
+            for i in range(40)
+        ],
+        # ~200 B: legacy postToolUse / stop payloads.
+        "legacy": [
+            {
+                "hook_event_name": "postToolUse", "session_id": f"s{i % 50}", "tool_name": rng.choice(_TOOLS),
+                "cwd": "/home/user/my-project", "tool_output": _text(rng, 16, 256),
+            }
+            if i % 4 else {"hook_event_name": "stop", "sessionId": f"s{i % 50}", "transcriptPath": "/t.jsonl"}
+            for i in range(1000)
+        ],
+        # 256 KiB - 4 MiB of tool output.
+        "legacy_huge": [
+            {
+                "hook_event_name": "postToolUse", "session_id": f"s{i}", "tool_name": "Bash",
+                "cwd": "/home/user/my-project", "tool_output": _text(rng, 256 << 10, 4 << 20),
+            }
+            for i in range(8)
+        ],
+    }
+
+
+class Case:
+    """One operation applied to every input of a corpus."""
+
+    def __init__(self, name: str, fn: Callable[[Any], Any], inputs: list[Any]) -> None:
+        self.name = name
+        self.fn = fn
+        self.inputs = inputs
+
+
+def cases(data: dict[str, list[dict[str, Any]]]) -> list[Case]:
+    envelopes = ("metric", "session", "file_write", "file_write_large")
+    encoded = {name: [json.dumps(d).encode() for d in data[name]] for name in envelopes}
+    events = {name: [OpenHookEvent.from_dict(d) for d in data[name]] for name in envelopes}
+    result = []
+    for name in envelopes:
+        result.append(Case(f"from_json/{name}", OpenHookEvent.from_json, encoded[name]))
+    for name in envelopes:
+        result.append(Case(f"validate/{name}", validate, data[name]))
+    for name in ("metric", "file_write"):
+        result.append(Case(f"validate_strict/{name}", lambda d: validate(d, strict=True), data[name]))
+    for name in envelopes:
+        result.append(Case(f"to_dict/{name}", OpenHookEvent.to_dict, events[name]))
+        result.append(Case(f"to_json/{name}", OpenHookEvent.to_json, events[name]))
+    for name in ("legacy", "legacy_huge"):
+        result.append(Case(f"from_legacy/{name}", from_legacy, data[name]))
+        result.append(Case(
+            f"from_legacy_digest/{name}", lambda p: from_legacy(p, retain="digest"), data[name],
+        ))
+    result.append(Case("to_trace_record/file_write", to_trace_record, events["file_write"]))
+    return result
+
+
+_CALIBRATION_ITEMS = [{"name": f"k{i}", "value": i} for i in range(1000)]
+
+
+def calibrate() -> int:
+    """Nanoseconds for one pass of a fixed pure-Python workload.
+
+    A case's score is its best time per op over the best calibration pass
+    taken in the same window, so it does not depend on the machine's speed.
+    """
+    start = time.perf_counter_ns()
+    total = 0
+    for item in _CALIBRATION_ITEMS:
+        total += len(item["name"]) + item["value"]
+    ",".join([item["name"] for item in _CALIBRATION_ITEMS])
+    return time.perf_counter_ns() - start
+
+
+def _percentile(sorted_samples: list[float], q: float) -> float:
+    return sorted_samples[min(len(sorted_samples) - 1, int(q * len(sorted_samples)))]
+
+
+def measure(case: Case, budget: float) -> dict[str, float]:
+    """Time ``case`` for about ``budget`` seconds and measure its allocations."""
+    fn, inputs = case.fn, case.inputs
+    fn(inputs[0])  # warm up lazy imports and caches
+
+    # Throughput: the fastest pass over the corpus, repeated so that a pass
+    # takes at least a few milliseconds.
+    start = time.perf_counter_ns()
+    for x in inputs:
+        fn(x)
+    repeat = max(1, int(_MIN_PASS_NS / max(1, time.perf_counter_ns() - start)))
+    best = unit = float("inf")
+    deadline = time.perf_counter() + budget / 2
+    passes = 0
+    while passes < 5 or time.perf_counter() < deadline:
+        unit = min(unit, calibrate())
+        start = time.perf_counter_ns()
+        for _ in range(repeat):
+            for x in inputs:
+                fn(x)
+        best = min(best, (time.perf_counter_ns() - start) / (repeat * len(inputs)))
+        passes += 1
+
+    # Latency: individual calls, including the timer's own overhead.
+    clock = time.perf_counter_ns
+    samples = []
+    deadline = time.perf_counter() + budget / 2
+    while len(samples) < 100 or time.perf_counter() < deadline:
+        for x in inputs:
+            start = clock()
+            fn(x)
+            samples.append(clock() - start)
+    samples.sort()
+
+    # Allocations: peak traced bytes during a call, averaged over the corpus.
+    sample = inputs[:200]
+    tracemalloc.start()
+    try:
+        allocated = 0
+        for x in sample:
+            tracemalloc.reset_peak()
+            current = tracemalloc.get_traced_memory()[0]
+            fn(x)
+            allocated += tracemalloc.get_traced_memory()[1] - current
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "ns_per_op": round(best, 1),
+        "ops_per_s": round(1e9 / best),
+        "score": round(best / unit, 6),
+        "p50_ns": _percentile(samples, 0.50),
+        "p99_ns": _percentile(samples, 0.99),
+        "alloc_bytes_per_op": round(allocated / len(sample)),
+    }
+
+
+def measure_import(runs: int) -> dict[str, float]:
+    """In-process cost of ``from openhook import parse_stdin`` in fresh interpreters."""
+    src = str(Path(__file__).resolve().parents[1] / "src")
+    code = (
+        "import time; t = time.perf_counter_ns(); from openhook import parse_stdin; "
+        "print(time.perf_counter_ns() - t)"
+    )
+    env = {**os.environ, "PYTHONPATH": src}
+    samples = []
+    unit = float("inf")
+    for _ in range(runs):
+        unit = min(unit, calibrate())
+        proc = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+        samples.append(int(proc.stdout))
+    samples.sort()
+    return {
+        "ns_per_op": samples[0],
+        "ops_per_s": round(1e9 / samples[0], 1),
+        "score": round(samples[0] / unit, 6),
+        "p50_ns": _percentile(samples, 0.50),
+        "p99_ns": _percentile(samples, 0.99),
+        "alloc_bytes_per_op": None,
+    }
+
+
+def run(*, quick: bool = False, select: Callable[[str], bool] = lambda name: True) -> dict[str, Any]:
+    """Measure the cases whose names ``select`` accepts."""
+    budget = 0.2 if quick else 1.0
+    results = {}
+    for case in cases(corpora()):
+        if select(case.name):
+            results[case.name] = measure(case, budget)
+    if select("import/parse_stdin"):
+        results["import/parse_stdin"] = measure_import(10 if quick else 30)
+    return {
+        "python": platform.python_version(),
+        "backend": codec.get_backend(),
+        "cases": results,
+    }
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any]) -> dict[str, float]:
+    """Return ``{case: change}`` in normalized time for cases present in both runs.
+
+    ``change`` is the relative slowdown: 0.1 means 10% slower than the baseline.
+    """
+    changes = {}
+    for name, stats in current["cases"].items():
+        base = baseline["cases"].get(name)
+        if base is not None:
+            changes[name] = stats["score"] / base["score"] - 1
+    return changes
+
+
+def _ns(value: float) -> str:
+    if value >= 1e6:
+        return f"{value / 1e6:,.1f} ms"
+    if value >= 1e3:
+        return f"{value / 1e3:,.1f} us"
+    return f"{value:,.0f} ns"
+
+
+def report(current: dict[str, Any], changes: dict[str, float], threshold: float) -> list[str]:
+    """Print the results table and return the names of cases that regressed."""
+    print(f"python {current['python']}, {current['backend']} decoder")
+    print(f"{'case':<36}{'ops/s':>12}{'p50':>12}{'p99':>12}{'alloc/op':>14}{'vs base':>10}")
+    regressed = []
+    for name, stats in current["cases"].items():
+        alloc = stats["alloc_bytes_per_op"]
+        change = changes.get(name)
+        mark = ""
+        if change is not None and change > threshold:
+            regressed.append(name)
+            mark = " !"
+        print(
+            f"{name:<36}{stats['ops_per_s']:>12,.0f}{_ns(stats['p50_ns']):>12}{_ns(stats['p99_ns']):>12}"
+            f"{'-' if alloc is None else f'{alloc:,.0f} B':>14}"
+            f"{'-' if change is None else f'{change:+.0%}':>10}{mark}"
+        )
+    return regressed
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--quick", action="store_true", help="shorter runs, for CI")
+    parser.add_argument("--filter", help="only run cases whose name contains this")
+    parser.add_argument("--backend", default="json", help="JSON decoding backend (default: json)")
+    parser.add_argument("--baseline", type=Path, help="compare against this baseline JSON file")
+    parser.add_argument(
+        "--threshold", type=float, default=DEFAULT_THRESHOLD,
+        help=f"allowed slowdown against the baseline (default: {DEFAULT_THRESHOLD})",
+    )
+    parser.add_argument("--save", type=Path, help="write the results as a baseline JSON file")
+    args = parser.parse_args(argv)
+
+    codec.set_backend(args.backend)
+    current = run(quick=args.quick, select=lambda name: not args.filter or args.filter in name)
+    changes = {}
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text())
+        changes = compare(current, baseline)
+        # A single slow pass on a shared machine is not a regression: measure
+        # the suspects again and keep their better score.
+        suspects = {name for name, change in changes.items() if change > args.threshold}
+        if suspects:
+            for name, stats in run(quick=args.quick, select=suspects.__contains__)["cases"].items():
+                if stats["score"] < current["cases"][name]["score"]:
+                    current["cases"][name] = stats
+            changes = compare(current, baseline)
+    regressed = report(current, changes, args.threshold)
+    if args.save is not None:
+        args.save.write_text(json.dumps(current, indent=2) + "\n")
+    if regressed:
+        print(f"\n{len(regressed)} case(s) slower than the baseline by more than {args.threshold:.0%}:")
+        for name in regressed:
+            print(f"  {name} ({changes[name]:+.0%})")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""Regenerate src/openhook/_schemas.py from spec/schemas/*.schema.json.
+
+Run from packages/python after editing any schema::
+
+    python scripts/gen_schemas.py
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[3]
+SCHEMA_DIR = ROOT / "spec" / "schemas"
+OUTPUT = Path(__file__).resolve().parents[1] / "src" / "openhook" / "_schemas.py"
+
+HEADER = '''"""JSON Schemas from spec/schemas, embedded for strict validation.
+
+Generated by scripts/gen_schemas.py — do not edit by hand.
+"""
+
+from typing import Any
+
+'''
+
+
+def _strip(schema: object) -> object:
+    """Drop annotation-only keywords that have no effect on validation."""
+    if isinstance(schema, dict):
+        return {
+            k: _strip(v)
+            for k, v in schema.items()
+            if k not in ("$schema", "$id", "title", "description")
+        }
+    return schema
+
+
+def _format(value: object, indent: int = 0) -> str:
+    """Format a JSON value as a Python literal, one key per line."""
+    pad = "    " * (indent + 1)
+    if isinstance(value, dict):
+        if not value:
+            return "{}"
+        items = [f"{pad}{json.dumps(k)}: {_format(v, indent + 1)}," for k, v in value.items()]
+        return "{\n" + "\n".join(items) + "\n" + "    " * indent + "}"
+    if isinstance(value, list):
+        return "[" + ", ".join(_format(v, indent) for v in value) + "]"
+    if isinstance(value, str):
+        return json.dumps(value)
+    return repr(value)
+
+
+def render() -> str:
+    envelope = json.loads((SCHEMA_DIR / "envelope.schema.json").read_text())
+    data_schemas: dict[str, object] = {}
+    for path in sorted(SCHEMA_DIR.glob("*.schema.json")):
+        if path.name == "envelope.schema.json":
+            continue
+        schema = json.loads(path.read_text())
+        # Titles are "<event type> data", e.g. "file.write data"
+        event_type = schema["title"].removesuffix(" data")
+        data_schemas[event_type] = _strip(schema)
+
+    return (
+        HEADER
+        + "ENVELOPE_SCHEMA: dict[str, Any] = "
+        + _format(_strip(envelope))
+        + "\n\nDATA_SCHEMAS: dict[str, dict[str, Any]] = "
+        + _format(data_schemas)
+        + "\n"
+    )
+
+
+def main() -> int:
+    OUTPUT.write_text(render())
+    print(f"wrote {OUTPUT.relative_to(ROOT)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,55 @@
 """OpenHook Protocol SDK for Python."""
 
-from .compat import from_legacy, is_openhook
-from .envelope import OpenHookEvent, ValidationError, parse_stdin, validate
-from .events import EventType
-
-__all__ = [
-    "EventType",
-    "OpenHookEvent",
-    "ValidationError",
-    "from_legacy",
-    "is_openhook",
-    "parse_stdin",
-    "validate",
-]
+from __future__ import annotations
+
+# Avoid importing typing at runtime; it is the single largest import cost.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any
+
+    from .compat import from_legacy, from_legacy_many, is_openhook
+    from .envelope import (
+        LazyEvent,
+        LineError,
+        OpenHookEvent,
+        RawJSON,
+        ValidationError,
+        iter_events,
+        parse_stdin,
+        validate,
+    )
+    from .events import EventType
+
+# Hooks run as a fresh process per event, so submodules are imported on first
+# attribute access rather than by `import openhook`.
+_EXPORTS = {
+    "EventType": ".events",
+    "LazyEvent": ".envelope",
+    "LineError": ".envelope",
+    "OpenHookEvent": ".envelope",
+    "RawJSON": ".envelope",
+    "ValidationError": ".envelope",
+    "from_legacy": ".compat",
+    "from_legacy_many": ".compat",
+    "is_openhook": ".compat",
+    "iter_events": ".envelope",
+    "parse_stdin": ".envelope",
+    "validate": ".envelope",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *__all__])
@@ -0,0 +1,148 @@
+"""JSON Schemas from spec/schemas, embedded for strict validation.
+
+Generated by scripts/gen_schemas.py — do not edit by hand.
+"""
+
+from typing import Any
+
+ENVELOPE_SCHEMA: dict[str, Any] = {
+    "type": "object",
+    "required": ["openhook", "id", "source", "type", "time", "session_id"],
+    "properties": {
+        "openhook": {
+            "type": "string",
+            "pattern": "^\\d+\\.\\d+$",
+        },
+        "id": {
+            "type": "string",
+            "minLength": 1,
+        },
+        "source": {
+            "type": "string",
+            "pattern": "^[a-z][a-z0-9-]*$",
+        },
+        "type": {
+            "type": "string",
+            "enum": ["session.start", "session.end", "prompt.submit", "tool.start", "tool.end", "file.write"],
+        },
+        "time": {
+            "type": "string",
+            "pattern": "^\\d{4}-\\d{2}-\\d{2}T\\d{2}:\\d{2}:\\d{2}",
+        },
+        "session_id": {
+            "type": "string",
+        },
+        "data": {
+            "type": "object",
+        },
+        "context": {
+            "type": "string",
+        },
+        "extensions": {
+            "type": "object",
+            "additionalProperties": True,
+        },
+    },
+    "additionalProperties": False,
+}
+
+DATA_SCHEMAS: dict[str, dict[str, Any]] = {
+    "file.write": {
+        "type": "object",
+        "required": ["path"],
+        "properties": {
+            "path": {
+                "type": "string",
+            },
+            "operation": {
+                "type": "string",
+                "enum": ["create", "update", "delete"],
+            },
+            "start_line": {
+                "type": "integer",
+                "minimum": 1,
+            },
+            "end_line": {
+                "type": "integer",
+                "minimum": 1,
+            },
+            "model": {
+                "type": "string",
+            },
+            "tool_call_id": {
+                "type": "string",
+            },
+        },
+        "additionalProperties": True,
+    },
+    "prompt.submit": {
+        "type": "object",
+        "properties": {
+            "prompt_length": {
+                "type": "integer",
+                "minimum": 0,
+            },
+        },
+        "additionalProperties": True,
+    },
+    "session.end": {
+        "type": "object",
+        "properties": {
+            "transcript_path": {
+                "type": "string",
+            },
+            "reason": {
+                "type": "string",
+                "enum": ["user_exit", "timeout", "error", "completed"],
+            },
+            "model": {
+                "type": "string",
+            },
+            "duration_ms": {
+                "type": "integer",
+                "minimum": 0,
+            },
+            "input_tokens": {
+                "type": "integer",
+                "minimum": 0,
+            },
+            "output_tokens": {
+                "type": "integer",
+                "minimum": 0,
+            },
+        },
+        "additionalProperties": True,
+    },
+    "tool.end": {
+        "type": "object",
+        "properties": {
+            "tool_name": {
+                "type": "string",
+            },
+            "tool_call_id": {
+                "type": "string",
+            },
+            "status": {
+                "type": "string",
+                "enum": ["success", "error"],
+            },
+            "duration_ms": {
+                "type": "integer",
+                "minimum": 0,
+            },
+        },
+        "additionalProperties": True,
+    },
+    "tool.start": {
+        "type": "object",
+        "properties": {
+            "tool_name": {
+                "type": "string",
+            },
+            "tool_call_id": {
+                "type": "string",
+            },
+        },
+        "additionalProperties": True,
+    },
+}
@@ -0,0 +1,312 @@
+"""asyncio counterparts of the streaming, output and dispatch APIs.
+
+For services that multiplex many agent connections on one event loop:
+
+- :func:`aiter_events` reads NDJSON envelopes from an ``asyncio.StreamReader``,
+- :class:`AsyncEventWriter` buffers events to an ``asyncio.StreamWriter`` and
+  awaits ``drain()`` after each batch, so a slow reader applies backpressure,
+- :class:`AsyncDispatcher` runs ``.openhook.json`` hooks as asyncio
+  subprocesses, at most ``max_concurrency`` at a time.
+
+Nothing here runs in an executor. Lines are parsed by the same code as
+:func:`openhook.iter_events`, and the writer uses :class:`~openhook.writer.EventWriter`'s
+flush policies, so both behave exactly like their blocking versions::
+
+    async def handle(reader, writer):
+        async with AsyncEventWriter(writer, max_events=100) as out:
+            async for event in aiter_events(reader, on_error="skip", lazy=True):
+                await out.write(event)
+
+    await asyncio.start_server(handle, port=4318)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import subprocess
+import time as _time
+from pathlib import Path
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Iterable
+
+from . import envelope
+from .dispatch import _KILLED, Hook, HookConfig, HookResult, _Routes
+from .envelope import (
+    DEFAULT_CHUNK_SIZE,
+    LazyEvent,
+    LineError,
+    OpenHookEvent,
+    _LineSplitter,
+    _check_on_error,
+    _parse_lines,
+    _time_range,
+)
+from .writer import DEFAULT_MAX_BYTES, _Buffer
+
+
+def aiter_events(
+    reader: asyncio.StreamReader,
+    *,
+    on_error: str = "raise",
+    errors: list[LineError] | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    strict: bool = False,
+    lazy: bool = False,
+    since: int | str | None = None,
+    until: int | str | None = None,
+) -> AsyncIterator[OpenHookEvent | LazyEvent]:
+    """Yield events from the NDJSON stream ``reader``, as :func:`openhook.iter_events` would.
+
+    ``reader`` is an ``asyncio.StreamReader`` (or anything with an async
+    ``read(n)`` returning bytes). It is read ``chunk_size`` at a time, so
+    unlike ``readline()`` a line may be longer than the reader's limit. The
+    keyword arguments are those of :func:`openhook.iter_events`.
+    """
+    _check_on_error(on_error, errors)
+    window = _time_range(since, until)
+    # Looked up per call, so openhook.instrument can time it.
+    parse = envelope._parse_line
+    return _aiter_parsed(reader, chunk_size, (on_error, errors, window, parse, (strict, lazy)))
+
+
+async def _aiter_parsed(reader: Any, chunk_size: int, parse_args: tuple[Any, ...]) -> AsyncIterator[Any]:
+    lineno = 0
+    splitter = _LineSplitter()
+    while True:
+        chunk = await reader.read(chunk_size)
+        if not chunk:
+            break
+        lines = splitter.feed(chunk)
+        for item in _parse_lines(lines, lineno, *parse_args):
+            yield item
+        lineno += len(lines)
+    tail = splitter.finish()
+    if tail is not None:
+        for item in _parse_lines((tail,), lineno, *parse_args):
+            yield item
+
+
+class AsyncEventWriter:
+    """Write events as NDJSON to an ``asyncio.StreamWriter``, buffering between flushes.
+
+    ``max_events``, ``max_bytes`` and ``max_age`` are the flush policies of
+    :class:`~openhook.writer.EventWriter`. Each flush is one ``write()``
+    followed by ``await drain()``. The stream is not closed by
+    :meth:`aclose`.
+    """
+
+    def __init__(
+        self,
+        writer: asyncio.StreamWriter,
+        *,
+        max_events: int | None = None,
+        max_bytes: int | None = DEFAULT_MAX_BYTES,
+        max_age: float | None = None,
+        clock: Callable[[], float] = _time.monotonic,
+    ) -> None:
+        self._buffer = _Buffer(max_events, max_bytes, max_age, clock)
+        self._writer = writer
+        self._closed = False
+        self.counters = {"events": 0, "bytes": 0, "flushes": 0}
+
+    def __len__(self) -> int:
+        """Number of buffered (unwritten) events."""
+        return len(self._buffer)
+
+    async def write(self, event: OpenHookEvent | LazyEvent) -> None:
+        """Buffer one event, flushing if a policy fires."""
+        await self._add(event.to_json_bytes() + b"\n")
+
+    async def write_many(
+        self, events: Iterable[OpenHookEvent | LazyEvent] | AsyncIterable[OpenHookEvent | LazyEvent]
+    ) -> None:
+        """Buffer several events from a sync or async iterable, checking the policies after each."""
+        if isinstance(events, AsyncIterable):
+            async for event in events:
+                await self._add(event.to_json_bytes() + b"\n")
+        else:
+            for event in events:
+                await self._add(event.to_json_bytes() + b"\n")
+
+    async def write_bytes(self, payload: bytes) -> None:
+        """Buffer one already-encoded JSON envelope (without its newline)."""
+        await self._add(payload + b"\n")
+
+    async def _add(self, line: bytes) -> None:
+        if self._closed:
+            raise ValueError("write to closed AsyncEventWriter")
+        if self._buffer.add(line):
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Write the buffered lines in one call and wait for the stream to drain."""
+        if not self._buffer:
+            return
+        # Writing and taking the batch happen without yielding, so batches
+        # from concurrent writers keep their order.
+        lines = self._buffer.lines
+        self._writer.write(lines[0] if len(lines) == 1 else b"".join(lines))
+        lines, size = self._buffer.take()
+        self.counters["events"] += len(lines)
+        self.counters["bytes"] += size
+        self.counters["flushes"] += 1
+        await self._writer.drain()
+
+    async def aclose(self) -> None:
+        """Flush the buffer. The stream stays open."""
+        if self._closed:
+            return
+        await self.flush()
+        self._closed = True
+
+    async def __aenter__(self) -> AsyncEventWriter:
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.aclose()
+
+
+class _AsyncPersistentProcess:
+    """A long-lived hook process fed NDJSON envelopes on stdin."""
+
+    def __init__(self, command: str, cwd: Path | None) -> None:
+        self.command = command
+        self.cwd = cwd
+        self.proc: asyncio.subprocess.Process | None = None
+        self.lock = asyncio.Lock()
+
+    async def _start(self) -> asyncio.subprocess.Process:
+        return await asyncio.create_subprocess_shell(self.command, cwd=self.cwd, stdin=subprocess.PIPE)
+
+    async def send(self, line: bytes) -> None:
+        async with self.lock:
+            if self.proc is None or self.proc.returncode is not None:
+                self.proc = await self._start()
+            stdin = self.proc.stdin
+            assert stdin is not None
+            try:
+                stdin.write(line)
+                await stdin.drain()
+            except (BrokenPipeError, ConnectionResetError):
+                # The process exited since it was started; restart once.
+                self.proc = await self._start()
+                self.proc.stdin.write(line)  # type: ignore[union-attr]
+                await self.proc.stdin.drain()  # type: ignore[union-attr]
+
+    async def close(self, timeout: float | None) -> None:
+        async with self.lock:
+            if self.proc is None:
+                return
+            if self.proc.stdin is not None:
+                self.proc.stdin.close()
+            try:
+                await asyncio.wait_for(self.proc.wait(), timeout)
+            except asyncio.TimeoutError:
+                self.proc.kill()
+                await self.proc.wait()
+            self.proc = None
+
+
+class AsyncDispatcher(_Routes):
+    """Run the hooks of a :class:`~openhook.dispatch.HookConfig` as asyncio subprocesses.
+
+    The asyncio form of :class:`~openhook.dispatch.Dispatcher`. The
+    synchronous hooks matching an event run concurrently, and
+    :meth:`dispatch` returns their exit codes once all have finished.
+    ``async: true`` hooks run as background tasks; once ``max_pending`` of
+    them are queued or running, :meth:`dispatch` waits for one to finish.
+    Across all events at most ``max_concurrency`` hook commands run at a
+    time. ``timeout`` and ``on_async_failure`` behave as for
+    :class:`~openhook.dispatch.Dispatcher`: a run that exceeds the timeout is
+    killed and reported as a failed result, and failures of background hooks
+    are passed to the callback and counted in ``counters``.
+    """
+
+    def __init__(
+        self,
+        config: HookConfig,
+        *,
+        max_concurrency: int = 4,
+        max_pending: int = 64,
+        timeout: float | None = None,
+        on_async_failure: Callable[[HookResult, BaseException | None], None] | None = None,
+    ) -> None:
+        super().__init__(config)
+        self.timeout = timeout
+        self._on_async_failure = on_async_failure
+        self.counters = {"timeouts": 0, "async_failures": 0}
+        self._running = asyncio.Semaphore(max_concurrency)
+        self._pending = asyncio.Semaphore(max_pending)
+        self._tasks: set[asyncio.Task[HookResult]] = set()
+        self._persistent: dict[str, _AsyncPersistentProcess] = {}
+
+    async def dispatch(self, event: OpenHookEvent | LazyEvent) -> list[HookResult]:
+        hooks = self.hooks_for(event.type)
+        if not hooks:
+            return []
+        payload = event.to_json_bytes()
+        waited = [hook for hook in hooks if not hook.persistent and not hook.is_async]
+        for hook in hooks:
+            if hook.persistent:
+                await self._persistent_process(hook).send(payload + b"\n")
+            elif hook.is_async:
+                await self._submit(hook, payload)
+        done = iter(await asyncio.gather(*(self._run(hook, payload) for hook in waited)))
+        return [HookResult(hook) if hook.persistent or hook.is_async else next(done) for hook in hooks]
+
+    async def _run(self, hook: Hook, payload: bytes) -> HookResult:
+        async with self._running:
+            proc = await asyncio.create_subprocess_shell(
+                hook.command, cwd=self.config.root, stdin=subprocess.PIPE
+            )
+            try:
+                await asyncio.wait_for(proc.communicate(payload), self.timeout)
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                self.counters["timeouts"] += 1
+                return HookResult(hook, _KILLED, timed_out=True)
+            return HookResult(hook, proc.returncode)
+
+    async def _submit(self, hook: Hook, payload: bytes) -> asyncio.Task[HookResult]:
+        await self._pending.acquire()
+        try:
+            task = asyncio.create_task(self._run(hook, payload))
+        except BaseException:
+            self._pending.release()
+            raise
+        self._tasks.add(task)
+        task.add_done_callback(lambda t: self._done(hook, t))
+        return task
+
+    def _done(self, hook: Hook, task: asyncio.Task[HookResult]) -> None:
+        self._tasks.discard(task)
+        self._pending.release()
+        if task.cancelled():
+            return
+        exc = task.exception()
+        result = HookResult(hook) if exc is not None else task.result()
+        if exc is None and not result.failed:
+            return
+        self.counters["async_failures"] += 1
+        if self._on_async_failure is not None:
+            self._on_async_failure(result, exc)
+
+    def _persistent_process(self, hook: Hook) -> _AsyncPersistentProcess:
+        proc = self._persistent.get(hook.command)
+        if proc is None:
+            proc = self._persistent[hook.command] = _AsyncPersistentProcess(hook.command, self.config.root)
+        return proc
+
+    async def aclose(self) -> None:
+        """Wait for async hooks and shut down persistent processes."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        for proc in self._persistent.values():
+            await proc.close(self.timeout)
+        self._persistent.clear()
+
+    async def __aenter__(self) -> AsyncDispatcher:
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.aclose()
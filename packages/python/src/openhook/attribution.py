@@ -0,0 +1,282 @@
+"""Line attribution index: which session/model last wrote line N of a file.
+
+Built incrementally from ``file.write`` events. For each path the index keeps
+disjoint line segments in three parallel sorted arrays (start, end,
+attribution id), so point and range lookups are a binary search. A later
+write to a line replaces the earlier attribution (events are applied in
+arrival order). Line numbers are taken as reported (numeric strings and
+integral floats are accepted, as by the Agent Trace aggregator); the index
+does not shift lines for insertions elsewhere in the file.
+
+The index saves to a compact binary file (a small JSON header followed by the
+raw arrays) that reloads without replaying any events. Saving drops
+attributions whose lines have all been overwritten since::
+
+    index = AttributionIndex()
+    for event in iter_events(f):
+        index.add(event)
+    index.save("attribution.idx")
+
+    index = AttributionIndex.load("attribution.idx")
+    index.who_wrote("src/app.ts", 42)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import IO, Any
+
+from .envelope import OpenHookEvent
+from .events import EventType
+
+_MAGIC = b"OHAI\x01"
+
+
+def _line_number(value: Any) -> int | None:
+    """``value`` as a 1-based line number, or None if it is not one.
+
+    Producers sometimes send numbers as strings (``"12"``) or floats; anything
+    else (including booleans) is not a line number.
+    """
+    if type(value) is int:
+        return value if value >= 1 else None
+    if type(value) is float and value.is_integer():
+        return int(value) if value >= 1 else None
+    # isdigit() alone also accepts characters such as "²" that int() rejects.
+    if type(value) is str and value.isascii() and value.isdigit():
+        return int(value) or None
+    return None
+
+
+@dataclass(frozen=True)
+class Attribution:
+    session_id: str
+    source: str
+    model: str | None
+    time: str
+
+
+class _Segments:
+    __slots__ = ("starts", "ends", "ids")
+
+    def __init__(self) -> None:
+        self.starts = array("q")
+        self.ends = array("q")
+        self.ids = array("I")
+
+    def paint(self, start: int, end: int, aid: int) -> None:
+        """Attribute lines start..end to ``aid``, replacing what was there."""
+        starts, ends, ids = self.starts, self.ends, self.ids
+        i = bisect_right(starts, start) - 1
+        lo = i if i >= 0 and ends[i] >= start else i + 1
+        hi = bisect_right(starts, end)
+
+        new_starts, new_ends, new_ids = [start], [end], [aid]
+        if lo < hi:
+            if starts[lo] < start:
+                new_starts.insert(0, starts[lo])
+                new_ends.insert(0, start - 1)
+                new_ids.insert(0, ids[lo])
+            if ends[hi - 1] > end:
+                new_starts.append(end + 1)
+                new_ends.append(ends[hi - 1])
+                new_ids.append(ids[hi - 1])
+
+        # Coalesce with touching neighbours that carry the same attribution.
+        if lo > 0 and ids[lo - 1] == new_ids[0] and ends[lo - 1] == new_starts[0] - 1:
+            lo -= 1
+            new_starts[0] = starts[lo]
+        if hi < len(starts) and ids[hi] == new_ids[-1] and starts[hi] == new_ends[-1] + 1:
+            new_ends[-1] = ends[hi]
+            hi += 1
+
+        starts[lo:hi] = array("q", new_starts)
+        ends[lo:hi] = array("q", new_ends)
+        ids[lo:hi] = array("I", new_ids)
+
+    def find(self, line: int) -> int | None:
+        i = bisect_right(self.starts, line) - 1
+        if i >= 0 and self.ends[i] >= line:
+            return self.ids[i]
+        return None
+
+    def overlapping(self, start: int, end: int) -> range:
+        i = bisect_right(self.starts, start) - 1
+        lo = i if i >= 0 and self.ends[i] >= start else i + 1
+        return range(lo, bisect_right(self.starts, end))
+
+
+class AttributionIndex:
+    """Per-file line attribution built from ``file.write`` events."""
+
+    def __init__(self) -> None:
+        self._files: dict[str, _Segments] = {}
+        self._attributions: list[Attribution] = []
+        self._attribution_ids: dict[Attribution, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def paths(self) -> list[str]:
+        return list(self._files)
+
+    def _intern(self, attribution: Attribution) -> int:
+        aid = self._attribution_ids.get(attribution)
+        if aid is None:
+            aid = self._attribution_ids[attribution] = len(self._attributions)
+            self._attributions.append(attribution)
+        return aid
+
+    def add(self, event: OpenHookEvent) -> bool:
+        """Apply a ``file.write`` event; returns True if it changed the index.
+
+        A ``delete`` operation drops the file. Writes without both
+        ``start_line`` and ``end_line`` as line numbers carry no line
+        information and are ignored.
+        """
+        if event.type != EventType.FILE_WRITE:
+            return False
+        path = event.data.get("path")
+        if not path:
+            return False
+        if event.data.get("operation") == "delete":
+            return self._files.pop(path, None) is not None
+
+        start_line = _line_number(event.data.get("start_line"))
+        end_line = _line_number(event.data.get("end_line"))
+        if start_line is None or end_line is None:
+            return False
+        if start_line > end_line:
+            start_line, end_line = end_line, start_line
+
+        aid = self._intern(Attribution(
+            session_id=event.session_id,
+            source=event.source,
+            model=event.data.get("model"),
+            time=event.time,
+        ))
+        segments = self._files.get(path)
+        if segments is None:
+            segments = self._files[path] = _Segments()
+        segments.paint(start_line, end_line, aid)
+        return True
+
+    def who_wrote(self, path: str, line: int) -> Attribution | None:
+        """Return who last wrote ``line`` of ``path``, or None if unknown."""
+        segments = self._files.get(path)
+        if segments is None:
+            return None
+        aid = segments.find(line)
+        return None if aid is None else self._attributions[aid]
+
+    def query(self, path: str, start: int, end: int) -> list[tuple[int, int, Attribution]]:
+        """Return ``(start, end, attribution)`` runs covering ``start..end``.
+
+        Runs are clipped to the requested range; unattributed lines are omitted.
+        """
+        segments = self._files.get(path)
+        if segments is None:
+            return []
+        return [
+            (
+                max(segments.starts[i], start),
+                min(segments.ends[i], end),
+                self._attributions[segments.ids[i]],
+            )
+            for i in segments.overlapping(start, end)
+        ]
+
+    # --- Persistence ---
+
+    def _compact(self) -> None:
+        """Drop attributions that no segment refers to any more, renumbering the rest."""
+        used = sorted({aid for seg in self._files.values() for aid in seg.ids})
+        if len(used) == len(self._attributions):
+            return
+        renumber = {old: new for new, old in enumerate(used)}
+        self._attributions = [self._attributions[old] for old in used]
+        self._attribution_ids = {a: aid for aid, a in enumerate(self._attributions)}
+        for seg in self._files.values():
+            seg.ids = array("I", [renumber[aid] for aid in seg.ids])
+
+    def save(self, file: str | os.PathLike[str] | IO[bytes]) -> None:
+        """Write the index in its compact binary format.
+
+        Attributions no longer referenced by any line are dropped first. A
+        path is written through a temporary file and renamed into place, so
+        a crash leaves the previous index intact.
+        """
+        if not hasattr(file, "write"):
+            target = os.fspath(file)  # type: ignore[arg-type]
+            tmp = f"{target}.tmp"
+            with open(tmp, "wb") as f:
+                self.save(f)
+            os.replace(tmp, target)
+            return
+        self._compact()
+        out: IO[bytes] = file  # type: ignore[assignment]
+        header = json.dumps({
+            "attributions": [
+                [a.session_id, a.source, a.model, a.time] for a in self._attributions
+            ],
+            "files": [[path, len(seg.starts)] for path, seg in self._files.items()],
+        }).encode()
+        out.write(_MAGIC)
+        out.write(len(header).to_bytes(4, "little"))
+        out.write(header)
+        for seg in self._files.values():
+            for arr in (seg.starts, seg.ends, seg.ids):
+                out.write(_to_little_endian(arr))
+
+    @classmethod
+    def load(cls, file: str | os.PathLike[str] | IO[bytes]) -> AttributionIndex:
+        """Read an index written by :meth:`save`."""
+        if not hasattr(file, "read"):
+            with open(file, "rb") as f:  # type: ignore[arg-type]
+                return cls.load(f)
+        raw = file.read()  # type: ignore[union-attr]
+        if raw[:len(_MAGIC)] != _MAGIC:
+            raise ValueError("Not an OpenHook attribution index")
+        pos = len(_MAGIC)
+        header_len = int.from_bytes(raw[pos:pos + 4], "little")
+        pos += 4
+        try:
+            header: dict[str, Any] = json.loads(raw[pos:pos + header_len])
+            pos += header_len
+            index = cls()
+            for session_id, source, model, time in header["attributions"]:
+                index._intern(Attribution(session_id, source, model, time))
+            files = [(path, int(count)) for path, count in header["files"]]
+        except (KeyError, TypeError, ValueError) as exc:
+            raise ValueError(f"Corrupt attribution index header: {exc}") from None
+
+        view = memoryview(raw)
+        for path, count in files:
+            seg = _Segments()
+            for arr in (seg.starts, seg.ends, seg.ids):
+                size = count * arr.itemsize
+                if count < 0 or pos + size > len(raw):
+                    raise ValueError(f"Truncated attribution index: segments of {path!r} are cut off")
+                arr.frombytes(view[pos:pos + size])
+                if sys.byteorder == "big":
+                    arr.byteswap()
+                pos += size
+            if seg.ids and max(seg.ids) >= len(index._attributions):
+                raise ValueError(f"Corrupt attribution index: unknown attribution in {path!r}")
+            index._files[path] = seg
+        if pos != len(raw):
+            raise ValueError(f"Corrupt attribution index: {len(raw) - pos} unexpected trailing bytes")
+        return index
+
+
+def _to_little_endian(arr: array) -> bytes:
+    if sys.byteorder == "little":
+        return arr.tobytes()
+    swapped = array(arr.typecode, arr)
+    swapped.byteswap()
+    return swapped.tobytes()
@@ -0,0 +1,526 @@
+"""Columnar event batches for analytics over event archives.
+
+:class:`EventBatch` stores events column by column instead of as a list of
+:class:`~openhook.envelope.OpenHookEvent` objects:
+
+- ``openhook``, ``source``, ``type``, ``session_id`` and ``context`` are
+  dictionary-encoded into ``array("i")`` codes (``-1`` for missing).
+- ``time`` is an ``array("q")`` of Unix epoch nanoseconds.
+- The common data fields get typed columns: ``duration_ms``,
+  ``input_tokens`` and ``output_tokens`` are ``array("q")`` (missing is
+  :data:`NULL`), and ``tool_name`` and ``status`` are dictionary-encoded.
+- All other ``data`` fields and ``extensions`` go in sparse side columns,
+  keyed by row and holding only the rows that have them.
+
+Filtering and grouping work on the integer columns, using NumPy when it is
+installed. :meth:`EventBatch.to_numpy` and :meth:`EventBatch.to_arrow`
+expose the arrays without copying them. Neither NumPy nor pyarrow is a
+dependency.
+
+:meth:`EventBatch.from_stream` builds a batch straight from NDJSON; no event
+objects are created::
+
+    batch = EventBatch.from_stream(open("events.ndjson", "rb"))
+    tools = batch.filter(type="tool.end", source="claude-code")
+    tools.group_by("tool_name", "duration_ms", "mean")
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Collection, Iterable, Iterator
+from typing import Any
+
+from . import envelope
+from .envelope import (
+    DEFAULT_CHUNK_SIZE,
+    LazyEvent,
+    LineError,
+    OpenHookEvent,
+    ValidationError,
+    _iter_parsed,
+    _time_range,
+)
+from .events import EventType
+from .timestamps import format_time, parse_time, to_epoch_ns
+
+# Missing value in the int64 columns.
+NULL = -(2**63)
+_INT64_MAX = 2**63 - 1
+
+ENCODED_COLUMNS = ("openhook", "source", "type", "session_id", "context")
+INT_DATA_COLUMNS = ("duration_ms", "input_tokens", "output_tokens")
+ENCODED_DATA_COLUMNS = ("tool_name", "status")
+_DICTIONARY_COLUMNS = ENCODED_COLUMNS + ENCODED_DATA_COLUMNS
+_INT_COLUMNS = ("time",) + INT_DATA_COLUMNS
+
+AGGREGATIONS = ("count", "sum", "mean", "min", "max")
+
+_numpy: Any = None
+
+
+def _np() -> Any:
+    """Return the numpy module, or None if it is not installed."""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
+
+
+def _fits_int64(value: Any) -> bool:
+    # NULL itself is taken by "missing", so it does not fit either.
+    return type(value) is int and NULL < value <= _INT64_MAX
+
+
+def _fits(key: str, value: Any) -> bool:
+    if key in INT_DATA_COLUMNS:
+        return _fits_int64(value)
+    return key in ENCODED_DATA_COLUMNS and isinstance(value, str)
+
+
+def _canonical_time(timestamp: str) -> bool:
+    """True if :func:`~openhook.timestamps.format_time` reproduces ``timestamp`` exactly.
+
+    Only called for timestamps that parsed, so checking the layout suffices:
+    ``YYYY-MM-DDTHH:MM:SS`` and ``Z``, with an optional fraction of at most
+    nine digits and no trailing zero.
+    """
+    size = len(timestamp)
+    if size != 20 and not (22 <= size <= 30 and timestamp[19] == "." and timestamp[-2] != "0"):
+        return False
+    return (
+        timestamp[-1] == "Z" and timestamp[10] == "T"
+        and timestamp[4] == timestamp[7] == "-" and timestamp[13] == timestamp[16] == ":"
+    )
+
+
+class _Dictionary:
+    """Append-only value <-> integer code mapping."""
+
+    __slots__ = ("values", "codes")
+
+    def __init__(self) -> None:
+        self.values: list[Any] = []
+        self.codes: dict[Any, int] = {}
+
+    def encode(self, value: Any) -> int:
+        if value is None:
+            return -1
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class EventBatch:
+    """A columnar, append-only batch of events."""
+
+    def __init__(self) -> None:
+        self.ids: list[str] = []
+        self._codes: dict[str, array] = {name: array("i") for name in _DICTIONARY_COLUMNS}
+        self._dictionaries: dict[str, _Dictionary] = {name: _Dictionary() for name in _DICTIONARY_COLUMNS}
+        self._ints: dict[str, array] = {name: array("q") for name in _INT_COLUMNS}
+        # Sparse side columns: row -> value, only for rows that have one.
+        self.extra_data: dict[int, dict[str, Any]] = {}
+        self.extensions: dict[int, dict[str, Any]] = {}
+        # Original text of timestamps that are unparsable (time is NULL) or
+        # would not round-trip through the int64 column.
+        self._raw_times: dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __repr__(self) -> str:
+        return f"EventBatch(rows={len(self)})"
+
+    # --- Building ---
+
+    def append(self, d: dict[str, Any]) -> None:
+        """Append one decoded (already validated) envelope dict.
+
+        Raises ValidationError, leaving the batch unchanged, if a field cannot
+        be stored: ``data`` that is not an object, or an object or array
+        where a dictionary-encoded column expects a scalar. Integers outside
+        int64 go to :attr:`extra_data`, and times outside it are kept as text
+        with a NULL ``time``.
+        """
+        codes, dictionaries, ints = self._codes, self._dictionaries, self._ints
+        data = d.get("data") or {}
+        if not isinstance(data, dict):
+            raise ValidationError("'data' must be an object")
+        for name in ENCODED_COLUMNS:
+            value = d.get(name)
+            if isinstance(value, (dict, list)):
+                raise ValidationError(f"'{name}' must be a string, not {type(value).__name__}")
+
+        row = len(self.ids)
+        self.ids.append(d["id"])
+        for name in ENCODED_COLUMNS:
+            codes[name].append(dictionaries[name].encode(d.get(name)))
+        time = d["time"]
+        time_ns = parse_time(time)
+        if time_ns is not None and not NULL < time_ns <= _INT64_MAX:
+            time_ns = None  # before 1677 or after 2262
+        ints["time"].append(NULL if time_ns is None else time_ns)
+        if time_ns is None or not _canonical_time(time):
+            self._raw_times[row] = time
+
+        fitted = 0
+        for name in INT_DATA_COLUMNS:
+            value = data.get(name)
+            if _fits_int64(value):
+                ints[name].append(value)
+                fitted += 1
+            else:
+                ints[name].append(NULL)
+        for name in ENCODED_DATA_COLUMNS:
+            value = data.get(name)
+            if isinstance(value, str):
+                codes[name].append(dictionaries[name].encode(value))
+                fitted += 1
+            else:
+                codes[name].append(-1)
+        if fitted != len(data):
+            # Other fields, and typed fields whose values do not fit their column.
+            self.extra_data[row] = {k: v for k, v in data.items() if not _fits(k, v)}
+        extensions = d.get("extensions")
+        if extensions:
+            self.extensions[row] = extensions
+
+    def append_event(self, event: OpenHookEvent | LazyEvent) -> None:
+        self.append({
+            "openhook": event.openhook,
+            "id": event.id,
+            "source": event.source,
+            "type": str(event.type),
+            "time": event.time,
+            "session_id": event.session_id,
+            "context": event.context,
+            "data": event.data,
+            "extensions": event.extensions,
+        })
+
+    @classmethod
+    def from_events(cls, events: Iterable[OpenHookEvent | LazyEvent]) -> EventBatch:
+        batch = cls()
+        for event in events:
+            batch.append_event(event)
+        return batch
+
+    @classmethod
+    def from_stream(
+        cls,
+        stream: Any = None,
+        *,
+        on_error: str = "raise",
+        errors: list[LineError] | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        strict: bool = False,
+        since: int | str | None = None,
+        until: int | str | None = None,
+    ) -> EventBatch:
+        """Build a batch from NDJSON, as :func:`~openhook.envelope.iter_events` reads it.
+
+        Each line is decoded and validated, then appended to the columns
+        directly; no event objects are created. The arguments are as for
+        ``iter_events``; lines outside ``since`` / ``until`` are skipped
+        before they are decoded.
+        """
+        batch = cls()
+        append = batch.append
+        parse_payload = envelope._parse_payload  # looked up per call, so openhook.instrument can time it
+
+        def parse(line: str | bytes, strict: bool) -> None:
+            # Appending inside the line loop lets on_error handle lines that
+            # decode and validate but do not fit the columns.
+            append(parse_payload(line, strict))
+
+        window = _time_range(since, until)
+        for _ in _iter_parsed(stream, on_error, errors, chunk_size, window, parse, strict):
+            pass
+        return batch
+
+    # --- Reading ---
+
+    def column(self, name: str) -> list[Any]:
+        """Return a column decoded to Python values (None for missing)."""
+        if name == "id":
+            return list(self.ids)
+        if name in self._codes:
+            values = self._dictionaries[name].values
+            return [values[c] if c >= 0 else None for c in self._codes[name]]
+        if name in self._ints:
+            return [None if v == NULL else v for v in self._ints[name]]
+        raise KeyError(f"Unknown column: {name!r}")
+
+    def codes(self, name: str) -> tuple[array, list[Any]]:
+        """Return a dictionary-encoded column as ``(codes, values)``."""
+        return self._codes[name], self._dictionaries[name].values
+
+    def ints(self, name: str) -> array:
+        """Return an int64 column (``time`` or a typed data column)."""
+        return self._ints[name]
+
+    def row(self, i: int) -> OpenHookEvent:
+        """Rebuild row ``i`` as an event (``time`` keeps nanosecond precision as UTC)."""
+        if i < 0:
+            i += len(self)
+        codes, dictionaries, ints = self._codes, self._dictionaries, self._ints
+
+        def decoded(name: str) -> Any:
+            code = codes[name][i]
+            return dictionaries[name].values[code] if code >= 0 else None
+
+        data: dict[str, Any] = {}
+        for name in ENCODED_DATA_COLUMNS:
+            value = decoded(name)
+            if value is not None:
+                data[name] = value
+        for name in INT_DATA_COLUMNS:
+            value = ints[name][i]
+            if value != NULL:
+                data[name] = value
+        data.update(self.extra_data.get(i, {}))
+        return OpenHookEvent(
+            openhook=decoded("openhook"),
+            id=self.ids[i],
+            source=decoded("source"),
+            type=EventType(decoded("type")),
+            time=self._raw_times.get(i) or format_time(ints["time"][i]),
+            session_id=decoded("session_id"),
+            data=data,
+            context=decoded("context"),
+            extensions=self.extensions.get(i, {}),
+        )
+
+    def __iter__(self) -> Iterator[OpenHookEvent]:
+        for i in range(len(self)):
+            yield self.row(i)
+
+    # --- Filtering ---
+
+    def _matches(self, name: str, wanted: Any) -> Any:
+        """Row indices (list, or numpy array) where column ``name`` equals/contains ``wanted``."""
+        np = _np()
+        if name in self._codes:
+            lookup = self._dictionaries[name].codes
+            values = wanted if isinstance(wanted, Collection) and not isinstance(wanted, str) else (wanted,)
+            wanted_codes = {-1 if v is None else lookup.get(v, -2) for v in values}
+            wanted_codes.discard(-2)
+            column = self._codes[name]
+            if np is not None:
+                return np.flatnonzero(np.isin(np.frombuffer(column, dtype=np.int32), list(wanted_codes)))
+            if len(wanted_codes) == 1:
+                (code,) = wanted_codes
+                return [i for i, c in enumerate(column) if c == code]
+            return [i for i, c in enumerate(column) if c in wanted_codes]
+        if name in self._ints:
+            values = wanted if isinstance(wanted, Collection) else (wanted,)
+            wanted_ints = {NULL if v is None else v for v in values}
+            column = self._ints[name]
+            if np is not None:
+                return np.flatnonzero(np.isin(np.frombuffer(column, dtype=np.int64), list(wanted_ints)))
+            return [i for i, v in enumerate(column) if v in wanted_ints]
+        if name == "id":
+            ids = {wanted} if isinstance(wanted, str) else set(wanted)
+            return [i for i, v in enumerate(self.ids) if v in ids]
+        raise KeyError(f"Unknown column: {name!r}")
+
+    def _in_time_range(self, since: int | None, until: int | None) -> Any:
+        np = _np()
+        lo = NULL + 1 if since is None else since
+        hi = 2**63 - 1 if until is None else until
+        column = self._ints["time"]
+        if np is not None:
+            t = np.frombuffer(column, dtype=np.int64)
+            return np.flatnonzero((t >= lo) & (t < hi))
+        return [i for i, t in enumerate(column) if lo <= t < hi]
+
+    def filter(
+        self, *, since: int | str | None = None, until: int | str | None = None, **equals: Any
+    ) -> EventBatch:
+        """Return the rows where every named column matches.
+
+        Each keyword names a column and a value, or a collection of values
+        (``type=("tool.start", "tool.end")``); ``None`` matches missing
+        values. ``since`` / ``until`` bound ``time`` (``since <= time < until``),
+        as epoch nanoseconds or timestamp strings.
+        """
+        rows: Any = None
+        np = _np()
+        selections = [self._matches(name, wanted) for name, wanted in equals.items()]
+        if since is not None or until is not None:
+            selections.append(self._in_time_range(
+                None if since is None else to_epoch_ns(since),
+                None if until is None else to_epoch_ns(until),
+            ))
+        for selected in selections:
+            if rows is None:
+                rows = selected
+            elif np is not None:
+                rows = np.intersect1d(rows, selected, assume_unique=True)
+            else:
+                keep = set(selected)
+                rows = [i for i in rows if i in keep]
+        if rows is None:
+            rows = range(len(self))
+        return self.take(rows)
+
+    def take(self, rows: Iterable[int]) -> EventBatch:
+        """Return a new batch of the given rows, in order (dictionaries are shared)."""
+        np = _np()
+        rows = list(rows) if np is None else np.asarray(rows, dtype=np.int64)
+        batch = EventBatch.__new__(EventBatch)
+        batch._dictionaries = self._dictionaries
+        if np is not None:
+            batch._codes = {
+                name: array("i", np.frombuffer(col, dtype=np.int32)[rows].tobytes()) if len(col) else array("i")
+                for name, col in self._codes.items()
+            }
+            batch._ints = {
+                name: array("q", np.frombuffer(col, dtype=np.int64)[rows].tobytes()) if len(col) else array("q")
+                for name, col in self._ints.items()
+            }
+            rows = rows.tolist()
+        else:
+            batch._codes = {name: array("i", [col[i] for i in rows]) for name, col in self._codes.items()}
+            batch._ints = {name: array("q", [col[i] for i in rows]) for name, col in self._ints.items()}
+        ids = self.ids
+        batch.ids = [ids[i] for i in rows]
+        batch.extra_data = {new: self.extra_data[old] for new, old in enumerate(rows) if old in self.extra_data}
+        batch.extensions = {new: self.extensions[old] for new, old in enumerate(rows) if old in self.extensions}
+        batch._raw_times = {new: self._raw_times[old] for new, old in enumerate(rows) if old in self._raw_times}
+        return batch
+
+    # --- Grouping ---
+
+    def group_by(self, key: str, value: str | None = None, agg: str = "count") -> dict[Any, Any]:
+        """Aggregate ``value`` per distinct ``key``.
+
+        ``key`` is a dictionary-encoded column. ``value`` is an int64 column
+        (missing values are skipped) and ``agg`` one of ``"count"``,
+        ``"sum"``, ``"mean"``, ``"min"``, ``"max"``. With ``agg="count"`` and
+        no ``value``, rows are counted. Rows with a missing key group under
+        ``None``.
+        """
+        if agg not in AGGREGATIONS:
+            raise ValueError(f"Unknown aggregation: {agg!r} (expected one of {', '.join(AGGREGATIONS)})")
+        if value is None and agg != "count":
+            raise ValueError(f"agg={agg!r} needs a value column")
+        if key not in self._codes:
+            raise KeyError(f"Cannot group by {key!r}; expected one of {', '.join(self._codes)}")
+        codes = self._codes[key]
+        names = self._dictionaries[key].values
+        column = self._ints[value] if value is not None else None
+
+        np = _np()
+        if np is not None:
+            result = self._group_numpy(np, codes, len(names), column, agg)
+        else:
+            result = self._group_python(codes, column, agg)
+        return {(names[c] if c >= 0 else None): v for c, v in result.items()}
+
+    @staticmethod
+    def _group_python(codes: array, column: array | None, agg: str) -> dict[int, Any]:
+        groups: dict[int, list[int]] = {}
+        if column is None:
+            counts: dict[int, int] = {}
+            for c in codes:
+                counts[c] = counts.get(c, 0) + 1
+            return counts
+        for c, v in zip(codes, column):
+            if v != NULL:
+                groups.setdefault(c, []).append(v)
+        if agg == "count":
+            return {c: len(vs) for c, vs in groups.items()}
+        if agg == "sum":
+            return {c: sum(vs) for c, vs in groups.items()}
+        if agg == "mean":
+            return {c: sum(vs) / len(vs) for c, vs in groups.items()}
+        if agg == "min":
+            return {c: min(vs) for c, vs in groups.items()}
+        return {c: max(vs) for c, vs in groups.items()}
+
+    @staticmethod
+    def _group_numpy(np: Any, codes: array, n_groups: int, column: array | None, agg: str) -> dict[int, Any]:
+        # Shift codes by one so missing keys (-1) become bin 0.
+        bins = np.frombuffer(codes, dtype=np.int32).astype(np.int64) + 1
+        if column is not None:
+            values = np.frombuffer(column, dtype=np.int64)
+            present = values != NULL
+            bins, values = bins[present], values[present]
+        counts = np.bincount(bins, minlength=n_groups + 1)
+        groups = np.flatnonzero(counts)
+        if column is None or agg == "count":
+            result = counts
+        elif agg in ("sum", "mean"):
+            # Sum in int64 (weights would go through float64 and lose precision).
+            order = np.argsort(bins, kind="stable")
+            sums = np.add.reduceat(values[order], np.searchsorted(bins[order], groups))
+            result = np.zeros(n_groups + 1, dtype=np.int64)
+            result[groups] = sums
+            if agg == "mean":
+                return {int(g) - 1: int(result[g]) / int(counts[g]) for g in groups}
+        else:
+            order = np.argsort(bins, kind="stable")
+            ufunc = np.minimum if agg == "min" else np.maximum
+            reduced = ufunc.reduceat(values[order], np.searchsorted(bins[order], groups))
+            result = np.zeros(n_groups + 1, dtype=np.int64)
+            result[groups] = reduced
+        return {int(g) - 1: int(result[g]) for g in groups}
+
+    # --- Export ---
+
+    def to_numpy(self) -> dict[str, Any]:
+        """Return the columns as NumPy arrays that share this batch's buffers.
+
+        Dictionary-encoded columns appear as ``int32`` codes under their name
+        plus an object array of values under ``"<name>_values"``; int64
+        columns use :data:`NULL` for missing values. Appending to the batch
+        afterwards may reallocate its buffers, so re-export after appending.
+        """
+        np = _np()
+        if np is None:
+            raise ImportError("to_numpy() requires numpy")
+        columns: dict[str, Any] = {"id": np.array(self.ids, dtype=object)}
+        for name, col in self._codes.items():
+            columns[name] = np.frombuffer(col, dtype=np.int32)
+            columns[f"{name}_values"] = np.array(self._dictionaries[name].values, dtype=object)
+        for name, col in self._ints.items():
+            columns[name] = np.frombuffer(col, dtype=np.int64)
+        return columns
+
+    def to_arrow(self) -> Any:
+        """Return a ``pyarrow.RecordBatch``; code and int64 buffers are not copied.
+
+        Dictionary-encoded columns become ``DictionaryArray``. Missing values
+        become nulls (only the validity bitmaps are newly allocated).
+        """
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("to_arrow() requires pyarrow") from None
+        n = len(self)
+        arrays: dict[str, Any] = {"id": pa.array(self.ids, type=pa.string())}
+        for name, col in self._codes.items():
+            validity = _validity(pa, col, -1)
+            indices = pa.Array.from_buffers(pa.int32(), n, [validity, pa.py_buffer(col)])
+            arrays[name] = pa.DictionaryArray.from_arrays(indices, pa.array(self._dictionaries[name].values))
+        for name, col in self._ints.items():
+            validity = _validity(pa, col, NULL)
+            arrays[name] = pa.Array.from_buffers(pa.int64(), n, [validity, pa.py_buffer(col)])
+        arrays["time"] = arrays["time"].view(pa.timestamp("ns", tz="UTC"))
+        return pa.RecordBatch.from_arrays(list(arrays.values()), names=list(arrays))
+
+
+def _validity(pa: Any, column: array, missing: int) -> Any:
+    """Arrow validity bitmap for ``column`` (None when nothing is missing)."""
+    if missing not in column:
+        return None
+    return pa.array([v != missing for v in column], type=pa.bool_()).buffers()[1]
+
@@ -0,0 +1,335 @@
+"""``openhook`` command line: reprocess NDJSON archives in parallel.
+
+Commands::
+
+    openhook convert legacy-*.ndjson -o events.ndjson     # legacy payloads -> OpenHook envelopes
+    openhook trace events-*.ndjson -o traces.ndjson       # file.write -> Agent Trace records
+    openhook trace events-*.ndjson -o traces.ndjson --aggregate   # one record per session
+
+Input files are split into byte ranges of about ``--chunk-size`` that end on
+line boundaries, and the chunks are processed by ``--jobs`` worker processes.
+Every output line is assigned to a partition by a stable hash of its
+``session_id``, and each partition is assembled from the chunks in input
+order, so a session's lines keep their order. With one partition (the
+default) the output is in input order; with ``--partitions N`` the output is
+a directory of ``part-NNNNN.ndjson`` files.
+
+Commands that keep per-session state (``trace --aggregate``) run in two
+rounds: the chunks' events are first routed to partitions, then each
+partition is processed by one worker that sees all of its sessions' events
+in order.
+
+Malformed lines are skipped and reported on stderr, and the exit status is 1.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import IO, Any, Callable, Iterator
+
+from . import codec
+from .compat import from_legacy, is_openhook
+from .envelope import ValidationError, _parse_line, validate
+from .integrations.agent_trace import TraceAggregator, to_trace_record
+
+DEFAULT_CHUNK_SIZE = 32 << 20
+
+# Errors reported per chunk; the rest are only counted.
+_MAX_REPORTED = 10
+
+
+@dataclass(frozen=True)
+class _Task:
+    """One byte range of an input file, and how to process it."""
+
+    command: str
+    path: str
+    start: int
+    end: int
+    index: int
+    workdir: str
+    partitions: int
+    strict: bool
+    retain: str
+    aggregate: bool
+
+
+def chunk_ranges(path: str, chunk_size: int) -> list[tuple[int, int]]:
+    """Split ``path`` into ``(start, end)`` byte ranges of about ``chunk_size``.
+
+    Every range but the last ends just after a newline, so no line is split.
+    """
+    size = os.path.getsize(path)
+    ranges = []
+    start = 0
+    with open(path, "rb") as f:
+        while start < size:
+            end = start + chunk_size
+            if end < size:
+                f.seek(end)
+                f.readline()
+                end = min(f.tell(), size)
+            else:
+                end = size
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def partition_of(session_id: Any, partitions: int) -> int:
+    """The partition of ``session_id``; stable across processes, unlike ``hash()``.
+
+    Ids that are not strings (e.g. a number in a malformed envelope) are
+    partitioned by their ``str()``.
+    """
+    if partitions == 1:
+        return 0
+    return zlib.crc32(str(session_id).encode()) % partitions
+
+
+def _describe(exc: Exception) -> str:
+    if isinstance(exc, (ValueError, ValidationError)):
+        return str(exc)
+    # Valid JSON of the wrong shape fails deeper in; name the exception.
+    return f"{type(exc).__name__}: {exc}"
+
+
+# --- Per-line transforms: line -> (session_id, output line) or None ---
+
+
+def _convert_line(line: bytes, task: _Task) -> tuple[str, bytes]:
+    payload = codec.loads(line)
+    if not isinstance(payload, dict):
+        raise ValidationError("Event must be a JSON object")
+    if is_openhook(payload):
+        validate(payload, strict=task.strict)
+        return payload["session_id"], line.strip()
+    event = from_legacy(payload, retain=task.retain, raw=line)
+    return event.session_id, event.to_json_bytes()
+
+
+def _trace_line(line: bytes, task: _Task) -> tuple[str, bytes] | None:
+    event = _parse_line(line, task.strict, True)
+    if task.aggregate:
+        # Routed as is; the partition's worker aggregates it.
+        return event.session_id, line.strip()
+    record = to_trace_record(event)  # type: ignore[arg-type]
+    if record is None:
+        return None
+    return event.session_id, json.dumps(record).encode()
+
+
+_TRANSFORMS: dict[str, Callable[[bytes, _Task], tuple[str, bytes] | None]] = {
+    "convert": _convert_line,
+    "trace": _trace_line,
+}
+
+
+def _chunk_file(workdir: str, index: int, partition: int) -> str:
+    return os.path.join(workdir, f"chunk-{index:06d}-{partition:05d}")
+
+
+def _map_chunk(task: _Task) -> tuple[dict[str, int], list[str]]:
+    """Transform one chunk into per-partition files; return its counters and first errors."""
+    transform = _TRANSFORMS[task.command]
+    outputs: list[list[bytes]] = [[] for _ in range(task.partitions)]
+    counters = {"lines": 0, "written": 0, "errors": 0}
+    errors = []
+    with open(task.path, "rb") as f:
+        f.seek(task.start)
+        data = f.read(task.end - task.start)
+    offset = task.start
+    for line in data.split(b"\n"):
+        position = offset
+        offset += len(line) + 1
+        if not line.strip():
+            continue
+        counters["lines"] += 1
+        try:
+            result = transform(line, task)
+            if result is not None:
+                session_id, out = result
+                outputs[partition_of(session_id, task.partitions)].append(out)
+        except Exception as exc:
+            counters["errors"] += 1
+            if len(errors) < _MAX_REPORTED:
+                errors.append(f"{task.path}: byte {position}: {_describe(exc)}")
+            continue
+        if result is not None:
+            counters["written"] += 1
+    for partition, lines in enumerate(outputs):
+        if lines:
+            lines.append(b"")
+            with open(_chunk_file(task.workdir, task.index, partition), "wb") as f:
+                f.write(b"\n".join(lines))
+    return counters, errors
+
+
+def _partition_lines(workdir: str, chunks: int, partition: int) -> Iterator[bytes]:
+    for index in range(chunks):
+        path = _chunk_file(workdir, index, partition)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                yield from f
+
+
+def _aggregate_partition(args: tuple[str, int, int]) -> tuple[int, int, list[str]]:
+    """Fold one partition's routed events into per-session trace records.
+
+    Returns the number of records, the number of events that could not be
+    folded in (which are skipped), and the first of their errors.
+    """
+    workdir, chunks, partition = args
+    aggregator = TraceAggregator()
+    records = []
+    failed = 0
+    errors = []
+    for number, line in enumerate(_partition_lines(workdir, chunks, partition), 1):
+        try:
+            record = aggregator.add(_parse_line(line, False, True))  # type: ignore[arg-type]
+        except Exception as exc:
+            failed += 1
+            if len(errors) < _MAX_REPORTED:
+                errors.append(f"partition {partition}: event {number}: {_describe(exc)}")
+            continue
+        if record is not None:
+            records.append(record)
+    records.extend(aggregator.flush())
+    with open(_chunk_file(workdir, chunks, partition), "wb") as f:
+        f.writelines(json.dumps(record).encode() + b"\n" for record in records)
+    return len(records), failed, errors
+
+
+def run(
+    command: str,
+    paths: list[str],
+    output: str | None,
+    *,
+    jobs: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    partitions: int = 1,
+    strict: bool = False,
+    retain: str = "full",
+    aggregate: bool = False,
+    stdout: IO[bytes] | None = None,
+) -> tuple[dict[str, int], list[str]]:
+    """Run ``command`` over ``paths``; return the summed counters and the reported errors.
+
+    ``output`` is a file (or None for ``stdout``) with one partition, and a
+    directory otherwise.
+    """
+    if partitions < 1:
+        raise ValueError("partitions must be at least 1")
+    if partitions > 1 and output is None:
+        raise ValueError("--partitions needs an output directory (-o)")
+    jobs = jobs or os.cpu_count() or 1
+    counters = {"lines": 0, "written": 0, "errors": 0}
+    errors: list[str] = []
+    with tempfile.TemporaryDirectory(prefix="openhook-") as workdir:
+        ranges = [(path, start, end) for path in paths for start, end in chunk_ranges(path, chunk_size)]
+        tasks = [
+            _Task(command, path, start, end, index, workdir, partitions, strict, retain, aggregate)
+            for index, (path, start, end) in enumerate(ranges)
+        ]
+        pool = ProcessPoolExecutor(jobs) if jobs > 1 and max(len(tasks), partitions) > 1 else None
+        try:
+            for chunk_counters, chunk_errors in (pool.map if pool else map)(_map_chunk, tasks):
+                for key, value in chunk_counters.items():
+                    counters[key] += value
+                errors.extend(chunk_errors)
+            outputs = range(len(tasks))
+            if aggregate:
+                # The aggregated records, written as one more "chunk" per
+                # partition, replace the routed events as the output.
+                work = [(workdir, len(tasks), partition) for partition in range(partitions)]
+                counters["written"] = 0
+                for written, failed, partition_errors in (pool.map if pool else map)(_aggregate_partition, work):
+                    counters["written"] += written
+                    counters["errors"] += failed
+                    errors.extend(partition_errors)
+                outputs = range(len(tasks), len(tasks) + 1)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        _merge(workdir, outputs, partitions, output, stdout)
+    return counters, errors
+
+
+def _merge(
+    workdir: str, chunks: range, partitions: int, output: str | None, stdout: IO[bytes] | None
+) -> None:
+    """Concatenate each partition's chunk files, in chunk order, into the output."""
+
+    def write(partition: int, out: IO[bytes]) -> None:
+        for index in chunks:
+            path = _chunk_file(workdir, index, partition)
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    shutil.copyfileobj(f, out)
+
+    if output is None:
+        out = stdout or sys.stdout.buffer
+        write(0, out)
+        out.flush()
+    elif partitions == 1:
+        with open(output, "wb") as f:
+            write(0, f)
+    else:
+        os.makedirs(output, exist_ok=True)
+        for partition in range(partitions):
+            with open(os.path.join(output, f"part-{partition:05d}.ndjson"), "wb") as f:
+                write(partition, f)
+
+
+def main(argv: list[str] | None = None, stdout: IO[bytes] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="openhook", description="Reprocess OpenHook NDJSON archives in parallel.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    convert = commands.add_parser("convert", help="convert legacy hook payloads to OpenHook envelopes")
+    convert.add_argument(
+        "--retain", default="full", choices=("full", "keys-only", "truncated", "digest", "raw"),
+        help="what to keep of each legacy payload (see from_legacy)",
+    )
+    trace = commands.add_parser("trace", help="turn file.write events into Agent Trace records")
+    trace.add_argument("--aggregate", action="store_true", help="one record per session (TraceAggregator)")
+    for sub in (convert, trace):
+        sub.add_argument("paths", nargs="+", help="NDJSON input files")
+        sub.add_argument("-o", "--output", help="output file, or directory with --partitions (default: stdout)")
+        sub.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+        sub.add_argument(
+            "--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="bytes per chunk (default: 32 MiB)"
+        )
+        sub.add_argument("--partitions", type=int, default=1, help="output partitions by session_id (default: 1)")
+        sub.add_argument("--strict", action="store_true", help="validate envelopes against the full schemas")
+    args = parser.parse_args(argv)
+
+    try:
+        counters, errors = run(
+            args.command, args.paths, args.output,
+            jobs=args.jobs, chunk_size=args.chunk_size, partitions=args.partitions, strict=args.strict,
+            retain=getattr(args, "retain", "full"), aggregate=getattr(args, "aggregate", False), stdout=stdout,
+        )
+    except (OSError, ValueError) as exc:
+        print(f"openhook: {exc}", file=sys.stderr)
+        return 2
+    for err in errors:
+        print(f"openhook: {err}", file=sys.stderr)
+    if counters["errors"] > len(errors):
+        print(f"openhook: ... {counters['errors'] - len(errors)} more malformed lines", file=sys.stderr)
+    print(
+        f"openhook {args.command}: {counters['lines']} lines, {counters['written']} written, "
+        f"{counters['errors']} malformed",
+        file=sys.stderr,
+    )
+    return 1 if counters["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
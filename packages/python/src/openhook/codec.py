@@ -0,0 +1,106 @@
+"""Pluggable JSON decoding backend.
+
+Decoding uses the fastest available backend: ``orjson``, then ``msgspec``,
+then the stdlib ``json`` module. Neither fast backend is a dependency; they are
+picked up only if installed. Set ``OPENHOOK_JSON_BACKEND`` (``orjson``,
+``msgspec`` or ``json``) or call :func:`set_backend` to choose explicitly.
+The backend is selected and imported on the first decode; an unknown or
+uninstalled ``OPENHOOK_JSON_BACKEND`` raises ImportError there.
+
+The backends differ only at the edges of JSON: the stdlib decoder accepts
+``NaN`` and ``Infinity`` and decodes integers of any size, while ``orjson``
+rejects ``NaN`` and ``Infinity`` and decodes integers outside the 64-bit
+range as floats.
+
+Encoding always uses the stdlib encoder (through its C accelerator), because
+the fast backends emit compact separators and raw UTF-8, which would change
+the bytes ``to_json()`` / ``emit()`` produce.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Callable
+
+BACKENDS = ("orjson", "msgspec", "json")
+
+_backend: str | None = None
+
+
+def _select(raw: str | bytes) -> Any:
+    # Placeholder until the first decode: the backend is chosen (and imported)
+    # lazily so that `import openhook` does not pay for importing orjson.
+    set_backend(_env_backend())
+    return loads(raw)
+
+
+loads = _select
+
+
+def _env_backend() -> str | None:
+    """Return the backend named by ``OPENHOOK_JSON_BACKEND``, or None if unset.
+
+    An unknown name raises ImportError rather than ValueError: the first
+    decode happens inside the envelope line loop, which would report a
+    ValueError as a bad line and, with ``on_error="skip"``, drop every line.
+    """
+    name = os.environ.get("OPENHOOK_JSON_BACKEND") or None
+    if name is not None and name not in BACKENDS:
+        raise ImportError(
+            f"OPENHOOK_JSON_BACKEND={name!r} is not a JSON backend (expected one of {', '.join(BACKENDS)})"
+        )
+    return name
+
+
+def _load(name: str) -> Callable[[str | bytes], Any]:
+    if name == "orjson":
+        import orjson
+
+        # orjson.JSONDecodeError already subclasses json.JSONDecodeError.
+        return orjson.loads
+    if name == "msgspec":
+        import msgspec
+
+        decode = msgspec.json.decode
+
+        def msgspec_loads(raw: str | bytes) -> Any:
+            try:
+                return decode(raw)
+            except msgspec.DecodeError as exc:
+                raise ValueError(str(exc)) from exc
+
+        return msgspec_loads
+    if name == "json":
+        return json.loads
+    raise ValueError(f"Unknown JSON backend: {name!r} (expected one of {', '.join(BACKENDS)})")
+
+
+def set_backend(name: str | None = None) -> str:
+    """Select the decoding backend and return its name.
+
+    With no argument, the first importable backend in :data:`BACKENDS` is used.
+    Raises ImportError if a named backend is not installed.
+    """
+    global loads, _backend
+    if name is None:
+        for candidate in BACKENDS:
+            try:
+                loads = _load(candidate)
+            except ImportError:
+                continue
+            _backend = candidate
+            return candidate
+    loads = _load(name)  # type: ignore[arg-type]
+    _backend = name
+    return name  # type: ignore[return-value]
+
+
+def get_backend() -> str:
+    """Return the name of the active decoding backend, selecting it if needed."""
+    if _backend is None:
+        set_backend(_env_backend())
+    return _backend  # type: ignore[return-value]
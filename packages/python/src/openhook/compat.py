@@ -2,13 +2,13 @@
 
 from __future__ import annotations
 
-import uuid
-from datetime import datetime, timezone
-from typing import Any
-
-from .envelope import OpenHookEvent
+from .envelope import OpenHookEvent, RawJSON
 from .events import EventType
 
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Callable, Collection, Iterable, Iterator
+
 # Maps legacy hook_event_name -> OpenHook event type
 _METRIC_EVENT_MAP: dict[str, EventType] = {
     "userPromptSubmitted": EventType.PROMPT_SUBMIT,
@@ -25,6 +25,13 @@ _SESSION_ID_KEYS = ("sessionId", "session_id", "conversation_id", "taskId", "thr
 # Legacy transcript path field names
 _TRANSCRIPT_KEYS = ("transcriptPath", "transcript_path")
 
+# Bound on cached key-set shapes in from_legacy_many
+_MAX_SHAPES = 1024
+
+# How much of the original payload from_legacy keeps in extensions.legacy_payload
+RETENTION_POLICIES = ("full", "keys-only", "truncated", "digest", "raw")
+DEFAULT_MAX_BYTES = 4096
+
 
 def _cwd_to_context(cwd: str) -> str:
     """Convert a legacy filesystem path to a file:// URI."""
@@ -33,55 +40,118 @@ def _cwd_to_context(cwd: str) -> str:
     return f"file://{cwd}"
 
 
-def _detect_source(payload: dict[str, Any]) -> str:
-    if payload.get("source_tool"):
-        return str(payload["source_tool"])
-    if "conversation_id" in payload:
+def _detect_source(keys: Collection[str]) -> str:
+    """Detect the tool from key presence alone (``source_tool`` is handled by the caller)."""
+    if "conversation_id" in keys:
         return "cursor"
-    if "taskId" in payload:
+    if "taskId" in keys:
         return "cline"
-    if "thread-id" in payload:
+    if "thread-id" in keys:
         return "codex"
-    if "hook_event_name" in payload:
+    if "hook_event_name" in keys:
         return "copilot"
     # Claude Code uses camelCase fields (sessionId, transcriptPath)
     # while other tools use snake_case (session_id)
-    if "sessionId" in payload or "transcriptPath" in payload:
+    if "sessionId" in keys or "transcriptPath" in keys:
         return "claude-code"
     return "unknown"
 
 
-def _extract_session_id(payload: dict[str, Any]) -> str:
-    for key in _SESSION_ID_KEYS:
-        if key in payload:
-            return str(payload[key])
-    nested = payload.get("session", {})
-    if isinstance(nested, dict) and "id" in nested:
-        return str(nested["id"])
-    return ""
+class _LegacyShape:
+    """Detection results for one set of payload keys.
+
+    Everything that depends only on which keys are present is resolved once
+    here; payloads from one tool share a shape, so batch conversion reuses it.
+    """
+
+    __slots__ = (
+        "has_source_tool", "source", "session_key", "nested_session",
+        "transcript_key", "nested_transcript",
+    )
+
+    def __init__(self, keys: Collection[str]) -> None:
+        self.has_source_tool = "source_tool" in keys
+        self.source = _detect_source(keys)
+        self.session_key = next((k for k in _SESSION_ID_KEYS if k in keys), None)
+        self.nested_session = self.session_key is None and "session" in keys
+        self.transcript_key = next((k for k in _TRANSCRIPT_KEYS if k in keys), None)
+        self.nested_transcript = self.transcript_key is None and "transcript" in keys
 
+    def source_of(self, payload: dict[str, Any]) -> str:
+        if self.has_source_tool and payload["source_tool"]:
+            return str(payload["source_tool"])
+        return self.source
 
-def _extract_transcript_path(payload: dict[str, Any]) -> str | None:
-    for key in _TRANSCRIPT_KEYS:
-        if key in payload:
-            return str(payload[key])
-    nested = payload.get("transcript", {})
-    if isinstance(nested, dict) and "path" in nested:
-        return str(nested["path"])
-    return None
+    def session_id_of(self, payload: dict[str, Any]) -> str:
+        if self.session_key is not None:
+            return str(payload[self.session_key])
+        if self.nested_session:
+            nested = payload["session"]
+            if isinstance(nested, dict) and "id" in nested:
+                return str(nested["id"])
+        return ""
 
+    def transcript_path_of(self, payload: dict[str, Any]) -> str | None:
+        if self.transcript_key is not None:
+            return str(payload[self.transcript_key])
+        if self.nested_transcript:
+            nested = payload["transcript"]
+            if isinstance(nested, dict) and "path" in nested:
+                return str(nested["path"])
+        return None
 
-def from_legacy(payload: dict[str, Any]) -> OpenHookEvent:
-    """Convert a legacy (non-OpenHook) hook payload to an OpenHookEvent."""
-    source = _detect_source(payload)
-    session_id = _extract_session_id(payload)
-    now = datetime.now(timezone.utc).isoformat()
 
+def _retained(
+    payload: dict[str, Any], retain: str, max_bytes: int, raw: bytes | str | None
+) -> Any:
+    """Return the ``legacy_payload`` value for a retention policy."""
+    if retain not in RETENTION_POLICIES:
+        raise ValueError(
+            f"Unknown retention policy: {retain!r} (expected one of {', '.join(RETENTION_POLICIES)})"
+        )
+    if retain == "full":
+        return payload
+    if retain == "keys-only":
+        return {"retention": "keys-only", "keys": list(payload)}
+    if retain == "raw":
+        if raw is None:
+            raise ValueError("retain='raw' requires the original raw bytes")
+        return RawJSON(raw)
+
+    # Size-based policies work on the original bytes when given, so nothing is
+    # re-encoded; otherwise the payload is encoded once.
+    if raw is None:
+        import json
+
+        encoded = json.dumps(payload).encode()
+    else:
+        encoded = raw.encode() if isinstance(raw, str) else raw
+    if retain == "digest":
+        import hashlib
+
+        return {
+            "retention": "digest",
+            "sha256": hashlib.sha256(encoded).hexdigest(),
+            "size": len(encoded),
+        }
+    # truncated
+    if len(encoded) <= max_bytes:
+        return payload
+    return {
+        "retention": "truncated",
+        "size": len(encoded),
+        "prefix": encoded[:max_bytes].decode(errors="ignore"),
+    }
+
+
+def _convert(
+    payload: dict[str, Any], shape: _LegacyShape, event_id: str, time: str, legacy: Any
+) -> OpenHookEvent:
     hook_event = payload.get("hook_event_name", "")
     event_type = _METRIC_EVENT_MAP.get(hook_event, EventType.SESSION_END)
 
     data: dict[str, Any] = {}
-    transcript = _extract_transcript_path(payload)
+    transcript = shape.transcript_path_of(payload)
     if transcript:
         data["transcript_path"] = transcript
 
@@ -94,17 +164,120 @@ def from_legacy(payload: dict[str, Any]) -> OpenHookEvent:
 
     return OpenHookEvent(
         openhook="0.1",
-        id=str(uuid.uuid4()),
-        source=source,
+        id=event_id,
+        source=shape.source_of(payload),
         type=event_type,
-        time=now,
-        session_id=session_id,
+        time=time,
+        session_id=shape.session_id_of(payload),
         data=data,
         context=context,
-        extensions={"legacy_payload": payload},
+        extensions={"legacy_payload": legacy},
     )
 
 
+def from_legacy(
+    payload: dict[str, Any],
+    *,
+    event_id: str | None = None,
+    time: str | None = None,
+    retain: str = "full",
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    raw: bytes | str | None = None,
+) -> OpenHookEvent:
+    """Convert a legacy (non-OpenHook) hook payload to an OpenHookEvent.
+
+    ``event_id`` and ``time`` default to :func:`openhook.ids.new_id` (a UUID v4
+    unless another generator is selected) and the current time.
+
+    ``retain`` controls what ``extensions["legacy_payload"]`` holds:
+
+    - ``"full"``: the payload dict itself (the default).
+    - ``"keys-only"``: ``{"retention": "keys-only", "keys": [...]}``.
+    - ``"truncated"``: the payload if its JSON fits in ``max_bytes``, else
+      ``{"retention": "truncated", "size": n, "prefix": "..."}``.
+    - ``"digest"``: ``{"retention": "digest", "sha256": "...", "size": n}``.
+    - ``"raw"``: the original JSON text ``raw`` as a :class:`RawJSON`, which
+      ``to_json()`` writes back verbatim (stripped, and on one line). Raises
+      ``ValueError`` if ``raw`` is not valid JSON.
+
+    ``raw`` is the payload's original JSON (as read from stdin); when given,
+    the size-based policies measure and hash it instead of re-encoding.
+    """
+    if not event_id:
+        from . import ids
+
+        event_id = ids.new_id()
+    if not time:
+        from datetime import datetime, timezone
+
+        time = datetime.now(timezone.utc).isoformat()
+    legacy = _retained(payload, retain, max_bytes, raw)
+    return _convert(payload, _LegacyShape(payload.keys()), event_id, time, legacy)
+
+
+def _new_ids() -> Iterator[str]:
+    """Yield ids from the active generator, which batches its entropy."""
+    from . import ids
+
+    while True:
+        yield ids.new_id()
+
+
+def _now_batches(
+    batch_size: int = 256, max_age: float = 0.001, clock: Callable[[], float] | None = None
+) -> Iterator[str]:
+    """Yield the current UTC time, re-reading the clock every ``batch_size`` events
+    or once ``max_age`` seconds have passed, so a slow or live input does not
+    get stale times.
+    """
+    from datetime import datetime, timezone
+
+    if clock is None:
+        from time import monotonic as clock
+    while True:
+        now = datetime.now(timezone.utc).isoformat()
+        read_at = clock()
+        for _ in range(batch_size):
+            yield now
+            if clock() - read_at > max_age:
+                break
+
+
+def from_legacy_many(
+    payloads: Iterable[dict[str, Any]],
+    *,
+    ids: Iterable[str] | None = None,
+    times: Iterable[str] | None = None,
+    retain: str = "full",
+    max_bytes: int = DEFAULT_MAX_BYTES,
+) -> Iterator[OpenHookEvent]:
+    """Lazily convert many legacy payloads, as :func:`from_legacy` would.
+
+    Source/session/transcript detection is cached per payload key set, so a
+    backfill of one tool's logs probes the keys once. ``ids`` and ``times``
+    supply each event's ``id`` and ``time``; by default ids come from
+    :func:`openhook.ids.new_id` and the clock is read once per 256 events,
+    or sooner when a millisecond has passed. Given the
+    same ids and times, every event equals ``from_legacy(payload, ...)``.
+    ``retain`` and ``max_bytes`` are as for :func:`from_legacy` (``"raw"`` is
+    not available here).
+    """
+    if retain == "raw":
+        raise ValueError("retain='raw' needs per-payload raw bytes; use from_legacy()")
+    id_iter = iter(ids) if ids is not None else _new_ids()
+    time_iter = iter(times) if times is not None else _now_batches()
+    shapes: dict[tuple[str, ...], _LegacyShape] = {}
+    for payload in payloads:
+        key = tuple(payload)
+        shape = shapes.get(key)
+        if shape is None:
+            if len(shapes) >= _MAX_SHAPES:
+                shapes.clear()
+            shape = shapes[key] = _LegacyShape(key)
+        legacy = _retained(payload, retain, max_bytes, None)
+        yield _convert(payload, shape, next(id_iter), next(time_iter), legacy)
+
+
 def is_openhook(payload: dict[str, Any]) -> bool:
     """Check if a payload is an OpenHook envelope."""
     return "openhook" in payload
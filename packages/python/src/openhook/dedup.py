@@ -0,0 +1,262 @@
+"""Duplicate suppression keyed on the envelope ``id`` (spec section 2.1).
+
+:class:`DedupFilter` remembers the ids it has seen for a time window and
+drops repeats, e.g. retried deliveries in an async hook chain::
+
+    dedup = DedupFilter(window=3600)
+    for event in dedup(iter_events()):
+        handle(event)
+
+Ids are kept exactly in an LRU bounded by ``window`` and ``max_ids``. For
+windows too large to hold every id, ``bloom_capacity`` adds a rotating Bloom
+filter behind the LRU. It holds two generations and starts a new one when
+the current is full or older than the window, so an id is remembered for
+between one and two windows at a bounded false-positive rate. A false positive
+drops a new event as a duplicate.
+
+The filter can be saved to a file and loaded back so that dedup survives a
+restart. Ages are stored relative to the save time.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import struct
+import time as _time
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import IO, Any, Callable, Iterable, Iterator, TypeVar
+
+from .envelope import LazyEvent, OpenHookEvent
+
+_MAGIC = b"OHDD\x01"
+
+E = TypeVar("E", OpenHookEvent, LazyEvent)
+
+
+class _Bloom:
+    """A fixed-size Bloom filter; the k indices are 32-bit words of one blake2b digest."""
+
+    __slots__ = ("bits", "size", "hashes", "count", "created", "_unpack")
+
+    def __init__(self, size: int, hashes: int, created: float) -> None:
+        self.bits = bytearray((size + 7) // 8)
+        self.size = size
+        self.hashes = hashes
+        self.count = 0
+        self.created = created
+        self._unpack = struct.Struct(f"<{hashes}I").unpack
+
+    def positions(self, key: bytes) -> list[int]:
+        size = self.size
+        digest = blake2b(key, digest_size=4 * self.hashes).digest()
+        return [h % size for h in self._unpack(digest)]
+
+    def add(self, positions: list[int]) -> None:
+        bits = self.bits
+        for pos in positions:
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def has(self, positions: list[int]) -> bool:
+        bits = self.bits
+        for pos in positions:
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+
+def _bloom_shape(capacity: int, false_positive_rate: float, max_bytes: int | None) -> tuple[int, int, int]:
+    """Return ``(bits, hashes, capacity)`` for the requested rate, capped at ``max_bytes``."""
+    ln2 = math.log(2)
+    bits = math.ceil(-capacity * math.log(false_positive_rate) / ln2**2)
+    limit = 2**32 if max_bytes is None else min(max_bytes * 8, 2**32)
+    if bits > limit:
+        # Keep the rate by holding fewer ids per generation (rotating sooner).
+        bits = limit
+        capacity = max(1, int(bits * ln2**2 / -math.log(false_positive_rate)))
+    # One blake2b digest (at most 64 bytes) supplies up to 16 indices.
+    hashes = min(16, max(1, round(bits / capacity * ln2)))
+    return bits, hashes, capacity
+
+
+class DedupFilter:
+    """Drop events whose ``id`` was already seen within ``window`` seconds.
+
+    ``max_ids`` caps the exact LRU; ids it evicts early are only remembered
+    by the Bloom filter, if one is configured. ``bloom_capacity`` is the
+    number of ids per Bloom generation, sized for ``false_positive_rate``
+    and capped at ``max_bloom_bytes`` (and at most 512 MiB, since indices
+    are 32-bit) per generation. Events without an id
+    are always passed through.
+    """
+
+    def __init__(
+        self,
+        *,
+        window: float = 3600.0,
+        max_ids: int = 100_000,
+        bloom_capacity: int | None = None,
+        false_positive_rate: float = 0.001,
+        max_bloom_bytes: int | None = None,
+        clock: Callable[[], float] = _time.monotonic,
+    ) -> None:
+        if max_ids < 1:
+            raise ValueError("max_ids must be at least 1")
+        if not 0 < false_positive_rate < 1:
+            raise ValueError("false_positive_rate must be between 0 and 1")
+        self.window = window
+        self.max_ids = max_ids
+        self.false_positive_rate = false_positive_rate
+        self._clock = clock
+        self._ids: OrderedDict[str, float] = OrderedDict()
+        self._bloom_shape: tuple[int, int, int] | None = None
+        self._blooms: list[_Bloom] = []
+        if bloom_capacity is not None:
+            self._bloom_shape = _bloom_shape(bloom_capacity, false_positive_rate, max_bloom_bytes)
+            self._blooms.append(self._new_bloom(clock()))
+        self.counters = {"passed": 0, "duplicates": 0, "bloom_duplicates": 0, "evicted": 0}
+
+    def __len__(self) -> int:
+        """Number of ids held exactly."""
+        return len(self._ids)
+
+    def __contains__(self, event_id: str) -> bool:
+        if event_id in self._ids:
+            return True
+        if not self._blooms:
+            return False
+        positions = self._blooms[-1].positions(event_id.encode())
+        return any(bloom.has(positions) for bloom in self._blooms)
+
+    def __call__(self, events: Iterable[E]) -> Iterator[E]:
+        """Yield the events of ``events`` that are not duplicates."""
+        seen = self.seen
+        for event in events:
+            if not seen(event.id):
+                yield event
+
+    @property
+    def bloom_bytes(self) -> int:
+        """Memory held by the Bloom generations, in bytes."""
+        return sum(len(bloom.bits) for bloom in self._blooms)
+
+    def _new_bloom(self, now: float) -> _Bloom:
+        bits, hashes, _ = self._bloom_shape  # type: ignore[misc]
+        return _Bloom(bits, hashes, now)
+
+    def _expire(self, now: float) -> None:
+        ids = self._ids
+        deadline = now - self.window
+        while ids:
+            event_id, arrival = next(iter(ids.items()))
+            if arrival > deadline:
+                break
+            del ids[event_id]
+        if self._blooms:
+            current = self._blooms[-1]
+            age = now - current.created
+            if age >= 2 * self.window:
+                # Idle for a whole window since the last rotation: all stale.
+                self._blooms = [self._new_bloom(now)]
+            elif age >= self.window or current.count >= self._bloom_shape[2]:  # type: ignore[index]
+                self._blooms = [current, self._new_bloom(now)]
+
+    def seen(self, event_id: str) -> bool:
+        """Record ``event_id``; returns True if it is a duplicate."""
+        if not event_id:
+            self.counters["passed"] += 1
+            return False
+        now = self._clock()
+        self._expire(now)
+        ids = self._ids
+        if event_id in ids:
+            # A repeat refreshes the id, keeping the dict ordered by last sighting.
+            ids[event_id] = now
+            ids.move_to_end(event_id)
+            self.counters["duplicates"] += 1
+            return True
+        blooms = self._blooms
+        if blooms:
+            # All generations share one shape, so the indices are computed once.
+            current = blooms[-1]
+            positions = current.positions(event_id.encode())
+            if current.has(positions) or (len(blooms) > 1 and blooms[0].has(positions)):
+                self.counters["duplicates"] += 1
+                self.counters["bloom_duplicates"] += 1
+                return True
+            current.add(positions)
+        ids[event_id] = now
+        if len(ids) > self.max_ids:
+            ids.popitem(last=False)
+            self.counters["evicted"] += 1
+        self.counters["passed"] += 1
+        return False
+
+    def is_duplicate(self, event: OpenHookEvent | LazyEvent) -> bool:
+        """Record ``event``; returns True if its id was already seen."""
+        return self.seen(event.id)
+
+    # --- Persistence ---
+
+    def save(self, file: str | os.PathLike[str] | IO[bytes]) -> None:
+        """Write the filter's state; ages are stored relative to now."""
+        if not hasattr(file, "write"):
+            with open(file, "wb") as f:  # type: ignore[arg-type]
+                self.save(f)
+            return
+        out: IO[bytes] = file  # type: ignore[assignment]
+        now = self._clock()
+        header = json.dumps({
+            "ids": [[event_id, now - arrival] for event_id, arrival in self._ids.items()],
+            "bloom": None if self._bloom_shape is None else {
+                "shape": list(self._bloom_shape),
+                "generations": [[now - b.created, b.count] for b in self._blooms],
+            },
+        }).encode()
+        out.write(_MAGIC)
+        out.write(len(header).to_bytes(4, "little"))
+        out.write(header)
+        for bloom in self._blooms:
+            out.write(bloom.bits)
+
+    @classmethod
+    def load(cls, file: str | os.PathLike[str] | IO[bytes], **options: Any) -> DedupFilter:
+        """Create a filter with ``options`` and restore state written by :meth:`save`.
+
+        Saved ids older than the window are dropped. Bloom generations are
+        restored only if ``options`` give them the same size as when saved.
+        """
+        if not hasattr(file, "read"):
+            with open(file, "rb") as f:  # type: ignore[arg-type]
+                return cls.load(f, **options)
+        raw = file.read()  # type: ignore[union-attr]
+        if raw[:len(_MAGIC)] != _MAGIC:
+            raise ValueError("Not an OpenHook dedup file")
+        pos = len(_MAGIC)
+        header_len = int.from_bytes(raw[pos:pos + 4], "little")
+        pos += 4
+        header = json.loads(raw[pos:pos + header_len])
+        pos += header_len
+
+        dedup = cls(**options)
+        now = dedup._clock()
+        for event_id, age in header["ids"]:
+            if age < dedup.window:
+                dedup._ids[event_id] = now - age
+        while len(dedup._ids) > dedup.max_ids:
+            dedup._ids.popitem(last=False)
+        bloom = header["bloom"]
+        if bloom is not None and dedup._bloom_shape is not None and tuple(bloom["shape"]) == dedup._bloom_shape:
+            size = (dedup._bloom_shape[0] + 7) // 8
+            dedup._blooms = []
+            for age, count in bloom["generations"]:
+                restored = dedup._new_bloom(now - age)
+                restored.bits[:] = raw[pos:pos + size]
+                restored.count = count
+                dedup._blooms.append(restored)
+                pos += size
+        dedup._expire(now)
+        return dedup
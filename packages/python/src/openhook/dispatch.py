@@ -0,0 +1,343 @@
+"""Hook dispatch for ``.openhook.json`` (spec section 4).
+
+Loads the discovery file, matches each event against every hook's ``events``
+filter and runs the hook command with the event on stdin. ``async: true``
+hooks run on a bounded thread pool so dispatch does not wait for them.
+
+As an SDK extension, a hook may also set ``"persistent": true``. The
+dispatcher then starts the command once and streams NDJSON envelopes (one per
+line, as written by ``emit()``) into its stdin, so each event costs one pipe
+write instead of a fork+exec. The hook reads them with ``iter_events()``.
+
+Usage::
+
+    python -m openhook.dispatch [-c .openhook.json] < events.ndjson
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any, Callable
+
+from .envelope import LazyEvent, LineError, OpenHookEvent, ValidationError, iter_events
+
+CONFIG_FILENAME = ".openhook.json"
+
+_config_cache: dict[Path, tuple[tuple[int, int], HookConfig]] = {}
+_config_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class Hook:
+    command: str
+    events: frozenset[str] = frozenset({"*"})
+    is_async: bool = False
+    persistent: bool = False
+
+    def matches(self, event_type: str) -> bool:
+        return "*" in self.events or event_type in self.events
+
+    @classmethod
+    def from_dict(cls, d: dict[str, Any]) -> Hook:
+        command = d.get("command")
+        if not isinstance(command, str) or not command:
+            raise ValidationError("Hook 'command' must be a non-empty string")
+        events = d.get("events", ["*"])
+        if not isinstance(events, list) or not all(isinstance(e, str) for e in events):
+            raise ValidationError(f"Hook 'events' must be a list of strings: {command!r}")
+        is_async = d.get("async", False)
+        persistent = d.get("persistent", False)
+        if not isinstance(is_async, bool) or not isinstance(persistent, bool):
+            raise ValidationError(f"Hook 'async' and 'persistent' must be booleans: {command!r}")
+        return cls(command=command, events=frozenset(events), is_async=is_async, persistent=persistent)
+
+
+@dataclass(frozen=True)
+class HookConfig:
+    hooks: tuple[Hook, ...] = ()
+    path: Path | None = None
+
+    @property
+    def root(self) -> Path | None:
+        """Directory hook commands run in (the directory of the config file)."""
+        return self.path.parent if self.path else None
+
+    @classmethod
+    def from_dict(cls, d: dict[str, Any], path: Path | None = None) -> HookConfig:
+        if not isinstance(d, dict) or not isinstance(d.get("openhook"), str):
+            raise ValidationError("Hook config must be an object with an 'openhook' version")
+        hooks = d.get("hooks", [])
+        if not isinstance(hooks, list):
+            raise ValidationError("Hook config 'hooks' must be a list")
+        return cls(hooks=tuple(Hook.from_dict(h) for h in hooks), path=path)
+
+
+# Exit status reported for a hook killed at its timeout, as for SIGKILL.
+_KILLED = -9
+
+
+@dataclass(frozen=True)
+class HookResult:
+    hook: Hook
+    # None for async and persistent hooks, which are not waited on.
+    returncode: int | None = None
+    # The hook exceeded the dispatcher's timeout and was killed.
+    timed_out: bool = False
+
+    @property
+    def failed(self) -> bool:
+        return bool(self.returncode) or self.timed_out
+
+
+def find_config(start: str | Path | None = None) -> Path | None:
+    """Return the nearest ``.openhook.json`` in ``start`` or its parents."""
+    directory = Path(start or os.getcwd()).resolve()
+    for candidate in (directory, *directory.parents):
+        path = candidate / CONFIG_FILENAME
+        if path.is_file():
+            return path
+    return None
+
+
+def load_config(path: str | Path | None = None) -> HookConfig:
+    """Load a hook config, discovering it from the cwd if ``path`` is None.
+
+    Parsed configs are cached per path and reused until the file's mtime or
+    size changes. Returns an empty config when no file is found.
+    """
+    resolved = Path(path).resolve() if path else find_config()
+    if resolved is None:
+        return HookConfig()
+    st = resolved.stat()
+    key = (st.st_mtime_ns, st.st_size)
+    with _config_lock:
+        cached = _config_cache.get(resolved)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+    config = HookConfig.from_dict(json.loads(resolved.read_bytes()), resolved)
+    with _config_lock:
+        _config_cache[resolved] = (key, config)
+    return config
+
+
+class _PersistentProcess:
+    """A long-lived hook process fed NDJSON envelopes on stdin."""
+
+    def __init__(self, command: str, cwd: Path | None) -> None:
+        self.command = command
+        self.cwd = cwd
+        self.proc: subprocess.Popen[bytes] | None = None
+        self.lock = threading.Lock()
+
+    def _start(self) -> subprocess.Popen[bytes]:
+        return subprocess.Popen(self.command, shell=True, cwd=self.cwd, stdin=subprocess.PIPE)
+
+    def send(self, line: bytes) -> None:
+        with self.lock:
+            if self.proc is None or self.proc.poll() is not None:
+                self.proc = self._start()
+            stdin = self.proc.stdin
+            assert stdin is not None
+            try:
+                stdin.write(line)
+                stdin.flush()
+            except BrokenPipeError:
+                # The process exited between poll() and write(); restart once.
+                self.proc = self._start()
+                self.proc.stdin.write(line)  # type: ignore[union-attr]
+                self.proc.stdin.flush()  # type: ignore[union-attr]
+
+    def close(self, timeout: float | None) -> None:
+        with self.lock:
+            if self.proc is None:
+                return
+            if self.proc.stdin is not None:
+                try:
+                    self.proc.stdin.close()
+                except BrokenPipeError:
+                    pass
+            try:
+                self.proc.wait(timeout)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+                self.proc.wait()
+            self.proc = None
+
+
+class _Routes:
+    """Which hooks of a config match each event type, computed once per type."""
+
+    def __init__(self, config: HookConfig) -> None:
+        self.config = config
+        self._routes: dict[str, tuple[Hook, ...]] = {}
+
+    def hooks_for(self, event_type: str) -> tuple[Hook, ...]:
+        hooks = self._routes.get(event_type)
+        if hooks is None:
+            hooks = tuple(h for h in self.config.hooks if h.matches(event_type))
+            self._routes[event_type] = hooks
+        return hooks
+
+
+class Dispatcher(_Routes):
+    """Run the hooks of a :class:`HookConfig` for each dispatched event.
+
+    ``max_workers`` bounds the async pool and ``max_pending`` bounds how many
+    async runs may be queued or running; ``dispatch()`` blocks once the limit
+    is reached. ``timeout`` (seconds) applies to each hook run and to
+    persistent processes on shutdown; a run that exceeds it is killed and
+    reported as a failed :class:`HookResult` with ``timed_out`` set.
+
+    Async hooks are not waited on, so their failures (a non-zero exit, a
+    timeout, or an exception starting the command) are passed to
+    ``on_async_failure`` with the exception, if any, and counted in
+    ``counters``.
+    """
+
+    def __init__(
+        self,
+        config: HookConfig,
+        *,
+        max_workers: int = 4,
+        max_pending: int = 64,
+        timeout: float | None = None,
+        on_async_failure: Callable[[HookResult, BaseException | None], None] | None = None,
+    ) -> None:
+        super().__init__(config)
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._on_async_failure = on_async_failure
+        self.counters = {"timeouts": 0, "async_failures": 0}
+        self._pool: ThreadPoolExecutor | None = None
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._persistent: dict[str, _PersistentProcess] = {}
+
+    def dispatch(self, event: OpenHookEvent | LazyEvent) -> list[HookResult]:
+        hooks = self.hooks_for(event.type)
+        if not hooks:
+            return []
+        payload = event.to_json_bytes()
+        results = []
+        for hook in hooks:
+            if hook.persistent:
+                self._persistent_process(hook).send(payload + b"\n")
+                results.append(HookResult(hook))
+            elif hook.is_async:
+                self._submit(hook, payload)
+                results.append(HookResult(hook))
+            else:
+                results.append(self._run(hook, payload))
+        return results
+
+    def _run(self, hook: Hook, payload: bytes) -> HookResult:
+        try:
+            proc = subprocess.run(
+                hook.command, shell=True, cwd=self.config.root, input=payload, timeout=self.timeout
+            )
+        except subprocess.TimeoutExpired:
+            # subprocess.run has already killed and reaped the process.
+            self.counters["timeouts"] += 1
+            return HookResult(hook, _KILLED, timed_out=True)
+        return HookResult(hook, proc.returncode)
+
+    def _submit(self, hook: Hook, payload: bytes) -> Future[HookResult]:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix="openhook")
+        self._slots.acquire()
+        try:
+            future = self._pool.submit(self._run, hook, payload)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda f: self._async_done(hook, f))
+        return future
+
+    def _async_done(self, hook: Hook, future: Future[HookResult]) -> None:
+        self._slots.release()
+        exc = future.exception()
+        result = HookResult(hook) if exc is not None else future.result()
+        if exc is None and not result.failed:
+            return
+        self.counters["async_failures"] += 1
+        if self._on_async_failure is not None:
+            self._on_async_failure(result, exc)
+
+    def _persistent_process(self, hook: Hook) -> _PersistentProcess:
+        proc = self._persistent.get(hook.command)
+        if proc is None:
+            proc = self._persistent[hook.command] = _PersistentProcess(hook.command, self.config.root)
+        return proc
+
+    def close(self) -> None:
+        """Wait for async hooks and shut down persistent processes."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        for proc in self._persistent.values():
+            proc.close(self.timeout)
+        self._persistent.clear()
+
+    def __enter__(self) -> Dispatcher:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def main(argv: list[str] | None = None, stdin: IO[bytes] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m openhook.dispatch",
+        description="Dispatch NDJSON OpenHook events from stdin to .openhook.json hooks.",
+    )
+    parser.add_argument("-c", "--config", help="path to .openhook.json (default: discover from cwd)")
+    parser.add_argument("--max-workers", type=int, default=4, help="async hook pool size")
+    parser.add_argument("--timeout", type=float, default=None, help="per-hook timeout in seconds")
+    args = parser.parse_args(argv)
+
+    try:
+        config = load_config(args.config)
+    except (OSError, ValueError, ValidationError) as exc:
+        print(f"openhook.dispatch: cannot load hook config: {exc}", file=sys.stderr)
+        return 1
+    errors: list[LineError] = []
+    status = 0
+
+    def report(result: HookResult, exc: BaseException | None = None) -> None:
+        if exc is not None:
+            problem = f"failed: {exc}"
+        elif result.timed_out:
+            problem = f"timed out after {args.timeout}s"
+        else:
+            problem = f"exited with {result.returncode}"
+        print(f"openhook.dispatch: hook {result.hook.command!r} {problem}", file=sys.stderr)
+
+    with Dispatcher(
+        config, max_workers=args.max_workers, timeout=args.timeout, on_async_failure=report
+    ) as dispatcher:
+        for event in iter_events(stdin, on_error="collect", errors=errors, lazy=True):
+            for err in errors:
+                print(f"openhook.dispatch: {err}", file=sys.stderr)
+                status = 1
+            errors.clear()
+            for result in dispatcher.dispatch(event):
+                if result.failed:
+                    report(result)
+                    status = 1
+        for err in errors:
+            print(f"openhook.dispatch: {err}", file=sys.stderr)
+            status = 1
+    if dispatcher.counters["async_failures"]:
+        status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
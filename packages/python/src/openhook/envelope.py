@@ -4,39 +4,119 @@ from __future__ import annotations
 
 import json
 import sys
-import uuid
 from dataclasses import dataclass, field
-from datetime import datetime, timezone
-from pathlib import Path
-from typing import Any
+from json.encoder import encode_basestring_ascii as _encode_str
 
+from . import codec
 from .events import EventType
 
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from pathlib import Path
+    from typing import Any, Callable, Iterable, Iterator, TypeVar
+
+    from .timestamps import TimeRange
+
+    T = TypeVar("T")
+
+# typing, uuid, datetime, pathlib and the strict schema validator are kept off
+# the import path (or imported where first needed): every hook is a fresh
+# process, and a consumer that only parses stdin should not pay for them.
+
 REQUIRED_FIELDS = frozenset({"openhook", "id", "source", "type", "time", "session_id"})
 
+DEFAULT_CHUNK_SIZE = 1 << 16
+
 
 class ValidationError(Exception):
     pass
 
 
-@dataclass(frozen=True)
-class OpenHookEvent:
-    openhook: str
-    id: str
-    source: str
+class LineError(ValidationError):
+    """A line of an NDJSON stream that could not be parsed as an event."""
+
+    def __init__(self, lineno: int, line: str | bytes, cause: Exception) -> None:
+        super().__init__(f"line {lineno}: {cause}")
+        self.lineno = lineno
+        self.line = line
+        self.cause = cause
+
+
+class RawJSON(str):
+    """A JSON document kept as text and written verbatim by ``to_json()``.
+
+    Used as an ``extensions`` value to pass an original payload through
+    without holding it as a dict or re-encoding it. The text is checked once
+    on construction: surrounding whitespace is stripped, invalid JSON raises
+    ``ValueError``, and a document spanning several lines is re-encoded on one
+    line so it cannot break NDJSON framing. ``to_dict()`` returns the decoded
+    value.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, text: str | bytes) -> RawJSON:
+        if isinstance(text, bytes):
+            text = text.decode()
+        text = text.strip()
+        try:
+            value = codec.loads(text)
+        except ValueError as exc:
+            raise ValueError(f"RawJSON text is not valid JSON: {exc}") from None
+        if "\n" in text or "\r" in text:
+            text = json.dumps(value)
+        return super().__new__(cls, text)
+
+    def value(self) -> Any:
+        """The JSON value this text represents."""
+        # str(): orjson rejects str subclasses.
+        return codec.loads(str(self))
+
+
+def _encode_extensions(extensions: dict[str, Any]) -> str:
+    if not any(type(v) is RawJSON for v in extensions.values()):
+        return json.dumps(extensions)
+    items = [
+        f"{json.dumps(k)}: {v if type(v) is RawJSON else json.dumps(v)}"
+        for k, v in extensions.items()
+    ]
+    return "{" + ", ".join(items) + "}"
+
+
+class _EventAccessors:
+    """Convenience accessors shared by OpenHookEvent and LazyEvent."""
+
+    __slots__ = ()
+
     type: EventType
     time: str
-    session_id: str
-    data: dict[str, Any] = field(default_factory=dict)
-    context: str | None = None
-    extensions: dict[str, Any] = field(default_factory=dict)
-
-    # --- Convenience accessors ---
+    data: dict[str, Any]
 
     @property
     def transcript_path(self) -> Path | None:
         p = self.data.get("transcript_path")
-        return Path(p) if p else None
+        if not p:
+            return None
+        from pathlib import Path
+
+        return Path(p)
+
+    @property
+    def epoch_ns(self) -> int | None:
+        """``time`` as Unix epoch nanoseconds, or None if it cannot be parsed.
+
+        Parsed on first access and cached on the event. A time without an
+        offset is taken as UTC.
+        """
+        try:
+            return self._epoch_ns  # type: ignore[attr-defined,no-any-return]
+        except AttributeError:
+            from .timestamps import parse_time
+
+            ns = parse_time(self.time)
+            # OpenHookEvent is frozen; the cache is not a dataclass field.
+            object.__setattr__(self, "_epoch_ns", ns)
+            return ns
 
     @property
     def is_trace(self) -> bool:
@@ -51,11 +131,24 @@ class OpenHookEvent:
             EventType.SESSION_END,
         )
 
+
+@dataclass(frozen=True)
+class OpenHookEvent(_EventAccessors):
+    openhook: str
+    id: str
+    source: str
+    type: EventType
+    time: str
+    session_id: str
+    data: dict[str, Any] = field(default_factory=dict)
+    context: str | None = None
+    extensions: dict[str, Any] = field(default_factory=dict)
+
     # --- Constructors ---
 
     @classmethod
-    def from_dict(cls, d: dict[str, Any]) -> OpenHookEvent:
-        validate(d)
+    def from_dict(cls, d: dict[str, Any], *, strict: bool = False) -> OpenHookEvent:
+        validate(d, strict=strict)
         return cls(
             openhook=d["openhook"],
             id=d["id"],
@@ -69,8 +162,13 @@ class OpenHookEvent:
         )
 
     @classmethod
-    def from_json(cls, raw: str) -> OpenHookEvent:
-        return cls.from_dict(json.loads(raw))
+    def from_json(cls, raw: str | bytes, *, strict: bool = False) -> OpenHookEvent:
+        return cls.from_dict(codec.loads(raw), strict=strict)
+
+    @classmethod
+    def from_json_bytes(cls, raw: bytes, *, strict: bool = False) -> OpenHookEvent:
+        """Parse UTF-8 JSON bytes without decoding them to ``str`` first."""
+        return cls.from_dict(codec.loads(raw), strict=strict)
 
     @classmethod
     def create(
@@ -85,12 +183,20 @@ class OpenHookEvent:
         event_id: str | None = None,
         time: str | None = None,
     ) -> OpenHookEvent:
+        if not event_id:
+            from . import ids
+
+            event_id = ids.new_id()
+        if not time:
+            from datetime import datetime, timezone
+
+            time = datetime.now(timezone.utc).isoformat()
         return cls(
             openhook="0.1",
-            id=event_id or str(uuid.uuid4()),
+            id=event_id,
             source=source,
             type=type,
-            time=time or datetime.now(timezone.utc).isoformat(),
+            time=time,
             session_id=session_id,
             data=data or {},
             context=context,
@@ -113,20 +219,168 @@ class OpenHookEvent:
         if self.context:
             d["context"] = self.context
         if self.extensions:
-            d["extensions"] = self.extensions
+            extensions = self.extensions
+            if any(type(v) is RawJSON for v in extensions.values()):
+                extensions = {k: v.value() if type(v) is RawJSON else v for k, v in extensions.items()}
+            d["extensions"] = extensions
         return d
 
     def to_json(self) -> str:
-        return json.dumps(self.to_dict())
+        # Same output as json.dumps(self.to_dict()), assembled directly so no
+        # intermediate dict is built for the envelope.
+        try:
+            parts = [
+                '{"openhook": ', _encode_str(self.openhook),
+                ', "id": ', _encode_str(self.id),
+                ', "source": ', _encode_str(self.source),
+                ', "type": ', _encode_str(self.type),
+                ', "time": ', _encode_str(self.time),
+                ', "session_id": ', _encode_str(self.session_id),
+            ]
+        except TypeError:
+            # A non-string envelope field; let the encoder handle it.
+            return json.dumps(self.to_dict())
+        if self.data:
+            parts.append(', "data": ')
+            parts.append(json.dumps(self.data))
+        if self.context:
+            parts.append(', "context": ')
+            parts.append(json.dumps(self.context))
+        if self.extensions:
+            parts.append(', "extensions": ')
+            parts.append(_encode_extensions(self.extensions))
+        parts.append("}")
+        return "".join(parts)
+
+    def to_json_bytes(self) -> bytes:
+        # The stdlib encoder escapes non-ASCII, so this is usually a plain copy;
+        # only RawJSON extension values can carry UTF-8 through.
+        return self.to_json().encode()
+
+    def emit(self, file: Any = None) -> None:
+        _write_line(self, file)
+
+
+class LazyEvent(_EventAccessors):
+    """A slotted, read-only event that defers decoding ``data``/``extensions``.
+
+    Only the envelope fields are kept as attributes; the raw JSON line is
+    retained and ``data``/``extensions`` are decoded from it on first access.
+    Routers that look at ``type``/``source``/``session_id`` and forward the
+    event never hold the decoded payload, and ``to_json()`` returns the
+    original text without re-encoding it.
+    """
+
+    __slots__ = (
+        "openhook", "id", "source", "type", "time", "session_id", "context",
+        "_raw", "_data", "_extensions", "_epoch_ns",
+    )
+
+    openhook: str
+    id: str
+    source: str
+    type: EventType
+    time: str
+    session_id: str
+    context: str | None
+
+    def __init__(self, d: dict[str, Any], raw: str | bytes) -> None:
+        self.openhook = d["openhook"]
+        self.id = d["id"]
+        self.source = d["source"]
+        self.type = EventType(d["type"])
+        self.time = d["time"]
+        self.session_id = d["session_id"]
+        self.context = d.get("context")
+        self._raw = raw
+        self._data: dict[str, Any] | None = None
+        self._extensions: dict[str, Any] | None = None
+
+    @classmethod
+    def from_json(cls, raw: str | bytes, *, strict: bool = False) -> LazyEvent:
+        d = codec.loads(raw)
+        validate(d, strict=strict)
+        return cls(d, raw)
+
+    def _decode(self) -> None:
+        d = codec.loads(self._raw)
+        self._data = d.get("data", {})
+        self._extensions = d.get("extensions", {})
+
+    @property
+    def data(self) -> dict[str, Any]:
+        if self._data is None:
+            self._decode()
+        return self._data  # type: ignore[return-value]
+
+    @property
+    def extensions(self) -> dict[str, Any]:
+        if self._extensions is None:
+            self._decode()
+        return self._extensions  # type: ignore[return-value]
+
+    def materialize(self) -> OpenHookEvent:
+        """Return the equivalent fully decoded OpenHookEvent."""
+        return OpenHookEvent(
+            openhook=self.openhook,
+            id=self.id,
+            source=self.source,
+            type=self.type,
+            time=self.time,
+            session_id=self.session_id,
+            data=self.data,
+            context=self.context,
+            extensions=self.extensions,
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return self.materialize().to_dict()
+
+    def to_json(self) -> str:
+        """Return the original JSON text of the event."""
+        raw = self._raw
+        return (raw.decode() if isinstance(raw, bytes) else raw).strip()
+
+    def to_json_bytes(self) -> bytes:
+        raw = self._raw
+        return (raw.encode() if isinstance(raw, str) else raw).strip()
 
     def emit(self, file: Any = None) -> None:
-        out = file or sys.stdout
-        out.write(self.to_json())
-        out.write("\n")
+        _write_line(self, file)
+
+    def __repr__(self) -> str:
+        return (
+            f"LazyEvent(id={self.id!r}, source={self.source!r}, type={self.type!r}, "
+            f"session_id={self.session_id!r})"
+        )
+
+
+def _write_line(event: OpenHookEvent | LazyEvent, file: Any) -> int:
+    """Write ``event`` as one NDJSON line; returns the line's length."""
+    out = file or sys.stdout
+    buffer = getattr(out, "buffer", None)
+    if buffer is not None:
+        # Binary stream underneath (e.g. sys.stdout): flush any pending text
+        # first so ordering is kept, then write the bytes in one call.
+        data = event.to_json_bytes() + b"\n"
         out.flush()
+        buffer.write(data)
+        buffer.flush()
+        return len(data)
+    line = event.to_json() + "\n"
+    out.write(line)
+    out.flush()
+    return len(line)
+
 
+def validate(d: dict[str, Any], *, strict: bool = False) -> None:
+    """Check that ``d`` is an OpenHook envelope.
 
-def validate(d: dict[str, Any]) -> None:
+    By default only the required fields, the ``openhook`` type and the event
+    type are checked. With ``strict=True`` the envelope and its ``data`` are
+    also checked against the full JSON Schemas in spec/schemas (field patterns,
+    unknown top-level fields, per-type data fields).
+    """
     missing = REQUIRED_FIELDS - d.keys()
     if missing:
         raise ValidationError(f"Missing required fields: {', '.join(sorted(missing))}")
@@ -140,9 +394,201 @@ def validate(d: dict[str, Any]) -> None:
     except ValueError:
         raise ValidationError(f"Unknown event type: {type_val!r}") from None
 
+    if strict:
+        from .schema import strict_error
+
+        msg = strict_error(d)
+        if msg is not None:
+            raise ValidationError(msg)
+
 
 def parse_stdin() -> OpenHookEvent:
-    raw = sys.stdin.read()
+    # A hook process parses exactly one event, so read raw bytes and use the
+    # already-loaded stdlib decoder instead of importing a faster backend.
+    stdin = sys.stdin
+    return _parse_stdin_bytes(getattr(stdin, "buffer", stdin).read())
+
+
+def _parse_stdin_bytes(raw: str | bytes) -> OpenHookEvent:
     if not raw.strip():
         raise ValidationError("Empty stdin")
-    return OpenHookEvent.from_json(raw)
+    return OpenHookEvent.from_dict(json.loads(raw))
+
+
+def _iter_chunks(stream: Any, chunk_size: int) -> Iterator[str | bytes]:
+    read = getattr(stream, "read", None)
+    if read is None:
+        yield from stream
+        return
+    while True:
+        chunk = read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+class _LineSplitter:
+    """Split a stream's chunks into lines.
+
+    The parts of a line spanning several chunks are kept in a list and joined
+    once, when its newline arrives, so a line much longer than a chunk costs
+    linear time rather than a re-copy and re-scan per chunk.
+    """
+
+    __slots__ = ("_pending",)
+
+    def __init__(self) -> None:
+        self._pending: list[Any] = []
+
+    def feed(self, chunk: str | bytes) -> list[Any]:
+        """Return the lines completed by ``chunk``, without their newlines."""
+        sep = b"\n" if isinstance(chunk, bytes) else "\n"
+        if sep not in chunk:
+            if chunk:
+                self._pending.append(chunk)
+            return []
+        lines = chunk.split(sep)
+        if self._pending:
+            self._pending.append(lines[0])
+            lines[0] = chunk[:0].join(self._pending)
+            self._pending = []
+        tail = lines.pop()
+        if tail:
+            self._pending.append(tail)
+        return lines
+
+    def finish(self) -> str | bytes | None:
+        """Return the last line if the stream did not end with a newline."""
+        if not self._pending:
+            return None
+        line = self._pending[0][:0].join(self._pending)
+        self._pending = []
+        return line  # type: ignore[no-any-return]
+
+
+def _iter_lines(stream: Any, chunk_size: int) -> Iterator[str | bytes]:
+    splitter = _LineSplitter()
+    for chunk in _iter_chunks(stream, chunk_size):
+        yield from splitter.feed(chunk)
+    tail = splitter.finish()
+    if tail is not None:
+        yield tail
+
+
+def _parse_line(line: str | bytes, strict: bool, lazy: bool) -> OpenHookEvent | LazyEvent:
+    payload = codec.loads(line)
+    if not isinstance(payload, dict):
+        raise ValidationError("Event must be a JSON object")
+    if lazy:
+        validate(payload, strict=strict)
+        return LazyEvent(payload, line)
+    return OpenHookEvent.from_dict(payload, strict=strict)
+
+
+def iter_events(
+    stream: Any = None,
+    *,
+    on_error: str = "raise",
+    errors: list[LineError] | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    strict: bool = False,
+    lazy: bool = False,
+    since: int | str | None = None,
+    until: int | str | None = None,
+) -> Iterator[OpenHookEvent | LazyEvent]:
+    """Yield events from an NDJSON stream, one envelope per line.
+
+    ``stream`` is a text or binary file object, or any iterable of ``str`` /
+    ``bytes`` chunks (chunks need not be line-aligned). Defaults to
+    ``sys.stdin.buffer``. Input is read ``chunk_size`` at a time, so memory
+    stays bounded by the chunk size plus the longest line. Blank lines are
+    ignored.
+
+    ``on_error`` decides what happens to a malformed line: ``"raise"`` raises
+    :class:`LineError`, ``"skip"`` drops it, and ``"collect"`` drops it and
+    appends the :class:`LineError` to ``errors``. ``strict`` is passed through
+    to :func:`validate`; ``lazy=True`` yields :class:`LazyEvent` instead of
+    :class:`OpenHookEvent`.
+
+    ``since`` / ``until`` keep only events with ``since <= time < until``
+    (epoch nanoseconds or timestamp strings). The time is read from the raw
+    line, so events outside the range are skipped without being decoded.
+    Events whose time cannot be parsed are dropped.
+    """
+    window = _time_range(since, until)
+    return _iter_parsed(stream, on_error, errors, chunk_size, window, _parse_line, strict, lazy)
+
+
+def _time_range(since: int | str | None, until: int | str | None) -> Any:
+    if since is None and until is None:
+        return None
+    from .timestamps import TimeRange
+
+    return TimeRange(since, until)
+
+
+def _parse_payload(line: str | bytes, strict: bool) -> dict[str, Any]:
+    """Decode and validate one envelope line, without building an event."""
+    payload = codec.loads(line)
+    if not isinstance(payload, dict):
+        raise ValidationError("Event must be a JSON object")
+    validate(payload, strict=strict)
+    return payload
+
+
+def _iter_parsed(
+    stream: Any,
+    on_error: str,
+    errors: list[LineError] | None,
+    chunk_size: int,
+    window: TimeRange | None,
+    parse: Callable[..., T],
+    *args: Any,
+) -> Iterator[T]:
+    """The line loop behind :func:`iter_events`: ``parse(line, *args)`` per non-blank line.
+
+    Lines that ``window`` skips are dropped before they are parsed.
+    """
+    _check_on_error(on_error, errors)
+    if stream is None:
+        stream = sys.stdin.buffer
+    return _parse_lines(_iter_lines(stream, chunk_size), 0, on_error, errors, window, parse, args)
+
+
+def _check_on_error(on_error: str, errors: list[LineError] | None) -> None:
+    if on_error not in ("raise", "skip", "collect"):
+        raise ValueError(f"Unknown on_error policy: {on_error!r}")
+    if on_error == "collect" and errors is None:
+        raise ValueError("on_error='collect' requires an errors list")
+
+
+def _parse_lines(
+    lines: Iterable[str | bytes],
+    lineno: int,
+    on_error: str,
+    errors: list[LineError] | None,
+    window: TimeRange | None,
+    parse: Callable[..., T],
+    args: tuple[Any, ...],
+) -> Iterator[T]:
+    """Parse ``lines``, numbering them from ``lineno + 1``.
+
+    Shared by the sync and asyncio readers, which differ only in how they
+    read the stream.
+    """
+    skips = window.skips if window is not None else None
+    for lineno, line in enumerate(lines, lineno + 1):
+        if not line.strip():
+            continue
+        if skips is not None and skips(line):
+            continue
+        try:
+            item = parse(line, *args)
+        except (ValueError, ValidationError) as exc:
+            err = LineError(lineno, line, exc)
+            if on_error == "raise":
+                raise err from exc
+            if on_error == "collect":
+                errors.append(err)  # type: ignore[union-attr]
+            continue
+        yield item
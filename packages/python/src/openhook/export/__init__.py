@@ -0,0 +1 @@
+"""Exporters that ship OpenHook events to external telemetry backends."""
@@ -0,0 +1,586 @@
+"""Batched OTLP/HTTP exporter for OpenHook events.
+
+Maps events to OpenTelemetry spans and metrics and posts them to a collector's
+OTLP/HTTP endpoint (``/v1/traces`` and ``/v1/metrics``) using the OTLP JSON
+encoding, so no protobuf dependency is needed:
+
+- ``tool.start`` / ``tool.end`` pairs (see :mod:`openhook.spans`) become
+  ``tool <name>`` spans. A ``tool.end`` whose ``tool.start`` never arrives
+  still becomes a span if it reports ``duration_ms``.
+- ``session.end`` becomes a ``session`` span ending at the event time and
+  lasting ``data.duration_ms``. All spans of a session share one trace id
+  derived from ``session_id``, with tool spans parented to the session span.
+- ``session.end`` token counts and durations and tool durations become
+  delta metrics, aggregated per attribute set within each batch.
+
+Events are batched until ``max_batch_size`` events or ``max_age`` seconds
+have accumulated, then gzipped and posted over one keep-alive connection. The
+size is checked as events arrive; the age is also watched by a background
+thread, so an idle consumer's partial batch is still sent on time. Requests
+that fail with a connection error or a retryable status (429, 502, 503, 504)
+are retried with exponential backoff, honouring ``Retry-After``, for at most
+``max_retry_time`` seconds. Export never raises: batches that still fail are
+dropped and counted in :attr:`OTLPExporter.counters`.
+
+Batching pays off in a long-running consumer, such as a ``persistent`` hook::
+
+    with OTLPExporter("http://localhost:4318") as exporter:
+        for event in iter_events():
+            exporter.add(event)
+"""
+
+from __future__ import annotations
+
+import gzip
+import http.client
+import json
+import random
+import threading
+import time as _time
+from hashlib import blake2b
+from typing import Any, Callable
+from urllib.parse import urlsplit
+
+from ..envelope import OpenHookEvent
+from ..events import EventType
+from ..spans import ToolSpan, ToolSpanCorrelator
+
+DEFAULT_ENDPOINT = "http://localhost:4318"
+
+# Statuses the OTLP/HTTP spec marks as retryable.
+_RETRYABLE = frozenset({429, 502, 503, 504})
+
+# Explicit histogram bounds, in milliseconds.
+DURATION_BOUNDS_MS = (
+    10.0, 50.0, 100.0, 250.0, 500.0, 1_000.0, 2_500.0, 5_000.0, 10_000.0,
+    30_000.0, 60_000.0, 300_000.0, 900_000.0, 3_600_000.0,
+)
+
+_SPAN_KIND_INTERNAL = 1
+_STATUS_UNSET, _STATUS_OK, _STATUS_ERROR = 0, 1, 2
+_AGGREGATION_TEMPORALITY_DELTA = 1
+
+_SCOPE = {"name": "openhook", "version": "0.1.0"}
+
+
+def _trace_id(session_id: str) -> str:
+    return blake2b(session_id.encode(), digest_size=16).hexdigest()
+
+
+def _span_id(session_id: str, tool_call_id: str | None = None) -> str:
+    key = session_id if tool_call_id is None else f"{session_id}\0{tool_call_id}"
+    return blake2b(key.encode(), digest_size=8, person=b"openhook").hexdigest()
+
+
+def _attribute(key: str, value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        # int64 values are strings in the OTLP JSON encoding.
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def _attributes(items: dict[str, Any]) -> list[dict[str, Any]]:
+    return [_attribute(k, v) for k, v in items.items() if v is not None]
+
+
+def _int(value: Any) -> int | None:
+    return value if isinstance(value, int) and not isinstance(value, bool) else None
+
+
+class _Sum:
+    __slots__ = ("start", "end", "value")
+
+    def __init__(self, time_ns: int) -> None:
+        self.start = self.end = time_ns
+        self.value = 0
+
+    def record(self, value: int, time_ns: int) -> None:
+        self.value += value
+        self.start = min(self.start, time_ns)
+        self.end = max(self.end, time_ns)
+
+    def point(self, attributes: list[dict[str, Any]]) -> dict[str, Any]:
+        return {
+            "attributes": attributes,
+            "startTimeUnixNano": str(self.start),
+            "timeUnixNano": str(self.end),
+            "asInt": str(self.value),
+        }
+
+
+class _Histogram:
+    __slots__ = ("start", "end", "count", "sum", "min", "max", "buckets")
+
+    def __init__(self, time_ns: int) -> None:
+        self.start = self.end = time_ns
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+        self.buckets = [0] * (len(DURATION_BOUNDS_MS) + 1)
+
+    def record(self, value: float, time_ns: int) -> None:
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        # Buckets are upper-inclusive: (bounds[i-1], bounds[i]].
+        i = 0
+        while i < len(DURATION_BOUNDS_MS) and value > DURATION_BOUNDS_MS[i]:
+            i += 1
+        self.buckets[i] += 1
+        self.start = min(self.start, time_ns)
+        self.end = max(self.end, time_ns)
+
+    def point(self, attributes: list[dict[str, Any]]) -> dict[str, Any]:
+        return {
+            "attributes": attributes,
+            "startTimeUnixNano": str(self.start),
+            "timeUnixNano": str(self.end),
+            "count": str(self.count),
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "bucketCounts": [str(n) for n in self.buckets],
+            "explicitBounds": list(DURATION_BOUNDS_MS),
+        }
+
+
+# name -> (kind, unit, description)
+_METRICS = {
+    "openhook.session.tokens": ("sum", "{token}", "Tokens consumed per session."),
+    "openhook.session.duration": ("histogram", "ms", "Session duration."),
+    "openhook.tool.duration": ("histogram", "ms", "Tool execution duration."),
+}
+
+
+class _Transport:
+    """One keep-alive HTTP(S) connection, reopened after errors."""
+
+    def __init__(self, endpoint: str, timeout: float) -> None:
+        url = urlsplit(endpoint)
+        if url.scheme not in ("http", "https") or not url.hostname:
+            raise ValueError(f"OTLP endpoint must be an http(s) URL: {endpoint!r}")
+        self._https = url.scheme == "https"
+        self._host = url.hostname
+        self._port = url.port
+        self.base_path = url.path.rstrip("/")
+        self._timeout = timeout
+        self._conn: http.client.HTTPConnection | None = None
+
+    def post(self, path: str, body: bytes, headers: dict[str, str]) -> tuple[int, str | None]:
+        """Send one request; returns the status and any ``Retry-After`` header."""
+        if self._conn is not None:
+            try:
+                return self._request(self._conn, path, body, headers)
+            except (ConnectionError, http.client.RemoteDisconnected):
+                # The server dropped the idle keep-alive connection; reconnect
+                # once without counting it as a failed attempt.
+                pass
+        cls = http.client.HTTPSConnection if self._https else http.client.HTTPConnection
+        self._conn = cls(self._host, self._port, timeout=self._timeout)
+        return self._request(self._conn, path, body, headers)
+
+    def _request(
+        self, conn: http.client.HTTPConnection, path: str, body: bytes, headers: dict[str, str]
+    ) -> tuple[int, str | None]:
+        try:
+            conn.request("POST", self.base_path + path, body, headers)
+            response = conn.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            self.close()
+            raise
+        if response.will_close:
+            self.close()
+        return response.status, response.getheader("Retry-After")
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class OTLPExporter:
+    """Batch OpenHook events into OTLP/HTTP JSON export requests.
+
+    ``headers`` are added to every request (e.g. an auth token) and
+    ``resource`` becomes the resource attributes (``service.name`` defaults
+    to ``"openhook"``). ``compresslevel`` is the gzip level; ``0`` disables
+    compression. A failing request is retried up to ``max_retries`` times,
+    waiting ``backoff * 2**attempt`` seconds (with jitter, capped at
+    ``max_backoff``) between attempts, and is given up once another wait
+    would take the batch past ``max_retry_time`` seconds, so :meth:`add` never
+    blocks the caller for longer than that plus the request timeouts.
+    ``correlator`` options are passed to the
+    :class:`~openhook.spans.ToolSpanCorrelator` that pairs tool events.
+
+    With ``flush_thread`` (the default), a daemon thread started with the
+    first batch exports it once it is ``max_age`` old even if no further
+    event arrives. Without it, call :meth:`poll` periodically (e.g. on a
+    read timeout). The exporter may be used from several threads.
+    """
+
+    def __init__(
+        self,
+        endpoint: str = DEFAULT_ENDPOINT,
+        *,
+        headers: dict[str, str] | None = None,
+        resource: dict[str, Any] | None = None,
+        max_batch_size: int = 512,
+        max_age: float = 5.0,
+        compresslevel: int = 1,
+        timeout: float = 10.0,
+        max_retries: int = 5,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        max_retry_time: float = 60.0,
+        flush_thread: bool = True,
+        correlator: dict[str, Any] | None = None,
+        clock: Callable[[], float] = _time.monotonic,
+        sleep: Callable[[float], None] = _time.sleep,
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self._transport = _Transport(endpoint, timeout)
+        self._headers = {"Content-Type": "application/json", **(headers or {})}
+        if compresslevel:
+            self._headers["Content-Encoding"] = "gzip"
+        self._resource = {
+            "attributes": _attributes({"service.name": "openhook", **(resource or {})}),
+        }
+        self.max_batch_size = max_batch_size
+        self.max_age = max_age
+        self.compresslevel = compresslevel
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retry_time = max_retry_time
+        self._flush_thread = flush_thread
+        self._clock = clock
+        self._sleep = sleep
+        self._correlator = ToolSpanCorrelator(on_evict=self._on_orphan, **(correlator or {}))
+
+        self._spans: list[dict[str, Any]] = []
+        self._metrics: dict[tuple[str, tuple[tuple[str, Any], ...]], _Sum | _Histogram] = {}
+        self._pending = 0
+        self._batch_started: float | None = None
+        # Guards the batch; _send_lock is taken while still holding it, so
+        # batches are sent in the order they were cut.
+        self._cond = threading.Condition()
+        self._send_lock = threading.Lock()
+        self._timer: threading.Thread | None = None
+        self._closed = False
+        self.counters = {
+            "events": 0,
+            "spans": 0,
+            "points": 0,
+            "requests": 0,
+            "retries": 0,
+            "failed_requests": 0,
+            "dropped_spans": 0,
+            "dropped_points": 0,
+        }
+
+    def __len__(self) -> int:
+        """Number of events in the current (unsent) batch."""
+        return self._pending
+
+    # --- Mapping ---
+
+    def add(self, event: OpenHookEvent) -> None:
+        """Add an event to the batch, exporting the batch if it is full or old."""
+        with self._cond:
+            self.counters["events"] += 1
+            span = self._correlator.add(event)
+            if span is not None:
+                self._add_tool_span(span)
+            elif event.type == EventType.SESSION_END:
+                self._add_session(event)
+            if self._pending < self.max_batch_size and not self._expired():
+                return
+            batch = self._take()
+        self._export(*batch)
+
+    def _batched(self) -> None:
+        """Count one more event in the batch, starting its age clock if new."""
+        self._pending += 1
+        if self._batch_started is None:
+            self._batch_started = self._clock()
+            if self._flush_thread and self._timer is None:
+                self._timer = threading.Thread(target=self._watch_age, name="openhook-otlp", daemon=True)
+                self._timer.start()
+            self._cond.notify()
+
+    def _expired(self) -> bool:
+        return self._batch_started is not None and self._clock() - self._batch_started >= self.max_age
+
+    def _watch_age(self) -> None:
+        while True:
+            with self._cond:
+                while not self._closed:
+                    if self._batch_started is None:
+                        self._cond.wait()
+                        continue
+                    remaining = self.max_age - (self._clock() - self._batch_started)
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._closed:
+                    return
+            self.poll()
+
+    def _record(self, name: str, attributes: dict[str, Any], value: float, time_ns: int) -> None:
+        key = (name, tuple((k, v) for k, v in attributes.items() if v is not None))
+        metric = self._metrics.get(key)
+        if metric is None:
+            kind = _METRICS[name][0]
+            metric = self._metrics[key] = (_Sum if kind == "sum" else _Histogram)(time_ns)
+        metric.record(value, time_ns)  # type: ignore[arg-type]
+
+    def _add_tool_span(self, span: ToolSpan) -> None:
+        start_ns = span.start.epoch_ns
+        end_ns = span.end.epoch_ns
+        if start_ns is None or end_ns is None:
+            return
+        duration = span.reported_duration_ms
+        if duration is None:
+            duration = span.duration_ms
+        self._append_tool_span(span.end, span.tool_call_id, span.tool_name, start_ns, end_ns, duration)
+
+    def _on_orphan(self, event: OpenHookEvent, reason: str) -> None:
+        # A tool.end that reports its own duration is a complete span on its own.
+        duration = _int(event.data.get("duration_ms"))
+        if event.type != EventType.TOOL_END or duration is None:
+            return
+        end_ns = event.epoch_ns
+        if end_ns is None:
+            return
+        self._append_tool_span(
+            event, event.data["tool_call_id"], event.data.get("tool_name"),
+            end_ns - duration * 1_000_000, end_ns, duration,
+        )
+
+    def _append_tool_span(
+        self,
+        end: OpenHookEvent,
+        tool_call_id: str,
+        tool_name: str | None,
+        start_ns: int,
+        end_ns: int,
+        duration_ms: float | None,
+    ) -> None:
+        status = end.data.get("status")
+        self._batched()
+        self._spans.append({
+            "traceId": _trace_id(end.session_id),
+            "spanId": _span_id(end.session_id, tool_call_id),
+            "parentSpanId": _span_id(end.session_id),
+            "name": f"tool {tool_name}" if tool_name else "tool",
+            "kind": _SPAN_KIND_INTERNAL,
+            "startTimeUnixNano": str(start_ns),
+            "endTimeUnixNano": str(end_ns),
+            "attributes": _attributes({
+                "openhook.source": end.source,
+                "openhook.session_id": end.session_id,
+                "openhook.context": end.context,
+                "openhook.tool.name": tool_name,
+                "openhook.tool.call_id": tool_call_id,
+                "openhook.tool.status": status,
+            }),
+            "status": {
+                "code": _STATUS_ERROR if status == "error"
+                else _STATUS_OK if status == "success" else _STATUS_UNSET,
+            },
+        })
+        if duration_ms is not None:
+            self._record(
+                "openhook.tool.duration",
+                {"openhook.source": end.source, "openhook.tool.name": tool_name, "openhook.tool.status": status},
+                duration_ms,
+                end_ns,
+            )
+
+    def _add_session(self, event: OpenHookEvent) -> None:
+        end_ns = event.epoch_ns
+        if end_ns is None:
+            return
+        data = event.data
+        duration = _int(data.get("duration_ms"))
+        input_tokens = _int(data.get("input_tokens"))
+        output_tokens = _int(data.get("output_tokens"))
+        model = data.get("model")
+        reason = data.get("reason")
+        self._batched()
+        self._spans.append({
+            "traceId": _trace_id(event.session_id),
+            "spanId": _span_id(event.session_id),
+            "name": "session",
+            "kind": _SPAN_KIND_INTERNAL,
+            "startTimeUnixNano": str(end_ns - (duration or 0) * 1_000_000),
+            "endTimeUnixNano": str(end_ns),
+            "attributes": _attributes({
+                "openhook.source": event.source,
+                "openhook.session_id": event.session_id,
+                "openhook.context": event.context,
+                "openhook.model": model,
+                "openhook.session.reason": reason,
+                "openhook.session.input_tokens": input_tokens,
+                "openhook.session.output_tokens": output_tokens,
+            }),
+            "status": {"code": _STATUS_ERROR if reason == "error" else _STATUS_UNSET},
+        })
+        labels = {"openhook.source": event.source, "openhook.model": model}
+        if duration is not None:
+            self._record("openhook.session.duration", labels, duration, end_ns)
+        if input_tokens is not None:
+            self._record("openhook.session.tokens", {**labels, "openhook.token.type": "input"}, input_tokens, end_ns)
+        if output_tokens is not None:
+            self._record("openhook.session.tokens", {**labels, "openhook.token.type": "output"}, output_tokens, end_ns)
+
+    # --- Encoding ---
+
+    def _traces_request(self, spans: list[dict[str, Any]]) -> dict[str, Any]:
+        return {"resourceSpans": [{
+            "resource": self._resource,
+            "scopeSpans": [{"scope": _SCOPE, "spans": spans}],
+        }]}
+
+    def _metrics_request(
+        self, metrics: dict[tuple[str, tuple[tuple[str, Any], ...]], _Sum | _Histogram]
+    ) -> dict[str, Any]:
+        by_name: dict[str, list[dict[str, Any]]] = {}
+        for (name, attrs), metric in metrics.items():
+            by_name.setdefault(name, []).append(metric.point(_attributes(dict(attrs))))
+        encoded = []
+        for name, points in by_name.items():
+            kind, unit, description = _METRICS[name]
+            metric: dict[str, Any] = {"name": name, "unit": unit, "description": description}
+            if kind == "sum":
+                metric["sum"] = {
+                    "dataPoints": points,
+                    "aggregationTemporality": _AGGREGATION_TEMPORALITY_DELTA,
+                    "isMonotonic": True,
+                }
+            else:
+                metric["histogram"] = {
+                    "dataPoints": points,
+                    "aggregationTemporality": _AGGREGATION_TEMPORALITY_DELTA,
+                }
+            encoded.append(metric)
+        return {"resourceMetrics": [{
+            "resource": self._resource,
+            "scopeMetrics": [{"scope": _SCOPE, "metrics": encoded}],
+        }]}
+
+    def _encode(self, request: dict[str, Any]) -> bytes:
+        body = json.dumps(request, separators=(",", ":")).encode()
+        if self.compresslevel:
+            body = gzip.compress(body, compresslevel=self.compresslevel, mtime=0)
+        return body
+
+    # --- Sending ---
+
+    def flush(self) -> bool:
+        """Export the current batch; returns False if any request was dropped."""
+        with self._cond:
+            batch = self._take()
+        return self._export(*batch)
+
+    def poll(self) -> bool:
+        """Export the current batch if it is ``max_age`` old; returns False if a request was dropped."""
+        with self._cond:
+            if not self._expired():
+                return True
+            batch = self._take()
+        return self._export(*batch)
+
+    def _take(self) -> tuple[list[dict[str, Any]], dict[Any, _Sum | _Histogram]]:
+        """Cut the current batch; called holding _cond, returns holding _send_lock."""
+        self._send_lock.acquire()
+        spans, metrics = self._spans, self._metrics
+        self._spans, self._metrics = [], {}
+        self._pending = 0
+        self._batch_started = None
+        return spans, metrics
+
+    def _export(self, spans: list[dict[str, Any]], metrics: dict[Any, _Sum | _Histogram]) -> bool:
+        try:
+            return self._post_batch(spans, metrics)
+        finally:
+            self._send_lock.release()
+
+    def _post_batch(self, spans: list[dict[str, Any]], metrics: dict[Any, _Sum | _Histogram]) -> bool:
+        ok = True
+        # One retry budget for the whole batch, so a flush blocks for at most that.
+        deadline = self._clock() + self.max_retry_time
+        if spans:
+            if self._send("/v1/traces", self._encode(self._traces_request(spans)), deadline):
+                self.counters["spans"] += len(spans)
+            else:
+                self.counters["dropped_spans"] += len(spans)
+                ok = False
+        if metrics:
+            if self._send("/v1/metrics", self._encode(self._metrics_request(metrics)), deadline):
+                self.counters["points"] += len(metrics)
+            else:
+                self.counters["dropped_points"] += len(metrics)
+                ok = False
+        return ok
+
+    def _send(self, path: str, body: bytes, deadline: float) -> bool:
+        for attempt in range(self.max_retries + 1):
+            self.counters["requests"] += 1
+            retry_after: str | None = None
+            try:
+                status, retry_after = self._transport.post(path, body, self._headers)
+            except (OSError, http.client.HTTPException):
+                status = None
+            if status is not None and 200 <= status < 300:
+                return True
+            if status is not None and status not in _RETRYABLE:
+                break
+            if attempt == self.max_retries:
+                break
+            delay = self._delay(attempt, retry_after)
+            if self._clock() + delay > deadline:
+                break
+            self.counters["retries"] += 1
+            self._sleep(delay)
+        self.counters["failed_requests"] += 1
+        return False
+
+    def _delay(self, attempt: int, retry_after: str | None) -> float:
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), self.max_backoff)
+            except ValueError:
+                pass
+        delay = min(self.backoff * 2**attempt, self.max_backoff)
+        return delay * (0.5 + random.random() / 2)
+
+    def close(self) -> None:
+        """Stop the age thread, flush the pending batch and close the connection.
+
+        Tool halves still waiting for their other half are released first,
+        so a ``tool.end`` that reports its own ``duration_ms`` is exported.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            self._correlator.flush()
+        if self._timer is not None:
+            self._timer.join()
+            self._timer = None
+        self.flush()
+        self._transport.close()
+
+    def __enter__(self) -> OTLPExporter:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
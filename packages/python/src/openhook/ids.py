@@ -0,0 +1,201 @@
+"""Event id generation: UUID v4 (the default) or time-ordered UUID v7.
+
+:func:`new_id` is what ``OpenHookEvent.create()`` and ``from_legacy()`` call
+when no id is given. Both generators draw entropy from ``os.urandom`` in
+batches rather than once per id, and refill after ``fork()`` so a child never
+repeats its parent's ids.
+
+The spec says an event id SHOULD be a UUID v4, and that stays the default.
+UUID v7 (RFC 9562) puts a millisecond Unix timestamp in the leading bits, so
+ids sort by creation time and index well. Within a process they are strictly
+increasing: ids created in the same millisecond carry a 12-bit counter, and
+when it runs out the timestamp is advanced by a millisecond. To opt in, call
+``set_id_generator("uuid7")`` or set ``OPENHOOK_ID_GENERATOR=uuid7``.
+
+:func:`uuid7_time_ms` reads the timestamp back. :func:`uuid7_bounds` turns a
+time range into an id range, so a store keyed by id can range-scan it::
+
+    lo, hi = uuid7_bounds(since="2026-02-23T00:00:00Z", until="2026-02-24T00:00:00Z")
+    rows = store.scan(lo, hi)  # lo <= id < hi
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time as _time
+import weakref
+from abc import ABC, abstractmethod
+from array import array
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Callable
+
+GENERATORS = ("uuid4", "uuid7")
+
+DEFAULT_BATCH_SIZE = 256
+
+_MASK_62 = (1 << 62) - 1
+
+_generators: weakref.WeakSet[_BatchedEntropy] = weakref.WeakSet()
+
+
+# Hex digit -> the same digit with the RFC 9562 variant bits (0b10) set.
+_VARIANT = {d: "89ab"[int(d, 16) & 3] for d in "0123456789abcdef"}
+
+
+def _format(value: int) -> str:
+    h = "%032x" % value
+    return "-".join((h[:8], h[8:12], h[12:16], h[16:20], h[20:]))
+
+
+class _BatchedEntropy(ABC):
+    """Base for generators that read ``os.urandom`` ``batch_size`` ids at a time."""
+
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.batch_size = batch_size
+        self._reset()
+        _generators.add(self)
+
+    @abstractmethod
+    def _reset(self) -> None:
+        """Drop buffered entropy and per-process state; also called in a forked child."""
+
+
+class UUID4Generator(_BatchedEntropy):
+    """Callable returning random UUID v4 strings.
+
+    Ids are formatted a batch at a time and handed out with ``list.pop``,
+    which is atomic, so no lock is needed.
+    """
+
+    def _reset(self) -> None:
+        self._ids: list[str] = []
+
+    def _refill(self) -> None:
+        h = os.urandom(16 * self.batch_size).hex()
+        variant = _VARIANT
+        self._ids.extend([
+            f"{h[p:p + 8]}-{h[p + 8:p + 12]}-4{h[p + 13:p + 16]}-{variant[h[p + 16]]}{h[p + 17:p + 20]}-{h[p + 20:p + 32]}"
+            for p in range(0, 32 * self.batch_size, 32)
+        ])
+
+    def __call__(self) -> str:
+        while True:
+            try:
+                return self._ids.pop()
+            except IndexError:
+                self._refill()
+
+
+class UUID7Generator(_BatchedEntropy):
+    """Callable returning UUID v7 strings that increase strictly within the generator.
+
+    ``clock`` returns the current time in Unix nanoseconds.
+    """
+
+    def __init__(
+        self, batch_size: int = DEFAULT_BATCH_SIZE, *, clock: Callable[[], int] = _time.time_ns
+    ) -> None:
+        super().__init__(batch_size)
+        self._clock = clock
+        self._last_ms = -1
+        self._counter = 0
+
+    def _reset(self) -> None:
+        self._lock = threading.Lock()
+        self._words: list[int] = []
+
+    def _random(self) -> int:
+        """A random 64-bit int; call with the lock held."""
+        words = self._words
+        if not words:
+            words.extend(array("Q", os.urandom(8 * self.batch_size)))
+        return words.pop()
+
+    def __call__(self) -> str:
+        with self._lock:
+            ms = self._clock() // 1_000_000
+            if ms > self._last_ms:
+                self._last_ms = ms
+                # Start the counter at a random point in its lower half,
+                # leaving room to count up within the millisecond.
+                self._counter = self._random() >> 53
+            else:
+                self._counter += 1
+                if self._counter > 0xFFF:
+                    self._last_ms += 1
+                    self._counter = 0
+            ms, counter = self._last_ms, self._counter
+            rand = self._random() & _MASK_62
+        return _format(ms << 80 | 0x7 << 76 | counter << 64 | 0b10 << 62 | rand)
+
+
+def _after_fork() -> None:
+    for generator in list(_generators):
+        generator._reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+def uuid7_time_ms(event_id: str) -> int:
+    """Return the Unix millisecond timestamp embedded in a UUID v7 string.
+
+    Raises ValueError if ``event_id`` is not a UUID v7.
+    """
+    h = event_id.replace("-", "")
+    if len(h) != 32 or h[12] != "7" or h[16] not in "89abAB":
+        raise ValueError(f"Not a UUID v7: {event_id!r}")
+    return int(h[:12], 16)
+
+
+def uuid7_bounds(since: int | str | None = None, until: int | str | None = None) -> tuple[str, str]:
+    """Return ``(lo, hi)`` such that UUID v7 ids created in ``[since, until)`` satisfy ``lo <= id < hi``.
+
+    Bounds are Unix epoch nanoseconds or timestamp strings and are rounded
+    outward to whole milliseconds, so the id range may also cover ids from
+    the rest of those milliseconds. The comparison is on the lowercase
+    strings, which order the same way as the ids' bytes.
+    """
+    from .timestamps import to_epoch_ns
+
+    lo = 0 if since is None else to_epoch_ns(since) // 1_000_000
+    hi = (1 << 48) - 1 if until is None else -(-to_epoch_ns(until) // 1_000_000)
+    return _format(lo << 80), _format(hi << 80)
+
+
+_generator: Callable[[], str] | None = None
+
+
+def new_id() -> str:
+    # Placeholder until the first call: the generator is chosen from
+    # OPENHOOK_ID_GENERATOR (default uuid4) and this name is rebound to it.
+    # References taken before then keep calling this, which delegates to the
+    # current generator.
+    generator = _generator
+    if generator is None:
+        set_id_generator(os.environ.get("OPENHOOK_ID_GENERATOR") or None)
+        generator = _generator
+    return generator()  # type: ignore[misc]
+
+
+def set_id_generator(generator: str | Callable[[], str] | None = None) -> None:
+    """Select what :func:`new_id` returns.
+
+    ``generator`` is ``"uuid4"`` (the default, also chosen by None),
+    ``"uuid7"``, or any callable returning an id string.
+    """
+    global new_id, _generator
+    if generator is None or generator == "uuid4":
+        new_id = _generator = UUID4Generator()
+    elif generator == "uuid7":
+        new_id = _generator = UUID7Generator()
+    elif callable(generator):
+        new_id = _generator = generator
+    else:
+        raise ValueError(f"Unknown id generator: {generator!r} (expected one of {', '.join(GENERATORS)})")
@@ -0,0 +1,357 @@
+"""Opt-in counters and timings for the SDK's hot paths.
+
+Instrumentation is off by default and then costs nothing: :func:`enable`
+swaps timed wrappers in for the functions below and :func:`disable` puts the
+originals back, the same way ``codec`` and ``ids`` rebind their functions.
+
+=================== =========================================================
+stage               instruments
+=================== =========================================================
+``parse``           each line parsed by ``iter_events()``,
+                    ``aiter_events()``, ``EventBatch.from_stream()`` and
+                    ``SpoolReader.replay()``, and ``parse_stdin()``
+                    (bytes: the line's length)
+``from_json``       ``OpenHookEvent.from_json`` / ``from_json_bytes``,
+                    ``LazyEvent.from_json`` (bytes: the input's length)
+``validate``        ``validate()``, including the calls made by
+                    ``from_json`` and the ``parse`` stage
+``from_legacy``     ``from_legacy()`` and each event of ``from_legacy_many()``
+                    (bytes: ``raw``, when given); for ``from_legacy_many``
+                    only the conversion is timed, not reading the input
+``to_trace_record`` ``integrations.agent_trace.to_trace_record``
+``emit``            ``emit()`` on either event class (bytes: the line written)
+=================== =========================================================
+
+Each stage keeps a call count, an error count, the cumulative time, a latency
+histogram over :data:`BUCKETS_NS` and a byte count. Validation failures are
+also counted by reason and by the envelope's ``source``::
+
+    from openhook import instrument
+
+    instrument.enable()
+    ...
+    snapshot = instrument.stats()
+    snapshot["stages"]["validate"]["calls"]
+    snapshot["validation_failures"]["by_reason"]  # {"missing_fields": 3, ...}
+
+``enable(callback)`` also calls ``callback(stage, duration_ns, size, source,
+error)`` after every instrumented call, which is the place to bridge to
+Prometheus or OpenTelemetry. ``error`` is None on success, the failure
+reason (see :data:`REASONS`) for a failed validation, and the exception's
+class name otherwise.
+
+Code that bound a function by name before :func:`enable` (``from openhook
+import validate``) keeps calling the original, so enable instrumentation at
+startup. Methods are always looked up on the class and are not affected.
+"""
+
+from __future__ import annotations
+
+import functools
+import sys
+import threading
+import time as _time
+from bisect import bisect_left
+from typing import Any, Callable, Iterable, Iterator
+
+from . import compat, envelope
+from .envelope import LazyEvent, OpenHookEvent, ValidationError
+from .integrations import agent_trace
+
+STAGES = ("parse", "from_json", "validate", "from_legacy", "to_trace_record", "emit")
+
+# Upper bounds of the latency histogram buckets; a final bucket counts the rest.
+BUCKETS_NS = (
+    1_000, 2_500, 5_000, 10_000, 25_000, 50_000, 100_000, 250_000, 500_000,
+    1_000_000, 2_500_000, 5_000_000, 10_000_000, 25_000_000, 100_000_000, 1_000_000_000,
+)
+
+# Message prefix of a ValidationError -> reason reported for it.
+REASONS = {
+    "Missing required fields": "missing_fields",
+    "'openhook' must be": "invalid_openhook",
+    "Unknown event type": "unknown_type",
+}
+
+Callback = Callable[[str, int, int | None, str | None, str | None], None]
+
+_lock = threading.Lock()
+_clock = _time.perf_counter_ns
+_callback: Callback | None = None
+# (owner, attribute, original, replacement) for each function swapped in.
+_originals: list[tuple[Any, str, Any, Any]] = []
+
+
+class _Stage:
+    __slots__ = ("calls", "errors", "total_ns", "bytes", "histogram")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.total_ns = 0
+        self.bytes = 0
+        self.histogram = [0] * (len(BUCKETS_NS) + 1)
+
+
+_stages = {stage: _Stage() for stage in STAGES}
+_failures_by_reason: dict[str, int] = {}
+_failures_by_source: dict[str, int] = {}
+
+
+def _record(stage: str, start: int, size: int | None, source: str | None, error: str | None) -> None:
+    elapsed = _clock() - start
+    with _lock:
+        s = _stages[stage]
+        s.calls += 1
+        s.total_ns += elapsed
+        s.histogram[bisect_left(BUCKETS_NS, elapsed)] += 1
+        if size is not None:
+            s.bytes += size
+        if error is not None:
+            s.errors += 1
+    callback = _callback
+    if callback is not None:
+        callback(stage, elapsed, size, source, error)
+
+
+def _reason(exc: ValidationError) -> str:
+    message = str(exc)
+    for prefix, reason in REASONS.items():
+        if message.startswith(prefix):
+            return reason
+    return "schema"
+
+
+# --- Wrappers ---
+
+
+def _parse(original: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(original)
+    def parse(line: str | bytes, *args: Any) -> Any:
+        start = _clock()
+        try:
+            result = original(line, *args)
+        except Exception as exc:
+            _record("parse", start, len(line), None, type(exc).__name__)
+            raise
+        # An event, or the decoded dict for EventBatch.
+        source = result.get("source") if isinstance(result, dict) else result.source
+        _record("parse", start, len(line), source if isinstance(source, str) else None, None)
+        return result
+
+    return parse
+
+
+def _from_json(original: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(original)
+    def from_json(cls: type, raw: str | bytes, *, strict: bool = False) -> Any:
+        start = _clock()
+        try:
+            event = original(cls, raw, strict=strict)
+        except Exception as exc:
+            _record("from_json", start, len(raw), None, type(exc).__name__)
+            raise
+        _record("from_json", start, len(raw), event.source, None)
+        return event
+
+    return from_json
+
+
+def _validate(original: Callable[..., None]) -> Callable[..., None]:
+    @functools.wraps(original)
+    def validate(d: dict[str, Any], *, strict: bool = False) -> None:
+        start = _clock()
+        source = d.get("source") if isinstance(d, dict) else None
+        if not isinstance(source, str):
+            source = None
+        try:
+            original(d, strict=strict)
+        except ValidationError as exc:
+            reason = _reason(exc)
+            with _lock:
+                _failures_by_reason[reason] = _failures_by_reason.get(reason, 0) + 1
+                key = source or "unknown"
+                _failures_by_source[key] = _failures_by_source.get(key, 0) + 1
+            _record("validate", start, None, source, reason)
+            raise
+        _record("validate", start, None, source, None)
+
+    return validate
+
+
+def _from_legacy(original: Callable[..., OpenHookEvent]) -> Callable[..., OpenHookEvent]:
+    @functools.wraps(original)
+    def from_legacy(payload: dict[str, Any], **kwargs: Any) -> OpenHookEvent:
+        start = _clock()
+        raw = kwargs.get("raw")
+        size = len(raw) if raw is not None else None
+        try:
+            event = original(payload, **kwargs)
+        except Exception as exc:
+            _record("from_legacy", start, size, None, type(exc).__name__)
+            raise
+        _record("from_legacy", start, size, event.source, None)
+        return event
+
+    return from_legacy
+
+
+def _from_legacy_many(original: Callable[..., Iterator[OpenHookEvent]]) -> Callable[..., Iterator[OpenHookEvent]]:
+    @functools.wraps(original)
+    def from_legacy_many(payloads: Iterable[dict[str, Any]], **kwargs: Any) -> Iterator[OpenHookEvent]:
+        # When the conversion got its current payload; None while the
+        # caller's iterator is being read, which is not timed.
+        started: list[int | None] = [None]
+
+        def timed(payloads: Iterable[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+            for payload in payloads:
+                started[0] = _clock()
+                yield payload
+                started[0] = None
+
+        events = original(timed(payloads), **kwargs)
+        while True:
+            try:
+                event = next(events)
+            except StopIteration:
+                return
+            except Exception as exc:
+                start = started[0]
+                if start is not None:
+                    _record("from_legacy", start, None, None, type(exc).__name__)
+                raise
+            start = started[0]
+            _record("from_legacy", _clock() if start is None else start, None, event.source, None)
+            yield event
+
+    return from_legacy_many
+
+
+def _to_trace_record(original: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(original)
+    def to_trace_record(event: OpenHookEvent) -> dict[str, Any] | None:
+        start = _clock()
+        try:
+            record = original(event)
+        except Exception as exc:
+            _record("to_trace_record", start, None, event.source, type(exc).__name__)
+            raise
+        _record("to_trace_record", start, None, event.source, None)
+        return record
+
+    return to_trace_record
+
+
+def _write_line(original: Callable[..., int]) -> Callable[..., int]:
+    @functools.wraps(original)
+    def write_line(event: OpenHookEvent | LazyEvent, file: Any) -> int:
+        start = _clock()
+        try:
+            size = original(event, file)
+        except Exception as exc:
+            _record("emit", start, None, event.source, type(exc).__name__)
+            raise
+        _record("emit", start, size, event.source, None)
+        return size
+
+    return write_line
+
+
+def _targets() -> list[tuple[Any, str, Callable[[Any], Any]]]:
+    """(owner, attribute, wrapper factory) for every instrumented function."""
+    return [
+        (envelope, "_parse_line", _parse),
+        (envelope, "_parse_payload", _parse),
+        (envelope, "_parse_stdin_bytes", _parse),
+        (OpenHookEvent, "from_json", _from_json),
+        (OpenHookEvent, "from_json_bytes", _from_json),
+        (LazyEvent, "from_json", _from_json),
+        (envelope, "validate", _validate),
+        (envelope, "_write_line", _write_line),
+        (compat, "from_legacy", _from_legacy),
+        (compat, "from_legacy_many", _from_legacy_many),
+        (agent_trace, "to_trace_record", _to_trace_record),
+    ]
+
+
+# --- Public API ---
+
+
+def enable(callback: Callback | None = None) -> None:
+    """Start instrumenting, calling ``callback`` (if given) after each instrumented call.
+
+    Calling it again while enabled only replaces the callback. Counts are
+    kept across :func:`disable` / :func:`enable`; use :func:`reset` to clear
+    them.
+    """
+    global _callback
+    _callback = callback
+    if _originals:
+        return
+    package = sys.modules[__package__]
+    for owner, name, wrap in _targets():
+        original = owner.__dict__[name]
+        if isinstance(original, classmethod):
+            replacement: Any = classmethod(wrap(original.__func__))
+        else:
+            replacement = wrap(original)
+        _originals.append((owner, name, original, replacement))
+        setattr(owner, name, replacement)
+        # `from openhook import validate` caches the function in the package.
+        if package.__dict__.get(name) is original:
+            setattr(package, name, replacement)
+
+
+def disable() -> None:
+    """Stop instrumenting and restore the original functions."""
+    global _callback
+    _callback = None
+    package = sys.modules[__package__]
+    while _originals:
+        owner, name, original, replacement = _originals.pop()
+        setattr(owner, name, original)
+        # The package caches whatever it resolved, which may be the wrapper
+        # if the name was first accessed while instrumentation was on.
+        if package.__dict__.get(name) is replacement:
+            setattr(package, name, original)
+
+
+def is_enabled() -> bool:
+    return bool(_originals)
+
+
+def reset() -> None:
+    """Clear all counts."""
+    with _lock:
+        for stage in STAGES:
+            _stages[stage] = _Stage()
+        _failures_by_reason.clear()
+        _failures_by_source.clear()
+
+
+def stats() -> dict[str, Any]:
+    """Return a snapshot of the counts.
+
+    ``{"stages": {stage: {"calls", "errors", "total_ns", "bytes",
+    "histogram"}}, "validation_failures": {"by_reason": {...}, "by_source":
+    {...}}}``. ``histogram[i]`` counts calls that took at most
+    ``BUCKETS_NS[i]`` (and more than the previous bound); the last entry counts
+    the slower ones.
+    """
+    with _lock:
+        return {
+            "stages": {
+                stage: {
+                    "calls": s.calls,
+                    "errors": s.errors,
+                    "total_ns": s.total_ns,
+                    "bytes": s.bytes,
+                    "histogram": list(s.histogram),
+                }
+                for stage, s in _stages.items()
+            },
+            "validation_failures": {
+                "by_reason": dict(_failures_by_reason),
+                "by_source": dict(_failures_by_source),
+            },
+        }
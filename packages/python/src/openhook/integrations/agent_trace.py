@@ -1,7 +1,9 @@
 """Bridge utilities for Agent Trace (https://agent-trace.dev/) integration.
 
 Agent Trace is an open specification for tracking AI-generated code.
-This module converts OpenHook file.write events into Agent Trace TraceRecords.
+This module converts OpenHook file.write events into Agent Trace TraceRecords,
+either one record per event (:func:`to_trace_record`) or one compact record
+per session (:class:`TraceAggregator`).
 
 Example::
 
@@ -17,9 +19,11 @@ Example::
 
 from __future__ import annotations
 
-import uuid
+from bisect import bisect_left, bisect_right
 from typing import Any
 
+from openhook import ids
+from openhook.attribution import _line_number
 from openhook.envelope import OpenHookEvent
 from openhook.events import EventType
 
@@ -43,14 +47,14 @@ def to_trace_record(event: OpenHookEvent) -> dict[str, Any] | None:
         contributor["model"] = model
 
     conversation: dict[str, Any] = {"contributor": contributor}
-    start_line = event.data.get("start_line")
-    end_line = event.data.get("end_line")
-    if start_line and end_line:
+    start_line = _line_number(event.data.get("start_line"))
+    end_line = _line_number(event.data.get("end_line"))
+    if start_line is not None and end_line is not None:
         conversation["ranges"] = [{"start_line": start_line, "end_line": end_line}]
 
     return {
         "version": "0.1.0",
-        "id": str(uuid.uuid4()),
+        "id": ids.new_id(),
         "timestamp": event.time,
         "files": [{"path": path, "conversations": [conversation]}],
         "tool": {
@@ -58,3 +62,134 @@ def to_trace_record(event: OpenHookEvent) -> dict[str, Any] | None:
             "session_id": event.session_id,
         },
     }
+
+
+class _RangeSet:
+    """Disjoint, sorted, inclusive line ranges; touching ranges are merged."""
+
+    __slots__ = ("starts", "ends")
+
+    def __init__(self) -> None:
+        self.starts: list[int] = []
+        self.ends: list[int] = []
+
+    def add(self, start: int, end: int) -> None:
+        starts, ends = self.starts, self.ends
+        # First range that ends at or after start - 1 (touching counts), and
+        # one past the last range that starts at or before end + 1.
+        lo = bisect_left(ends, start - 1)
+        hi = bisect_right(starts, end + 1)
+        if lo < hi:
+            start = min(start, starts[lo])
+            end = max(end, ends[hi - 1])
+        starts[lo:hi] = [start]
+        ends[lo:hi] = [end]
+
+    def to_list(self) -> list[dict[str, int]]:
+        return [{"start_line": s, "end_line": e} for s, e in zip(self.starts, self.ends)]
+
+
+class _SessionTrace:
+    __slots__ = ("source", "timestamp", "files")
+
+    def __init__(self, source: str, timestamp: str) -> None:
+        self.source = source
+        self.timestamp = timestamp
+        # path -> model (None when unknown) -> merged ranges
+        self.files: dict[str, dict[str | None, _RangeSet]] = {}
+
+
+class TraceAggregator:
+    """Fold file.write events into one TraceRecord per session.
+
+    Each session keeps, per file path and contributor model, a merged set of
+    line ranges, so a session that edits one file 200 times yields a single
+    record with a handful of ranges. A ``session.end`` event completes its
+    session and :meth:`add` returns the record; :meth:`flush` emits records
+    for sessions that are still open.
+
+    Example::
+
+        aggregator = TraceAggregator()
+        for event in iter_events(f):
+            record = aggregator.add(event)
+            if record:
+                print(json.dumps(record))
+        for record in aggregator.flush():
+            print(json.dumps(record))
+    """
+
+    def __init__(self) -> None:
+        self._sessions: dict[str, _SessionTrace] = {}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def add(self, event: OpenHookEvent) -> dict[str, Any] | None:
+        """Add an event; returns the session's record on ``session.end``."""
+        if event.type == EventType.SESSION_END:
+            return self._finish(event.session_id, event.time)
+        if event.type != EventType.FILE_WRITE:
+            return None
+
+        path: str | None = event.data.get("path")
+        if not path:
+            return None
+
+        session = self._sessions.get(event.session_id)
+        if session is None:
+            session = self._sessions[event.session_id] = _SessionTrace(event.source, event.time)
+        else:
+            session.timestamp = event.time
+
+        by_model = session.files.setdefault(path, {})
+        model: str | None = event.data.get("model")
+        ranges = by_model.get(model)
+        if ranges is None:
+            ranges = by_model[model] = _RangeSet()
+        start_line = _line_number(event.data.get("start_line"))
+        end_line = _line_number(event.data.get("end_line"))
+        if start_line and end_line:
+            ranges.add(min(start_line, end_line), max(start_line, end_line))
+        return None
+
+    def flush(self, session_id: str | None = None) -> list[dict[str, Any]]:
+        """Emit and forget records for one open session, or for all of them."""
+        if session_id is not None:
+            record = self._finish(session_id, None)
+            return [record] if record else []
+        records = [self._record(sid, session, None) for sid, session in self._sessions.items()]
+        self._sessions.clear()
+        return records
+
+    def _finish(self, session_id: str, timestamp: str | None) -> dict[str, Any] | None:
+        session = self._sessions.pop(session_id, None)
+        if session is None:
+            return None
+        return self._record(session_id, session, timestamp)
+
+    @staticmethod
+    def _record(session_id: str, session: _SessionTrace, timestamp: str | None) -> dict[str, Any]:
+        files = []
+        for path, by_model in session.files.items():
+            conversations = []
+            for model, ranges in by_model.items():
+                contributor: dict[str, Any] = {"type": "ai"}
+                if model:
+                    contributor["model"] = model
+                conversation: dict[str, Any] = {"contributor": contributor}
+                if ranges.starts:
+                    conversation["ranges"] = ranges.to_list()
+                conversations.append(conversation)
+            files.append({"path": path, "conversations": conversations})
+
+        return {
+            "version": "0.1.0",
+            "id": ids.new_id(),
+            "timestamp": timestamp or session.timestamp,
+            "files": files,
+            "tool": {
+                "name": session.source,
+                "session_id": session_id,
+            },
+        }
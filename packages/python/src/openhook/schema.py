@@ -0,0 +1,165 @@
+"""Strict validation compiled from the OpenHook JSON Schemas.
+
+The schemas in spec/schemas are embedded in ``_schemas.py`` and compiled once,
+at import, into plain Python closures: regexes are compiled up front, key sets
+are frozen, and ``data`` is checked by a validator looked up by event ``type``.
+Only the JSON Schema keywords the spec actually uses are supported.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Callable
+
+from ._schemas import DATA_SCHEMAS, ENVELOPE_SCHEMA
+
+# A compiled check returns an error message, or None if the value is valid.
+Check = Callable[[Any], "str | None"]
+
+_SUPPORTED_KEYWORDS = frozenset({
+    "type", "required", "properties", "additionalProperties",
+    "pattern", "enum", "minLength", "minimum",
+})
+
+_PLAIN_TYPES: dict[str, tuple[type, str]] = {
+    "string": (str, "a string"),
+    "object": (dict, "an object"),
+}
+
+
+def _is_integer(v: Any) -> bool:
+    if type(v) is int:
+        return True
+    return type(v) is float and v.is_integer()
+
+
+def _ecma_regex(pattern: str) -> re.Pattern[str]:
+    """Compile an ECMA-262 pattern as JSON Schema validators (ajv) read it.
+
+    Python's ``$`` also matches before a trailing newline; ECMA's only at the
+    end, so an unescaped ``$`` outside a character class becomes ``\\Z``.
+    """
+    out = []
+    escaped = in_class = False
+    for c in pattern:
+        if escaped:
+            escaped = False
+        elif c == "\\":
+            escaped = True
+        elif c == "[":
+            in_class = True
+        elif c == "]":
+            in_class = False
+        elif c == "$" and not in_class:
+            c = "\\Z"
+        out.append(c)
+    return re.compile("".join(out), re.ASCII)
+
+
+def _compile_string(schema: dict[str, Any], where: str) -> Check:
+    pattern = schema.get("pattern")
+    search = _ecma_regex(pattern).search if pattern else None
+    min_length = schema.get("minLength", 0)
+    enum = frozenset(schema["enum"]) if "enum" in schema else None
+
+    def check(v: Any) -> str | None:
+        if type(v) is not str:
+            return f"{where} must be a string"
+        if len(v) < min_length:
+            return f"{where} must be at least {min_length} characters"
+        if search is not None and search(v) is None:
+            return f"{where} does not match pattern {pattern!r}"
+        if enum is not None and v not in enum:
+            return f"{where} must be one of {', '.join(sorted(enum))}, got {v!r}"
+        return None
+
+    return check
+
+
+def _compile_integer(schema: dict[str, Any], where: str) -> Check:
+    minimum = schema.get("minimum")
+
+    def check(v: Any) -> str | None:
+        if not _is_integer(v):
+            return f"{where} must be an integer"
+        if minimum is not None and v < minimum:
+            return f"{where} must be >= {minimum}"
+        return None
+
+    return check
+
+
+def _compile_object(schema: dict[str, Any], where: str) -> Check:
+    required = frozenset(schema.get("required", ()))
+    properties = schema.get("properties", {})
+    allowed = frozenset(properties)
+    closed = schema.get("additionalProperties", True) is False
+    prefix = f"{where}." if where else ""
+    label = where or "event"
+
+    # Properties constrained only by a JSON type are checked inline with one
+    # type() comparison; everything else goes through a compiled sub-check.
+    plain: list[tuple[str, type, str]] = []
+    subchecks: list[tuple[str, Check]] = []
+    for key, sub in properties.items():
+        if sub.keys() == {"type"} and sub["type"] in _PLAIN_TYPES:
+            expected, name = _PLAIN_TYPES[sub["type"]]
+            plain.append((key, expected, f"{prefix}{key} must be {name}"))
+        else:
+            subchecks.append((key, _compile(sub, f"{prefix}{key}")))
+
+    def check(v: Any) -> str | None:
+        if type(v) is not dict:
+            return f"{label} must be an object"
+        keys = v.keys()
+        if required and not required <= keys:
+            missing = ", ".join(sorted(required - keys))
+            return f"{label} is missing required fields: {missing}"
+        if closed and not keys <= allowed:
+            extra = ", ".join(sorted(keys - allowed))
+            return f"{label} has unknown fields: {extra}"
+        for key, expected, message in plain:
+            if key in v and type(v[key]) is not expected:
+                return message
+        for key, sub in subchecks:
+            if key in v:
+                msg = sub(v[key])
+                if msg is not None:
+                    return msg
+        return None
+
+    return check
+
+
+def _compile(schema: dict[str, Any], where: str = "") -> Check:
+    unsupported = schema.keys() - _SUPPORTED_KEYWORDS
+    if unsupported:
+        raise ValueError(f"Unsupported schema keywords at {where or '<root>'}: {sorted(unsupported)}")
+    kind = schema.get("type")
+    if kind == "object":
+        return _compile_object(schema, where)
+    if kind == "string":
+        return _compile_string(schema, where)
+    if kind == "integer":
+        return _compile_integer(schema, where)
+    raise ValueError(f"Unsupported schema type at {where or '<root>'}: {kind!r}")
+
+
+_check_envelope = _compile(ENVELOPE_SCHEMA)
+_DATA_CHECKS: dict[str, Check] = {
+    event_type: _compile(schema, "data") for event_type, schema in DATA_SCHEMAS.items()
+}
+
+
+def strict_error(d: dict[str, Any]) -> str | None:
+    """Check an envelope against the full spec schemas.
+
+    Returns the first violation as a message, or None if ``d`` conforms.
+    """
+    msg = _check_envelope(d)
+    if msg is not None:
+        return msg
+    data_check = _DATA_CHECKS.get(d["type"])
+    if data_check is None:
+        return None
+    return data_check(d.get("data", {}))
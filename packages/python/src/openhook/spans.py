@@ -0,0 +1,196 @@
+"""Pair tool.start / tool.end events into spans via ``data.tool_call_id``.
+
+Events may arrive in any order. Unmatched halves are held in a bounded table
+keyed by ``(session_id, tool_call_id)`` and dropped as orphans when they
+exceed the TTL, when the table is full (oldest first), or when their session
+ends. Memory therefore stays flat however many agents crash mid-call.
+
+Example::
+
+    correlator = ToolSpanCorrelator(max_open=10_000, ttl=300)
+    for event in iter_events():
+        span = correlator.add(event)
+        if span:
+            print(span.tool_name, span.duration_ms)
+    print(correlator.counters)
+"""
+
+from __future__ import annotations
+
+import time as _time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable
+
+from .envelope import OpenHookEvent
+from .events import EventType
+
+
+@dataclass(frozen=True)
+class ToolSpan:
+    session_id: str
+    tool_call_id: str
+    tool_name: str | None
+    start: OpenHookEvent
+    end: OpenHookEvent
+    # Computed from the two event timestamps; None if either is unparsable.
+    duration_ms: float | None
+    # data.duration_ms as reported on tool.end, if present.
+    reported_duration_ms: int | None
+
+    @property
+    def status(self) -> str | None:
+        return self.end.data.get("status")
+
+    @property
+    def skew_ms(self) -> float | None:
+        """Computed minus reported duration, when both are known."""
+        if self.duration_ms is None or self.reported_duration_ms is None:
+            return None
+        return self.duration_ms - self.reported_duration_ms
+
+
+class ToolSpanCorrelator:
+    """Correlate tool.start / tool.end events into :class:`ToolSpan` objects.
+
+    ``max_open`` caps unmatched halves held at once; ``ttl`` (seconds, by
+    arrival time on ``clock``) bounds how long one is held. A span whose
+    computed and reported durations differ by more than
+    ``duration_tolerance_ms`` is still emitted but counted as a mismatch.
+    ``on_evict`` is called with each dropped half and the reason
+    (``"ttl"``, ``"capacity"``, ``"session_end"`` or ``"flush"``).
+    """
+
+    def __init__(
+        self,
+        *,
+        max_open: int = 10_000,
+        ttl: float = 300.0,
+        duration_tolerance_ms: float = 1000.0,
+        clock: Callable[[], float] = _time.monotonic,
+        on_evict: Callable[[OpenHookEvent, str], None] | None = None,
+    ) -> None:
+        if max_open < 1:
+            raise ValueError("max_open must be at least 1")
+        self.max_open = max_open
+        self.ttl = ttl
+        self.duration_tolerance_ms = duration_tolerance_ms
+        self._clock = clock
+        self._on_evict = on_evict
+        # (session_id, tool_call_id) -> (arrival, half); insertion order is age order
+        self._open: OrderedDict[tuple[str, str], tuple[float, OpenHookEvent]] = OrderedDict()
+        self._by_session: dict[str, set[str]] = {}
+        self.counters = {
+            "completed": 0,
+            "orphaned": 0,
+            "evicted_ttl": 0,
+            "evicted_capacity": 0,
+            "evicted_session_end": 0,
+            "evicted_flush": 0,
+            "duplicates": 0,
+            "duration_mismatches": 0,
+            "uncorrelated": 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._open)
+
+    def add(self, event: OpenHookEvent) -> ToolSpan | None:
+        """Add an event; returns a span when it completes one."""
+        now = self._clock()
+        self.expire(now)
+
+        if event.type == EventType.SESSION_END:
+            self._end_session(event.session_id)
+            return None
+        if event.type != EventType.TOOL_START and event.type != EventType.TOOL_END:
+            return None
+
+        call_id = event.data.get("tool_call_id")
+        if not call_id:
+            self.counters["uncorrelated"] += 1
+            return None
+
+        key = (event.session_id, call_id)
+        held = self._open.get(key)
+        if held is not None:
+            other = held[1]
+            if other.type != event.type:
+                self._remove(key)
+                if event.type == EventType.TOOL_END:
+                    return self._complete(other, event)
+                return self._complete(event, other)
+            # Same half seen twice (e.g. a retried delivery): keep the newer one.
+            self.counters["duplicates"] += 1
+            self._remove(key)
+
+        self._open[key] = (now, event)
+        self._by_session.setdefault(event.session_id, set()).add(call_id)
+        if len(self._open) > self.max_open:
+            oldest = next(iter(self._open))
+            self._evict(oldest, "capacity")
+        return None
+
+    def expire(self, now: float | None = None) -> int:
+        """Drop halves older than the TTL; returns how many were dropped."""
+        if now is None:
+            now = self._clock()
+        deadline = now - self.ttl
+        dropped = 0
+        while self._open:
+            key, (arrival, _) = next(iter(self._open.items()))
+            if arrival > deadline:
+                break
+            self._evict(key, "ttl")
+            dropped += 1
+        return dropped
+
+    def flush(self) -> int:
+        """Drop every held half (e.g. at shutdown); returns how many were dropped."""
+        dropped = len(self._open)
+        for key in list(self._open):
+            self._evict(key, "flush")
+        return dropped
+
+    def _end_session(self, session_id: str) -> None:
+        for call_id in list(self._by_session.get(session_id, ())):
+            self._evict((session_id, call_id), "session_end")
+
+    def _remove(self, key: tuple[str, str]) -> OpenHookEvent:
+        _, event = self._open.pop(key)
+        call_ids = self._by_session[key[0]]
+        call_ids.discard(key[1])
+        if not call_ids:
+            del self._by_session[key[0]]
+        return event
+
+    def _evict(self, key: tuple[str, str], reason: str) -> None:
+        event = self._remove(key)
+        self.counters["orphaned"] += 1
+        self.counters[f"evicted_{reason}"] += 1
+        if self._on_evict is not None:
+            self._on_evict(event, reason)
+
+    def _complete(self, start: OpenHookEvent, end: OpenHookEvent) -> ToolSpan:
+        start_ns = start.epoch_ns
+        end_ns = end.epoch_ns
+        duration = (end_ns - start_ns) / 1e6 if start_ns is not None and end_ns is not None else None
+        reported = end.data.get("duration_ms")
+        if not isinstance(reported, int) or isinstance(reported, bool):
+            reported = None
+        if (
+            duration is not None
+            and reported is not None
+            and abs(duration - reported) > self.duration_tolerance_ms
+        ):
+            self.counters["duration_mismatches"] += 1
+        self.counters["completed"] += 1
+        return ToolSpan(
+            session_id=start.session_id,
+            tool_call_id=start.data["tool_call_id"],
+            tool_name=end.data.get("tool_name") or start.data.get("tool_name"),
+            start=start,
+            end=end,
+            duration_ms=duration,
+            reported_duration_ms=reported,
+        )
@@ -0,0 +1,395 @@
+"""Durable on-disk event spool: a segmented, append-only log.
+
+Hook processes append events with :class:`SpoolWriter`, and a separate consumer
+drains them at its own pace with :class:`SpoolReader`, so events are not
+lost while the consumer is down::
+
+    # hook side
+    with SpoolWriter("/var/spool/openhook") as spool:
+        spool.append(parse_stdin())
+
+    # consumer side
+    reader = SpoolReader("/var/spool/openhook")
+    for event, cursor in reader.replay(saved_cursor):
+        handle(event)
+        saved_cursor = cursor
+
+Each record is an 8-byte header (payload length, CRC-32 of the payload, both
+little-endian) followed by the event's JSON. Segments are named after the
+log offset of their first byte, so a cursor is a single integer. A segment
+is never written again once it reaches ``segment_bytes``; the writer that
+fills it starts the next one.
+
+Appends from several processes are serialised with an ``flock`` on the
+spool's lock file; each append is one ``write(2)``. With ``fsync=True``,
+``append`` returns only once its record is on disk. Concurrent appenders
+share fsyncs (group commit), both threads of one writer and separate
+writers or processes: one fsync covers every record in the log before the
+offset it was taken at, and the leader records that offset in the spool's
+``.synced`` file under its own ``flock``, so appenders queued behind it find
+their records already durable and return without an fsync of their own.
+After a crash, :func:`recover` cuts a torn or corrupt tail off the last
+segment.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import threading
+import time as _time
+import zlib
+from collections.abc import Iterable, Iterator
+
+from . import envelope
+from .envelope import LazyEvent, LineError, OpenHookEvent, ValidationError
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: single-process only
+    fcntl = None  # type: ignore[assignment]
+
+DEFAULT_SEGMENT_BYTES = 64 * 1024 * 1024
+
+_HEADER = struct.Struct("<II")
+_SUFFIX = ".log"
+_LOCK_FILE = ".lock"
+# Log offset up to which records are known to be fsynced; flock'ed by the sync leader.
+_SYNCED_FILE = ".synced"
+_OFFSET = struct.Struct("<Q")
+
+
+def _segment_name(base: int) -> str:
+    return f"{base:020d}{_SUFFIX}"
+
+
+def _segments(directory: str) -> list[int]:
+    """Base offsets of the segments in ``directory``, ascending."""
+    return sorted(
+        int(name[:-len(_SUFFIX)])
+        for name in os.listdir(directory)
+        if name.endswith(_SUFFIX) and name[:-len(_SUFFIX)].isdigit()
+    )
+
+
+def _encode(payload: bytes) -> bytes:
+    return _HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def _scan(data: bytes | memoryview, pos: int) -> Iterator[tuple[int, bytes]]:
+    """Yield ``(end, payload)`` for each intact record from ``pos``; stop at the first bad one."""
+    size = len(data)
+    while pos + _HEADER.size <= size:
+        length, crc = _HEADER.unpack_from(data, pos)
+        end = pos + _HEADER.size + length
+        if end > size:
+            return
+        payload = bytes(data[pos + _HEADER.size:end])
+        if zlib.crc32(payload) != crc:
+            return
+        yield end, payload
+        pos = end
+
+
+class SpoolWriter:
+    """Append events to the spool in ``directory`` (created if missing).
+
+    ``segment_bytes`` is the size at which a segment is sealed. With
+    ``fsync=False`` appends return once the record is written (it survives
+    the process but not a power loss) and :meth:`sync` makes them durable.
+    ``commit_delay`` (seconds) makes the thread about to fsync wait briefly,
+    so more concurrent appends, from this or other writers, share that
+    fsync. ``counters["shared_fsyncs"]`` counts syncs that another writer's
+    fsync already covered.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike[str],
+        *,
+        segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+        fsync: bool = True,
+        commit_delay: float = 0.0,
+    ) -> None:
+        self.directory = os.fspath(directory)
+        self.segment_bytes = segment_bytes
+        self.fsync = fsync
+        self.commit_delay = commit_delay
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock_fd = os.open(os.path.join(self.directory, _LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+        self._synced_fd = os.open(os.path.join(self.directory, _SYNCED_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+        self._lock = threading.Lock()
+        self._base = -1
+        self._fd = -1
+        # Group commit state, as log offsets: the end of this writer's last
+        # record, and how far the log is known to be durable.
+        self._sync_cond = threading.Condition()
+        self._written = 0
+        self._synced = 0
+        self._syncing = False
+        self.counters = {"records": 0, "bytes": 0, "fsyncs": 0, "shared_fsyncs": 0, "segments": 0}
+
+    def _open_segment(self, base: int) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+        self._fd = os.open(
+            os.path.join(self.directory, _segment_name(base)),
+            os.O_WRONLY | os.O_APPEND | os.O_CREAT,
+            0o644,
+        )
+        self._base = base
+
+    def _current_segment(self) -> int:
+        """Return the offset of the file's end, switching to a newer or fresh segment if needed.
+
+        Called with the directory lock held.
+        """
+        if self._fd < 0:
+            segments = _segments(self.directory)
+            self._open_segment(segments[-1] if segments else 0)
+        while True:
+            size = os.fstat(self._fd).st_size
+            if size < self.segment_bytes:
+                return self._base + size
+            # Sealed. Make it durable before moving on (so recovery only has
+            # to check the last segment), then continue in the next segment,
+            # which another writer may already have started.
+            os.fsync(self._fd)
+            next_base = self._base + size
+            self._open_segment(next_base)
+            self.counters["segments"] += 1
+
+    def append(self, event: OpenHookEvent | LazyEvent) -> int:
+        """Append one event; returns the log offset just past its record."""
+        return self.append_bytes(event.to_json_bytes())
+
+    def append_many(self, events: Iterable[OpenHookEvent | LazyEvent]) -> int:
+        """Append events with one write and at most one fsync; returns the end offset."""
+        payloads = [_encode(e.to_json_bytes()) for e in events]
+        return self._write_records(b"".join(payloads), len(payloads))
+
+    def append_bytes(self, payload: bytes) -> int:
+        """Append one already-encoded JSON envelope."""
+        return self._write_records(_encode(payload), 1)
+
+    def _write_records(self, records: bytes, count: int) -> int:
+        if not records:
+            return self.tell()
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+            try:
+                end = self._current_segment() + len(records)
+                written = os.write(self._fd, records)
+                if written != len(records):
+                    # Short write (e.g. disk full): drop the partial record so
+                    # later appends do not land behind a torn one.
+                    os.ftruncate(self._fd, end - len(records) - self._base)
+                    raise OSError(f"Short write to spool segment ({written} of {len(records)} bytes)")
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+            self.counters["records"] += count
+            self.counters["bytes"] += len(records)
+            with self._sync_cond:
+                self._written = max(self._written, end)
+        if self.fsync:
+            self._sync_to(end)
+        return end
+
+    def _sync_to(self, end: int) -> None:
+        with self._sync_cond:
+            while self._synced < end:
+                if self._syncing:
+                    self._sync_cond.wait()
+                    continue
+                # Become this writer's leader; _sync_log then shares with other writers.
+                self._syncing = True
+                self._sync_cond.release()
+                synced = 0
+                try:
+                    if self.commit_delay:
+                        _time.sleep(self.commit_delay)
+                    with self._sync_cond:
+                        target = self._written
+                    synced = self._sync_log(target)
+                finally:
+                    self._sync_cond.acquire()
+                    self._syncing = False
+                self._synced = max(self._synced, synced)
+                self._sync_cond.notify_all()
+
+    def _sync_log(self, target: int) -> int:
+        """Make the log durable up to at least ``target``; returns the offset it now is durable to."""
+        if fcntl is not None:
+            fcntl.flock(self._synced_fd, fcntl.LOCK_EX)
+        try:
+            # fsync a duplicate descriptor outside the write lock so appends
+            # (and segment rotation) carry on meanwhile. Sealed segments were
+            # fsynced when they filled, so the last one is all that is left.
+            with self._lock:
+                if fcntl is not None:
+                    fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+                try:
+                    offset = self._current_segment()
+                    fd = os.dup(self._fd)
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+            try:
+                # Whoever held the lock before us may have fsynced past our
+                # records. An offset beyond the log's end is left over from
+                # a spool whose segments were removed, so it is not trusted.
+                durable = self._read_synced()
+                if target <= durable <= offset:
+                    self.counters["shared_fsyncs"] += 1
+                    return durable
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            self.counters["fsyncs"] += 1
+            os.pwrite(self._synced_fd, _OFFSET.pack(offset), 0)
+            return offset
+        finally:
+            if fcntl is not None:
+                fcntl.flock(self._synced_fd, fcntl.LOCK_UN)
+
+    def _read_synced(self) -> int:
+        data = os.pread(self._synced_fd, _OFFSET.size, 0)
+        return _OFFSET.unpack(data)[0] if len(data) == _OFFSET.size else 0
+
+    def sync(self) -> None:
+        """Make every record appended so far durable."""
+        with self._sync_cond:
+            end = self._written
+        self._sync_to(end)
+
+    def tell(self) -> int:
+        """Log offset where the next record will start."""
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+            try:
+                return self._current_segment()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def close(self) -> None:
+        if self.fsync:
+            self.sync()
+        with self._lock:
+            if self._fd >= 0:
+                os.close(self._fd)
+                self._fd = -1
+            if self._lock_fd >= 0:
+                os.close(self._lock_fd)
+                os.close(self._synced_fd)
+                self._lock_fd = self._synced_fd = -1
+
+    def __enter__(self) -> SpoolWriter:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+class SpoolReader:
+    """Replay events from the spool in ``directory`` starting at a cursor."""
+
+    def __init__(self, directory: str | os.PathLike[str]) -> None:
+        self.directory = os.fspath(directory)
+
+    def segments(self) -> list[int]:
+        """Base offsets of the segments on disk, ascending."""
+        return _segments(self.directory)
+
+    def replay_bytes(self, cursor: int = 0) -> Iterator[tuple[bytes, int]]:
+        """Yield ``(payload, next_cursor)`` for every complete record from ``cursor``.
+
+        Stops at the end of the log, or at a record that is still being
+        written (or torn, until :func:`recover` runs). Replaying again from
+        the last ``next_cursor`` picks up where this left off.
+        """
+        segments = self.segments()
+        for i, base in enumerate(segments):
+            next_base = segments[i + 1] if i + 1 < len(segments) else None
+            if next_base is not None and next_base <= cursor:
+                continue
+            if cursor < base:
+                cursor = base  # the segment holding the cursor was purged
+            pos = start = cursor - base
+            with open(os.path.join(self.directory, _segment_name(base)), "rb") as f:
+                if os.fstat(f.fileno()).st_size > start:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        for pos, payload in _scan(mm, start):
+                            yield payload, base + pos
+            cursor = base + pos
+            if next_base is None or cursor < next_base:
+                return  # end of the written log (or an incomplete record)
+
+    def replay(
+        self,
+        cursor: int = 0,
+        *,
+        lazy: bool = False,
+        on_error: str = "raise",
+        errors: list[LineError] | None = None,
+    ) -> Iterator[tuple[OpenHookEvent | LazyEvent, int]]:
+        """Yield ``(event, next_cursor)`` for every event from ``cursor``.
+
+        A record that passes its CRC but is not a valid envelope is handled
+        by ``on_error`` as in :func:`~openhook.envelope.iter_events`, with the
+        record's position in this replay (from 1) as ``lineno``. With
+        ``"skip"`` or ``"collect"``, replay moves past it, so a consumer that
+        saves the cursors it is given is not stuck on the record.
+        """
+        envelope._check_on_error(on_error, errors)
+        parse = envelope._parse_line  # looked up per call, so openhook.instrument can time it
+        for n, (payload, next_cursor) in enumerate(self.replay_bytes(cursor), 1):
+            try:
+                event = parse(payload, False, lazy)
+            except (ValueError, ValidationError) as exc:
+                err = LineError(n, payload, exc)
+                if on_error == "raise":
+                    raise err from exc
+                if on_error == "collect":
+                    errors.append(err)  # type: ignore[union-attr]
+                continue
+            yield event, next_cursor
+
+    def purge(self, cursor: int) -> int:
+        """Delete segments that lie entirely before ``cursor``; returns how many."""
+        segments = self.segments()
+        removed = 0
+        for base, next_base in zip(segments, segments[1:]):
+            if next_base > cursor:
+                break
+            os.remove(os.path.join(self.directory, _segment_name(base)))
+            removed += 1
+        return removed
+
+
+def recover(directory: str | os.PathLike[str]) -> int:
+    """Truncate a torn or corrupt tail from the last segment; returns bytes removed.
+
+    Run it before writers start, e.g. when the consumer boots after a crash.
+    Sealed segments were fsynced when they filled and are not scanned.
+    """
+    directory = os.fspath(directory)
+    segments = _segments(directory)
+    if not segments:
+        return 0
+    path = os.path.join(directory, _segment_name(segments[-1]))
+    with open(path, "r+b") as f:
+        data = f.read()
+        valid = 0
+        for valid, _ in _scan(data, 0):
+            pass
+        removed = len(data) - valid
+        if removed:
+            f.truncate(valid)
+            f.flush()
+            os.fsync(f.fileno())
+    return removed
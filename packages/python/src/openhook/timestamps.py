@@ -0,0 +1,161 @@
+"""Timestamp parsing for the envelope ``time`` field.
+
+:func:`parse_time` converts an RFC 3339 timestamp to integer Unix epoch
+nanoseconds. It leans on :meth:`datetime.fromisoformat`, which is
+implemented in C and accepts the profiles the SDK and the agents emit
+(``2026-02-23T10:00:00.123456Z`` or ``...+00:00``), and adds what that
+lacks: ``Z`` on Python 3.10, and fractions finer than a microsecond, which
+keep full nanosecond precision.
+
+Events cache the result as :attr:`~openhook.OpenHookEvent.epoch_ns`, and
+``iter_events(since=..., until=...)`` uses :class:`TimeRange` to drop
+out-of-range lines from the raw bytes, before they are decoded::
+
+    for event in iter_events(stream, since="2026-02-23T00:00:00Z"):
+        latency_ms = (event.epoch_ns - start_ns) / 1e6
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any
+
+from . import codec
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_NAIVE_EPOCH = datetime(1970, 1, 1)
+
+# Nanoseconds per unit of the last digit of an n-digit fraction.
+_FRACTION_SCALE = tuple(10 ** (9 - n) for n in range(10))
+
+_fromisoformat = datetime.fromisoformat
+
+
+def parse_time(timestamp: Any) -> int | None:
+    """Return ``timestamp`` as Unix epoch nanoseconds, or None if it cannot be parsed.
+
+    Timestamps without an offset are taken as UTC.
+    """
+    try:
+        dt = _fromisoformat(timestamp)
+    except (TypeError, ValueError):
+        return _parse_fallback(timestamp)
+    if len(timestamp) > 27 and "0" <= timestamp[26] <= "9" and timestamp[19] == ".":
+        # More than six fraction digits, which datetime truncates.
+        return _parse_nanoseconds(timestamp)
+    delta = dt - (_NAIVE_EPOCH if dt.tzinfo is None else _EPOCH)
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000_000 + delta.microseconds * 1_000
+
+
+def _parse_fallback(timestamp: Any) -> int | None:
+    # Before Python 3.11, fromisoformat rejects "Z" and fractions other than
+    # three or six digits.
+    if not isinstance(timestamp, str):
+        return None
+    if timestamp[19:20] == ".":
+        return _parse_nanoseconds(timestamp)
+    if timestamp[-1:] == "Z":
+        return parse_time(timestamp[:-1] + "+00:00")
+    return None
+
+
+def _parse_nanoseconds(timestamp: str) -> int | None:
+    """Parse the fraction as an integer and the rest without it."""
+    end = 20
+    while end < len(timestamp) and timestamp[end].isdigit():
+        end += 1
+    digits = timestamp[20:min(end, 29)]
+    if not digits or not digits.isascii():
+        return None
+    whole = parse_time(timestamp[:19] + timestamp[end:])
+    if whole is None:
+        return None
+    return whole + int(digits) * _FRACTION_SCALE[len(digits)]
+
+
+def format_time(ns: int) -> str:
+    """Format Unix epoch nanoseconds as an RFC 3339 UTC timestamp.
+
+    The fraction is written with as many digits as it needs, so
+    ``parse_time(format_time(ns)) == ns``.
+    """
+    seconds, rem = divmod(ns, 1_000_000_000)
+    stamp = datetime.fromtimestamp(seconds, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+    if rem:
+        stamp += f".{rem:09d}".rstrip("0")
+    return stamp + "Z"
+
+
+def to_epoch_ns(value: int | str) -> int:
+    """Accept epoch nanoseconds or a timestamp string; raise ValueError if unparsable."""
+    if isinstance(value, int):
+        return value
+    ns = parse_time(value)
+    if ns is None:
+        raise ValueError(f"Cannot parse timestamp: {value!r}")
+    return ns
+
+
+class TimeRange:
+    """The half-open interval ``since <= time < until`` in epoch nanoseconds.
+
+    Either bound may be None (unbounded). :meth:`skips` decides from a raw
+    NDJSON line whether its event falls outside the range. Events whose time
+    cannot be parsed are outside every range.
+    """
+
+    __slots__ = ("since", "until")
+
+    def __init__(self, since: int | str | None = None, until: int | str | None = None) -> None:
+        self.since = None if since is None else to_epoch_ns(since)
+        self.until = None if until is None else to_epoch_ns(until)
+
+    def __contains__(self, ns: int | None) -> bool:
+        if ns is None:
+            return False
+        return (self.since is None or ns >= self.since) and (self.until is None or ns < self.until)
+
+    def skips(self, line: str | bytes) -> bool:
+        """True if the event on ``line`` is outside the range.
+
+        The ``"time"`` value is read straight from the line. If the key occurs
+        more than once or the value is escaped, the line is decoded instead.
+        A line that does not decode is not skipped, so the caller's parser
+        reports it.
+        """
+        raw = _probe_time(line)
+        if raw is None:
+            try:
+                d = codec.loads(line)
+            except ValueError:
+                return False
+            if not isinstance(d, dict):
+                return False
+            return parse_time(d.get("time")) not in self
+        return parse_time(raw) not in self
+
+
+def _probe_time(line: str | bytes) -> str | None:
+    """The ``time`` string of a one-line envelope, found without decoding it, or None."""
+    if isinstance(line, bytes):
+        key, quote, colon, backslash = b'"time"', b'"', b":", b"\\"
+    else:
+        key, quote, colon, backslash = '"time"', '"', ":", "\\"
+    pos = line.find(key)
+    if pos < 0 or line.find(key, pos + 6) >= 0:
+        return None  # absent, or also used as a data key or value
+    start = line.find(quote, pos + 6)
+    if start < 0 or line[pos + 6:start].strip() != colon:
+        return None
+    end = line.find(quote, start + 1)
+    if end < 0:
+        return None
+    value = line[start + 1:end]
+    if backslash in value:
+        return None
+    if isinstance(value, bytes):
+        try:
+            return value.decode("ascii")
+        except UnicodeDecodeError:
+            return None
+    return value
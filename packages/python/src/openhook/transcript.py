@@ -0,0 +1,197 @@
+"""Incremental reader for the JSONL transcripts named by ``data.transcript_path``.
+
+The transcript is memory-mapped and read one line at a time, so a large file
+is never loaded whole. :class:`TranscriptReader` remembers, per session, the
+byte offset just past the last record it returned, so a resumed or
+repeated session only parses what was appended since. If the file was
+replaced or truncated, reading starts again from the beginning. A trailing
+line without its newline (a record still being written) is left for the next
+read.
+
+``fields`` selects dotted paths (``"message.usage"``) to pull out of each
+record. Lines that do not mention any of the requested keys are skipped
+without being decoded, and only the selected values are kept::
+
+    reader = TranscriptReader("offsets.json")
+    for record in reader.read(event, fields=("message.model", "message.usage")):
+        usage = record.get("message.usage")
+    reader.save()
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from . import codec
+from .envelope import LazyEvent, OpenHookEvent
+
+# Sessions remembered by a reader before the least recently read is dropped.
+DEFAULT_MAX_SESSIONS = 10_000
+
+_MISSING = object()
+
+
+def _select(record: Any, paths: tuple[tuple[str, tuple[str, ...]], ...]) -> dict[str, Any]:
+    selected: dict[str, Any] = {}
+    for path, parts in paths:
+        value = record
+        for part in parts:
+            value = value.get(part, _MISSING) if isinstance(value, dict) else _MISSING
+            if value is _MISSING:
+                break
+        else:
+            selected[path] = value
+    return selected
+
+
+def _scan(
+    path: str | os.PathLike[str], cursor: list[int], fields: Iterable[str] | None
+) -> Iterator[Any]:
+    """Yield records from ``cursor[0]``, keeping ``cursor[0]`` just past the last line consumed."""
+    paths = tuple((f, tuple(f.split("."))) for f in fields) if fields is not None else None
+    needles = tuple({f'"{parts[-1]}"'.encode() for _, parts in paths}) if paths else ()
+    codec.get_backend()  # bind the selected backend, not the placeholder
+    loads = codec.loads
+
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size <= cursor[0]:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = cursor[0]
+            while pos < size:
+                end = mm.find(b"\n", pos, size)
+                if end < 0:
+                    break  # incomplete trailing record
+                line_start, pos = pos, end + 1
+                cursor[0] = pos
+                if needles and not any(mm.find(n, line_start, end) >= 0 for n in needles):
+                    continue
+                line = mm[line_start:end]
+                if not line.strip():
+                    continue
+                try:
+                    record = loads(line)
+                except ValueError:
+                    continue
+                if paths is not None:
+                    record = _select(record, paths)
+                    if not record:
+                        continue
+                yield record
+
+
+def iter_records(
+    path: str | os.PathLike[str],
+    *,
+    start: int = 0,
+    fields: Iterable[str] | None = None,
+) -> Iterator[tuple[int, Any]]:
+    """Yield ``(end_offset, record)`` for each complete line from ``start``.
+
+    ``end_offset`` is the byte offset just past the record's newline; pass it
+    back as ``start`` to resume. With ``fields``, each record is a dict of the
+    selected dotted paths that are present, and records with none of them are
+    skipped. Blank and malformed lines are skipped.
+    """
+    cursor = [start]
+    for record in _scan(path, cursor, fields):
+        yield cursor[0], record
+
+
+class TranscriptReader:
+    """Read transcripts incrementally, checkpointing each session's offset.
+
+    ``checkpoint_file`` (optional) is a JSON file of saved offsets; it is
+    loaded if it exists and written by :meth:`save`. The checkpoint advances
+    as records are yielded, so stopping part way through resumes after the
+    last record received.
+    """
+
+    def __init__(
+        self,
+        checkpoint_file: str | os.PathLike[str] | None = None,
+        *,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+    ) -> None:
+        self.checkpoint_file = checkpoint_file
+        self.max_sessions = max_sessions
+        # session_id -> [path, offset, inode]
+        self._checkpoints: dict[str, list[Any]] = {}
+        if checkpoint_file is not None and os.path.exists(checkpoint_file):
+            with open(checkpoint_file, encoding="utf-8") as f:
+                self._checkpoints = json.load(f)
+
+    def __len__(self) -> int:
+        return len(self._checkpoints)
+
+    def offset(self, session_id: str) -> int:
+        """Byte offset the next read of ``session_id`` starts from."""
+        checkpoint = self._checkpoints.get(session_id)
+        return checkpoint[1] if checkpoint else 0
+
+    def reset(self, session_id: str | None = None) -> None:
+        """Forget one session's checkpoint, or all of them."""
+        if session_id is None:
+            self._checkpoints.clear()
+        else:
+            self._checkpoints.pop(session_id, None)
+
+    def read(
+        self,
+        source: OpenHookEvent | LazyEvent | str | os.PathLike[str],
+        *,
+        session_id: str | None = None,
+        fields: Iterable[str] | None = None,
+    ) -> Iterator[Any]:
+        """Yield the records appended since this session was last read.
+
+        ``source`` is an event carrying ``data.transcript_path`` (its
+        ``session_id`` keys the checkpoint) or a path, in which case the
+        checkpoint is keyed by ``session_id`` or else the path itself.
+        Yields nothing for an event without a transcript path.
+        """
+        if isinstance(source, (OpenHookEvent, LazyEvent)):
+            path = source.data.get("transcript_path")
+            if not path:
+                return
+            key = session_id or source.session_id
+        else:
+            path = os.fspath(source)
+            key = session_id or path
+
+        try:
+            inode = os.stat(path).st_ino
+        except FileNotFoundError:
+            return
+        start = 0
+        checkpoint = self._checkpoints.pop(key, None)
+        if checkpoint is not None and checkpoint[0] == path and checkpoint[2] == inode:
+            start = checkpoint[1]
+        # Re-inserting keeps the dict ordered by last read, oldest first.
+        checkpoint = self._checkpoints[key] = [path, start, inode]
+        while len(self._checkpoints) > self.max_sessions:
+            del self._checkpoints[next(iter(self._checkpoints))]
+
+        if start > os.path.getsize(path):
+            checkpoint[1] = start = 0  # truncated and rewritten in place
+        cursor = [start]
+        for record in _scan(path, cursor, fields):
+            checkpoint[1] = cursor[0]
+            yield record
+        # Lines skipped after the last record are consumed too.
+        checkpoint[1] = cursor[0]
+
+    def save(self, checkpoint_file: str | os.PathLike[str] | None = None) -> None:
+        """Write the checkpoints to ``checkpoint_file`` (atomically)."""
+        target = checkpoint_file if checkpoint_file is not None else self.checkpoint_file
+        if target is None:
+            raise ValueError("No checkpoint file given")
+        tmp = f"{os.fspath(target)}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._checkpoints, f)
+        os.replace(tmp, target)
@@ -0,0 +1,260 @@
+"""Buffered NDJSON output for producers that emit many events.
+
+``emit()`` writes and flushes once per event. :class:`EventWriter` collects
+encoded lines and writes them in one call when a flush policy fires:
+
+- ``max_events``: this many events are buffered,
+- ``max_bytes``: the buffered lines reach this many bytes,
+- ``max_age``: the oldest buffered event is this many seconds old (checked as
+  events arrive, or by a background thread with ``flush_thread=True``),
+- or explicitly, with :meth:`EventWriter.flush` or on leaving the ``with``
+  block.
+
+Lines are written in the order they were added, and the output is the same as
+``emit()`` would produce for each event::
+
+    with EventWriter(sys.stdout, max_events=100, max_age=0.5, signals=(signal.SIGTERM,)) as out:
+        for event in events:
+            out.write(event)
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import signal
+import sys
+import threading
+import time as _time
+from typing import IO, Any, Callable, Iterable
+
+from .envelope import LazyEvent, OpenHookEvent
+
+DEFAULT_MAX_BYTES = 64 * 1024
+
+
+class _Buffer:
+    """Encoded lines waiting to be written, and the policies that flush them.
+
+    Shared by :class:`EventWriter` and ``aio.AsyncEventWriter``, which differ
+    only in how a batch is written out.
+    """
+
+    def __init__(
+        self,
+        max_events: int | None,
+        max_bytes: int | None,
+        max_age: float | None,
+        clock: Callable[[], float],
+    ) -> None:
+        if max_events is not None and max_events < 1:
+            raise ValueError("max_events must be at least 1")
+        self.max_events = max_events
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._clock = clock
+        self.lines: list[Any] = []
+        self.size = 0
+        self._first: float | None = None
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def add(self, line: Any) -> bool:
+        """Buffer ``line`` and return whether a flush policy fired."""
+        lines = self.lines
+        if not lines and self.max_age is not None:
+            self._first = self._clock()
+        lines.append(line)
+        self.size += len(line)
+        return (
+            (self.max_events is not None and len(lines) >= self.max_events)
+            or (self.max_bytes is not None and self.size >= self.max_bytes)
+            or (self._first is not None and self._clock() - self._first >= self.max_age)  # type: ignore[operator]
+        )
+
+    def remaining(self) -> float | None:
+        """Seconds until ``max_age`` fires, or None if it cannot (empty buffer or no ``max_age``)."""
+        if self._first is None:
+            return None
+        return self.max_age - (self._clock() - self._first)  # type: ignore[operator]
+
+    def take(self) -> tuple[list[Any], int]:
+        """Return the buffered lines and their total size, emptying the buffer.
+
+        Writers call this once the lines have been written, so a failed write
+        leaves them buffered for the next flush.
+        """
+        lines, size = self.lines, self.size
+        self.lines, self.size, self._first = [], 0, None
+        return lines, size
+
+
+def _is_binary(out: Any) -> bool:
+    if isinstance(out, (io.RawIOBase, io.BufferedIOBase)):
+        return True
+    if isinstance(out, io.TextIOBase):
+        return False
+    mode = getattr(out, "mode", None)
+    return isinstance(mode, str) and "b" in mode
+
+
+class EventWriter:
+    """Write events as NDJSON to ``file`` (default ``sys.stdout``), buffering between flushes.
+
+    ``file`` may be a text or binary stream. A text stream with an underlying
+    binary ``buffer`` (like ``sys.stdout``) is written through the buffer, as
+    ``emit()`` does. Bytes are written only to streams known to be binary (an
+    ``io.RawIOBase`` or ``io.BufferedIOBase``, or a ``mode`` containing
+    ``"b"``); any other file-like object is given ``str``. The file is flushed
+    after each batch and is not closed by :meth:`close`. If writing a batch
+    raises, its lines stay buffered and are retried by the next flush.
+
+    With ``flush_thread`` and a ``max_age``, a daemon thread started with the
+    first event flushes the buffer once it is ``max_age`` old even if no
+    further event arrives. A flush that fails in the thread is counted in
+    ``counters["failed_flushes"]`` and retried ``max_age`` later. Calls are
+    serialised by a lock, so the thread and the producer never interleave.
+
+    ``signals`` lists signals (e.g. ``signal.SIGTERM``) on which the buffer is
+    flushed before the previous handler runs. The handlers are installed by
+    the constructor, which must then run in the main thread, and restored by
+    :meth:`close`.
+    """
+
+    def __init__(
+        self,
+        file: IO[Any] | None = None,
+        *,
+        max_events: int | None = None,
+        max_bytes: int | None = DEFAULT_MAX_BYTES,
+        max_age: float | None = None,
+        flush_thread: bool = False,
+        signals: Iterable[int] = (),
+        clock: Callable[[], float] = _time.monotonic,
+    ) -> None:
+        self._buffer = _Buffer(max_events, max_bytes, max_age, clock)
+        out = file if file is not None else sys.stdout
+        buffer = getattr(out, "buffer", None)
+        if buffer is not None:
+            self._text: IO[Any] | None = out
+            self._out = buffer
+            self._binary = True
+        else:
+            self._text = None
+            self._out = out
+            self._binary = _is_binary(out)
+        self._flushing = False
+        self._closed = False
+        # Reentrant, because a signal handler may flush while the main thread
+        # holds it.
+        self._cond = threading.Condition(threading.RLock())
+        self._flush_thread = flush_thread and max_age is not None
+        self._timer: threading.Thread | None = None
+        self._previous: dict[int, Any] = {}
+        for signum in signals:
+            self._previous[signum] = signal.signal(signum, self._on_signal)
+        self.counters = {"events": 0, "bytes": 0, "flushes": 0, "failed_flushes": 0}
+
+    def __len__(self) -> int:
+        """Number of buffered (unwritten) events."""
+        return len(self._buffer)
+
+    def write(self, event: OpenHookEvent | LazyEvent) -> None:
+        """Buffer one event, flushing if a policy fires."""
+        if self._binary:
+            self._add(event.to_json_bytes() + b"\n")
+        else:
+            self._add(event.to_json() + "\n")
+
+    def write_many(self, events: Iterable[OpenHookEvent | LazyEvent]) -> None:
+        """Buffer several events, checking the policies after each."""
+        write = self.write
+        for event in events:
+            write(event)
+
+    def write_bytes(self, payload: bytes) -> None:
+        """Buffer one already-encoded JSON envelope (without its newline)."""
+        self._add(payload + b"\n" if self._binary else payload.decode() + "\n")
+
+    def _add(self, line: Any) -> None:
+        with self._cond:
+            if self._closed:
+                raise ValueError("write to closed EventWriter")
+            if self._buffer.add(line):
+                self.flush()
+            elif self._flush_thread and len(self._buffer) == 1:
+                if self._timer is None:
+                    self._timer = threading.Thread(
+                        target=self._watch_age, name="openhook-writer", daemon=True
+                    )
+                    self._timer.start()
+                self._cond.notify()
+
+    def _watch_age(self) -> None:
+        cond = self._cond
+        with cond:
+            while not self._closed:
+                remaining = self._buffer.remaining()
+                if remaining is None:
+                    cond.wait()
+                elif remaining > 0:
+                    cond.wait(remaining)
+                else:
+                    try:
+                        self.flush()
+                    except Exception:
+                        self.counters["failed_flushes"] += 1
+                        cond.wait(self._buffer.max_age)
+
+    def flush(self) -> None:
+        """Write the buffered lines in one call and flush the file."""
+        with self._cond:
+            buffer = self._buffer
+            if self._flushing or not buffer:
+                return
+            self._flushing = True
+            try:
+                lines = buffer.lines
+                if self._text is not None:
+                    self._text.flush()  # keep ordering with text written directly
+                self._out.write(lines[0] if len(lines) == 1 else (b"" if self._binary else "").join(lines))
+                lines, size = buffer.take()
+                self._out.flush()
+                self.counters["events"] += len(lines)
+                self.counters["bytes"] += size
+                self.counters["flushes"] += 1
+            finally:
+                self._flushing = False
+
+    def _on_signal(self, signum: int, frame: Any) -> None:
+        # A flush interrupted by the signal is left to finish after the
+        # handler returns; starting another would reorder the output.
+        self.flush()
+        previous = self._previous.get(signum)
+        if callable(previous):
+            previous(signum, frame)
+        elif previous == signal.SIG_DFL:
+            signal.signal(signum, signal.SIG_DFL)
+            os.kill(os.getpid(), signum)
+
+    def close(self) -> None:
+        """Flush, stop the age thread and restore the signal handlers. The file stays open."""
+        with self._cond:
+            if self._closed:
+                return
+            self.flush()
+            self._closed = True
+            self._cond.notify_all()
+        if self._timer is not None:
+            self._timer.join()
+            self._timer = None
+        for signum, previous in self._previous.items():
+            signal.signal(signum, previous if previous is not None else signal.SIG_DFL)
+        self._previous.clear()
+
+    def __enter__(self) -> EventWriter:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
@@ -0,0 +1,19 @@
+"""テスト全体で共有するフィクスチャ。"""
+
+import pytest
+
+
+class _Clock:
+    """now を書き換えて進める時計。clock= 引数にそのまま渡せる。"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """0 から始まり、テストが now を設定して進める偽の時計。"""
+    return _Clock()
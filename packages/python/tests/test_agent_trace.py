@@ -1,7 +1,7 @@
 """Agent Trace ブリッジの振る舞いを検証する仕様テスト。"""
 
-from openhook import EventType, OpenHookEvent
-from openhook.integrations.agent_trace import to_trace_record
+from openhook import EventType, OpenHookEvent, ids
+from openhook.integrations.agent_trace import TraceAggregator, to_trace_record
 
 
 def _make_file_write(**data_overrides) -> OpenHookEvent:
@@ -66,6 +66,20 @@ class TestToTraceRecord_pathがない場合:
         assert to_trace_record(event) is None
 
 
+class TestToTraceRecord_行番号の変換:
+    """行番号は TraceAggregator と同じ規則で整数に変換される。"""
+
+    def test_文字列の行番号は整数になる(self):
+        record = to_trace_record(_make_file_write(start_line="3", end_line=5.0))
+        ranges = record["files"][0]["conversations"][0]["ranges"]
+        assert ranges == [{"start_line": 3, "end_line": 5}]
+
+    def test_ASCII以外の数字は行番号として扱わない(self):
+        record = to_trace_record(_make_file_write(start_line="²", end_line="5"))
+        conv = record["files"][0]["conversations"][0]
+        assert "ranges" not in conv
+
+
 class TestToTraceRecord_TraceRecord生成:
     """pathを持つfile.writeはAgent Trace TraceRecordを生成する。"""
 
@@ -144,3 +158,146 @@ class TestToTraceRecord_TraceRecord生成:
             r1 = to_trace_record(_make_file_write())
             r2 = to_trace_record(_make_file_write())
             assert r1["id"] != r2["id"]
+
+
+# ---------------------------------------------------------------------------
+# TraceAggregator
+# ---------------------------------------------------------------------------
+
+def _write(session_id="sess_123", **data):
+    data.setdefault("path", "src/app.ts")
+    return OpenHookEvent.create(
+        source="claude-code", type=EventType.FILE_WRITE, session_id=session_id, data=data
+    )
+
+
+def _end(session_id="sess_123"):
+    return OpenHookEvent.create(
+        source="claude-code", type=EventType.SESSION_END, session_id=session_id
+    )
+
+
+def _ranges(record, path="src/app.ts", model=None):
+    for f in record["files"]:
+        if f["path"] != path:
+            continue
+        for conv in f["conversations"]:
+            if conv["contributor"].get("model") == model:
+                return [(r["start_line"], r["end_line"]) for r in conv.get("ranges", [])]
+    raise AssertionError("conversation not found")
+
+
+class TestTraceAggregator_範囲のマージ:
+    """同じファイル・同じモデルの行範囲は1つのレコードに統合される。"""
+
+    def test_重なる範囲は1つにまとめられる(self):
+        agg = TraceAggregator()
+        agg.add(_write(start_line=1, end_line=10))
+        agg.add(_write(start_line=5, end_line=20))
+        assert _ranges(agg.add(_end())) == [(1, 20)]
+
+    def test_隣接する範囲は1つにまとめられる(self):
+        agg = TraceAggregator()
+        agg.add(_write(start_line=11, end_line=20))
+        agg.add(_write(start_line=1, end_line=10))
+        assert _ranges(agg.add(_end())) == [(1, 20)]
+
+    def test_離れた範囲は別々に保持される(self):
+        agg = TraceAggregator()
+        agg.add(_write(start_line=30, end_line=40))
+        agg.add(_write(start_line=1, end_line=10))
+        assert _ranges(agg.add(_end())) == [(1, 10), (30, 40)]
+
+    def test_複数の範囲をまたぐ書き込みでまとめられる(self):
+        agg = TraceAggregator()
+        for start in (1, 20, 40, 60):
+            agg.add(_write(start_line=start, end_line=start + 5))
+        agg.add(_write(start_line=3, end_line=45))
+        assert _ranges(agg.add(_end())) == [(1, 45), (60, 65)]
+
+    def test_200回の編集でも1レコードになる(self):
+        agg = TraceAggregator()
+        for i in range(200):
+            agg.add(_write(start_line=i + 1, end_line=i + 1))
+        record = agg.add(_end())
+        assert len(record["files"]) == 1
+        assert _ranges(record) == [(1, 200)]
+
+    def test_文字列の行番号は整数として扱われる(self):
+        agg = TraceAggregator()
+        agg.add(_write(start_line="3", end_line="8"))
+        agg.add(_write(start_line=9.0, end_line=12))
+        assert _ranges(agg.add(_end())) == [(3, 12)]
+
+    def test_行番号でない値の範囲は無視されファイルは残る(self):
+        agg = TraceAggregator()
+        agg.add(_write(start_line="top", end_line=[1]))
+        agg.add(_write(start_line=True, end_line=4))
+        agg.add(_write(start_line="²", end_line="5"))
+        record = agg.add(_end())
+        assert record["files"][0]["path"] == "src/app.ts"
+        assert _ranges(record) == []
+
+
+class TestTraceAggregator_グルーピング:
+    """範囲はセッション・パス・モデルごとに分けて集約される。"""
+
+    def test_モデルごとに別のconversationになる(self):
+        agg = TraceAggregator()
+        agg.add(_write(model="anthropic/claude-sonnet-4-6", start_line=1, end_line=5))
+        agg.add(_write(model="openai/gpt-5", start_line=3, end_line=8))
+        record = agg.add(_end())
+        assert _ranges(record, model="anthropic/claude-sonnet-4-6") == [(1, 5)]
+        assert _ranges(record, model="openai/gpt-5") == [(3, 8)]
+
+    def test_パスごとに別のfileエントリになる(self):
+        agg = TraceAggregator()
+        agg.add(_write(path="a.ts"))
+        agg.add(_write(path="b.ts"))
+        record = agg.add(_end())
+        assert [f["path"] for f in record["files"]] == ["a.ts", "b.ts"]
+
+    def test_session_endは該当セッションだけを完了させる(self):
+        agg = TraceAggregator()
+        agg.add(_write(session_id="s1"))
+        agg.add(_write(session_id="s2"))
+        record = agg.add(_end("s1"))
+        assert record["tool"]["session_id"] == "s1"
+        assert len(agg) == 1
+
+    def test_書き込みのないセッションのsession_endはNoneを返す(self):
+        assert TraceAggregator().add(_end()) is None
+
+
+class TestTraceAggregator_flush:
+    """flush() は未完了のセッションのレコードを出力する。"""
+
+    def test_すべての未完了セッションが出力される(self):
+        agg = TraceAggregator()
+        agg.add(_write(session_id="s1"))
+        agg.add(_write(session_id="s2"))
+        records = agg.flush()
+        assert sorted(r["tool"]["session_id"] for r in records) == ["s1", "s2"]
+        assert len(agg) == 0
+
+    def test_セッションを指定して出力できる(self):
+        agg = TraceAggregator()
+        agg.add(_write(session_id="s1"))
+        agg.add(_write(session_id="s2"))
+        (record,) = agg.flush("s2")
+        assert record["tool"]["session_id"] == "s2"
+        assert len(agg) == 1
+
+
+class TestTraceRecord_id:
+    """レコードの id は openhook.ids の生成器から割り当てられる。"""
+
+    def test_set_id_generatorの設定に従う(self):
+        ids.set_id_generator(lambda: "fixed-id")
+        try:
+            agg = TraceAggregator()
+            agg.add(_write(start_line=1, end_line=2))
+            assert agg.add(_end())["id"] == "fixed-id"
+            assert to_trace_record(_make_file_write())["id"] == "fixed-id"
+        finally:
+            ids.set_id_generator()
@@ -0,0 +1,247 @@
+"""asyncio 版 API (aiter_events / AsyncEventWriter / AsyncDispatcher) の振る舞いを検証する仕様テスト。"""
+
+import asyncio
+import io
+import json
+import shlex
+import subprocess
+import sys
+
+import pytest
+
+from openhook import EventType, LineError, OpenHookEvent, iter_events
+from openhook.aio import AsyncDispatcher, AsyncEventWriter, aiter_events
+from openhook.dispatch import HookConfig
+
+
+def _event(i, type=EventType.TOOL_START, time="2026-02-23T10:00:00Z"):
+    return OpenHookEvent.create(
+        source="claude-code", type=type, session_id="s1",
+        data={"tool_name": "Bash", "tool_call_id": f"c{i}"}, event_id=f"e{i}", time=time,
+    )
+
+
+def _py(code):
+    return f"{shlex.quote(sys.executable)} -c {shlex.quote(code)}"
+
+
+def _config(hooks):
+    return HookConfig.from_dict({"openhook": "0.1", "hooks": hooks})
+
+
+async def _collect(data, chunk_size=7, **kwargs):
+    reader = asyncio.StreamReader()
+    reader.feed_data(data)
+    reader.feed_eof()
+    return [e async for e in aiter_events(reader, chunk_size=chunk_size, **kwargs)]
+
+
+class _Writer:
+    """write と drain の呼び出しを記録する StreamWriter の代用品。"""
+
+    def __init__(self):
+        self.data = bytearray()
+        self.writes = 0
+        self.drains = 0
+
+    def write(self, b):
+        self.writes += 1
+        self.data += b
+
+    async def drain(self):
+        self.drains += 1
+
+
+class TestAiterEvents:
+    """aiter_events は同期版 iter_events と同じ結果を返す。"""
+
+    def test_チャンク境界をまたぐ行も同期版と同じイベントになる(self):
+        data = b"".join(_event(i).to_json_bytes() + b"\n" for i in range(20)) + b"\n" + _event(20).to_json_bytes()
+        events = asyncio.run(_collect(data))
+        assert events == list(iter_events(io.BytesIO(data)))
+        assert [e.id for e in events] == [f"e{i}" for i in range(21)]
+
+    def test_chunk_sizeの何倍もある行も読み込まれる(self):
+        big = OpenHookEvent.create(
+            source="claude-code", type=EventType.TOOL_END, session_id="s1",
+            data={"blob": "x" * (4 << 20)}, event_id="big", time="2026-02-23T10:00:00Z",
+        )
+        data = _event(0).to_json_bytes() + b"\n" + big.to_json_bytes() + b"\n" + _event(1).to_json_bytes()
+        events = asyncio.run(_collect(data, chunk_size=4096))
+        assert [e.id for e in events] == ["e0", "big", "e1"]
+
+    def test_不正な行の行番号は同期版と同じ(self):
+        data = _event(0).to_json_bytes() + b"\n\nnot-json\n" + _event(1).to_json_bytes() + b"\n{\n"
+        errors, sync_errors = [], []
+        events = asyncio.run(_collect(data, on_error="collect", errors=errors))
+        list(iter_events(io.BytesIO(data), on_error="collect", errors=sync_errors))
+        assert [e.id for e in events] == ["e0", "e1"]
+        assert [err.lineno for err in errors] == [err.lineno for err in sync_errors] == [3, 5]
+
+    def test_on_errorがraiseならLineErrorが発生する(self):
+        with pytest.raises(LineError):
+            asyncio.run(_collect(b"not-json\n"))
+
+    def test_不明なon_errorは呼び出し時にValueError(self):
+        with pytest.raises(ValueError):
+            aiter_events(object(), on_error="ignore")
+
+    def test_lazyと時刻範囲を使える(self):
+        data = b"".join(
+            _event(i, time=f"2026-02-23T10:00:0{i}Z").to_json_bytes() + b"\n" for i in range(5)
+        )
+        events = asyncio.run(_collect(data, lazy=True, since="2026-02-23T10:00:01Z", until="2026-02-23T10:00:03Z"))
+        assert [e.id for e in events] == ["e1", "e2"]
+
+
+class TestAsyncEventWriter:
+    """AsyncEventWriter はポリシーに従ってまとめて書き、毎回 drain を待つ。"""
+
+    def test_出力はemitと同じでフラッシュごとにdrainする(self):
+        out = _Writer()
+
+        async def run():
+            async with AsyncEventWriter(out, max_events=3) as writer:
+                await writer.write_many(_event(i) for i in range(7))
+            return writer
+
+        writer = asyncio.run(run())
+        expected = io.StringIO()
+        for i in range(7):
+            _event(i).emit(expected)
+        assert bytes(out.data) == expected.getvalue().encode()
+        assert (out.writes, out.drains) == (3, 3)
+        assert writer.counters["events"] == 7
+
+    def test_非同期イテラブルから書ける(self):
+        out = _Writer()
+        data = b"".join(_event(i).to_json_bytes() + b"\n" for i in range(4))
+
+        async def run():
+            reader = asyncio.StreamReader()
+            reader.feed_data(data)
+            reader.feed_eof()
+            async with AsyncEventWriter(out) as writer:
+                await writer.write_many(aiter_events(reader, lazy=True))
+
+        asyncio.run(run())
+        assert bytes(out.data) == data
+
+    def test_close後の書き込みはValueErrorが発生する(self):
+        async def run():
+            writer = AsyncEventWriter(_Writer())
+            await writer.aclose()
+            await writer.write(_event(0))
+
+        with pytest.raises(ValueError):
+            asyncio.run(run())
+
+    def test_パイプの読み手が遅くてもすべて届く(self):
+        async def run():
+            proc = await asyncio.create_subprocess_exec(
+                sys.executable, "-c",
+                "import sys, time\n"
+                "n = 0\n"
+                "for line in sys.stdin.buffer:\n"
+                "    n += 1\n"
+                "    if n % 200 == 0: time.sleep(0.01)\n"
+                "print(n)\n",
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            )
+            async with AsyncEventWriter(proc.stdin, max_events=50) as writer:
+                for i in range(2000):
+                    await writer.write(_event(i))
+            proc.stdin.close()
+            out, _ = await proc.communicate()
+            return int(out)
+
+        assert asyncio.run(run()) == 2000
+
+
+class TestAsyncDispatcher:
+    """AsyncDispatcher はフックを非同期サブプロセスで並行に実行する。"""
+
+    def test_同期フックの終了コードとstdinが渡される(self, tmp_path):
+        out = tmp_path / "out"
+        config = _config([
+            {"command": _py(f"import sys; open({str(out)!r}, 'wb').write(sys.stdin.buffer.read())")},
+            {"command": "exit 3"},
+            {"command": "true", "events": ["session.end"]},
+        ])
+
+        async def run():
+            async with AsyncDispatcher(config) as d:
+                return await d.dispatch(_event(0))
+
+        results = asyncio.run(run())
+        assert [r.returncode for r in results] == [0, 3]
+        assert OpenHookEvent.from_json(out.read_bytes()) == _event(0)
+
+    def test_同時実行数はmax_concurrencyに制限される(self, tmp_path):
+        log = tmp_path / "log"
+        code = (
+            "import time\n"
+            f"with open({str(log)!r}, 'a') as f: f.write('+'); f.flush()\n"
+            "time.sleep(0.2)\n"
+            f"with open({str(log)!r}, 'a') as f: f.write('-')\n"
+        )
+        config = _config([{"command": _py(code)}])
+
+        async def run():
+            async with AsyncDispatcher(config, max_concurrency=2) as d:
+                await asyncio.gather(*(d.dispatch(_event(i)) for i in range(5)))
+
+        asyncio.run(run())
+        depth = peak = 0
+        for c in log.read_text():
+            depth += 1 if c == "+" else -1
+            peak = max(peak, depth)
+        assert peak == 2
+
+    def test_asyncフックはacloseまでに実行される(self, tmp_path):
+        out = tmp_path / "out"
+        config = _config([{"command": _py(f"open({str(out)!r}, 'a').write('x')"), "async": True}])
+
+        async def run():
+            async with AsyncDispatcher(config, max_pending=2) as d:
+                for i in range(5):
+                    assert (await d.dispatch(_event(i)))[0].returncode is None
+
+        asyncio.run(run())
+        assert out.read_text() == "xxxxx"
+
+    def test_常駐フックには1プロセスにNDJSONで届く(self, tmp_path):
+        out = tmp_path / "out"
+        code = f"import sys\nwith open({str(out)!r}, 'ab') as f: f.write(sys.stdin.buffer.read())"
+        config = _config([{"command": _py(code), "persistent": True}])
+
+        async def run():
+            async with AsyncDispatcher(config) as d:
+                for i in range(10):
+                    await d.dispatch(_event(i))
+
+        asyncio.run(run())
+        ids = [json.loads(line)["id"] for line in out.read_bytes().splitlines()]
+        assert ids == [f"e{i}" for i in range(10)]
+
+    def test_タイムアウトしたフックは失敗として返される(self):
+        config = _config([{"command": _py("import time; time.sleep(5)")}])
+
+        async def run():
+            async with AsyncDispatcher(config, timeout=0.2) as d:
+                return await d.dispatch(_event(0)), d
+
+        (result,), d = asyncio.run(run())
+        assert result.timed_out and result.failed
+        assert d.counters["timeouts"] == 1
+
+    def test_asyncフックの失敗はon_async_failureに渡される(self):
+        failures = []
+        config = _config([{"command": "exit 4", "async": True}, {"command": "true", "async": True}])
+
+        async def run():
+            async with AsyncDispatcher(config, on_async_failure=lambda r, exc: failures.append((r, exc))) as d:
+                await d.dispatch(_event(0))
+
+        asyncio.run(run())
+        assert [(r.returncode, exc) for r, exc in failures] == [(4, None)]
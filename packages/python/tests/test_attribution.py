@@ -0,0 +1,167 @@
+"""行帰属インデックスの振る舞いを検証する仕様テスト。"""
+
+import io
+import random
+
+import pytest
+
+from openhook import EventType, OpenHookEvent
+from openhook.attribution import AttributionIndex
+
+
+def _write(start, end, session_id="s1", model="anthropic/claude-sonnet-4-6", path="src/app.ts", **data):
+    return OpenHookEvent.create(
+        source="claude-code",
+        type=EventType.FILE_WRITE,
+        session_id=session_id,
+        data={"path": path, "start_line": start, "end_line": end, "model": model, **data},
+        time="2026-02-23T10:00:00Z",
+    )
+
+
+class TestAttributionIndex_点クエリ:
+    """who_wrote() は指定行を最後に書いたセッションとモデルを返す。"""
+
+    def test_書き込まれた行の帰属が返される(self):
+        index = AttributionIndex()
+        index.add(_write(1, 10))
+        a = index.who_wrote("src/app.ts", 5)
+        assert (a.session_id, a.model) == ("s1", "anthropic/claude-sonnet-4-6")
+
+    def test_書き込まれていない行はNoneを返す(self):
+        index = AttributionIndex()
+        index.add(_write(1, 10))
+        assert index.who_wrote("src/app.ts", 11) is None
+        assert index.who_wrote("other.ts", 1) is None
+
+    def test_後の書き込みが前の帰属を上書きする(self):
+        index = AttributionIndex()
+        index.add(_write(1, 10, session_id="s1"))
+        index.add(_write(4, 6, session_id="s2"))
+        assert [index.who_wrote("src/app.ts", n).session_id for n in (3, 4, 6, 7)] == [
+            "s1", "s2", "s2", "s1",
+        ]
+
+    def test_deleteでファイルの帰属が消える(self):
+        index = AttributionIndex()
+        index.add(_write(1, 10))
+        index.add(_write(None, None, operation="delete"))
+        assert index.who_wrote("src/app.ts", 1) is None
+
+    def test_行番号のない書き込みは無視される(self):
+        index = AttributionIndex()
+        assert index.add(_write(None, None)) is False
+        assert len(index) == 0
+
+    def test_文字列や小数の行番号も整数として扱われる(self):
+        index = AttributionIndex()
+        assert index.add(_write("3", "5", session_id="s1"))
+        assert index.add(_write(6.0, 8.0, session_id="s2"))
+        assert index.add(_write(9, "10", session_id="s3"))
+        assert [index.who_wrote("src/app.ts", n).session_id for n in (3, 6, 10)] == ["s1", "s2", "s3"]
+
+    def test_行番号でない値の書き込みは無視される(self):
+        index = AttributionIndex()
+        assert not index.add(_write("top", 5))
+        assert not index.add(_write(True, 5))
+        assert not index.add(_write("²", "5"))
+        assert index.who_wrote("src/app.ts", 5) is None
+
+
+
+class TestAttributionIndex_範囲クエリ:
+    """query() は範囲を覆う帰属の連続区間を返す。"""
+
+    def test_区間は要求範囲で切り詰められる(self):
+        index = AttributionIndex()
+        index.add(_write(1, 10, session_id="s1"))
+        index.add(_write(11, 20, session_id="s2"))
+        runs = [(s, e, a.session_id) for s, e, a in index.query("src/app.ts", 5, 15)]
+        assert runs == [(5, 10, "s1"), (11, 15, "s2")]
+
+    def test_同じ帰属の隣接区間は統合される(self):
+        index = AttributionIndex()
+        index.add(_write(1, 10))
+        index.add(_write(11, 20))
+        assert [(s, e) for s, e, _ in index.query("src/app.ts", 1, 100)] == [(1, 20)]
+
+    def test_ランダムな書き込みでも単純な実装と一致する(self):
+        rng = random.Random(0)
+        index = AttributionIndex()
+        expected = {}
+        for _ in range(500):
+            start = rng.randint(1, 200)
+            end = start + rng.randint(0, 30)
+            session = f"s{rng.randint(0, 4)}"
+            index.add(_write(start, end, session_id=session))
+            for line in range(start, end + 1):
+                expected[line] = session
+        for line in range(1, 240):
+            a = index.who_wrote("src/app.ts", line)
+            assert (a.session_id if a else None) == expected.get(line)
+
+
+class TestAttributionIndex_永続化:
+    """save() と load() でインデックスが復元される。"""
+
+    def test_保存と読み込みで同じ結果を返す(self, tmp_path):
+        index = AttributionIndex()
+        index.add(_write(1, 10, session_id="s1"))
+        index.add(_write(5, 20, session_id="s2", model=None, path="b.ts"))
+        path = tmp_path / "attribution.idx"
+        index.save(path)
+        loaded = AttributionIndex.load(path)
+        assert loaded.who_wrote("src/app.ts", 3) == index.who_wrote("src/app.ts", 3)
+        assert loaded.query("b.ts", 1, 30) == index.query("b.ts", 1, 30)
+
+    def test_読み込んだインデックスに追記できる(self):
+        buf = io.BytesIO()
+        index = AttributionIndex()
+        index.add(_write(1, 10, session_id="s1"))
+        index.save(buf)
+        buf.seek(0)
+        loaded = AttributionIndex.load(buf)
+        loaded.add(_write(5, 5, session_id="s1"))
+        loaded.add(_write(6, 6, session_id="s2"))
+        assert loaded.who_wrote("src/app.ts", 6).session_id == "s2"
+
+    def test_不正なファイルはValueErrorが発生する(self):
+        with pytest.raises(ValueError):
+            AttributionIndex.load(io.BytesIO(b"garbage"))
+
+    def test_上書きされきった帰属は保存時に削除される(self, tmp_path):
+        index = AttributionIndex()
+        for i in range(100):
+            index.add(OpenHookEvent.create(
+                source="claude-code", type=EventType.FILE_WRITE, session_id="s1",
+                data={"path": "src/app.ts", "start_line": 1, "end_line": 10},
+                time=f"2026-02-23T10:00:{i % 60:02d}.{i:03d}Z",
+            ))
+        path = tmp_path / "attribution.idx"
+        index.save(path)
+        assert len(index._attributions) == 1
+        loaded = AttributionIndex.load(path)
+        assert loaded.query("src/app.ts", 1, 10) == index.query("src/app.ts", 1, 10)
+        assert loaded.query("src/app.ts", 1, 10)[0][2].time == "2026-02-23T10:00:39.099Z"
+
+    def test_保存は一時ファイルを経由して置き換える(self, tmp_path):
+        path = tmp_path / "attribution.idx"
+        path.write_bytes(b"old")
+        index = AttributionIndex()
+        index.add(_write(1, 10))
+        index.save(path)
+        assert list(tmp_path.iterdir()) == [path]
+        assert AttributionIndex.load(path).who_wrote("src/app.ts", 1) is not None
+
+    def test_途中で切れたファイルはValueErrorが発生する(self):
+        buf = io.BytesIO()
+        index = AttributionIndex()
+        index.add(_write(1, 10))
+        index.add(_write(20, 30, path="b.ts"))
+        index.save(buf)
+        data = buf.getvalue()
+        for cut in (len(data) - 1, len(data) - 20):
+            with pytest.raises(ValueError):
+                AttributionIndex.load(io.BytesIO(data[:cut]))
+        with pytest.raises(ValueError):
+            AttributionIndex.load(io.BytesIO(data + b"\0"))
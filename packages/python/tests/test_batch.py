@@ -0,0 +1,227 @@
+"""列指向のイベントバッチの振る舞いを検証する仕様テスト。"""
+
+import io
+import json
+
+import pytest
+
+import openhook.batch
+from openhook import EventType, LineError, OpenHookEvent
+from openhook.batch import NULL, EventBatch
+
+
+@pytest.fixture(params=["python", "numpy"])
+def backend(request, monkeypatch):
+    """純粋 Python 実装と NumPy 実装の両方で検証する。"""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+        monkeypatch.setattr(openhook.batch, "_numpy", None)
+    else:
+        monkeypatch.setattr(openhook.batch, "_numpy", False)
+    return request.param
+
+
+def _events():
+    return [
+        OpenHookEvent.create(
+            source="claude-code", type=EventType.TOOL_END, session_id="s1",
+            data={"tool_name": "Bash", "status": "success", "duration_ms": 100, "exit_code": 0},
+            event_id="e1", time="2026-02-23T10:00:00Z",
+        ),
+        OpenHookEvent.create(
+            source="claude-code", type=EventType.TOOL_END, session_id="s2",
+            data={"tool_name": "Read", "status": "error", "duration_ms": 300},
+            event_id="e2", time="2026-02-23T10:00:01.250Z", context="file:///repo",
+        ),
+        OpenHookEvent.create(
+            source="cursor", type=EventType.TOOL_END, session_id="s1",
+            data={"tool_name": "Bash", "duration_ms": 200},
+            event_id="e3", time="2026-02-23T10:00:02Z", extensions={"x-trace": "abc"},
+        ),
+        OpenHookEvent.create(
+            source="cursor", type=EventType.SESSION_END, session_id="s1",
+            data={"input_tokens": 5000, "output_tokens": 1200},
+            event_id="e4", time="2026-02-23T10:00:03Z",
+        ),
+    ]
+
+
+def _ndjson(events):
+    return io.BytesIO(b"".join(e.to_json_bytes() + b"\n" for e in events))
+
+
+class TestEventBatch_構築:
+    """イベントは列ごとに格納され、元のイベントに復元できる。"""
+
+    def test_from_streamとfrom_eventsは同じバッチを作る(self):
+        a = EventBatch.from_stream(_ndjson(_events()))
+        b = EventBatch.from_events(_events())
+        assert list(a) == list(b) == _events()
+
+    def test_文字列の列は辞書符号化される(self):
+        batch = EventBatch.from_events(_events())
+        codes, values = batch.codes("source")
+        assert list(codes) == [0, 0, 1, 1]
+        assert values == ["claude-code", "cursor"]
+
+    def test_欠損値は符号マイナス1とNULLになる(self):
+        batch = EventBatch.from_events(_events())
+        assert batch.codes("context")[0][0] == -1
+        assert batch.ints("duration_ms")[3] == NULL
+        assert batch.column("status") == ["success", "error", None, None]
+
+    def test_timeはエポックナノ秒で格納される(self):
+        batch = EventBatch.from_events(_events())
+        assert batch.ints("time")[1] - batch.ints("time")[0] == 1_250_000_000
+
+    def test_その他のdataフィールドは疎な列に入る(self):
+        batch = EventBatch.from_events(_events())
+        assert batch.extra_data == {0: {"exit_code": 0}}
+        assert batch.extensions == {2: {"x-trace": "abc"}}
+
+    def test_型が合わない値は疎な列に残る(self):
+        event = OpenHookEvent.create(
+            source="x", type=EventType.TOOL_END, session_id="s",
+            data={"duration_ms": "slow", "status": True}, time="2026-02-23T10:00:00Z",
+        )
+        batch = EventBatch.from_events([event])
+        assert batch.ints("duration_ms")[0] == NULL
+        assert batch.row(0) == event
+
+    def test_解釈できない時刻は元の文字列で復元される(self):
+        event = OpenHookEvent.create(source="x", type=EventType.SESSION_END, session_id="s", time="yesterday")
+        batch = EventBatch.from_events([event])
+        assert batch.ints("time")[0] == NULL
+        assert batch.row(0).time == "yesterday"
+
+    @pytest.mark.parametrize("time", [
+        "2026-02-23 10:00:00Z",
+        "20260223T100000Z",
+        "2026-02-23T10:00:00+00:00",
+        "2026-02-23T10:00:00.500Z",
+        "2026-02-23T10:00:00,5Z",
+        "2026-02-23T10:00:00.1234567891Z",
+    ])
+    def test_正規形でない時刻も元の文字列で復元される(self, time):
+        event = OpenHookEvent.create(source="x", type=EventType.SESSION_END, session_id="s", time=time)
+        batch = EventBatch.from_events([event])
+        assert batch.ints("time")[0] != NULL
+        assert batch.row(0).time == time
+
+    def test_int64に収まらない整数は疎な列に入る(self):
+        event = OpenHookEvent.create(
+            source="x", type=EventType.SESSION_END, session_id="s",
+            data={"input_tokens": 2**63, "output_tokens": -(2**63), "duration_ms": 5},
+        )
+        batch = EventBatch.from_events([event])
+        assert batch.ints("input_tokens")[0] == NULL
+        assert batch.ints("output_tokens")[0] == NULL
+        assert batch.extra_data[0] == {"input_tokens": 2**63, "output_tokens": -(2**63)}
+        assert batch.row(0) == event
+
+    def test_int64に収まらない時刻はNULLで元の文字列が残る(self):
+        event = OpenHookEvent.create(source="x", type=EventType.SESSION_END, session_id="s", time="2300-01-01T00:00:00Z")
+        batch = EventBatch.from_events([event])
+        assert batch.ints("time")[0] == NULL
+        assert batch.row(0).time == "2300-01-01T00:00:00Z"
+
+    def test_列に格納できない行はon_errorで読み飛ばされる(self):
+        good = _events()[0].to_json_bytes()
+        bad_context = json.dumps({**json.loads(good), "id": "x1", "context": {"uri": "file:///repo"}}).encode()
+        bad_data = json.dumps({**json.loads(good), "id": "x2", "data": [1]}).encode()
+        stream = io.BytesIO(b"\n".join([good, bad_context, bad_data, good]) + b"\n")
+        errors = []
+        batch = EventBatch.from_stream(stream, on_error="collect", errors=errors)
+        assert len(batch) == 2
+        assert [e.lineno for e in errors] == [2, 3]
+        # 失敗した行は列に何も残さない
+        assert all(len(batch.ints(name)) == 2 for name in ("time", "duration_ms"))
+        assert len(batch.codes("context")[0]) == 2
+
+    def test_不正な行はon_errorに従う(self):
+        stream = io.BytesIO(_events()[0].to_json_bytes() + b"\n{broken\n")
+        errors = []
+        batch = EventBatch.from_stream(stream, on_error="collect", errors=errors)
+        assert len(batch) == 1
+        assert isinstance(errors[0], LineError)
+
+
+class TestEventBatch_絞り込み:
+    """filter() は列の値と時刻範囲で行を選ぶ。"""
+
+    def test_等値条件で絞り込まれる(self, backend):
+        batch = EventBatch.from_events(_events())
+        assert batch.filter(session_id="s1", type="tool.end").ids == ["e1", "e3"]
+
+    def test_値の集合で絞り込まれる(self, backend):
+        batch = EventBatch.from_events(_events())
+        assert batch.filter(tool_name={"Read", "Bash"}, source="cursor").ids == ["e3"]
+
+    def test_Noneは欠損値に一致する(self, backend):
+        batch = EventBatch.from_events(_events())
+        assert batch.filter(status=None).ids == ["e3", "e4"]
+
+    def test_存在しない値には何も一致しない(self, backend):
+        batch = EventBatch.from_events(_events())
+        assert len(batch.filter(source="codex")) == 0
+
+    def test_時刻範囲で絞り込まれる(self, backend):
+        batch = EventBatch.from_events(_events())
+        t = batch.ints("time")
+        assert batch.filter(since=t[1], until=t[3]).ids == ["e2", "e3"]
+
+    def test_絞り込んだバッチも元のイベントに復元できる(self, backend):
+        batch = EventBatch.from_events(_events())
+        assert list(batch.filter(source="cursor")) == _events()[2:]
+
+    def test_未知の列はKeyErrorが発生する(self, backend):
+        with pytest.raises(KeyError):
+            EventBatch.from_events(_events()).filter(model="x")
+
+
+class TestEventBatch_集計:
+    """group_by() は辞書符号化された列ごとに集計する。"""
+
+    def test_行数を数える(self, backend):
+        batch = EventBatch.from_events(_events())
+        assert batch.group_by("session_id") == {"s1": 3, "s2": 1}
+
+    def test_欠損値を除いて合計する(self, backend):
+        batch = EventBatch.from_events(_events())
+        assert batch.group_by("tool_name", "duration_ms", "sum") == {"Bash": 300, "Read": 300}
+
+    def test_平均と最小と最大(self, backend):
+        batch = EventBatch.from_events(_events())
+        assert batch.group_by("source", "duration_ms", "mean") == {"claude-code": 200, "cursor": 200}
+        assert batch.group_by("session_id", "duration_ms", "min") == {"s1": 100, "s2": 300}
+        assert batch.group_by("session_id", "duration_ms", "max") == {"s1": 200, "s2": 300}
+
+    def test_キーの欠損はNoneにまとめられる(self, backend):
+        batch = EventBatch.from_events(_events())
+        assert batch.group_by("status") == {"success": 1, "error": 1, None: 2}
+
+    def test_不明な集計はValueErrorが発生する(self, backend):
+        with pytest.raises(ValueError):
+            EventBatch.from_events(_events()).group_by("source", "duration_ms", "median")
+
+
+class TestEventBatch_エクスポート:
+    """NumPy / Arrow へのエクスポートはバッファを共有する。"""
+
+    def test_to_numpyはバッファを共有する(self):
+        np = pytest.importorskip("numpy")
+        batch = EventBatch.from_events(_events())
+        columns = batch.to_numpy()
+        assert np.shares_memory(columns["duration_ms"], np.frombuffer(batch.ints("duration_ms"), dtype=np.int64))
+        assert list(columns["source_values"]) == ["claude-code", "cursor"]
+
+    def test_to_arrowは辞書配列とnullを持つ(self):
+        pytest.importorskip("pyarrow")
+        record_batch = EventBatch.from_events(_events()).to_arrow()
+        assert record_batch.column("source").to_pylist() == ["claude-code", "claude-code", "cursor", "cursor"]
+        assert record_batch.column("duration_ms").null_count == 1
+
+    def test_NumPyがなければImportErrorが発生する(self, monkeypatch):
+        monkeypatch.setattr(openhook.batch, "_numpy", False)
+        with pytest.raises(ImportError):
+            EventBatch.from_events(_events()).to_numpy()
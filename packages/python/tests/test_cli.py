@@ -0,0 +1,169 @@
+"""openhook コマンド (convert / trace) の並列処理の振る舞いを検証する仕様テスト。"""
+
+import io
+import json
+
+import pytest
+
+from openhook import EventType, OpenHookEvent, iter_events
+from openhook.cli import chunk_ranges, main, partition_of, run
+from openhook.integrations.agent_trace import TraceAggregator
+
+
+def _legacy(path, n=500):
+    with open(path, "w") as f:
+        for i in range(n):
+            f.write(json.dumps({"hook_event_name": "postToolUse", "session_id": f"s{i % 13}", "n": i}) + "\n")
+    return str(path)
+
+
+def _events(path, n=500):
+    events = []
+    for i in range(n):
+        if i % 50 == 49:
+            events.append(OpenHookEvent.create(
+                source="claude-code", type=EventType.SESSION_END, session_id=f"s{i % 13}",
+                event_id=str(i), time="2026-02-23T10:00:00Z",
+            ))
+        else:
+            events.append(OpenHookEvent.create(
+                source="claude-code", type=EventType.FILE_WRITE, session_id=f"s{i % 13}",
+                data={"path": f"f{i % 3}.py", "start_line": i % 40 + 1, "end_line": i % 40 + 2},
+                event_id=str(i), time="2026-02-23T10:00:00Z",
+            ))
+    with open(path, "w") as f:
+        for event in events:
+            f.write(event.to_json() + "\n")
+    return str(path), events
+
+
+def _without_ids(records):
+    return sorted(json.dumps({**r, "id": None}, sort_keys=True) for r in records)
+
+
+class TestChunkRanges:
+    """入力ファイルは行境界で終わるバイト範囲に分割される。"""
+
+    def test_範囲は連続し行を分断しない(self, tmp_path):
+        path = _legacy(tmp_path / "in.ndjson")
+        data = open(path, "rb").read()
+        ranges = chunk_ranges(path, 1000)
+        assert len(ranges) > 5
+        assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+        assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+        assert all(data[end - 1:end] == b"\n" for _, end in ranges)
+
+    def test_空のファイルは範囲を持たない(self, tmp_path):
+        path = tmp_path / "empty.ndjson"
+        path.write_bytes(b"")
+        assert chunk_ranges(str(path), 1000) == []
+
+    def test_パーティションはプロセスをまたいで安定している(self):
+        assert partition_of("sess_abc", 8) == partition_of("sess_abc", 8) < 8
+        assert partition_of("sess_abc", 1) == 0
+
+
+class TestConvert:
+    """convert は並列に処理しても入力順を保って変換する。"""
+
+    def test_出力は入力順で逐次変換と同じ(self, tmp_path):
+        path = _legacy(tmp_path / "in.ndjson")
+        out = tmp_path / "out.ndjson"
+        counters, errors = run("convert", [path], str(out), jobs=2, chunk_size=2000)
+        assert counters == {"lines": 500, "written": 500, "errors": 0} and errors == []
+        events = list(iter_events(open(out, "rb")))
+        assert [e.extensions["legacy_payload"]["n"] for e in events] == list(range(500))
+        assert {e.session_id for e in events} == {f"s{i}" for i in range(13)}
+
+    def test_OpenHookの行はそのまま通す(self, tmp_path):
+        path, events = _events(tmp_path / "in.ndjson", 20)
+        out = tmp_path / "out.ndjson"
+        run("convert", [path], str(out), jobs=1)
+        assert out.read_bytes() == open(path, "rb").read()
+
+    def test_パーティションごとにセッションがまとまり順序が保たれる(self, tmp_path):
+        path = _legacy(tmp_path / "in.ndjson")
+        run("convert", [path], str(tmp_path / "out"), jobs=2, chunk_size=2000, partitions=4)
+        seen = set()
+        for part in sorted((tmp_path / "out").iterdir()):
+            events = list(iter_events(open(part, "rb")))
+            sessions = {e.session_id for e in events}
+            assert not sessions & seen
+            seen |= sessions
+            for session in sessions:
+                ns = [e.extensions["legacy_payload"]["n"] for e in events if e.session_id == session]
+                assert ns == sorted(ns)
+        assert len(seen) == 13
+
+    def test_パーティション指定で出力先がなければValueError(self, tmp_path):
+        with pytest.raises(ValueError):
+            run("convert", [_legacy(tmp_path / "in.ndjson")], None, partitions=2)
+
+
+class TestTrace:
+    """trace は file.write から Agent Trace レコードを作る。"""
+
+    def test_イベントごとのレコード(self, tmp_path):
+        path, events = _events(tmp_path / "in.ndjson")
+        out = tmp_path / "out.ndjson"
+        counters, _ = run("trace", [path], str(out), jobs=2, chunk_size=3000)
+        records = [json.loads(line) for line in open(out)]
+        assert counters["written"] == len(records) == sum(e.type == EventType.FILE_WRITE for e in events)
+        assert [r["files"][0]["path"] for r in records] == [
+            e.data["path"] for e in events if e.type == EventType.FILE_WRITE
+        ]
+
+    def test_集約は逐次のTraceAggregatorと同じ結果になる(self, tmp_path):
+        path, events = _events(tmp_path / "in.ndjson")
+        run("trace", [path], str(tmp_path / "out"), jobs=2, chunk_size=3000, partitions=3, aggregate=True)
+        records = [json.loads(line) for part in (tmp_path / "out").iterdir() for line in open(part)]
+        aggregator = TraceAggregator()
+        expected = [r for r in map(aggregator.add, events) if r] + aggregator.flush()
+        assert _without_ids(records) == _without_ids(expected)
+
+
+class TestMain:
+    """CLI は標準出力に書き出し、不正な行があれば終了コード1を返す。"""
+
+    def test_標準出力に書き出す(self, tmp_path):
+        path, _ = _events(tmp_path / "in.ndjson", 10)
+        stdout = io.BytesIO()
+        assert main(["trace", path, "-j", "1"], stdout=stdout) == 0
+        assert len(stdout.getvalue().splitlines()) == 10
+
+    def test_不正な行は報告され終了コード1(self, tmp_path, capsys):
+        path = tmp_path / "in.ndjson"
+        path.write_text('{"hook_event_name": "stop", "sessionId": "s"}\nnot-json\n')
+        assert main(["convert", str(path), "-o", str(tmp_path / "out.ndjson")]) == 1
+        err = capsys.readouterr().err
+        assert "byte 46" in err and "1 malformed" in err
+
+    @pytest.mark.parametrize("aggregate", [[], ["--aggregate"]])
+    def test_形の合わないJSONの行は数えられ残りは処理される(self, tmp_path, capsys, aggregate):
+        def envelope(event_id, session_id, data):
+            return json.dumps({
+                "openhook": "0.1", "id": event_id, "source": "x", "type": "file.write",
+                "time": "2026-02-23T10:00:00Z", "session_id": session_id, "data": data,
+            })
+
+        path = tmp_path / "in.ndjson"
+        path.write_text("\n".join([
+            envelope("a", 7, {"path": "a.py"}),
+            envelope("b", "s", [1]),
+            envelope("c", "s", {"path": {"x": 1}}),
+            envelope("d", "s", {"path": "b.py", "start_line": "x"}),
+            envelope("e", "s", {"path": "c.py"}),
+        ]) + "\n")
+        out = tmp_path / "out"
+        args = ["trace", str(path), "-j", "2", "--partitions", "2", "-o", str(out), *aggregate]
+        assert main(args) == 1
+        err = capsys.readouterr().err
+        assert "AttributeError" in err
+        records = [json.loads(line) for part in out.iterdir() for line in open(part)]
+        if aggregate:
+            # 集約では path がオブジェクトの行も畳み込めずに数えられる
+            assert "2 malformed" in err
+            assert sorted(f["path"] for r in records for f in r["files"]) == ["a.py", "b.py", "c.py"]
+        else:
+            assert "1 malformed" in err
+            assert len(records) == 4
@@ -0,0 +1,117 @@
+"""JSONバックエンド切り替えとバイト列APIの振る舞いを検証する仕様テスト。"""
+
+import io
+import json
+
+import pytest
+
+from openhook import EventType, OpenHookEvent, codec
+
+
+def _installed_backends():
+    names = []
+    for name in codec.BACKENDS:
+        try:
+            codec._load(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+@pytest.fixture(params=_installed_backends())
+def backend(request):
+    previous = codec.get_backend()
+    codec.set_backend(request.param)
+    yield request.param
+    codec.set_backend(previous)
+
+
+def _event(**overrides):
+    fields = dict(
+        source="claude-code",
+        type=EventType.TOOL_END,
+        session_id="sess_123",
+        data={"tool_name": "Bash", "output": "日本語 ✓  ", "n": 1.5, "ok": True, "none": None},
+        context="file:///home/ユーザー",
+        extensions={"vendor": {"nested": [1, 2, 3]}},
+        event_id="id-001",
+        time="2026-02-23T10:00:00Z",
+    )
+    fields.update(overrides)
+    return OpenHookEvent.create(**fields)
+
+
+class TestCodec_バックエンド選択:
+    """set_backend() はデコードに使うJSONバックエンドを切り替える。"""
+
+    def test_引数なしでは利用可能なバックエンドが選ばれる(self):
+        previous = codec.get_backend()
+        try:
+            assert codec.set_backend() == _installed_backends()[0]
+        finally:
+            codec.set_backend(previous)
+
+    def test_未知のバックエンド名はValueErrorが発生する(self):
+        with pytest.raises(ValueError):
+            codec.set_backend("simdjson")
+
+    def test_未知の環境変数は最初のデコードでImportErrorになる(self, monkeypatch):
+        from openhook import iter_events
+
+        monkeypatch.setenv("OPENHOOK_JSON_BACKEND", "simdjson")
+        monkeypatch.setattr(codec, "loads", codec._select)
+        monkeypatch.setattr(codec, "_backend", None)
+        stream = io.StringIO(_event().to_json() + "\n")
+        with pytest.raises(ImportError, match="OPENHOOK_JSON_BACKEND"):
+            list(iter_events(stream, on_error="skip"))
+
+    def test_環境変数のバックエンドが最初のデコードで選ばれる(self, monkeypatch):
+        monkeypatch.setenv("OPENHOOK_JSON_BACKEND", "json")
+        monkeypatch.setattr(codec, "loads", codec._select)
+        monkeypatch.setattr(codec, "_backend", None)
+        assert codec.loads("[1]") == [1]
+        assert codec.loads is json.loads and codec.get_backend() == "json"
+
+    def test_どのバックエンドでも同じイベントが復元される(self, backend):
+        e = _event()
+        assert OpenHookEvent.from_json(e.to_json()) == e
+        assert OpenHookEvent.from_json_bytes(e.to_json_bytes()) == e
+
+    def test_どのバックエンドでも不正なJSONはValueErrorになる(self, backend):
+        with pytest.raises(ValueError):
+            OpenHookEvent.from_json_bytes(b"not-json")
+
+
+class TestOpenHookEvent_to_json互換性:
+    """to_json() の出力は json.dumps(to_dict()) とバイト単位で一致する。"""
+
+    def test_非ASCIIを含むイベントで一致する(self):
+        e = _event()
+        assert e.to_json() == json.dumps(e.to_dict())
+
+    def test_省略可能なフィールドがなくても一致する(self):
+        e = _event(data=None, context=None, extensions=None)
+        assert e.to_json() == json.dumps(e.to_dict())
+
+    def test_文字列以外のエンベロープ値でも一致する(self):
+        e = OpenHookEvent(
+            openhook="0.1", id=42, source="x", type=EventType.SESSION_END,
+            time="t", session_id="s",
+        )
+        assert e.to_json() == json.dumps(e.to_dict())
+
+    def test_to_json_bytesはto_jsonのバイト列である(self):
+        e = _event()
+        assert e.to_json_bytes() == e.to_json().encode()
+
+
+class TestOpenHookEvent_emitバイナリ:
+    """emit() は下層にバイナリバッファがあればバイト列を直接書き込む。"""
+
+    def test_TextIOWrapperにはバッファ経由で1行書き込まれる(self):
+        raw = io.BytesIO()
+        out = io.TextIOWrapper(raw, encoding="utf-8")
+        out.write("before\n")
+        _event().emit(file=out)
+        assert raw.getvalue() == b"before\n" + _event().to_json_bytes() + b"\n"
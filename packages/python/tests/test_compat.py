@@ -1,6 +1,14 @@
 """レガシーペイロード変換の振る舞いを検証する仕様テスト。"""
 
-from openhook import EventType, from_legacy, is_openhook
+import hashlib
+import io
+import json
+import time
+
+import pytest
+
+from openhook import EventType, RawJSON, from_legacy, from_legacy_many, is_openhook, iter_events
+from openhook.compat import _now_batches
 
 
 # ---------------------------------------------------------------------------
@@ -164,3 +172,149 @@ class TestFromLegacy_データ保全:
     def test_transcript_pathはdataに移される(self):
         e = from_legacy({"sessionId": "s1", "transcriptPath": "/home/.claude/sess.jsonl"})
         assert e.data["transcript_path"] == "/home/.claude/sess.jsonl"
+
+
+# ---------------------------------------------------------------------------
+# from_legacy_many()
+# ---------------------------------------------------------------------------
+
+_LEGACY_PAYLOADS = [
+    {"sessionId": "s1", "transcriptPath": "/t.jsonl", "cwd": "/home/user"},
+    {"conversation_id": "conv_1"},
+    {"taskId": "task_1"},
+    {"thread-id": "t-1"},
+    {"hook_event_name": "postToolUse", "session_id": "s2", "tool_name": "Bash"},
+    {"hook_event_name": "preToolUse", "session_id": "s3", "tool_name": "Edit"},
+    {"source_tool": "kiro", "session_id": "s4"},
+    {"source_tool": "", "sessionId": "s5"},
+    {"session": {"id": "nested"}, "transcript": {"path": "/n.jsonl"}},
+    {"session": "not-a-dict"},
+    {"unknown_field": "value"},
+]
+
+
+class TestFromLegacyMany:
+    """from_legacy_many() は from_legacy() と同じ結果を遅延生成する。"""
+
+    def test_同じidとtimeを与えるとfrom_legacyと一致する(self):
+        ids = [f"id-{i}" for i in range(len(_LEGACY_PAYLOADS))]
+        expected = [
+            from_legacy(p, event_id=i, time="2026-01-01T00:00:00Z")
+            for p, i in zip(_LEGACY_PAYLOADS, ids)
+        ]
+        actual = list(from_legacy_many(
+            _LEGACY_PAYLOADS, ids=ids, times=["2026-01-01T00:00:00Z"] * len(ids)
+        ))
+        assert actual == expected
+
+    def test_同じ形のペイロードでも値に応じたsession_idになる(self):
+        events = list(from_legacy_many([{"sessionId": "a"}, {"sessionId": "b"}]))
+        assert [e.session_id for e in events] == ["a", "b"]
+
+    def test_source_toolは値が空なら形に基づいて判定される(self):
+        events = list(from_legacy_many([{"source_tool": "kiro"}, {"source_tool": ""}]))
+        assert [e.source for e in events] == ["kiro", "unknown"]
+
+    def test_既定のidは一意なUUIDになる(self):
+        events = list(from_legacy_many([{"sessionId": "s"}] * 300))
+        ids = {e.id for e in events}
+        assert len(ids) == 300
+        assert all(len(i) == 36 and i[14] == "4" for i in ids)
+
+    def test_時間が経つと時刻を読み直す(self):
+        now = [0.0]
+        times = _now_batches(clock=lambda: now[0])
+        first = next(times)
+        assert next(times) == first
+        time.sleep(0.001)
+        assert next(times) == first
+        now[0] = 0.002
+        assert next(times) != first
+
+    def test_イテレータとして遅延評価される(self):
+        def payloads():
+            yield {"sessionId": "a"}
+            raise AssertionError("consumed too far")
+
+        events = from_legacy_many(payloads())
+        assert next(events).session_id == "a"
+
+
+# ---------------------------------------------------------------------------
+# from_legacy() — legacy_payload の保持ポリシー
+# ---------------------------------------------------------------------------
+
+_BIG_PAYLOAD = {"hook_event_name": "postToolUse", "session_id": "s1", "tool_output": "x" * 10_000}
+
+
+class TestFromLegacy_保持ポリシー:
+    """retain は extensions.legacy_payload に何を残すかを決める。"""
+
+    def test_既定では元のペイロードがそのまま保存される(self):
+        e = from_legacy(_BIG_PAYLOAD)
+        assert e.extensions["legacy_payload"] is _BIG_PAYLOAD
+
+    def test_keys_onlyではキーの一覧だけが残る(self):
+        e = from_legacy(_BIG_PAYLOAD, retain="keys-only")
+        assert e.extensions["legacy_payload"] == {
+            "retention": "keys-only",
+            "keys": ["hook_event_name", "session_id", "tool_output"],
+        }
+
+    def test_digestではハッシュとサイズが残る(self):
+        raw = json.dumps(_BIG_PAYLOAD).encode()
+        legacy = from_legacy(_BIG_PAYLOAD, retain="digest").extensions["legacy_payload"]
+        assert legacy["sha256"] == hashlib.sha256(raw).hexdigest()
+        assert legacy["size"] == len(raw)
+
+    def test_truncatedでは上限を超えると先頭だけが残る(self):
+        legacy = from_legacy(_BIG_PAYLOAD, retain="truncated", max_bytes=100).extensions["legacy_payload"]
+        assert legacy["retention"] == "truncated"
+        assert len(legacy["prefix"]) == 100
+
+    def test_truncatedでは上限内ならペイロードがそのまま残る(self):
+        small = {"sessionId": "s1"}
+        assert from_legacy(small, retain="truncated").extensions["legacy_payload"] is small
+
+    def test_rawでは元のバイト列がto_jsonにそのまま書き出される(self):
+        raw = b'{"sessionId":"s1",  "note":"\xe6\x97\xa5\xe6\x9c\xac"}'
+        e = from_legacy(json.loads(raw), retain="raw", raw=raw)
+        assert isinstance(e.extensions["legacy_payload"], RawJSON)
+        assert raw in e.to_json_bytes()
+        assert json.loads(e.to_json())["extensions"]["legacy_payload"] == json.loads(raw)
+
+    def test_rawの末尾の改行はNDJSONの行を壊さない(self):
+        raw = b'{"sessionId": "s1"}\n'
+        buf = io.StringIO()
+        from_legacy(json.loads(raw), retain="raw", raw=raw).emit(buf)
+        assert buf.getvalue().count("\n") == 1
+        (event,) = iter_events(io.StringIO(buf.getvalue()))
+        assert event.extensions["legacy_payload"] == {"sessionId": "s1"}
+
+    def test_rawが複数行のJSONなら1行に詰められる(self):
+        raw = b'{\n  "sessionId": "s1",\n  "n": [1, 2]\n}\n'
+        e = from_legacy(json.loads(raw), retain="raw", raw=raw)
+        assert "\n" not in e.to_json()
+        assert json.loads(e.to_json())["extensions"]["legacy_payload"] == json.loads(raw)
+
+    def test_rawが不正なJSONならValueErrorが発生する(self):
+        with pytest.raises(ValueError):
+            from_legacy({"sessionId": "s1"}, retain="raw", raw=b"{not json")
+
+    def test_rawのto_dictは元のオブジェクトを返す(self):
+        raw = b'{"sessionId":"s1",  "n":1}'
+        e = from_legacy(json.loads(raw), retain="raw", raw=raw)
+        assert e.to_dict()["extensions"]["legacy_payload"] == {"sessionId": "s1", "n": 1}
+        assert json.loads(json.dumps(e.to_dict())) == json.loads(e.to_json())
+
+    def test_rawでバイト列がないとValueErrorが発生する(self):
+        with pytest.raises(ValueError):
+            from_legacy({"sessionId": "s1"}, retain="raw")
+
+    def test_未知のポリシーはValueErrorが発生する(self):
+        with pytest.raises(ValueError):
+            from_legacy({"sessionId": "s1"}, retain="none")
+
+    def test_from_legacy_manyでもポリシーを指定できる(self):
+        (e,) = from_legacy_many([_BIG_PAYLOAD], retain="keys-only")
+        assert e.extensions["legacy_payload"]["retention"] == "keys-only"
@@ -0,0 +1,132 @@
+"""envelope id による重複排除の振る舞いを検証する仕様テスト。"""
+
+import io
+
+import pytest
+
+from openhook import EventType, OpenHookEvent
+from openhook.dedup import DedupFilter
+
+
+def _event(event_id):
+    return OpenHookEvent.create(source="x", type=EventType.SESSION_END, session_id="s1", event_id=event_id)
+
+
+class TestDedupFilter_重複排除:
+    """同じ id のイベントは2回目以降が取り除かれる。"""
+
+    def test_イテレーターから重複が取り除かれる(self):
+        dedup = DedupFilter()
+        events = [_event(i) for i in ("a", "b", "a", "c", "b")]
+        assert [e.id for e in dedup(events)] == ["a", "b", "c"]
+        assert dedup.counters["duplicates"] == 2
+
+    def test_is_duplicateは2回目にTrueを返す(self):
+        dedup = DedupFilter()
+        assert dedup.is_duplicate(_event("a")) is False
+        assert dedup.is_duplicate(_event("a")) is True
+
+    def test_ウィンドウを過ぎたidは新しいイベントとして扱われる(self, clock):
+        dedup = DedupFilter(window=10, clock=clock)
+        dedup.seen("a")
+        clock.now = 11
+        assert dedup.seen("a") is False
+
+    def test_重複の受信でウィンドウが延長される(self, clock):
+        dedup = DedupFilter(window=10, clock=clock)
+        dedup.seen("a")
+        clock.now = 8
+        dedup.seen("a")
+        clock.now = 15
+        assert dedup.seen("a") is True
+
+    def test_max_idsを超えると古いidが忘れられる(self):
+        dedup = DedupFilter(max_ids=2)
+        for i in ("a", "b", "c"):
+            dedup.seen(i)
+        assert len(dedup) == 2
+        assert "a" not in dedup
+        assert dedup.counters["evicted"] == 1
+
+    def test_空のidは常に通過する(self):
+        dedup = DedupFilter()
+        assert dedup.seen("") is False
+        assert dedup.seen("") is False
+
+    def test_不正な偽陽性率はValueErrorが発生する(self):
+        with pytest.raises(ValueError):
+            DedupFilter(bloom_capacity=100, false_positive_rate=0)
+
+
+class TestDedupFilter_Bloomフィルター:
+    """LRU から溢れた id も Bloom フィルターで検出される。"""
+
+    def test_LRUから追い出されたidも重複と判定される(self):
+        dedup = DedupFilter(max_ids=10, bloom_capacity=1_000)
+        for i in range(100):
+            dedup.seen(f"id{i}")
+        assert dedup.seen("id0") is True
+        assert dedup.counters["bloom_duplicates"] == 1
+
+    def test_偽陽性率は指定値程度に収まる(self):
+        dedup = DedupFilter(max_ids=1, bloom_capacity=10_000, false_positive_rate=0.01)
+        for i in range(10_000):
+            dedup.seen(f"seen{i}")
+        false_positives = sum(f"new{i}" in dedup for i in range(10_000))
+        assert false_positives < 300
+
+    def test_メモリ上限で世代あたりのサイズが制限される(self):
+        dedup = DedupFilter(bloom_capacity=1_000_000, max_bloom_bytes=4096)
+        assert dedup.bloom_bytes == 4096
+
+    def test_世代は容量に達すると入れ替わり2世代まで保持される(self):
+        dedup = DedupFilter(max_ids=1, bloom_capacity=100)
+        for i in range(250):
+            dedup.seen(f"id{i}")
+        assert len(dedup._blooms) == 2
+        assert dedup.seen("id249") is True
+        assert "id0" not in dedup
+
+    def test_2ウィンドウ以上経過すると全世代が破棄される(self, clock):
+        dedup = DedupFilter(window=10, max_ids=1, bloom_capacity=100, clock=clock)
+        dedup.seen("a")
+        dedup.seen("b")
+        clock.now = 25
+        assert dedup.seen("a") is False
+
+
+class TestDedupFilter_永続化:
+    """save() と load() で再起動後も重複排除が続く。"""
+
+    def test_保存したidは読み込み後も重複と判定される(self, tmp_path):
+        dedup = DedupFilter()
+        dedup.seen("a")
+        path = tmp_path / "dedup.bin"
+        dedup.save(path)
+        assert DedupFilter.load(path).seen("a") is True
+
+    def test_Bloomフィルターも復元される(self):
+        buf = io.BytesIO()
+        dedup = DedupFilter(max_ids=1, bloom_capacity=1_000)
+        for i in range(10):
+            dedup.seen(f"id{i}")
+        dedup.save(buf)
+        buf.seek(0)
+        loaded = DedupFilter.load(buf, max_ids=1, bloom_capacity=1_000)
+        assert loaded.seen("id0") is True
+
+    def test_経過時間はウィンドウに対して保存される(self, clock):
+        buf = io.BytesIO()
+        dedup = DedupFilter(window=10, clock=clock)
+        dedup.seen("a")
+        clock.now = 8
+        dedup.save(buf)
+        buf.seek(0)
+        clock.now = 1000
+        loaded = DedupFilter.load(buf, window=10, clock=clock)
+        clock.now = 1003
+        assert loaded.seen("a") is False
+
+    def test_不正なファイルはValueErrorが発生する(self):
+        with pytest.raises(ValueError):
+            DedupFilter.load(io.BytesIO(b"garbage"))
@@ -0,0 +1,189 @@
+""".openhook.json フックディスパッチャの振る舞いを検証する仕様テスト。"""
+
+import json
+import shlex
+import sys
+from io import BytesIO
+
+import pytest
+
+from openhook import EventType, OpenHookEvent, ValidationError
+from openhook.dispatch import Dispatcher, HookConfig, find_config, load_config, main
+
+
+def _py(code: str) -> str:
+    """Return a shell command that runs ``code`` with the current interpreter."""
+    return f"{shlex.quote(sys.executable)} -c {shlex.quote(code)}"
+
+
+def _append_stdin(out) -> str:
+    return _py(
+        "import sys\n"
+        f"with open({str(out)!r}, 'ab') as f:\n"
+        "    f.write(sys.stdin.buffer.read())\n"
+    )
+
+
+def _write_config(tmp_path, hooks) -> object:
+    path = tmp_path / ".openhook.json"
+    path.write_text(json.dumps({"openhook": "0.1", "hooks": hooks}))
+    return path
+
+
+def _event(type=EventType.SESSION_END, **kwargs):
+    return OpenHookEvent.create(source="test", type=type, session_id="s1", **kwargs)
+
+
+class TestLoadConfig:
+    """load_config() は .openhook.json を読み込みキャッシュする。"""
+
+    def test_eventsを省略すると全イベントを購読する(self, tmp_path):
+        config = load_config(_write_config(tmp_path, [{"command": "true"}]))
+        assert config.hooks[0].matches("tool.start")
+
+    def test_asyncフィールドが読み込まれる(self, tmp_path):
+        config = load_config(_write_config(tmp_path, [{"command": "true", "async": True}]))
+        assert config.hooks[0].is_async is True
+
+    def test_変更がなければキャッシュされた設定を返す(self, tmp_path):
+        path = _write_config(tmp_path, [{"command": "true"}])
+        assert load_config(path) is load_config(path)
+
+    def test_親ディレクトリの設定ファイルが発見される(self, tmp_path):
+        path = _write_config(tmp_path, [])
+        child = tmp_path / "a" / "b"
+        child.mkdir(parents=True)
+        assert find_config(child) == path.resolve()
+
+    def test_commandがないフックはValidationErrorが発生する(self, tmp_path):
+        with pytest.raises(ValidationError):
+            load_config(_write_config(tmp_path, [{"events": ["*"]}]))
+
+    @pytest.mark.parametrize("field", ["async", "persistent"])
+    def test_真偽値でないフラグはValidationErrorが発生する(self, tmp_path, field):
+        with pytest.raises(ValidationError):
+            load_config(_write_config(tmp_path, [{"command": "true", field: "false"}]))
+
+
+class TestDispatcher_同期フック:
+    """同期フックはイベントJSONをstdinに受け取り、終了コードが返される。"""
+
+    def test_購読しているイベントがstdinに渡される(self, tmp_path):
+        out = tmp_path / "out"
+        config = load_config(_write_config(tmp_path, [
+            {"command": _append_stdin(out), "events": ["session.end"]},
+        ]))
+        event = _event()
+        with Dispatcher(config) as d:
+            (result,) = d.dispatch(event)
+        assert result.returncode == 0
+        assert OpenHookEvent.from_json(out.read_bytes()) == event
+
+    def test_購読していないイベントでは実行されない(self, tmp_path):
+        out = tmp_path / "out"
+        config = load_config(_write_config(tmp_path, [
+            {"command": _append_stdin(out), "events": ["session.end"]},
+        ]))
+        with Dispatcher(config) as d:
+            assert d.dispatch(_event(type=EventType.TOOL_START)) == []
+        assert not out.exists()
+
+    def test_失敗した終了コードが返される(self, tmp_path):
+        config = HookConfig.from_dict({"openhook": "0.1", "hooks": [{"command": "exit 3"}]})
+        with Dispatcher(config) as d:
+            assert d.dispatch(_event())[0].returncode == 3
+
+
+    def test_タイムアウトしたフックは失敗として返される(self):
+        config = HookConfig.from_dict({"openhook": "0.1", "hooks": [
+            {"command": _py("import time; time.sleep(5)")}, {"command": "true"},
+        ]})
+        with Dispatcher(config, timeout=0.2) as d:
+            slow, fast = d.dispatch(_event())
+        assert slow.timed_out and slow.failed
+        assert fast.returncode == 0 and not fast.failed
+        assert d.counters["timeouts"] == 1
+
+
+class TestDispatcher_非同期フック:
+    """async フックはプールで実行され、close() で完了を待つ。"""
+
+    def test_closeまでにすべて実行される(self, tmp_path):
+        out = tmp_path / "out"
+        config = load_config(_write_config(tmp_path, [
+            {"command": _py(f"open({str(out)!r}, 'a').write('x')"), "async": True},
+        ]))
+        with Dispatcher(config, max_workers=2, max_pending=2) as d:
+            for _ in range(5):
+                assert d.dispatch(_event())[0].returncode is None
+        assert out.read_text() == "xxxxx"
+
+    def test_失敗はon_async_failureに渡される(self):
+        failures = []
+        config = HookConfig.from_dict({"openhook": "0.1", "hooks": [
+            {"command": "exit 4", "async": True},
+            {"command": _py("import time; time.sleep(5)"), "async": True},
+            {"command": "true", "async": True},
+        ]})
+        with Dispatcher(config, timeout=0.2, on_async_failure=lambda r, exc: failures.append((r, exc))) as d:
+            d.dispatch(_event())
+        assert sorted((r.returncode, r.timed_out, exc) for r, exc in failures) == [(-9, True, None), (4, False, None)]
+        assert d.counters["async_failures"] == 2
+
+
+class TestDispatcher_常駐フック:
+    """persistent フックは1プロセスのstdinにNDJSONで流し込まれる。"""
+
+    def test_全イベントが1つのプロセスに届く(self, tmp_path):
+        out = tmp_path / "out"
+        config = load_config(_write_config(tmp_path, [
+            {"command": _append_stdin(out), "persistent": True},
+        ]))
+        events = [_event(event_id=str(i)) for i in range(10)]
+        with Dispatcher(config) as d:
+            for e in events:
+                d.dispatch(e)
+        lines = out.read_bytes().splitlines()
+        assert [OpenHookEvent.from_json(line).id for line in lines] == [str(i) for i in range(10)]
+
+
+class TestMain:
+    """CLI は stdin の NDJSON を設定されたフックに配送する。"""
+
+    def test_NDJSONの各イベントが配送される(self, tmp_path):
+        out = tmp_path / "out"
+        path = _write_config(tmp_path, [{"command": _py(f"open({str(out)!r}, 'a').write('x')")}])
+        stdin = BytesIO(b"".join(_event().to_json_bytes() + b"\n" for _ in range(3)))
+        assert main(["-c", str(path)], stdin=stdin) == 0
+        assert out.read_text() == "xxx"
+
+    def test_不正な行があると終了コード1を返す(self, tmp_path, capsys):
+        path = _write_config(tmp_path, [])
+        assert main(["-c", str(path)], stdin=BytesIO(b"not-json\n")) == 1
+        assert "line 1" in capsys.readouterr().err
+
+    def test_タイムアウトは報告され終了コード1(self, tmp_path, capsys):
+        path = _write_config(tmp_path, [{"command": _py("import time; time.sleep(5)")}])
+        stdin = BytesIO(_event().to_json_bytes() + b"\n")
+        assert main(["-c", str(path), "--timeout", "0.2"], stdin=stdin) == 1
+        assert "timed out" in capsys.readouterr().err
+
+    def test_同期フックの失敗は報告され終了コード1(self, tmp_path, capsys):
+        path = _write_config(tmp_path, [{"command": "exit 3"}])
+        stdin = BytesIO(_event().to_json_bytes() + b"\n")
+        assert main(["-c", str(path)], stdin=stdin) == 1
+        assert "exited with 3" in capsys.readouterr().err
+
+    def test_不正な設定ファイルは1行で報告され終了コード1(self, tmp_path, capsys):
+        path = tmp_path / ".openhook.json"
+        path.write_text("{not json")
+        assert main(["-c", str(path)], stdin=BytesIO()) == 1
+        err = capsys.readouterr().err
+        assert err.startswith("openhook.dispatch: cannot load hook config:")
+        assert err.count("\n") == 1
+
+    def test_asyncフックの失敗は報告され終了コード1(self, tmp_path, capsys):
+        path = _write_config(tmp_path, [{"command": "exit 2", "async": True}])
+        stdin = BytesIO(_event().to_json_bytes() + b"\n")
+        assert main(["-c", str(path)], stdin=stdin) == 1
+        assert "exited with 2" in capsys.readouterr().err
@@ -5,12 +5,20 @@ pytest -v で実行すると仕様書として機能する。
 """
 
 import json
-from io import StringIO
+from io import BytesIO, StringIO
 from pathlib import Path
 
 import pytest
 
-from openhook import EventType, OpenHookEvent, ValidationError, validate
+from openhook import (
+    EventType,
+    LazyEvent,
+    LineError,
+    OpenHookEvent,
+    ValidationError,
+    iter_events,
+    validate,
+)
 
 
 # ---------------------------------------------------------------------------
@@ -298,3 +306,157 @@ class TestOpenHookEvent_emit:
         buf = StringIO()
         e.emit(file=buf)
         assert buf.getvalue().endswith("\n")
+
+
+# ---------------------------------------------------------------------------
+# iter_events()
+# ---------------------------------------------------------------------------
+
+def _ndjson(*payloads) -> str:
+    return "".join(json.dumps(p) + "\n" for p in payloads)
+
+
+_RAW_WITH_ERRORS = (
+    _ndjson(_minimal_payload(id="a"))
+    + "not-json\n"
+    + _ndjson(_minimal_payload(type="foo.bar"), _minimal_payload(id="b"))
+)
+
+
+class TestIterEvents_有効なストリーム:
+    """iter_events() はNDJSONストリームから1行1イベントずつ読み出す。"""
+
+    def test_行ごとにイベントが生成される(self):
+        raw = _ndjson(_minimal_payload(id="a"), _minimal_payload(id="b"))
+        events = list(iter_events(StringIO(raw)))
+        assert [e.id for e in events] == ["a", "b"]
+
+    def test_バイナリストリームも読み込める(self):
+        raw = _ndjson(_minimal_payload(id="a"), _minimal_payload(id="b"))
+        events = list(iter_events(BytesIO(raw.encode())))
+        assert [e.id for e in events] == ["a", "b"]
+
+    def test_チャンク境界が行の途中にあっても復元される(self):
+        raw = _ndjson(_minimal_payload(id="a"), _minimal_payload(id="b"))
+        events = list(iter_events(BytesIO(raw.encode()), chunk_size=7))
+        assert [e.id for e in events] == ["a", "b"]
+
+    def test_chunk_sizeの何倍もある行も線形時間で読み込まれる(self):
+        # 1行 8 MiB を 4 KiB ずつ読む。チャンクごとに連結し直すと数 GB のコピーになる。
+        big = _minimal_payload(id="big", data={"blob": "x" * (8 << 20)})
+        raw = _ndjson(_minimal_payload(id="a"), big, _minimal_payload(id="b")).encode()
+        events = list(iter_events(BytesIO(raw), chunk_size=4096))
+        assert [e.id for e in events] == ["a", "big", "b"]
+        assert len(events[1].data["blob"]) == 8 << 20
+
+    def test_bytesチャンクのイテラブルを受け付ける(self):
+        raw = _ndjson(_minimal_payload(id="a")).encode()
+        chunks = [raw[:10], raw[10:]]
+        assert [e.id for e in iter_events(chunks)] == ["a"]
+
+    def test_末尾に改行がない行も読み込まれる(self):
+        raw = _ndjson(_minimal_payload(id="a")).rstrip("\n")
+        assert [e.id for e in iter_events(StringIO(raw))] == ["a"]
+
+    def test_空行は無視される(self):
+        raw = "\n" + _ndjson(_minimal_payload(id="a")) + "\n\n"
+        assert [e.id for e in iter_events(StringIO(raw))] == ["a"]
+
+    def test_emitの出力をそのまま読み込める(self):
+        buf = StringIO()
+        for i in range(3):
+            OpenHookEvent.create(
+                source="test", type=EventType.TOOL_END, session_id="s1", event_id=str(i)
+            ).emit(file=buf)
+        buf.seek(0)
+        assert [e.id for e in iter_events(buf)] == ["0", "1", "2"]
+
+
+class TestIterEvents_不正な行:
+    """iter_events() は不正な行をon_errorの方針に従って扱う。"""
+
+    def test_デフォルトではLineErrorが発生する(self):
+        with pytest.raises(LineError) as exc_info:
+            list(iter_events(StringIO(_RAW_WITH_ERRORS)))
+        assert exc_info.value.lineno == 2
+
+    def test_LineErrorはValidationErrorとして捕捉できる(self):
+        with pytest.raises(ValidationError):
+            list(iter_events(StringIO(_RAW_WITH_ERRORS)))
+
+    def test_skipでは不正な行が読み飛ばされる(self):
+        events = list(iter_events(StringIO(_RAW_WITH_ERRORS), on_error="skip"))
+        assert [e.id for e in events] == ["a", "b"]
+
+    def test_collectでは行番号付きでエラーが収集される(self):
+        errors = []
+        events = list(iter_events(StringIO(_RAW_WITH_ERRORS), on_error="collect", errors=errors))
+        assert [e.id for e in events] == ["a", "b"]
+        assert [err.lineno for err in errors] == [2, 3]
+
+    def test_JSONオブジェクト以外の行は不正とみなされる(self):
+        with pytest.raises(LineError):
+            list(iter_events(StringIO("[1, 2]\n")))
+
+    def test_collectでerrorsを省略するとValueErrorが発生する(self):
+        with pytest.raises(ValueError):
+            list(iter_events(StringIO(""), on_error="collect"))
+
+    def test_未知のon_errorはValueErrorが発生する(self):
+        with pytest.raises(ValueError):
+            list(iter_events(StringIO(""), on_error="ignore"))
+
+
+# ---------------------------------------------------------------------------
+# LazyEvent
+# ---------------------------------------------------------------------------
+
+class TestLazyEvent:
+    """LazyEvent はエンベロープのみを保持し、dataとextensionsを遅延デコードする。"""
+
+    def _raw(self):
+        return json.dumps(_minimal_payload(
+            data={"transcript_path": "/tmp/t.jsonl"},
+            context="file:///home",
+            extensions={"vendor": "x"},
+        ))
+
+    def test_エンベロープのフィールドが読み取れる(self):
+        e = LazyEvent.from_json(self._raw())
+        assert e.source == "claude-code"
+        assert e.type == EventType.SESSION_END
+        assert e.session_id == "sess_123"
+        assert e.context == "file:///home"
+
+    def test_dataはアクセスするまでデコードされない(self):
+        e = LazyEvent.from_json(self._raw())
+        assert e._data is None
+        assert e.data == {"transcript_path": "/tmp/t.jsonl"}
+        assert e.extensions == {"vendor": "x"}
+
+    def test___dict__を持たない(self):
+        assert not hasattr(LazyEvent.from_json(self._raw()), "__dict__")
+
+    def test_transcript_pathなどのアクセサが使える(self):
+        e = LazyEvent.from_json(self._raw())
+        assert e.transcript_path == Path("/tmp/t.jsonl")
+        assert e.is_trace is True
+        assert e.is_metric is True
+
+    def test_materializeでOpenHookEventと等価になる(self):
+        raw = self._raw()
+        assert LazyEvent.from_json(raw).materialize() == OpenHookEvent.from_json(raw)
+
+    def test_to_jsonは元のJSONをそのまま返す(self):
+        raw = self._raw()
+        assert LazyEvent.from_json(raw.encode()).to_json() == raw
+
+    def test_不正なペイロードはValidationErrorが発生する(self):
+        with pytest.raises(ValidationError):
+            LazyEvent.from_json(json.dumps(_minimal_payload(type="foo.bar")))
+
+    def test_iter_eventsでlazyを指定するとLazyEventが生成される(self):
+        raw = _ndjson(_minimal_payload(id="a", data={"k": 1}))
+        (e,) = iter_events(BytesIO(raw.encode()), lazy=True)
+        assert isinstance(e, LazyEvent)
+        assert e.data == {"k": 1}
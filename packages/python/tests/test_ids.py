@@ -0,0 +1,156 @@
+"""イベント id 生成器 (UUID v4 / v7) の振る舞いを検証する仕様テスト。"""
+
+import os
+import subprocess
+import sys
+import uuid
+
+import pytest
+
+from openhook import EventType, OpenHookEvent, from_legacy, from_legacy_many, ids
+from openhook.ids import UUID4Generator, UUID7Generator, set_id_generator, uuid7_bounds, uuid7_time_ms
+from openhook.timestamps import parse_time
+
+
+@pytest.fixture
+def restore_generator():
+    yield
+    set_id_generator(None)
+
+
+class TestUUID4Generator:
+    """既定の生成器は乱数をまとめて読み出す UUID v4 を返す。"""
+
+    def test_UUID_v4を返す(self):
+        generator = UUID4Generator()
+        for _ in range(100):
+            value = uuid.UUID(generator())
+            assert value.version == 4 and value.variant == uuid.RFC_4122
+
+    def test_乱数はまとめて読み出される(self, monkeypatch):
+        calls = []
+        urandom = os.urandom
+        monkeypatch.setattr(os, "urandom", lambda n: calls.append(n) or urandom(n))
+        generator = UUID4Generator(batch_size=64)
+        values = {generator() for _ in range(65)}
+        assert len(values) == 65
+        assert calls == [1024, 1024]
+
+    def test_createの既定のidはUUID_v4(self):
+        event = OpenHookEvent.create(source="x", type=EventType.SESSION_END, session_id="s")
+        assert uuid.UUID(event.id).version == 4
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="fork is not available")
+    def test_fork後の子プロセスは親と同じidを返さない(self):
+        generator = UUID4Generator()
+        generator()
+        read, write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.write(write, generator().encode())
+            os._exit(0)
+        os.close(write)
+        os.waitpid(pid, 0)
+        child = os.read(read, 64).decode()
+        os.close(read)
+        assert child != generator()
+
+
+class TestUUID7Generator:
+    """UUID v7 は時刻順に並び、同じプロセス内では単調増加する。"""
+
+    def test_UUID_v7を返し時刻を復元できる(self, clock):
+        clock.now = parse_time("2026-02-23T10:00:00.123Z")
+        value = UUID7Generator(clock=clock)()
+        parsed = uuid.UUID(value)
+        assert parsed.version == 7 and parsed.variant == uuid.RFC_4122
+        assert uuid7_time_ms(value) == clock.now // 1_000_000
+
+    def test_同じミリ秒内でも単調増加する(self, clock):
+        clock.now = parse_time("2026-02-23T10:00:00Z")
+        generator = UUID7Generator(clock=clock)
+        values = [generator() for _ in range(5000)]
+        assert values == sorted(values) and len(set(values)) == 5000
+
+    def test_カウンターが尽きると時刻を1ミリ秒進める(self, clock):
+        clock.now = parse_time("2026-02-23T10:00:00Z")
+        generator = UUID7Generator(clock=clock)
+        last = [generator() for _ in range(5000)][-1]
+        assert uuid7_time_ms(last) == clock.now // 1_000_000 + 1
+
+    def test_時計が戻っても単調増加する(self, clock):
+        clock.now = parse_time("2026-02-23T10:00:01Z")
+        generator = UUID7Generator(clock=clock)
+        first = generator()
+        clock.now -= 1_000_000_000
+        assert generator() > first
+
+    def test_v4のidを復号するとValueError(self):
+        with pytest.raises(ValueError):
+            uuid7_time_ms(str(uuid.uuid4()))
+
+    def test_時刻範囲をidの範囲に変換できる(self, clock):
+        clock.now = parse_time("2026-02-23T09:59:59.999Z")
+        generator = UUID7Generator(clock=clock)
+        before = generator()
+        clock.now = parse_time("2026-02-23T10:00:00Z")
+        inside = generator()
+        clock.now = parse_time("2026-02-23T11:00:00Z")
+        after = generator()
+        lo, hi = uuid7_bounds("2026-02-23T10:00:00Z", "2026-02-23T11:00:00Z")
+        assert not lo <= before < hi
+        assert lo <= inside < hi
+        assert not lo <= after < hi
+
+    def test_ミリ秒未満のuntilまでに作られたidも範囲に入る(self, clock):
+        clock.now = parse_time("2026-02-23T10:00:00.000200Z")
+        inside = UUID7Generator(clock=clock)()
+        lo, hi = uuid7_bounds("2026-02-23T10:00:00Z", "2026-02-23T10:00:00.000500Z")
+        assert lo <= inside < hi
+
+    def test_基底クラスは直接作れない(self):
+        with pytest.raises(TypeError):
+            ids._BatchedEntropy()
+
+
+class TestSetIdGenerator:
+    """id 生成器は差し替えられ、create と from_legacy に反映される。"""
+
+    def test_uuid7を選ぶとcreateとfrom_legacyのidがv7になる(self, restore_generator):
+        set_id_generator("uuid7")
+        event = OpenHookEvent.create(source="x", type=EventType.SESSION_END, session_id="s")
+        legacy = from_legacy({"hook_event_name": "stop", "sessionId": "s"})
+        many = list(from_legacy_many([{"hook_event_name": "stop", "sessionId": "s"}] * 3))
+        assert all(uuid.UUID(e.id).version == 7 for e in [event, legacy, *many])
+        assert event.id < legacy.id < many[0].id < many[1].id < many[2].id
+
+    def test_任意の関数を使える(self, restore_generator):
+        counter = iter(range(100))
+        set_id_generator(lambda: f"evt-{next(counter)}")
+        assert OpenHookEvent.create(source="x", type=EventType.SESSION_END, session_id="s").id == "evt-0"
+        assert ids.new_id() == "evt-1"
+
+    def test_不明な生成器はValueError(self):
+        with pytest.raises(ValueError):
+            set_id_generator("uuid1")
+
+    def test_環境変数で選べる(self):
+        code = "from openhook import ids; import uuid; print(uuid.UUID(ids.new_id()).version)"
+        env = {**os.environ, "OPENHOOK_ID_GENERATOR": "uuid7", "PYTHONPATH": os.pathsep.join(sys.path)}
+        out = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+        assert out.stdout.strip() == "7"
+
+    def test_最初の呼び出し前に取り出したnew_idも同じ生成器を使う(self):
+        code = (
+            "from openhook import ids\n"
+            "from openhook.ids import new_id\n"
+            "got = [new_id() for _ in range(200)]\n"
+            "generator = ids.new_id\n"
+            "new_id()\n"
+            "print(ids.new_id is generator, got == sorted(got), len(set(got)))\n"
+            "ids.set_id_generator(lambda: 'evt')\n"
+            "print(new_id())\n"
+        )
+        env = {**os.environ, "OPENHOOK_ID_GENERATOR": "uuid7", "PYTHONPATH": os.pathsep.join(sys.path)}
+        out = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+        assert out.stdout.split("\n")[:2] == ["True True 200", "evt"]
@@ -0,0 +1,64 @@
+"""`import openhook` の起動コストを検証する回帰テスト。
+
+フックはイベントごとに新しいプロセスとして起動されるため、
+import のコストはそのままイベントごとのレイテンシになる。
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import openhook
+
+SRC_DIR = str(Path(openhook.__file__).resolve().parents[1])
+
+# 予算はCIの遅いマシンでも安定するよう余裕を持たせている。
+IMPORT_BUDGET_MS = float(os.environ.get("OPENHOOK_IMPORT_BUDGET_MS", "60"))
+
+
+def _import_times(code: str) -> dict[str, int]:
+    """Run ``code`` under -X importtime and return {module: cumulative_us} for top-level imports."""
+    env = {**os.environ, "PYTHONPATH": SRC_DIR}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):
+            times[name.strip()] = int(cumulative)
+        else:
+            times.setdefault(name.strip(), 0)
+    return times
+
+
+def _cost_ms(code: str) -> float:
+    baseline = _import_times("pass")
+    best = float("inf")
+    for _ in range(3):
+        times = _import_times(code)
+        cost = sum(us for name, us in times.items() if name not in baseline)
+        best = min(best, cost / 1000)
+    return best
+
+
+class TestImportTime_遅延インポート:
+    """parse_stdin だけを使うフックは重いモジュールを読み込まない。"""
+
+    def test_import_openhookはサブモジュールを読み込まない(self):
+        times = _import_times("import openhook")
+        assert "openhook.envelope" not in times
+        assert "openhook.compat" not in times
+
+    def test_parse_stdinのimportでは不要なモジュールが読み込まれない(self):
+        times = _import_times("from openhook import parse_stdin")
+        for module in ("uuid", "datetime", "pathlib", "typing", "openhook.schema", "openhook.compat"):
+            assert module not in times, module
+
+    def test_parse_stdinのimportコストが予算内に収まる(self):
+        cost = _cost_ms("from openhook import parse_stdin")
+        assert cost < IMPORT_BUDGET_MS, f"import cost {cost:.1f}ms exceeds {IMPORT_BUDGET_MS}ms budget"
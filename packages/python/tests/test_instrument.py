@@ -0,0 +1,202 @@
+"""計装 (instrument) のカウンター・タイミング・コールバックの振る舞いを検証する仕様テスト。"""
+
+import asyncio
+import io
+import json
+import sys
+import time
+
+import pytest
+
+import openhook
+from openhook import LazyEvent, OpenHookEvent, compat, envelope, instrument
+from openhook.aio import aiter_events
+from openhook.batch import EventBatch
+from openhook.integrations import agent_trace
+from openhook.spool import SpoolReader, SpoolWriter
+
+_LINE = json.dumps({
+    "openhook": "0.1", "id": "e1", "source": "claude-code", "type": "file.write",
+    "time": "2026-02-23T10:00:00Z", "session_id": "s1", "data": {"path": "src/app.ts"},
+})
+
+
+@pytest.fixture
+def enabled():
+    instrument.reset()
+    calls = []
+    instrument.enable(lambda *args: calls.append(args))
+    yield calls
+    instrument.disable()
+    instrument.reset()
+
+
+def _stage(name):
+    return instrument.stats()["stages"][name]
+
+
+class TestInstrument_無効時:
+    """無効時は元の関数がそのまま使われる。"""
+
+    def test_enableしなければ関数は差し替えられない(self):
+        assert not instrument.is_enabled()
+        assert OpenHookEvent.__dict__["from_json"].__func__.__module__ == "openhook.envelope"
+        assert envelope.validate.__module__ == "openhook.envelope"
+
+    def test_disableで元の関数に戻る(self):
+        original = (envelope.validate, compat.from_legacy, OpenHookEvent.__dict__["from_json"], openhook.validate)
+        instrument.enable()
+        assert envelope.validate is not original[0]
+        assert openhook.validate is envelope.validate
+        instrument.disable()
+        assert (
+            envelope.validate, compat.from_legacy, OpenHookEvent.__dict__["from_json"], openhook.validate
+        ) == original
+
+    def test_有効な間に初めて参照した名前もdisableで元に戻る(self, monkeypatch):
+        # パッケージにまだキャッシュされていない状態から始める
+        monkeypatch.delitem(openhook.__dict__, "from_legacy", raising=False)
+        original = compat.from_legacy
+        instrument.enable()
+        try:
+            assert openhook.from_legacy is not original
+        finally:
+            instrument.disable()
+        assert openhook.from_legacy is original
+        instrument.reset()
+        openhook.from_legacy({"hook_event_name": "stop", "sessionId": "s"})
+        assert _stage("from_legacy")["calls"] == 0
+
+    def test_無効時の呼び出しは数えない(self):
+        instrument.reset()
+        OpenHookEvent.from_json(_LINE)
+        assert _stage("from_json")["calls"] == 0
+
+
+class TestInstrument_ステージ:
+    """各ステージの呼び出し回数・時間・バイト数が記録される。"""
+
+    def test_from_jsonは入力のバイト数とネストしたvalidateを数える(self, enabled):
+        OpenHookEvent.from_json(_LINE)
+        OpenHookEvent.from_json_bytes(_LINE.encode())
+        LazyEvent.from_json(_LINE)
+        stage = _stage("from_json")
+        assert stage["calls"] == 3 and stage["bytes"] == 3 * len(_LINE)
+        assert stage["total_ns"] > 0 and sum(stage["histogram"]) == 3
+        assert _stage("validate")["calls"] == 3
+
+    def test_iter_eventsの検証も数える(self, enabled):
+        list(openhook.iter_events(io.BytesIO((_LINE + "\n").encode() * 4)))
+        assert _stage("validate")["calls"] == 4
+
+    def test_ストリームの各行がparseとして数えられる(self, enabled, tmp_path):
+        data = (_LINE + "\n").encode() * 10
+        list(openhook.iter_events(io.BytesIO(data)))
+        list(openhook.iter_events(io.BytesIO(data), lazy=True))
+        EventBatch.from_stream(io.BytesIO(data))
+
+        async def drain():
+            reader = asyncio.StreamReader()
+            reader.feed_data(data)
+            reader.feed_eof()
+            return [e async for e in aiter_events(reader)]
+
+        asyncio.run(drain())
+        with SpoolWriter(tmp_path, fsync=False) as spool:
+            spool.append(OpenHookEvent.from_json(_LINE))
+        list(SpoolReader(tmp_path).replay())
+        stage = _stage("parse")
+        assert stage["calls"] == 41
+        assert stage["bytes"] == 41 * len(_LINE)
+        assert [c for c in enabled if c[0] == "parse"][0][3] == "claude-code"
+
+    def test_parse_stdinも数える(self, enabled, monkeypatch):
+        monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(io.BytesIO(_LINE.encode())))
+        openhook.parse_stdin()
+        stage = _stage("parse")
+        assert stage["calls"] == 1 and stage["bytes"] == len(_LINE)
+
+    def test_from_legacy_manyは入力の読み出しを時間に含めない(self, enabled):
+        def slow_payloads():
+            for _ in range(3):
+                time.sleep(0.02)
+                yield {"hook_event_name": "stop", "sessionId": "s"}
+
+        list(compat.from_legacy_many(slow_payloads()))
+        stage = _stage("from_legacy")
+        assert stage["calls"] == 3
+        assert stage["total_ns"] < 20_000_000
+
+    def test_from_legacyとfrom_legacy_manyは1件ずつ数える(self, enabled):
+        raw = b'{"hook_event_name": "stop", "sessionId": "s"}'
+        compat.from_legacy(json.loads(raw), raw=raw)
+        events = list(compat.from_legacy_many([{"hook_event_name": "stop", "sessionId": "s"}] * 3))
+        assert len(events) == 3
+        stage = _stage("from_legacy")
+        assert stage["calls"] == 4 and stage["bytes"] == len(raw)
+
+    def test_to_trace_recordを数える(self, enabled):
+        agent_trace.to_trace_record(OpenHookEvent.from_json(_LINE))
+        assert _stage("to_trace_record")["calls"] == 1
+
+    def test_emitは書き込んだ行のバイト数を数え出力は変わらない(self, enabled):
+        event = OpenHookEvent.from_json(_LINE)
+        out = io.StringIO()
+        event.emit(out)
+        instrument.disable()
+        expected = io.StringIO()
+        event.emit(expected)
+        assert out.getvalue() == expected.getvalue()
+        assert _stage("emit")["bytes"] == len(expected.getvalue())
+
+
+class TestInstrument_検証失敗:
+    """検証失敗は理由と source ごとに数えられ、例外はそのまま伝わる。"""
+
+    def test_理由とsourceごとに数える(self, enabled):
+        bad = [
+            {"openhook": "0.1", "source": "copilot"},
+            {**json.loads(_LINE), "type": "bogus"},
+            {**json.loads(_LINE), "openhook": 1},
+        ]
+        for d in bad:
+            with pytest.raises(openhook.ValidationError):
+                openhook.validate(d)
+        failures = instrument.stats()["validation_failures"]
+        assert failures["by_reason"] == {"missing_fields": 1, "unknown_type": 1, "invalid_openhook": 1}
+        assert failures["by_source"] == {"copilot": 1, "claude-code": 2}
+        assert _stage("validate")["errors"] == 3
+
+    def test_strictのスキーマ違反はschemaとして数える(self, enabled):
+        d = {**json.loads(_LINE), "data": {}}
+        with pytest.raises(openhook.ValidationError):
+            openhook.validate(d, strict=True)
+        assert instrument.stats()["validation_failures"]["by_reason"] == {"schema": 1}
+
+    def test_不正なJSONはfrom_jsonのエラーとして数える(self, enabled):
+        with pytest.raises(ValueError):
+            OpenHookEvent.from_json("{")
+        assert _stage("from_json")["errors"] == 1
+
+
+class TestInstrument_コールバック:
+    """コールバックは計装された呼び出しごとに呼ばれる。"""
+
+    def test_ステージ_時間_サイズ_source_エラーを受け取る(self, enabled):
+        OpenHookEvent.from_json(_LINE)
+        with pytest.raises(openhook.ValidationError):
+            OpenHookEvent.from_json('{"source": "x"}')
+        stages = [(stage, size, source, error) for stage, _, size, source, error in enabled]
+        assert stages == [
+            ("validate", None, "claude-code", None),
+            ("from_json", len(_LINE), "claude-code", None),
+            ("validate", None, "x", "missing_fields"),
+            ("from_json", 15, None, "ValidationError"),
+        ]
+        assert all(duration >= 0 for _, duration, *_ in enabled)
+
+    def test_resetでカウントが消える(self, enabled):
+        OpenHookEvent.from_json(_LINE)
+        instrument.reset()
+        assert _stage("from_json")["calls"] == 0
+        assert _stage("validate")["histogram"] == [0] * (len(instrument.BUCKETS_NS) + 1)
@@ -0,0 +1,282 @@
+"""OTLP/HTTP エクスポーターの振る舞いを、ローカルの代替コレクターに対して検証する仕様テスト。"""
+
+import gzip
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from openhook import EventType, OpenHookEvent
+from openhook.export.otlp import OTLPExporter
+from openhook.timestamps import parse_time
+
+
+class _Collector:
+    """リクエストを記録し、指定回数だけ失敗を返す代替コレクター。"""
+
+    def __init__(self):
+        self.requests = []
+        self.connections = set()
+        self.failures = []  # 先頭から順に返すステータス
+        collector = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                collector.connections.add(self.client_address)
+                status = collector.failures.pop(0) if collector.failures else 200
+                if status == 200:
+                    if self.headers.get("Content-Encoding") == "gzip":
+                        body = gzip.decompress(body)
+                    collector.requests.append((self.path, dict(self.headers), json.loads(body)))
+                self.send_response(status)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"{}")
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.endpoint = f"http://127.0.0.1:{self.server.server_port}"
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.01,), daemon=True)
+        self.thread.start()
+
+    def spans(self):
+        return [
+            span
+            for path, _, body in self.requests if path == "/v1/traces"
+            for rs in body["resourceSpans"] for ss in rs["scopeSpans"] for span in ss["spans"]
+        ]
+
+    def metrics(self):
+        return {
+            m["name"]: m
+            for path, _, body in self.requests if path == "/v1/metrics"
+            for rm in body["resourceMetrics"] for sm in rm["scopeMetrics"] for m in sm["metrics"]
+        }
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def collector():
+    c = _Collector()
+    yield c
+    c.close()
+
+
+def _event(type, session_id="s1", time="2026-02-23T10:00:00Z", **data):
+    return OpenHookEvent.create(source="claude-code", type=type, session_id=session_id, data=data, time=time)
+
+
+def _session_end(session_id="s1", **data):
+    data.setdefault("duration_ms", 120000)
+    return _event(EventType.SESSION_END, session_id, time="2026-02-23T10:02:00Z", **data)
+
+
+def _attrs(item):
+    return {a["key"]: next(iter(a["value"].values())) for a in item["attributes"]}
+
+
+class TestOTLPExporter_スパン:
+    """ツール呼び出しとセッションが OTLP スパンに変換される。"""
+
+    def test_tool_startとtool_endが1つのスパンになる(self, collector):
+        with OTLPExporter(collector.endpoint) as exporter:
+            exporter.add(_event(EventType.TOOL_START, tool_name="Bash", tool_call_id="c1"))
+            exporter.add(_event(
+                EventType.TOOL_END, time="2026-02-23T10:00:01.500Z",
+                tool_call_id="c1", status="error", duration_ms=1500,
+            ))
+        (span,) = collector.spans()
+        assert span["name"] == "tool Bash"
+        assert int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"]) == 1_500_000_000
+        assert span["status"]["code"] == 2
+        assert _attrs(span)["openhook.tool.call_id"] == "c1"
+
+    def test_同じセッションのスパンは同じトレースに属する(self, collector):
+        with OTLPExporter(collector.endpoint) as exporter:
+            exporter.add(_event(EventType.TOOL_START, tool_name="Bash", tool_call_id="c1"))
+            exporter.add(_event(EventType.TOOL_END, tool_call_id="c1", status="success"))
+            exporter.add(_session_end())
+        tool, session = collector.spans()
+        assert tool["traceId"] == session["traceId"]
+        assert len(tool["traceId"]) == 32 and len(tool["spanId"]) == 16
+        assert tool["parentSpanId"] == session["spanId"]
+        assert "parentSpanId" not in session
+
+    def test_session_endのスパンはduration_msだけ遡って始まる(self, collector):
+        with OTLPExporter(collector.endpoint) as exporter:
+            exporter.add(_session_end(input_tokens=50000))
+        (span,) = collector.spans()
+        assert span["startTimeUnixNano"] == str(parse_time("2026-02-23T10:00:00Z"))
+        assert _attrs(span)["openhook.session.input_tokens"] == "50000"
+
+    def test_startが届かないtool_endもduration_msがあればスパンになる(self, collector):
+        with OTLPExporter(collector.endpoint, correlator={"max_open": 1}) as exporter:
+            exporter.add(_event(EventType.TOOL_END, tool_call_id="c1", duration_ms=200))
+            exporter.add(_event(EventType.TOOL_END, tool_call_id="c2"))
+        (span,) = collector.spans()
+        assert int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"]) == 200_000_000
+
+    def test_対応のないtool_endもcloseで送信される(self, collector):
+        exporter = OTLPExporter(collector.endpoint)
+        for i in range(5):
+            exporter.add(_event(EventType.TOOL_END, tool_call_id=f"c{i}", duration_ms=100))
+        exporter.close()
+        assert len(collector.spans()) == 5
+        assert len(exporter._correlator) == 0
+
+
+class TestOTLPExporter_メトリクス:
+    """トークン数と所要時間はバッチ内で集約されたデルタメトリクスになる。"""
+
+    def test_トークン数は属性ごとに合計される(self, collector):
+        with OTLPExporter(collector.endpoint) as exporter:
+            exporter.add(_session_end("s1", input_tokens=100, output_tokens=10))
+            exporter.add(_session_end("s2", input_tokens=200, output_tokens=20))
+        tokens = collector.metrics()["openhook.session.tokens"]["sum"]
+        assert tokens["aggregationTemporality"] == 1 and tokens["isMonotonic"] is True
+        totals = {_attrs(p)["openhook.token.type"]: p["asInt"] for p in tokens["dataPoints"]}
+        assert totals == {"input": "300", "output": "30"}
+
+    def test_所要時間はヒストグラムになる(self, collector):
+        with OTLPExporter(collector.endpoint) as exporter:
+            exporter.add(_event(EventType.TOOL_START, tool_name="Read", tool_call_id="c1"))
+            exporter.add(_event(EventType.TOOL_END, tool_call_id="c1", duration_ms=40))
+            exporter.add(_session_end(duration_ms=90_000))
+        metrics = collector.metrics()
+        (tool,) = metrics["openhook.tool.duration"]["histogram"]["dataPoints"]
+        assert (tool["count"], tool["sum"]) == ("1", 40)
+        assert tool["bucketCounts"][1] == "1"  # (10, 50]
+        (session,) = metrics["openhook.session.duration"]["histogram"]["dataPoints"]
+        assert session["sum"] == 90_000
+
+
+class TestOTLPExporter_バッチ:
+    """イベントは件数と経過時間でまとめて送られる。"""
+
+    def test_max_batch_sizeに達すると送信される(self, collector):
+        exporter = OTLPExporter(collector.endpoint, max_batch_size=2)
+        exporter.add(_session_end("s1"))
+        assert collector.requests == []
+        exporter.add(_session_end("s2"))
+        assert len(collector.spans()) == 2
+        assert len(exporter) == 0
+        exporter.close()
+
+    def test_max_ageを過ぎると次のイベントで送信される(self, collector, clock):
+        exporter = OTLPExporter(collector.endpoint, max_age=5, clock=clock, flush_thread=False)
+        exporter.add(_session_end("s1"))
+        clock.now = 6
+        exporter.add(_event(EventType.PROMPT_SUBMIT))
+        assert len(collector.spans()) == 1
+        exporter.close()
+
+    def test_pollはmax_ageを過ぎたバッチだけを送信する(self, collector, clock):
+        exporter = OTLPExporter(collector.endpoint, max_age=5, clock=clock, flush_thread=False)
+        exporter.add(_session_end("s1"))
+        clock.now = 4
+        assert exporter.poll() is True
+        assert collector.requests == []
+        clock.now = 6
+        assert exporter.poll() is True
+        assert len(collector.spans()) == 1
+        exporter.close()
+
+    def test_イベントが来なくてもタイマースレッドがmax_ageで送信する(self, collector):
+        exporter = OTLPExporter(collector.endpoint, max_age=0.05)
+        exporter.add(_session_end("s1"))
+        deadline = time.monotonic() + 5
+        while not collector.requests and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(collector.spans()) == 1
+        exporter.close()
+        assert len(collector.requests) == 2  # トレースとメトリクス
+
+    def test_ペイロードはgzip圧縮される(self, collector):
+        with OTLPExporter(collector.endpoint) as exporter:
+            exporter.add(_session_end())
+        _, headers, _ = collector.requests[0]
+        assert headers["Content-Encoding"] == "gzip"
+        assert headers["Content-Type"] == "application/json"
+
+    def test_compresslevel0では圧縮しない(self, collector):
+        with OTLPExporter(collector.endpoint, compresslevel=0) as exporter:
+            exporter.add(_session_end())
+        _, headers, _ = collector.requests[0]
+        assert "Content-Encoding" not in headers
+
+    def test_複数回の送信で接続が再利用される(self, collector):
+        exporter = OTLPExporter(collector.endpoint, max_batch_size=1)
+        for i in range(5):
+            exporter.add(_session_end(f"s{i}"))
+        exporter.close()
+        assert len(collector.spans()) == 5
+        assert len(collector.connections) == 1
+
+    def test_イベントがなければ何も送らない(self, collector):
+        with OTLPExporter(collector.endpoint) as exporter:
+            exporter.add(_event(EventType.PROMPT_SUBMIT))
+        assert collector.requests == []
+
+
+class TestOTLPExporter_再試行:
+    """失敗したリクエストはバックオフしながら再試行される。"""
+
+    def test_再試行可能なステータスの後に成功する(self, collector):
+        collector.failures = [503, 429]
+        sleeps = []
+        exporter = OTLPExporter(collector.endpoint, backoff=1, sleep=sleeps.append)
+        exporter.add(_session_end())
+        assert exporter.flush() is True
+        assert len(sleeps) == 2
+        assert 0.5 <= sleeps[0] <= 1 and 1 <= sleeps[1] <= 2
+        assert exporter.counters["retries"] == 2
+        exporter.close()
+
+    def test_max_retry_timeを超える待機はせずに破棄される(self, collector, clock):
+        collector.failures = [503] * 10
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            clock.now += seconds
+
+        sleeps = []
+        exporter = OTLPExporter(
+            collector.endpoint, backoff=1, max_retries=10, max_retry_time=5, clock=clock, sleep=sleep, flush_thread=False
+        )
+        exporter.add(_session_end())
+        assert exporter.flush() is False
+        assert sum(sleeps) <= 5
+        assert exporter.counters["retries"] == len(sleeps) < 10
+        exporter.close()
+
+    def test_再試行できないステータスでは破棄される(self, collector):
+        collector.failures = [400, 400]
+        exporter = OTLPExporter(collector.endpoint, sleep=lambda s: None)
+        exporter.add(_session_end(input_tokens=1))
+        assert exporter.flush() is False
+        assert exporter.counters["retries"] == 0
+        assert exporter.counters["dropped_spans"] == 1
+        assert exporter.counters["dropped_points"] == 2
+
+    def test_コレクターに接続できなくても例外を送出しない(self):
+        exporter = OTLPExporter("http://127.0.0.1:9", max_retries=2, sleep=lambda s: None)
+        exporter.add(_session_end())
+        assert exporter.flush() is False
+        # トレースとメトリクスの2リクエストがそれぞれ3回試行される
+        assert exporter.counters["requests"] == 6
+        assert exporter.counters["failed_requests"] == 2
+
+    def test_http以外のエンドポイントはValueErrorが発生する(self):
+        with pytest.raises(ValueError):
+            OTLPExporter("grpc://localhost:4317")
+
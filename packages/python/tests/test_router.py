@@ -0,0 +1,117 @@
+"""購読ルーター (Router) の振る舞いを検証する仕様テスト。"""
+
+import random
+
+import pytest
+
+from openhook import EventType, OpenHookEvent, ValidationError
+from openhook.dispatch import HookConfig
+from openhook.router import Router, Subscription
+
+
+def _ev(type=EventType.TOOL_END, source="claude-code", context=None, **data):
+    return OpenHookEvent.create(source=source, type=type, session_id="s1", data=data, context=context)
+
+
+def _consumers(router, event):
+    return [sub.consumer for sub in router.match(event)]
+
+
+class TestRouter_条件:
+    """type・source・context 接頭辞・data の等値で購読が選ばれる。"""
+
+    def test_typeとsourceで選ぶ(self):
+        router = Router([
+            Subscription("all"),
+            Subscription("ends", events=frozenset({"tool.end"})),
+            Subscription("copilot", sources=frozenset({"copilot"})),
+            Subscription("copilot-ends", events=frozenset({"tool.end"}), sources=frozenset({"copilot"})),
+        ])
+        assert _consumers(router, _ev()) == ["all", "ends"]
+        assert _consumers(router, _ev(source="copilot")) == ["all", "ends", "copilot", "copilot-ends"]
+        assert _consumers(router, _ev(EventType.FILE_WRITE, source="copilot")) == ["all", "copilot"]
+
+    def test_contextは文字列の接頭辞として比較する(self):
+        router = Router([
+            Subscription("team-a", context="file:///srv/repos/team-a/"),
+            Subscription("team", context="file:///srv/repos/team"),
+            Subscription("srv", context="file:///srv/"),
+            Subscription("exact", context="file:///srv/repos/team-a/app.py"),
+        ])
+        assert _consumers(router, _ev(context="file:///srv/repos/team-a/app.py")) == ["team-a", "team", "srv", "exact"]
+        assert _consumers(router, _ev(context="file:///srv/repos/team-b/x")) == ["team", "srv"]
+        assert _consumers(router, _ev(context="file:///srv/repos/team-a")) == ["team", "srv"]
+        assert _consumers(router, _ev(context="https://example.com/")) == []
+        assert _consumers(router, _ev()) == []
+
+    def test_dataはすべてのフィールドが等しいときだけ一致する(self):
+        router = Router([
+            Subscription("bash-errors", data=(("status", "error"), ("tool_name", "Bash"))),
+            Subscription("errors", data=(("status", "error"),)),
+            Subscription("flag", data=(("retry", True),)),
+        ])
+        assert _consumers(router, _ev(tool_name="Bash", status="error")) == ["bash-errors", "errors"]
+        assert _consumers(router, _ev(tool_name="Read", status="error")) == ["errors"]
+        assert _consumers(router, _ev(status="success")) == []
+        assert _consumers(router, _ev(retry=1)) == []
+        assert _consumers(router, _ev(retry=True, status=["error"])) == ["flag"]
+
+    def test_各購読を個別に調べた結果と一致する(self):
+        rng = random.Random(0)
+        types = [t.value for t in EventType]
+        subs = [
+            Subscription(
+                i,
+                events=frozenset(rng.sample(types, 2)) if rng.random() < 0.7 else frozenset({"*"}),
+                sources=frozenset({rng.choice(["a", "b", "c"])}) if rng.random() < 0.5 else frozenset({"*"}),
+                context=rng.choice([None, "file:///r/", "file:///r/t1", "file:///r/t1/", "file:///r/t2/x"]),
+                data=tuple((k, rng.choice([1, 2])) for k in rng.sample(["x", "y"], rng.randint(0, 2))),
+            )
+            for i in range(300)
+        ]
+        router = Router(subs)
+        for _ in range(300):
+            event = _ev(
+                rng.choice(types), rng.choice(["a", "b", "c"]),
+                rng.choice([None, "file:///r/t1/a", "file:///r/t2/xy", "file:///q/"]),
+                **{k: rng.choice([1, 2, 3]) for k in rng.sample(["x", "y"], rng.randint(0, 2))},
+            )
+            assert router.match(event) == [s for s in subs if s.matches(event)]
+
+
+class TestRouter_更新:
+    """購読の追加・削除は次の match から反映される。"""
+
+    def test_追加と削除(self):
+        router = Router()
+        router.add(Subscription("a"))
+        router.add(Subscription("b", events=frozenset({"file.write"})))
+        assert _consumers(router, _ev()) == ["a"]
+        router.remove(Subscription("a"))
+        assert _consumers(router, _ev()) == []
+        assert _consumers(router, _ev(EventType.FILE_WRITE)) == ["b"]
+        with pytest.raises(ValueError):
+            router.remove(Subscription("a"))
+
+    def test_設定ファイルのフックから作れる(self):
+        config = HookConfig.from_dict({"openhook": "0.1", "hooks": [
+            {"command": "a"}, {"command": "b", "events": ["session.end"]},
+        ]})
+        router = Router.from_config(config)
+        assert [sub.consumer.command for sub in router.match(_ev(EventType.SESSION_END))] == ["a", "b"]
+
+
+class TestSubscription_from_dict:
+    """辞書から購読を作り、不正な値は ValidationError になる。"""
+
+    def test_辞書から作る(self):
+        sub = Subscription.from_dict(
+            {"events": ["tool.end"], "sources": ["copilot"], "context": "file:///x/", "data": {"status": "error"}},
+            consumer="q",
+        )
+        assert sub == Subscription("q", frozenset({"tool.end"}), frozenset({"copilot"}), "file:///x/", (("status", "error"),))
+
+    @pytest.mark.parametrize("d", [{"events": "tool.end"}, {"context": 1}, {"data": {"x": [1]}}, {"data": []}])
+    def test_不正な値はValidationError(self, d):
+        with pytest.raises(ValidationError):
+            Subscription.from_dict(d)
@@ -0,0 +1,133 @@
+"""spec/schemas から生成した厳密バリデーションの振る舞いを検証する仕様テスト。"""
+
+import importlib.util
+import json
+from pathlib import Path
+
+import pytest
+
+from openhook import EventType, OpenHookEvent, ValidationError, validate
+
+SPEC_DIR = Path(__file__).resolve().parents[3] / "spec"
+
+requires_spec = pytest.mark.skipif(
+    not SPEC_DIR.is_dir(), reason="spec/ directory is not available"
+)
+
+
+def _load_generator():
+    path = Path(__file__).resolve().parents[1] / "scripts" / "gen_schemas.py"
+    spec = importlib.util.spec_from_file_location("gen_schemas", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _payload(**overrides):
+    base = {
+        "openhook": "0.1",
+        "id": "test-id-001",
+        "source": "claude-code",
+        "type": "session.end",
+        "time": "2026-02-23T10:00:00Z",
+        "session_id": "sess_123",
+    }
+    base.update(overrides)
+    return base
+
+
+@requires_spec
+class TestSchemas_生成物:
+    """埋め込みスキーマは spec/schemas と同期している。"""
+
+    def test_生成済みモジュールがspecと一致する(self):
+        gen = _load_generator()
+        assert gen.OUTPUT.read_text() == gen.render()
+
+    def test_specのサンプルはすべて厳密検証を通過する(self):
+        for path in sorted((SPEC_DIR / "examples").glob("*.json")):
+            payload = json.loads(path.read_text())
+            if "openhook" in payload:
+                validate(payload, strict=True)
+
+
+class TestValidate_strict_エンベロープ:
+    """strict=True はエンベロープのパターンと未知フィールドを検証する。"""
+
+    def test_有効なペイロードはエラーが発生しない(self):
+        validate(_payload(), strict=True)
+
+    def test_createで生成したイベントは通過する(self):
+        e = OpenHookEvent.create(source="my-tool", type=EventType.SESSION_END, session_id="s1")
+        validate(e.to_dict(), strict=True)
+
+    def test_未知のトップレベルフィールドはエラーになる(self):
+        with pytest.raises(ValidationError, match="extra_field"):
+            validate(_payload(extra_field="x"), strict=True)
+
+    def test_strictでなければ未知のフィールドは許容される(self):
+        validate(_payload(extra_field="x"))
+
+    def test_kebab_caseでないsourceはエラーになる(self):
+        with pytest.raises(ValidationError, match="source"):
+            validate(_payload(source="Claude_Code"), strict=True)
+
+    def test_MAJOR_MINOR形式でないopenhookはエラーになる(self):
+        with pytest.raises(ValidationError, match="openhook"):
+            validate(_payload(openhook="0.1.0"), strict=True)
+
+    @pytest.mark.parametrize("field, value", [("source", "claude-code\n"), ("openhook", "0.1\n")])
+    def test_末尾の改行はパターンに一致しない(self, field, value):
+        # ECMA-262 の $ は末尾の改行の前には一致しない (ajv と同じ結果になる)。
+        with pytest.raises(ValidationError, match=field):
+            validate(_payload(**{field: value}), strict=True)
+
+    def test_ISO8601形式でないtimeはエラーになる(self):
+        with pytest.raises(ValidationError, match="time"):
+            validate(_payload(time="yesterday"), strict=True)
+
+    def test_空のidはエラーになる(self):
+        with pytest.raises(ValidationError, match="id"):
+            validate(_payload(id=""), strict=True)
+
+    def test_文字列でないsession_idはエラーになる(self):
+        with pytest.raises(ValidationError, match="session_id"):
+            validate(_payload(session_id=123), strict=True)
+
+    def test_オブジェクトでないextensionsはエラーになる(self):
+        with pytest.raises(ValidationError, match="extensions"):
+            validate(_payload(extensions=[]), strict=True)
+
+
+class TestValidate_strict_data:
+    """strict=True はイベントタイプごとのdataスキーマを検証する。"""
+
+    def test_file_writeにpathがないとエラーになる(self):
+        with pytest.raises(ValidationError, match="path"):
+            validate(_payload(type="file.write", data={"operation": "create"}), strict=True)
+
+    def test_file_writeのstart_lineは1以上である(self):
+        with pytest.raises(ValidationError, match="start_line"):
+            validate(_payload(type="file.write", data={"path": "a", "start_line": 0}), strict=True)
+
+    def test_整数フィールドに真偽値は使えない(self):
+        with pytest.raises(ValidationError, match="duration_ms"):
+            validate(_payload(type="tool.end", data={"duration_ms": True}), strict=True)
+
+    def test_tool_endの不明なstatusはエラーになる(self):
+        with pytest.raises(ValidationError, match="status"):
+            validate(_payload(type="tool.end", data={"status": "ok"}), strict=True)
+
+    def test_session_endの不明なreasonはエラーになる(self):
+        with pytest.raises(ValidationError, match="reason"):
+            validate(_payload(data={"reason": "crash"}), strict=True)
+
+    def test_dataの未知フィールドは許容される(self):
+        validate(_payload(type="tool.end", data={"vendor_field": 1}), strict=True)
+
+    def test_スキーマのないイベントタイプのdataは検証されない(self):
+        validate(_payload(type="session.start", data={"anything": object()}), strict=True)
+
+    def test_from_dictでもstrictを指定できる(self):
+        with pytest.raises(ValidationError):
+            OpenHookEvent.from_dict(_payload(source="BAD"), strict=True)
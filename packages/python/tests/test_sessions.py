@@ -0,0 +1,126 @@
+"""セッションごとの集計 (SessionStore) の振る舞いを検証する仕様テスト。"""
+
+import pytest
+
+from openhook import EventType, OpenHookEvent
+from openhook.sessions import SessionStore
+
+
+def _ev(type, session_id="s1", time="2026-02-23T10:00:00Z", **data):
+    return OpenHookEvent.create(source="claude-code", type=type, session_id=session_id, data=data, time=time)
+
+
+def _session(session_id="s1"):
+    return [
+        _ev(EventType.SESSION_START, session_id),
+        _ev(EventType.PROMPT_SUBMIT, session_id, prompt_length=10),
+        _ev(EventType.TOOL_START, session_id, tool_name="Bash", tool_call_id="c1"),
+        _ev(EventType.TOOL_END, session_id, tool_call_id="c1", status="error"),
+        _ev(EventType.TOOL_START, session_id, tool_name="Read", tool_call_id="c2"),
+        _ev(EventType.TOOL_END, session_id, tool_call_id="c2", status="success"),
+        _ev(EventType.TOOL_START, session_id, tool_name="Bash", tool_call_id="c3"),
+        _ev(EventType.FILE_WRITE, session_id, "2026-02-23T10:00:05Z", path="a.py", model="anthropic/x"),
+        _ev(EventType.FILE_WRITE, session_id, "2026-02-23T10:00:06Z", path="a.py"),
+        _ev(EventType.PROMPT_SUBMIT, session_id, "2026-02-23T10:00:09Z"),
+    ]
+
+
+class TestSessionStore_集計:
+    """イベントを受け取るたびにセッションの集計が更新される。"""
+
+    def test_プロンプト_ツール_エラー率_ファイルを数える(self):
+        store = SessionStore()
+        for event in _session():
+            store.add(event)
+        snap = store.snapshot("s1")
+        assert snap.events == 10 and snap.prompts == 2
+        assert snap.tool_counts == {"Bash": 2, "Read": 1} and snap.tool_calls == 3
+        assert (snap.tool_results, snap.tool_errors, snap.error_rate) == (2, 1, 0.5)
+        assert snap.files == frozenset({"a.py"}) and snap.model == "anthropic/x"
+        assert snap.duration_ms == pytest.approx(9000)
+        assert snap.end_reason is None
+
+    def test_スナップショットはその後の更新の影響を受けない(self):
+        store = SessionStore()
+        store.add(_ev(EventType.TOOL_START, tool_name="Bash"))
+        snap = store.snapshot("s1")
+        store.add(_ev(EventType.TOOL_START, tool_name="Bash"))
+        assert snap.tool_counts == {"Bash": 1}
+        assert store.snapshot("s1").tool_counts == {"Bash": 2}
+
+    def test_セッションは互いに独立している(self):
+        store = SessionStore()
+        store.add(_ev(EventType.TOOL_START, "s1", tool_name="Read"))
+        store.add(_ev(EventType.TOOL_START, "s2", tool_name="Bash"))
+        assert store.snapshot("s1").tool_counts == {"Read": 1}
+        assert store.snapshot("s2").tool_counts == {"Bash": 1}
+        assert store.snapshot("s3") is None
+
+    def test_max_filesを超えたパスは数えるだけ(self):
+        store = SessionStore(max_files=2)
+        for path in ["a", "b", "a", "c", "d"]:
+            store.add(_ev(EventType.FILE_WRITE, path=path))
+        snap = store.snapshot("s1")
+        assert snap.files == frozenset({"a", "b"}) and snap.files_dropped == 2
+
+    def test_対象外のイベントは無視される(self):
+        store = SessionStore()
+        store.add(OpenHookEvent.create(source="x", type="custom.thing", session_id="s1"))
+        assert len(store) == 0 and store.counters["ignored"] == 1
+
+
+class TestSessionStore_終了:
+    """session.end・アイドル・容量超過でセッションが確定し、保持されなくなる。"""
+
+    def test_session_endで確定したスナップショットが返る(self):
+        finalized = []
+        store = SessionStore(on_finalize=lambda snap, reason: finalized.append((snap, reason)))
+        for event in _session():
+            assert store.add(event) is None
+        snap = store.add(_ev(
+            EventType.SESSION_END, model="anthropic/y", input_tokens=100, output_tokens=20,
+            duration_ms=12000, reason="completed",
+        ))
+        assert (snap.input_tokens, snap.output_tokens, snap.model) == (100, 20, "anthropic/y")
+        assert snap.duration_ms == 12000 and snap.end_reason == "completed"
+        assert finalized == [(snap, "session_end")]
+        assert "s1" not in store and store.snapshot("s1") is None
+
+    def test_報告された0トークンはそのまま記録される(self):
+        store = SessionStore()
+        store.add(_ev(EventType.SESSION_START))
+        snap = store.add(_ev(EventType.SESSION_END, input_tokens=0, output_tokens=5))
+        assert (snap.input_tokens, snap.output_tokens) == (0, 5)
+
+    def test_アイドルが続いたセッションは確定される(self, clock):
+        finalized = []
+        store = SessionStore(idle_timeout=10, clock=clock, on_finalize=lambda s, r: finalized.append((s.session_id, r)))
+        store.add(_ev(EventType.PROMPT_SUBMIT, "s1"))
+        clock.now = 5
+        store.add(_ev(EventType.PROMPT_SUBMIT, "s2"))
+        clock.now = 9
+        store.add(_ev(EventType.PROMPT_SUBMIT, "s1"))
+        clock.now = 15
+        assert store.expire() == 1
+        assert finalized == [("s2", "idle")] and "s1" in store
+
+    def test_容量を超えると最も古く使われたセッションから確定する(self):
+        finalized = []
+        store = SessionStore(max_sessions=2, on_finalize=lambda s, r: finalized.append((s.session_id, r)))
+        store.add(_ev(EventType.PROMPT_SUBMIT, "s1"))
+        store.add(_ev(EventType.PROMPT_SUBMIT, "s2"))
+        store.add(_ev(EventType.PROMPT_SUBMIT, "s1"))
+        store.add(_ev(EventType.PROMPT_SUBMIT, "s3"))
+        assert finalized == [("s2", "capacity")]
+        assert len(store) == 2 and store.counters["finalized_capacity"] == 1
+
+    def test_flushはすべてのセッションを確定する(self):
+        store = SessionStore()
+        store.add(_ev(EventType.PROMPT_SUBMIT, "s1"))
+        store.add(_ev(EventType.PROMPT_SUBMIT, "s2"))
+        assert [s.session_id for s in store.flush()] == ["s1", "s2"]
+        assert len(store) == 0 and store.counters["finalized_flush"] == 2
+
+    def test_不正な引数はValueError(self):
+        with pytest.raises(ValueError):
+            SessionStore(max_sessions=0)
@@ -0,0 +1,142 @@
+"""tool.start / tool.end のスパン相関の振る舞いを検証する仕様テスト。"""
+
+import pytest
+
+from openhook import EventType, OpenHookEvent
+from openhook.spans import ToolSpanCorrelator
+
+
+def _tool(type, call_id="call_1", session_id="s1", time="2026-02-23T10:00:00Z", **data):
+    if call_id is not None:
+        data["tool_call_id"] = call_id
+    return OpenHookEvent.create(
+        source="claude-code", type=type, session_id=session_id, data=data, time=time
+    )
+
+
+def _start(call_id="call_1", **kw):
+    return _tool(EventType.TOOL_START, call_id, tool_name="Bash", **kw)
+
+
+def _end(call_id="call_1", time="2026-02-23T10:00:01.500Z", **kw):
+    kw.setdefault("status", "success")
+    return _tool(EventType.TOOL_END, call_id, time=time, **kw)
+
+
+class TestToolSpanCorrelator_対応付け:
+    """同じ tool_call_id の tool.start と tool.end が1つのスパンになる。"""
+
+    def test_startの後のendでスパンが完成する(self):
+        c = ToolSpanCorrelator()
+        assert c.add(_start()) is None
+        span = c.add(_end())
+        assert span.tool_call_id == "call_1"
+        assert span.tool_name == "Bash"
+        assert span.status == "success"
+        assert span.duration_ms == pytest.approx(1500)
+
+    def test_endが先に届いても対応付けられる(self):
+        c = ToolSpanCorrelator()
+        assert c.add(_end()) is None
+        span = c.add(_start())
+        assert span.start.type == EventType.TOOL_START
+        assert span.duration_ms == pytest.approx(1500)
+
+    def test_セッションが異なれば同じidでも対応付けられない(self):
+        c = ToolSpanCorrelator()
+        c.add(_start(session_id="s1"))
+        assert c.add(_end(session_id="s2")) is None
+        assert len(c) == 2
+
+    def test_完成したスパンは保持されない(self):
+        c = ToolSpanCorrelator()
+        c.add(_start())
+        c.add(_end())
+        assert len(c) == 0
+
+    def test_tool_call_idがないイベントは数えて無視する(self):
+        c = ToolSpanCorrelator()
+        assert c.add(_start(call_id=None)) is None
+        assert c.counters["uncorrelated"] == 1
+        assert len(c) == 0
+
+
+class TestToolSpanCorrelator_duration検証:
+    """計算した所要時間は data.duration_ms と照合される。"""
+
+    def test_報告値との差がskew_msに入る(self):
+        c = ToolSpanCorrelator()
+        c.add(_start())
+        span = c.add(_end(duration_ms=1400))
+        assert span.reported_duration_ms == 1400
+        assert span.skew_ms == pytest.approx(100)
+        assert c.counters["duration_mismatches"] == 0
+
+    def test_許容差を超えると不一致として数えられる(self):
+        c = ToolSpanCorrelator(duration_tolerance_ms=50)
+        c.add(_start())
+        c.add(_end(duration_ms=1000))
+        assert c.counters["duration_mismatches"] == 1
+
+
+class TestToolSpanCorrelator_退避:
+    """対応の取れないイベントは上限・TTL・session.endで破棄される。"""
+
+    def test_上限を超えると最も古いものが破棄される(self):
+        evicted = []
+        c = ToolSpanCorrelator(max_open=2, on_evict=lambda e, r: evicted.append((e.data["tool_call_id"], r)))
+        for i in range(3):
+            c.add(_start(call_id=f"c{i}"))
+        assert len(c) == 2
+        assert evicted == [("c0", "capacity")]
+        assert c.counters["evicted_capacity"] == 1
+        assert c.counters["orphaned"] == 1
+
+    def test_TTLを過ぎたものは破棄される(self, clock):
+        c = ToolSpanCorrelator(ttl=10, clock=clock)
+        c.add(_start(call_id="old"))
+        clock.now = 5
+        c.add(_start(call_id="new"))
+        clock.now = 11
+        assert c.expire() == 1
+        assert len(c) == 1
+        assert c.counters["evicted_ttl"] == 1
+
+    def test_TTL切れの後に届いたendは対応付けられない(self, clock):
+        c = ToolSpanCorrelator(ttl=10, clock=clock)
+        c.add(_start())
+        clock.now = 20
+        assert c.add(_end()) is None
+
+    def test_session_endでそのセッションのものだけ破棄される(self):
+        c = ToolSpanCorrelator()
+        c.add(_start(call_id="a", session_id="s1"))
+        c.add(_start(call_id="b", session_id="s2"))
+        c.add(OpenHookEvent.create(source="x", type=EventType.SESSION_END, session_id="s1"))
+        assert len(c) == 1
+        assert c.counters["evicted_session_end"] == 1
+
+    def test_flushですべて破棄されon_evictに渡される(self):
+        evicted = []
+        c = ToolSpanCorrelator(on_evict=lambda e, reason: evicted.append((e.data["tool_call_id"], reason)))
+        c.add(_start(call_id="a", session_id="s1"))
+        c.add(_start(call_id="b", session_id="s2"))
+        assert c.flush() == 2
+        assert len(c) == 0
+        assert evicted == [("a", "flush"), ("b", "flush")]
+        assert c.counters["evicted_flush"] == 2
+
+    def test_重複したstartは新しい方に置き換えられる(self):
+        c = ToolSpanCorrelator()
+        c.add(_start(time="2026-02-23T10:00:00Z"))
+        c.add(_start(time="2026-02-23T10:00:01Z"))
+        span = c.add(_end())
+        assert c.counters["duplicates"] == 1
+        assert span.duration_ms == pytest.approx(500)
+
+    def test_大量の孤立イベントでも保持数は上限を超えない(self):
+        c = ToolSpanCorrelator(max_open=100)
+        for i in range(10_000):
+            c.add(_start(call_id=f"c{i}", session_id=f"s{i % 7}"))
+        assert len(c) == 100
+        assert sum(len(v) for v in c._by_session.values()) == 100
@@ -0,0 +1,248 @@
+"""ディスクスプールの追記・再生・復旧の振る舞いを検証する仕様テスト。"""
+
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from openhook import EventType, LazyEvent, OpenHookEvent
+from openhook.envelope import LineError
+from openhook.spool import SpoolReader, SpoolWriter, recover
+
+
+def _event(i):
+    return OpenHookEvent.create(
+        source="test", type=EventType.TOOL_END, session_id="s1",
+        data={"n": i}, event_id=f"e{i}", time="2026-02-23T10:00:00Z",
+    )
+
+
+def _ids(directory, cursor=0):
+    return [e.id for e, _ in SpoolReader(directory).replay(cursor)]
+
+
+class TestSpool_追記と再生:
+    """追記したイベントはカーソルから順に再生される。"""
+
+    def test_追記した順に再生される(self, tmp_path):
+        with SpoolWriter(tmp_path) as spool:
+            for i in range(3):
+                spool.append(_event(i))
+        events = [e for e, _ in SpoolReader(tmp_path).replay()]
+        assert events == [_event(i) for i in range(3)]
+
+    def test_カーソルから再開すると続きだけが返される(self, tmp_path):
+        with SpoolWriter(tmp_path) as spool:
+            spool.append(_event(0))
+            cursor = spool.append(_event(1))
+            spool.append(_event(2))
+        assert _ids(tmp_path, cursor) == ["e2"]
+
+    def test_再生中に返されるカーソルは次のレコードを指す(self, tmp_path):
+        with SpoolWriter(tmp_path) as spool:
+            ends = [spool.append(_event(i)) for i in range(3)]
+        assert [c for _, c in SpoolReader(tmp_path).replay()] == ends
+
+    def test_lazyではLazyEventが返される(self, tmp_path):
+        with SpoolWriter(tmp_path) as spool:
+            spool.append(_event(0))
+        (event, _), = SpoolReader(tmp_path).replay(lazy=True)
+        assert isinstance(event, LazyEvent)
+
+    def test_append_manyは1回の書き込みで追記する(self, tmp_path):
+        with SpoolWriter(tmp_path) as spool:
+            spool.append_many(_event(i) for i in range(5))
+            assert spool.counters["records"] == 5
+            assert spool.counters["fsyncs"] == 1
+        assert len(_ids(tmp_path)) == 5
+
+    def test_空のスプールは何も返さない(self, tmp_path):
+        assert _ids(tmp_path) == []
+
+
+class TestSpool_不正なレコード:
+    """CRC は正しいがエンベロープとして不正なレコードは on_error で扱われる。"""
+
+    def _spool(self, directory):
+        with SpoolWriter(directory) as spool:
+            spool.append(_event(0))
+            spool.append_bytes(b'{"not": "an envelope"}')
+            return spool.append(_event(2))
+
+    def test_既定ではLineErrorが発生する(self, tmp_path):
+        self._spool(tmp_path)
+        with pytest.raises(LineError) as info:
+            _ids(tmp_path)
+        assert info.value.lineno == 2
+
+    def test_skipでは読み飛ばして次のカーソルへ進む(self, tmp_path):
+        end = self._spool(tmp_path)
+        replayed = list(SpoolReader(tmp_path).replay(on_error="skip"))
+        assert [e.id for e, _ in replayed] == ["e0", "e2"]
+        assert replayed[-1][1] == end
+
+    def test_collectではエラーを集める(self, tmp_path):
+        self._spool(tmp_path)
+        errors = []
+        events = [e.id for e, _ in SpoolReader(tmp_path).replay(on_error="collect", errors=errors)]
+        assert events == ["e0", "e2"]
+        assert [(err.lineno, err.line) for err in errors] == [(2, b'{"not": "an envelope"}')]
+
+
+class TestSpool_セグメント:
+    """セグメントはサイズでローテーションされ、再生はセグメントを跨ぐ。"""
+
+    def test_segment_bytesを超えると新しいセグメントになる(self, tmp_path):
+        with SpoolWriter(tmp_path, segment_bytes=500) as spool:
+            for i in range(20):
+                spool.append(_event(i))
+        reader = SpoolReader(tmp_path)
+        assert len(reader.segments()) > 1
+        assert _ids(tmp_path) == [f"e{i}" for i in range(20)]
+
+    def test_セグメント名は先頭のオフセットになる(self, tmp_path):
+        with SpoolWriter(tmp_path, segment_bytes=500) as spool:
+            for i in range(20):
+                spool.append(_event(i))
+        segments = SpoolReader(tmp_path).segments()
+        for base, next_base in zip(segments, segments[1:]):
+            size = os.path.getsize(tmp_path / f"{base:020d}.log")
+            assert base + size == next_base
+
+    def test_読み終えたセグメントはpurgeで削除される(self, tmp_path):
+        with SpoolWriter(tmp_path, segment_bytes=500) as spool:
+            for i in range(20):
+                spool.append(_event(i))
+        reader = SpoolReader(tmp_path)
+        cursor = [c for _, c in reader.replay()][14]
+        removed = reader.purge(cursor)
+        assert removed >= 1
+        assert _ids(tmp_path, cursor) == [f"e{i}" for i in range(15, 20)]
+
+    def test_再起動した書き込み側は最後のセグメントに追記する(self, tmp_path):
+        with SpoolWriter(tmp_path, segment_bytes=500) as spool:
+            for i in range(10):
+                spool.append(_event(i))
+        with SpoolWriter(tmp_path, segment_bytes=500) as spool:
+            spool.append(_event(10))
+        assert _ids(tmp_path)[-2:] == ["e9", "e10"]
+
+
+class TestSpool_復旧:
+    """壊れた末尾は再生で読まれず、recover() で切り詰められる。"""
+
+    def _segment(self, tmp_path):
+        (base,) = SpoolReader(tmp_path).segments()
+        return tmp_path / f"{base:020d}.log"
+
+    def test_途中で切れたレコードは再生されない(self, tmp_path):
+        with SpoolWriter(tmp_path) as spool:
+            spool.append(_event(0))
+            spool.append(_event(1))
+        path = self._segment(tmp_path)
+        os.truncate(path, os.path.getsize(path) - 3)
+        assert _ids(tmp_path) == ["e0"]
+
+    def test_CRCが一致しないレコード以降は再生されない(self, tmp_path):
+        with SpoolWriter(tmp_path) as spool:
+            spool.append(_event(0))
+            cursor = spool.append(_event(1))
+            spool.append(_event(2))
+        path = self._segment(tmp_path)
+        data = bytearray(path.read_bytes())
+        data[cursor - 2] ^= 0xFF
+        path.write_bytes(bytes(data))
+        assert _ids(tmp_path) == ["e0"]
+
+    def test_recoverは壊れた末尾を切り詰める(self, tmp_path):
+        with SpoolWriter(tmp_path) as spool:
+            spool.append(_event(0))
+            end = spool.append(_event(1))
+        path = self._segment(tmp_path)
+        with open(path, "ab") as f:
+            f.write(b"\x10\x00\x00\x00torn")
+        assert recover(tmp_path) == 8
+        assert os.path.getsize(path) == end
+        with SpoolWriter(tmp_path) as spool:
+            spool.append(_event(2))
+        assert _ids(tmp_path) == ["e0", "e1", "e2"]
+
+    def test_壊れていなければrecoverは何もしない(self, tmp_path):
+        with SpoolWriter(tmp_path) as spool:
+            spool.append(_event(0))
+        assert recover(tmp_path) == 0
+
+
+class TestSpool_並行書き込み:
+    """複数のスレッドやプロセスから追記してもレコードは壊れない。"""
+
+    def test_スレッド間でfsyncがまとめられる(self, tmp_path):
+        spool = SpoolWriter(tmp_path, commit_delay=0.005)
+        threads = [
+            threading.Thread(target=lambda k=k: [spool.append(_event(k * 100 + i)) for i in range(20)])
+            for k in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        spool.close()
+        assert spool.counters["records"] == 160
+        assert spool.counters["fsyncs"] < 160
+        assert len(set(_ids(tmp_path))) == 160
+
+    def test_fsyncしない設定ではsyncまで書き込むだけ(self, tmp_path):
+        spool = SpoolWriter(tmp_path, fsync=False)
+        spool.append(_event(0))
+        assert spool.counters["fsyncs"] == 0
+        spool.sync()
+        assert spool.counters["fsyncs"] == 1
+        spool.close()
+
+    def test_別の書き込み側のfsyncが自分のレコードを含めばfsyncしない(self, tmp_path):
+        first = SpoolWriter(tmp_path, fsync=False)
+        second = SpoolWriter(tmp_path, fsync=False)
+        first.append(_event(0))
+        second.append(_event(1))
+        second.sync()
+        first.sync()
+        assert second.counters["fsyncs"] == 1
+        assert first.counters["fsyncs"] == 0
+        assert first.counters["shared_fsyncs"] == 1
+        # 共有されたfsyncの後に書いたレコードは自分でfsyncする
+        first.append(_event(2))
+        first.sync()
+        assert first.counters["fsyncs"] == 1
+        first.close()
+        second.close()
+
+    def test_ログの末尾を超える記録済みオフセットは信用しない(self, tmp_path):
+        (tmp_path / ".synced").write_bytes((10**9).to_bytes(8, "little"))
+        with SpoolWriter(tmp_path) as spool:
+            spool.append(_event(0))
+            assert spool.counters["fsyncs"] == 1
+            assert spool.counters["shared_fsyncs"] == 0
+
+    def test_複数プロセスからの追記がすべて読める(self, tmp_path):
+        code = (
+            "import sys\n"
+            "from openhook import EventType, OpenHookEvent\n"
+            "from openhook.spool import SpoolWriter\n"
+            "with SpoolWriter(sys.argv[1], segment_bytes=2000, fsync=False) as spool:\n"
+            "    for i in range(50):\n"
+            "        spool.append(OpenHookEvent.create(source='p', type=EventType.TOOL_END,\n"
+            "            session_id='s', event_id=f'{sys.argv[2]}-{i}'))\n"
+        )
+        env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+        procs = [
+            subprocess.Popen([sys.executable, "-c", code, str(tmp_path), str(k)], env=env)
+            for k in range(4)
+        ]
+        assert all(p.wait() == 0 for p in procs)
+        ids = _ids(tmp_path)
+        assert len(ids) == len(set(ids)) == 200
+        for k in range(4):
+            mine = [i for i in ids if i.startswith(f"{k}-")]
+            assert mine == [f"{k}-{i}" for i in range(50)]
@@ -0,0 +1,138 @@
+"""タイムスタンプの解析、epoch_ns アクセサ、時刻範囲による絞り込みの振る舞いを検証する仕様テスト。"""
+
+import io
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from openhook import EventType, LazyEvent, LineError, OpenHookEvent, iter_events
+from openhook.timestamps import TimeRange, format_time, parse_time
+
+_BASE = parse_time("2026-02-23T10:00:00Z")
+
+
+def _event(time, data=None):
+    return OpenHookEvent.create(
+        source="claude-code", type=EventType.TOOL_END, session_id="s1", data=data, time=time,
+    )
+
+
+def _ndjson(*lines):
+    return io.BytesIO(b"".join(line + b"\n" for line in lines))
+
+
+class TestParseTime:
+    """タイムスタンプはナノ秒精度の整数に変換される。"""
+
+    def test_マイクロ秒まで失われない(self):
+        assert parse_time("2026-02-23T10:00:00.123456Z") % 1_000_000_000 == 123_456_000
+
+    def test_ナノ秒まで失われない(self):
+        assert parse_time("2026-02-23T10:00:00.123456789Z") - _BASE == 123_456_789
+
+    def test_タイムゾーン付きの時刻はUTCに換算される(self):
+        assert parse_time("2026-02-23T19:00:00+09:00") == _BASE
+
+    def test_Zと00_00は同じ時刻になる(self):
+        assert parse_time("2026-02-23T10:00:00.5+00:00") == parse_time("2026-02-23T10:00:00.5Z") == _BASE + 500_000_000
+
+    def test_オフセットのない時刻はUTCとみなされる(self):
+        assert parse_time("2026-02-23T10:00:00") == _BASE
+
+    def test_datetimeと同じ値になる(self):
+        start = datetime(2024, 2, 28, 23, 59, 59, tzinfo=timezone.utc)
+        for i in range(0, 400 * 86_400, 86_399):
+            dt = start + timedelta(seconds=i, microseconds=i % 1_000_000)
+            expected = int((dt - datetime(1970, 1, 1, tzinfo=timezone.utc)) / timedelta(microseconds=1)) * 1000
+            assert parse_time(dt.isoformat()) == expected
+            assert parse_time(dt.isoformat().replace("+00:00", "Z")) == expected
+
+    @pytest.mark.parametrize("value", ["yesterday", "", "2026-02-23T25:00:00Z", "2026-02-30T10:00:00Z", None, 1700000000])
+    def test_解釈できない時刻はNoneを返す(self, value):
+        assert parse_time(value) is None
+
+    def test_format_timeで往復できる(self):
+        for ns in (_BASE, _BASE + 500_000_000, _BASE + 123_456_789):
+            assert parse_time(format_time(ns)) == ns
+        assert format_time(_BASE) == "2026-02-23T10:00:00Z"
+
+
+class TestEpochNs:
+    """epoch_ns はイベントごとに一度だけ計算される。"""
+
+    def test_OpenHookEventのtimeを変換する(self):
+        event = _event("2026-02-23T10:00:01Z")
+        assert event.epoch_ns == _BASE + 1_000_000_000
+
+    def test_2回目以降は解析しない(self, monkeypatch):
+        event = _event("2026-02-23T10:00:01Z")
+        assert event.epoch_ns is not None
+        monkeypatch.setattr("openhook.timestamps.parse_time", lambda t: pytest.fail("parsed twice"))
+        assert event.epoch_ns == _BASE + 1_000_000_000
+
+    def test_LazyEventでも使える(self):
+        event = LazyEvent.from_json(_event("2026-02-23T10:00:01Z").to_json())
+        assert event.epoch_ns == _BASE + 1_000_000_000
+
+    def test_キャッシュは等価性に影響しない(self):
+        a, b = _event("2026-02-23T10:00:00Z"), _event("2026-02-23T10:00:00Z")
+        object.__setattr__(b, "id", a.id)
+        a.epoch_ns
+        assert a == b
+
+    def test_解釈できない時刻はNone(self):
+        assert _event("yesterday").epoch_ns is None
+
+
+class TestTimeRange:
+    """TimeRange は行を復号せずに範囲外のイベントを判定する。"""
+
+    def test_範囲は半開区間(self):
+        window = TimeRange("2026-02-23T10:00:00Z", "2026-02-23T10:00:01Z")
+        assert _BASE in window
+        assert _BASE + 999_999_999 in window
+        assert _BASE + 1_000_000_000 not in window
+        assert None not in window
+
+    def test_行の時刻で判定する(self):
+        window = TimeRange(since=_BASE + 1)
+        assert window.skips(_event("2026-02-23T10:00:00Z").to_json_bytes())
+        assert not window.skips(_event("2026-02-23T10:00:01Z").to_json())
+
+    def test_timeキーが複数あれば復号して判定する(self):
+        line = _event("2026-02-23T10:00:01Z", {"time": "2026-02-23T09:00:00Z"}).to_json_bytes()
+        assert not TimeRange(since=_BASE).skips(line)
+        assert TimeRange(until=_BASE).skips(line)
+
+    def test_値がtimeの文字列でも誤判定しない(self):
+        line = b'{"data": {"kind": "time"}, "time": "2026-02-23T10:00:01Z"}'
+        assert not TimeRange(since=_BASE).skips(line)
+
+    def test_解釈できない範囲はValueError(self):
+        with pytest.raises(ValueError):
+            TimeRange(since="yesterday")
+
+
+class TestIterEvents_時刻範囲:
+    """iter_events は since / until の範囲のイベントだけを返す。"""
+
+    def test_範囲内のイベントだけを返す(self):
+        times = [f"2026-02-23T10:00:0{i}Z" for i in range(5)]
+        stream = _ndjson(*(_event(t).to_json_bytes() for t in times))
+        events = list(iter_events(stream, since="2026-02-23T10:00:01Z", until=_BASE + 3_000_000_000))
+        assert [e.time for e in events] == times[1:3]
+
+    def test_範囲外の壊れた行は復号されない(self):
+        broken = b'{"time": "2026-02-23T09:00:00Z", "id": ' + b"x" * 10
+        stream = _ndjson(broken, _event("2026-02-23T10:00:00Z").to_json_bytes())
+        (event,) = iter_events(stream, since=_BASE)
+        assert event.epoch_ns == _BASE
+
+    def test_範囲内の壊れた行はLineErrorになる(self):
+        stream = _ndjson(b'{"time": "2026-02-23T10:00:00Z", broken')
+        with pytest.raises(LineError):
+            list(iter_events(stream, since=_BASE))
+
+    def test_時刻を解釈できないイベントは除外される(self):
+        stream = _ndjson(_event("yesterday").to_json_bytes())
+        assert list(iter_events(stream, until=_BASE)) == []
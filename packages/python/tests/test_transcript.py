@@ -0,0 +1,134 @@
+"""トランスクリプトの増分読み込みの振る舞いを検証する仕様テスト。"""
+
+import json
+import os
+
+from openhook import EventType, OpenHookEvent
+from openhook.transcript import TranscriptReader, iter_records
+
+
+def _append(path, *records, newline=True):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("\n".join(json.dumps(r) for r in records) + ("\n" if newline else ""))
+
+
+def _assistant(n, model="claude-sonnet-4-6"):
+    return {
+        "type": "assistant",
+        "message": {"model": model, "usage": {"input_tokens": n}, "content": [{"type": "text", "text": "x" * 50}]},
+    }
+
+
+def _session_end(path, session_id="s1"):
+    return OpenHookEvent.create(
+        source="claude-code", type=EventType.SESSION_END, session_id=session_id,
+        data={"transcript_path": str(path)},
+    )
+
+
+class TestIterRecords:
+    """iter_records() は完結した行だけをオフセット付きで返す。"""
+
+    def test_各レコードの終端オフセットが返される(self, tmp_path):
+        path = tmp_path / "t.jsonl"
+        _append(path, {"n": 1}, {"n": 2})
+        records = list(iter_records(path))
+        assert [r for _, r in records] == [{"n": 1}, {"n": 2}]
+        assert records[-1][0] == os.path.getsize(path)
+
+    def test_改行のない末尾行は読まない(self, tmp_path):
+        path = tmp_path / "t.jsonl"
+        _append(path, {"n": 1})
+        _append(path, {"n": 2}, newline=False)
+        assert [r for _, r in iter_records(path)] == [{"n": 1}]
+
+    def test_空行と壊れた行は読み飛ばされる(self, tmp_path):
+        path = tmp_path / "t.jsonl"
+        path.write_text('{"n": 1}\n\n{broken\n{"n": 2}\n')
+        assert [r for _, r in iter_records(path)] == [{"n": 1}, {"n": 2}]
+
+    def test_空のファイルは何も返さない(self, tmp_path):
+        path = tmp_path / "t.jsonl"
+        path.write_bytes(b"")
+        assert list(iter_records(path)) == []
+
+
+class TestIterRecords_フィールド抽出:
+    """fields を指定すると必要な値だけが取り出される。"""
+
+    def test_ドット区切りのパスで値が取り出される(self, tmp_path):
+        path = tmp_path / "t.jsonl"
+        _append(path, _assistant(10))
+        (_, record), = iter_records(path, fields=("message.model", "message.usage"))
+        assert record == {"message.model": "claude-sonnet-4-6", "message.usage": {"input_tokens": 10}}
+
+    def test_指定したフィールドを含まないレコードは返さない(self, tmp_path):
+        path = tmp_path / "t.jsonl"
+        _append(path, {"type": "user", "message": {"content": "hi"}}, _assistant(10), {"usage": 1})
+        records = [r for _, r in iter_records(path, fields=("message.usage",))]
+        assert records == [{"message.usage": {"input_tokens": 10}}]
+
+
+class TestTranscriptReader_チェックポイント:
+    """同じセッションの再読み込みでは追記分だけを読む。"""
+
+    def test_追記された分だけが返される(self, tmp_path):
+        path = tmp_path / "t.jsonl"
+        reader = TranscriptReader()
+        _append(path, _assistant(1), _assistant(2))
+        assert len(list(reader.read(_session_end(path)))) == 2
+        _append(path, _assistant(3))
+        records = list(reader.read(_session_end(path)))
+        assert [r["message"]["usage"]["input_tokens"] for r in records] == [3]
+        assert reader.offset("s1") == os.path.getsize(path)
+
+    def test_途中で読むのをやめても受け取った分までは進む(self, tmp_path):
+        path = tmp_path / "t.jsonl"
+        reader = TranscriptReader()
+        _append(path, _assistant(1), _assistant(2), _assistant(3))
+        next(reader.read(path))
+        assert [r["message"]["usage"]["input_tokens"] for r in reader.read(path)] == [2, 3]
+
+    def test_書きかけの末尾行は次回に読まれる(self, tmp_path):
+        path = tmp_path / "t.jsonl"
+        reader = TranscriptReader()
+        _append(path, {"n": 1})
+        with open(path, "a") as f:
+            f.write('{"n": ')
+        assert list(reader.read(path)) == [{"n": 1}]
+        with open(path, "a") as f:
+            f.write("2}\n")
+        assert list(reader.read(path)) == [{"n": 2}]
+
+    def test_置き換えられたファイルは先頭から読み直す(self, tmp_path):
+        path = tmp_path / "t.jsonl"
+        reader = TranscriptReader()
+        _append(path, {"n": 1}, {"n": 2})
+        list(reader.read(path))
+        replacement = tmp_path / "new.jsonl"
+        _append(replacement, {"n": 3})
+        os.replace(replacement, path)
+        assert list(reader.read(path)) == [{"n": 3}]
+
+    def test_transcript_pathのないイベントは何も返さない(self):
+        event = OpenHookEvent.create(source="x", type=EventType.SESSION_END, session_id="s1")
+        assert list(TranscriptReader().read(event)) == []
+
+    def test_チェックポイントは保存して復元できる(self, tmp_path):
+        path = tmp_path / "t.jsonl"
+        offsets = tmp_path / "offsets.json"
+        _append(path, {"n": 1})
+        reader = TranscriptReader(offsets)
+        list(reader.read(_session_end(path)))
+        reader.save()
+        _append(path, {"n": 2})
+        assert list(TranscriptReader(offsets).read(_session_end(path))) == [{"n": 2}]
+
+    def test_max_sessionsを超えると最も古いセッションが忘れられる(self, tmp_path):
+        path = tmp_path / "t.jsonl"
+        _append(path, {"n": 1})
+        reader = TranscriptReader(max_sessions=2)
+        for session_id in ("a", "b", "c"):
+            list(reader.read(path, session_id=session_id))
+        assert len(reader) == 2
+        assert reader.offset("a") == 0
@@ -0,0 +1,273 @@
+"""バッファ付き EventWriter とフラッシュポリシーの振る舞いを検証する仕様テスト。"""
+
+import io
+import os
+import signal
+import time
+
+import pytest
+
+from openhook import EventType, LazyEvent, OpenHookEvent
+from openhook.writer import EventWriter
+
+
+class _Recorder(io.BytesIO):
+    """write と flush の呼び出しを記録するバイナリストリーム。"""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+        self.flushes = 0
+
+    def write(self, b):
+        self.writes += 1
+        return super().write(b)
+
+    def flush(self):
+        self.flushes += 1
+
+
+def _event(i):
+    return OpenHookEvent.create(
+        source="claude-code", type=EventType.TOOL_START, session_id="s1",
+        data={"tool_name": "Bash", "tool_call_id": f"c{i}"}, event_id=f"e{i}", time="2026-02-23T10:00:00Z",
+    )
+
+
+def _emitted(events):
+    stream = io.StringIO()
+    for event in events:
+        event.emit(stream)
+    return stream.getvalue()
+
+
+class TestEventWriter_出力:
+    """出力は emit() を1件ずつ呼んだ場合と同じになる。"""
+
+    def test_バイナリストリームへの出力はemitと同じ(self):
+        events = [_event(i) for i in range(5)]
+        out = io.BytesIO()
+        with EventWriter(out) as writer:
+            writer.write_many(events)
+        assert out.getvalue() == _emitted(events).encode()
+
+    def test_テキストストリームへの出力はemitと同じ(self):
+        events = [_event(i) for i in range(5)]
+        out = io.StringIO()
+        with EventWriter(out) as writer:
+            writer.write_many(events)
+        assert out.getvalue() == _emitted(events)
+
+    def test_writeだけを持つオブジェクトにはテキストで書く(self):
+        class Sink:
+            def __init__(self):
+                self.chunks = []
+
+            def write(self, s):
+                self.chunks.append(s)
+
+            def flush(self):
+                pass
+
+        events = [_event(i) for i in range(3)]
+        out = Sink()
+        with EventWriter(out) as writer:
+            writer.write_many(events)
+            writer.write_bytes(_event(3).to_json_bytes())
+        assert all(isinstance(chunk, str) for chunk in out.chunks)
+        assert "".join(out.chunks) == _emitted(events + [_event(3)])
+
+    def test_modeにbを含むオブジェクトにはバイト列で書く(self):
+        class Sink:
+            mode = "wb"
+
+            def __init__(self):
+                self.chunks = []
+
+            def write(self, b):
+                self.chunks.append(b)
+
+            def flush(self):
+                pass
+
+        out = Sink()
+        with EventWriter(out) as writer:
+            writer.write(_event(0))
+        assert out.chunks == [_emitted([_event(0)]).encode()]
+
+    def test_LazyEventとエンコード済みのバイト列も書ける(self):
+        out = io.BytesIO()
+        with EventWriter(out) as writer:
+            writer.write(LazyEvent.from_json(_event(0).to_json_bytes()))
+            writer.write_bytes(_event(1).to_json_bytes())
+        assert out.getvalue() == _emitted([_event(0), _event(1)]).encode()
+
+    def test_直接書いたテキストとの順序が保たれる(self):
+        raw = io.BytesIO()
+        text = io.TextIOWrapper(raw, encoding="utf-8")
+        writer = EventWriter(text)
+        writer.write(_event(0))
+        writer.flush()
+        text.write("between\n")
+        writer.write(_event(1))
+        writer.close()
+        lines = raw.getvalue().splitlines()
+        assert lines[1] == b"between"
+        assert [OpenHookEvent.from_json(lines[i]).id for i in (0, 2)] == ["e0", "e1"]
+
+
+class TestEventWriter_フラッシュポリシー:
+    """バッファはポリシーの条件を満たすと1回の write でまとめて書き出される。"""
+
+    def test_max_eventsに達するとまとめて書き出す(self):
+        out = _Recorder()
+        writer = EventWriter(out, max_events=3, max_bytes=None)
+        for i in range(7):
+            writer.write(_event(i))
+        assert (out.writes, out.flushes) == (2, 2)
+        assert len(writer) == 1
+        writer.close()
+        assert out.getvalue().count(b"\n") == 7
+
+    def test_max_bytesに達すると書き出す(self):
+        out = _Recorder()
+        size = len(_event(0).to_json_bytes()) + 1
+        writer = EventWriter(out, max_bytes=size * 2)
+        writer.write(_event(0))
+        assert out.writes == 0
+        writer.write(_event(1))
+        assert out.writes == 1
+        assert writer.counters == {"events": 2, "bytes": size * 2, "flushes": 1, "failed_flushes": 0}
+
+    def test_max_ageを過ぎると次のイベントで書き出す(self, clock):
+        out = _Recorder()
+        writer = EventWriter(out, max_bytes=None, max_age=0.5, clock=clock)
+        writer.write(_event(0))
+        clock.now = 0.4
+        writer.write(_event(1))
+        assert out.writes == 0
+        clock.now = 0.5
+        writer.write(_event(2))
+        assert out.writes == 1 and len(writer) == 0
+
+    def test_ポリシーがなければ明示的なflushまで書かない(self):
+        out = _Recorder()
+        writer = EventWriter(out, max_bytes=None)
+        writer.write_many(_event(i) for i in range(100))
+        assert out.writes == 0
+        writer.flush()
+        assert (out.writes, out.flushes) == (1, 1)
+
+    def test_空のバッファのflushは何も書かない(self):
+        out = _Recorder()
+        EventWriter(out).flush()
+        assert out.writes == 0
+
+    def test_max_eventsが0ならValueErrorが発生する(self):
+        with pytest.raises(ValueError):
+            EventWriter(io.BytesIO(), max_events=0)
+
+
+class _Failing(io.BytesIO):
+    """最初の fail 回の write で BrokenPipeError を送出するストリーム。"""
+
+    def __init__(self, fail):
+        super().__init__()
+        self.fail = fail
+
+    def write(self, b):
+        if self.fail:
+            self.fail -= 1
+            raise BrokenPipeError
+        return super().write(b)
+
+
+class TestEventWriter_書き込み失敗:
+    """write が失敗してもバッファの行は失われず、次のフラッシュで書かれる。"""
+
+    def test_失敗したバッチはバッファに残る(self):
+        out = _Failing(1)
+        writer = EventWriter(out, max_bytes=None)
+        writer.write_many(_event(i) for i in range(3))
+        with pytest.raises(BrokenPipeError):
+            writer.flush()
+        assert len(writer) == 3 and writer.counters["events"] == 0
+        writer.flush()
+        assert out.getvalue() == _emitted(_event(i) for i in range(3)).encode()
+
+    def test_ポリシーによるフラッシュの失敗でも次の書き込みで再送される(self):
+        out = _Failing(1)
+        writer = EventWriter(out, max_events=2, max_bytes=None)
+        writer.write(_event(0))
+        with pytest.raises(BrokenPipeError):
+            writer.write(_event(1))
+        writer.write(_event(2))
+        assert out.getvalue() == _emitted(_event(i) for i in range(3)).encode()
+
+
+class TestEventWriter_フラッシュスレッド:
+    """flush_thread を指定するとイベントが来なくても max_age で書き出される。"""
+
+    def test_次のイベントがなくてもmax_ageで書き出す(self):
+        out = io.BytesIO()
+        writer = EventWriter(out, max_bytes=None, max_age=0.05, flush_thread=True)
+        writer.write(_event(0))
+        deadline = time.monotonic() + 5
+        while not out.getvalue() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert out.getvalue() == _emitted([_event(0)]).encode()
+        assert len(writer) == 0
+        writer.close()
+        assert writer._timer is None
+
+    def test_スレッドでの失敗は数えて後で再試行する(self):
+        out = _Failing(1)
+        writer = EventWriter(out, max_bytes=None, max_age=0.05, flush_thread=True)
+        writer.write(_event(0))
+        deadline = time.monotonic() + 5
+        while not out.getvalue() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert out.getvalue() == _emitted([_event(0)]).encode()
+        assert writer.counters["failed_flushes"] == 1
+        writer.close()
+
+    def test_max_ageがなければスレッドを起動しない(self):
+        writer = EventWriter(io.BytesIO(), flush_thread=True)
+        writer.write(_event(0))
+        assert writer._timer is None
+        writer.close()
+
+
+class TestEventWriter_終了:
+    """with ブロックの終了やシグナルでバッファが書き出される。"""
+
+    def test_close後の書き込みはValueErrorが発生する(self):
+        writer = EventWriter(io.BytesIO())
+        writer.close()
+        with pytest.raises(ValueError):
+            writer.write(_event(0))
+
+    def test_例外で抜けても書き出される(self):
+        out = io.BytesIO()
+        with pytest.raises(RuntimeError):
+            with EventWriter(out) as writer:
+                writer.write(_event(0))
+                raise RuntimeError
+        assert out.getvalue().count(b"\n") == 1
+
+    def test_シグナルで書き出してから元のハンドラーを呼ぶ(self):
+        received = []
+        original = signal.signal(signal.SIGUSR1, lambda signum, frame: received.append(signum))
+        try:
+            out = io.BytesIO()
+            writer = EventWriter(out, signals=(signal.SIGUSR1,))
+            writer.write(_event(0))
+            os.kill(os.getpid(), signal.SIGUSR1)
+            assert out.getvalue().count(b"\n") == 1
+            assert received == [signal.SIGUSR1]
+            writer.close()
+            os.kill(os.getpid(), signal.SIGUSR1)
+            assert received == [signal.SIGUSR1] * 2
+            assert signal.getsignal(signal.SIGUSR1) is not writer._on_signal
+        finally:
+            signal.signal(signal.SIGUSR1, original)